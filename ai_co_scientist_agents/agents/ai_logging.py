@@ -4,11 +4,19 @@ AI 활용 로깅 에이전트
 """
 
 import logging
+import sys
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from datetime import datetime
 import json
 
+# Add shared module to path
+shared_path = Path(__file__).parent.parent.parent / "shared"
+if str(shared_path) not in sys.path:
+    sys.path.insert(0, str(shared_path))
+
+from ledger import InteractionLedger, get_ledger
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,11 +32,19 @@ class AILoggingAgent:
     - AI 기여도 자체 평가
     """
     
-    def __init__(self):
+    # 보고서에 상세 기록할 최근 상호작용 수 (통계는 ledger 전체 기준)
+    MAX_LOGGED_INTERACTIONS = 50
+    
+    def __init__(self, ledger_path: Optional[str] = None):
+        """
+        Args:
+            ledger_path: interaction ledger 경로 (없으면 프로세스 공용 ledger)
+        """
         self.role = "AI Logger"
         self.results = {}
         self.interactions = []
         self.model_usage = {}
+        self.ledger = InteractionLedger(ledger_path) if ledger_path else get_ledger()
         logger.info(f"{self.role} initialized")
     
     def compile_usage_report(self) -> Dict[str, Any]:
@@ -68,101 +84,38 @@ class AILoggingAgent:
         
         self._save_results()
         
-        logger.info(f"AI usage report compiled. Total interactions: {len(interactions)}")
+        logger.info(f"AI usage report compiled. Total interactions: {model_stats['total_interactions']}")
         
         return self.results
     
     def _collect_interactions(self) -> List[Dict[str, Any]]:
-        """AI 상호작용 로그 수집"""
-        # 실제 구현 시 로그 파일에서 읽어오기
+        """AI 상호작용 로그 수집 (ledger의 최근 기록)"""
         interactions = [
-            {
-                "timestamp": "2026-01-15 09:30:00",
-                "model": "claude-3-5-sonnet-20241022",
-                "phase": "Literature Review",
-                "task": "Generate search queries for related papers",
-                "prompt": "Based on the research topic 'AI-driven methodology for scientific research', generate 5 search queries for finding relevant papers on arXiv and Google Scholar.",
-                "response": "Here are 5 search queries: 1) AI-driven methodology recent advances, 2) Machine learning scientific research efficiency, ...",
-                "tokens_input": 150,
-                "tokens_output": 280,
-                "contribution_level": "High",
-            },
-            {
-                "timestamp": "2026-01-15 10:15:00",
-                "model": "claude-3-5-sonnet-20241022",
-                "phase": "Hypothesis Generation",
-                "task": "Generate research hypotheses based on literature gaps",
-                "prompt": "Based on the identified research gaps: 1) Limited multi-modal integration research, 2) Insufficient AI hypothesis validation, generate 3 testable hypotheses.",
-                "response": "Here are 3 hypotheses: H1) AI-driven methodology improves efficiency by 30%..., H2) Multi-modal integration enhances accuracy..., H3) Automation reduces time by 40%...",
-                "tokens_input": 200,
-                "tokens_output": 350,
-                "contribution_level": "High",
-            },
-            {
-                "timestamp": "2026-01-16 14:00:00",
-                "model": "gpt-4",
-                "phase": "Data Analysis",
-                "task": "Interpret statistical analysis results",
-                "prompt": "Interpret these statistical results: t(98)=4.52, p<0.001, Cohen's d=0.85 for AI vs Traditional efficiency comparison.",
-                "response": "The results indicate a statistically significant difference with a large effect size...",
-                "tokens_input": 120,
-                "tokens_output": 200,
-                "contribution_level": "Medium",
-            },
-            {
-                "timestamp": "2026-01-17 09:00:00",
-                "model": "claude-3-5-sonnet-20241022",
-                "phase": "Paper Writing",
-                "task": "Write abstract section",
-                "prompt": "Write a 250-word abstract for a research paper titled 'AI-Driven Methodology for Enhancing Scientific Research Efficiency' including background, objective, methods, results, and conclusion.",
-                "response": "Background: The integration of artificial intelligence... Objective: This study aims to quantify... Methods: We conducted a comparative study... Results: The AI-driven group demonstrated... Conclusions: AI-driven methodologies significantly improve...",
-                "tokens_input": 180,
-                "tokens_output": 420,
-                "contribution_level": "High",
-            },
-            {
-                "timestamp": "2026-01-17 11:30:00",
-                "model": "gemini-pro",
-                "phase": "Paper Writing",
-                "task": "Review and improve discussion section",
-                "prompt": "Review this discussion section and suggest improvements for clarity and scientific rigor: [discussion text]",
-                "response": "Here are suggested improvements: 1) Add more context to key findings, 2) Clarify limitations section, 3) Strengthen future work recommendations...",
-                "tokens_input": 500,
-                "tokens_output": 300,
-                "contribution_level": "Medium",
-            },
+            record.to_dict()
+            for record in self.ledger.tail(self.MAX_LOGGED_INTERACTIONS)
         ]
         
         self.interactions = interactions
         return interactions
     
     def _analyze_model_usage(self) -> Dict[str, Any]:
-        """모델 사용 통계 분석"""
-        model_counts = {}
-        phase_usage = {}
-        
-        for interaction in self.interactions:
-            model = interaction['model']
-            phase = interaction['phase']
-            
-            model_counts[model] = model_counts.get(model, 0) + 1
-            
-            if phase not in phase_usage:
-                phase_usage[phase] = {}
-            phase_usage[phase][model] = phase_usage[phase].get(model, 0) + 1
-        
-        total_tokens = sum(
-            i['tokens_input'] + i['tokens_output'] 
-            for i in self.interactions
-        )
+        """모델 사용 통계 분석 (ledger 전체를 streaming 집계)"""
+        usage = self.ledger.aggregate()
+        total = usage['total_interactions']
         
         return {
-            "total_interactions": len(self.interactions),
-            "models_used": list(model_counts.keys()),
-            "model_distribution": model_counts,
-            "phase_usage": phase_usage,
-            "total_tokens": total_tokens,
-            "average_tokens_per_interaction": total_tokens / len(self.interactions) if self.interactions else 0,
+            "total_interactions": total,
+            "models_used": list(usage['by_model'].keys()),
+            "model_distribution": {
+                model: stats['count'] for model, stats in usage['by_model'].items()
+            },
+            "model_details": usage['by_model'],
+            "phase_usage": usage['phase_usage'],
+            "total_tokens": usage['total_tokens'],
+            "average_tokens_per_interaction": usage['total_tokens'] / total if total else 0,
+            "total_cost_usd": usage['total_cost_usd'],
+            "cost_by_iteration": usage['by_iteration'],
+            "cost_per_iteration": usage['cost_per_iteration'],
         }
     
     def _create_checklist(self) -> Dict[str, Any]:
@@ -322,6 +275,7 @@ class AILoggingAgent:
 - **사용 AI 모델**: {', '.join(self.results['model_stats']['models_used'])}
 - **총 상호작용 횟수**: {self.results['model_stats']['total_interactions']}
 - **총 토큰 사용량**: {self.results['model_stats']['total_tokens']:,}
+- **총 비용 (USD)**: ${self.results['model_stats']['total_cost_usd']:.4f}
 
 ## 2. AI 활용 체크리스트
 
@@ -354,29 +308,18 @@ class AILoggingAgent:
         content += f"""
 ## 3. AI 상호작용 로그
 
-"""
-        for i, interaction in enumerate(self.results['interactions'], 1):
-            content += f"""
-### 3.{i} {interaction['phase']}
-
-**Timestamp**: {interaction['timestamp']}
-**Model**: {interaction['model']}
-**Task**: {interaction['task']}
-**Contribution Level**: {interaction['contribution_level']}
-**Tokens**: Input {interaction['tokens_input']}, Output {interaction['tokens_output']}
+최근 {len(self.results['interactions'])}건 (전체 {self.results['model_stats']['total_interactions']:,}건)
 
-**Prompt**:
-```
-{interaction['prompt']}
-```
-
-**Response**:
-```
-{interaction['response']}
-```
-
----
+| Timestamp | Iteration | Phase | Model | Prompt Hash | Tokens (In/Out) | Latency (ms) | Cost (USD) |
+|-----------|-----------|-------|-------|-------------|-----------------|--------------|------------|
 """
+        for interaction in self.results['interactions']:
+            content += (
+                f"| {interaction['timestamp']} | {interaction['iteration'] if interaction['iteration'] is not None else '-'} "
+                f"| {interaction['phase']} | {interaction['model']} | `{interaction['prompt_hash']}` "
+                f"| {interaction['tokens_input']}/{interaction['tokens_output']} "
+                f"| {interaction['latency_ms']} | {interaction['cost_usd']:.6f} |\n"
+            )
         
         content += f"""
 ## 4. AI 기여도 자체 평가
@@ -403,8 +346,12 @@ class AILoggingAgent:
 ### 5.1 모델별 사용 분포
 
 """
-        for model, count in self.results['model_stats']['model_distribution'].items():
-            content += f"- {model}: {count} interactions\n"
+        for model, stats in self.results['model_stats']['model_details'].items():
+            content += (
+                f"- {model}: {stats['count']} interactions, "
+                f"{stats['tokens_input'] + stats['tokens_output']:,} tokens, "
+                f"${stats['cost_usd']:.4f}, avg {stats['avg_latency_ms']} ms\n"
+            )
         
         content += f"""
 ### 5.2 단계별 모델 사용
@@ -415,6 +362,16 @@ class AILoggingAgent:
             for model, count in models.items():
                 content += f"  - {model}: {count}\n"
         
+        content += f"""
+### 5.3 Iteration별 비용
+
+| Iteration | 호출 수 | 토큰 | 비용 (USD) |
+|-----------|---------|------|------------|
+"""
+        for iteration, stats in self.results['model_stats']['cost_by_iteration'].items():
+            content += f"| {iteration} | {stats['count']} | {stats['tokens']:,} | {stats['cost_usd']:.4f} |\n"
+        content += f"\n**Iteration당 평균 비용**: ${self.results['model_stats']['cost_per_iteration']:.4f}\n"
+        
         content += f"""
 ## 6. 활용 URL 목록
 
@@ -9,6 +9,22 @@ from typing import Dict, List, Any
 from datetime import datetime
 import json
 
+import numpy as np
+from scipy import stats as sp_stats
+
+from analysis import (
+    AnalysisEngine,
+    FigureRenderer,
+    FigureSpec,
+    PreprocessingPipeline,
+    Resampler,
+    box_stats,
+    load_columns,
+    write_benchmark_dataset,
+    write_experiment_dataset,
+)
+from config.settings import DATA_CONFIG
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,10 +40,37 @@ class DataAnalysisAgent:
     - 결과 시각화
     """
     
+    DATA_DIR = Path("outputs/data")
+    
+    # 데이터셋별 분석 계획 (한 번의 스캔으로 모든 통계량 누적)
+    ANALYSIS_PLAN = {
+        "Research Performance Dataset": {
+            "numeric": ["research_efficiency", "prediction_accuracy", "time_to_insight", "time_to_insight_baseline"],
+            "categorical": ["methodology_type", "data_integration"],
+            "groups": [("methodology_type", "research_efficiency"), ("data_integration", "prediction_accuracy")],
+            "pairs": [("time_to_insight_baseline", "time_to_insight")],
+            "regression": ("time_to_insight", ["time_to_insight_baseline", "research_efficiency"]),
+        },
+        "Benchmark Dataset": {
+            "numeric": ["baseline_performance", "control_metrics"],
+        },
+    }
+    
+    # IQR 이상치 검사 컬럼 (시간 변수는 로그정규 분포라 제외)
+    OUTLIER_COLUMNS = {
+        "Research Performance Dataset": ["research_efficiency", "prediction_accuracy"],
+    }
+    
     def __init__(self):
         self.role = "Data Analyst"
         self.results = {}
         self.datasets = []
+        self.engine = AnalysisEngine(DATA_CONFIG, chunk_rows=DATA_CONFIG.get("chunk_rows", 250000),
+                                     seed=DATA_CONFIG.get("seed", 42))
+        self.resampler = Resampler(DATA_CONFIG, seed=DATA_CONFIG.get("seed", 42))
+        self.renderer = FigureRenderer("outputs/analysis_results", **DATA_CONFIG.get("figures", {}))
+        self.scans = {}
+        self.columns = {}
         logger.info(f"{self.role} initialized")
     
     def analyze_data(self, hypothesis_results: Dict[str, Any]) -> Dict[str, Any]:
@@ -87,13 +130,16 @@ class DataAnalysisAgent:
                 "format": "CSV",
                 "variables": [
                     "methodology_type",
+                    "data_integration",
                     "research_efficiency",
                     "prediction_accuracy",
+                    "time_to_insight_baseline",
                     "time_to_insight",
                 ],
                 "collection_method": "Controlled experiment simulation",
                 "license": "Research use only",
                 "url": "N/A (Generated data)",
+                "path": str(self.DATA_DIR / "research_performance.csv"),
             },
             {
                 "name": "Benchmark Dataset",
@@ -108,141 +154,283 @@ class DataAnalysisAgent:
                 "collection_method": "Published dataset",
                 "license": "CC BY 4.0",
                 "url": "https://example.com/dataset",
+                "path": str(self.DATA_DIR / "benchmark.json"),
             },
         ]
         
+        # 파일이 없으면 생성 (실험 시뮬레이션, seed 고정)
+        seed = DATA_CONFIG.get("seed", 42)
+        for ds, writer in zip(datasets, (write_experiment_dataset, write_benchmark_dataset)):
+            if not Path(ds["path"]).exists():
+                writer(ds["path"], int(ds["size"].split()[0]), seed=seed)
+        
         self.datasets = datasets
         return datasets
     
     def _preprocess_data(self, datasets: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """데이터 전처리"""
+        """데이터 전처리 (청크 단위 실행, 결과는 outputs/data/processed/<데이터셋>)"""
+        options = DATA_CONFIG.get("preprocessing", {})
+        totals = {"input": 0, "kept": 0, "train": 0, "test": 0}
+        missing, values, outliers, features = 0, 0, 0, 0
+        params = {}
+        
+        for ds in datasets:
+            plan = self.ANALYSIS_PLAN.get(ds["name"])
+            if plan is None:
+                continue
+            pipeline = PreprocessingPipeline(DATA_CONFIG, chunk_rows=self.engine.chunk_rows, seed=self.engine.seed)
+            output = self.DATA_DIR / "processed" / Path(ds["path"]).stem
+            meta = pipeline.fit_transform(ds["path"], output, plan["numeric"], plan.get("categorical", ()),
+                                          self.OUTLIER_COLUMNS.get(ds["name"], []))
+            ds["processed_path"] = str(output)
+            ds["size"] = f"{pipeline.rows['input']} records"
+            params[ds["name"]] = meta["params"]
+            
+            for key in totals:
+                totals[key] += pipeline.rows[key]
+            missing += sum(m.missing for m in pipeline.moments.values())
+            values += sum(m.n + m.missing for m in pipeline.moments.values())
+            outliers += sum(pipeline.outliers.values())
+            features += len(meta["features"])
+        
+        self.scans.clear()
+        self.columns = {}
+        action = "removed" if options.get("outlier_action", "drop") == "drop" else "clipped"
+        test_size = options.get("test_size", 0.2)
         return {
             "steps": [
-                "Missing value handling (imputation with mean)",
-                "Outlier detection (IQR method)",
+                f"Missing value handling (imputation with mean): {missing} values imputed",
+                f"Outlier detection (IQR method, k={options.get('iqr_factor', 1.5)}): {outliers} values {action}",
                 "Data normalization (z-score)",
                 "Feature encoding (one-hot for categorical)",
-                "Train-test split (80-20)",
+                f"Train-test split ({1 - test_size:.0%}-{test_size:.0%}): "
+                f"{totals['train']} train / {totals['test']} test records",
             ],
             "quality_metrics": {
-                "completeness": "98.5%",
-                "accuracy": "Validated against ground truth",
-                "consistency": "No contradictions found",
+                "completeness": f"{1 - missing / values:.1%}" if values else "N/A",
+                "accuracy": f"{outliers} values outside IQR fences {action}",
+                "consistency": f"{totals['input'] - totals['kept']} of {totals['input']} records dropped",
             },
-            "processed_records": 6000,
-            "features": 12,
+            "processed_records": totals["kept"],
+            "features": features,
+            "split": {"train": totals["train"], "test": totals["test"]},
+            "parameters": params,
         }
     
+    def _scan(self) -> Dict[str, Any]:
+        """데이터셋 스캔 (전처리 결과가 있으면 그것을 사용, 청크 단위로 1회 누적, 결과는 캐시)"""
+        for ds in self.datasets:
+            plan = self.ANALYSIS_PLAN.get(ds["name"])
+            if plan is None or ds["name"] in self.scans:
+                continue
+            self.scans[ds["name"]] = self.engine.scan(ds.get("processed_path", ds["path"]), **plan)
+        return self.scans
+    
     def _exploratory_analysis(self, preprocessed_data: Dict[str, Any]) -> Dict[str, Any]:
         """탐색적 데이터 분석"""
+        descriptive, correlations, matrices, distributions = {}, {}, {}, {}
+        
+        for name, scan in self._scan().items():
+            descriptive.update(self.engine.describe(scan))
+            matrix = self.engine.correlations(scan)
+            if matrix:
+                matrices[name] = matrix
+            columns = list(matrix)
+            for i, a in enumerate(columns):
+                for b in columns[i + 1:]:
+                    correlations[f"{a} vs {b}"] = matrix[a][b]
+            for column, moments in scan.columns.items():
+                distributions[column] = self.engine.distribution_shape(moments)
+        
         return {
-            "descriptive_statistics": {
-                "research_efficiency": {
-                    "mean": 15.3,
-                    "std": 3.2,
-                    "min": 8.5,
-                    "max": 22.1,
-                    "median": 15.1,
-                },
-                "prediction_accuracy": {
-                    "mean": 87.5,
-                    "std": 5.8,
-                    "min": 72.0,
-                    "max": 96.5,
-                    "median": 88.0,
-                },
-                "time_to_insight": {
-                    "mean": 4.2,
-                    "std": 1.5,
-                    "min": 2.0,
-                    "max": 8.5,
-                    "median": 4.0,
-                },
+            "descriptive_statistics": descriptive,
+            "correlations": correlations,
+            "correlation_matrix": matrices,
+            "distributions": distributions,
+        }
+    
+    def _statistical_analysis(self, preprocessed_data: Dict[str, Any]) -> Dict[str, Any]:
+        """통계 분석 (H1: Welch t-test, H2: ANOVA, H3: paired t-test, 회귀 적합도)"""
+        scan = self._scan()["Research Performance Dataset"]
+        level = DATA_CONFIG["confidence_level"]
+        
+        h1 = self.engine.t_test(scan, "methodology_type", "research_efficiency", "ai_driven", "traditional")
+        h2 = self.engine.anova(scan, "data_integration", "prediction_accuracy")
+        h3 = self.engine.paired(scan, "time_to_insight_baseline", "time_to_insight")
+        
+        resampled = self._resample()
+        tests = [
+            self._format_test(
+                "H1: AI-driven vs Traditional efficiency", h1,
+                "AI-driven methodology shows significantly higher efficiency"
+                if h1["significant"] and h1.get("mean_difference", 0) > 0
+                else "No significant efficiency advantage for AI-driven methodology",
+                resampled["H1"]
+            ),
+            self._format_test(
+                "H2: Multi-modal integration effect", h2,
+                "Data integration level significantly affects accuracy"
+                if h2["significant"] else "No significant effect of data integration level on accuracy",
+                resampled["H2"]
+            ),
+            self._format_test(
+                "H3: Automation time reduction", h3,
+                f"Automation reduces time-to-insight by {-h3.get('percent_change', 0):.0f}% on average"
+                if h3["significant"] and h3.get("mean_difference", 0) > 0
+                else "No significant time-to-insight reduction from automation",
+                resampled["H3"]
+            ),
+        ]
+        
+        method = f"bootstrap percentile, {self.resampler.n_resamples} resamples"
+        h1b, h2b, h3b = resampled["H1"], resampled["H2"], resampled["H3"]
+        intervals = {
+            "efficiency_difference": {
+                "estimate": round(h1b["observed"], 4),
+                "ci": [round(v, 4) for v in h1b["ci"]],
+                "unit": "tasks/hour",
+                "level": level,
+                "method": method,
             },
-            "correlations": {
-                "methodology_type vs efficiency": 0.72,
-                "data_integration vs accuracy": 0.68,
-                "automation vs time": -0.65,
+            "accuracy_improvement": {
+                "estimate": round(h2b.get("improvement_percent", float("nan")), 4),
+                "ci": [round(v, 4) for v in h2b.get("improvement_ci", [float("nan")] * 2)],
+                "unit": "%",
+                "comparison": f"{h2b.get('highest')} vs {h2b.get('lowest')} integration level",
+                "level": level,
+                "method": method,
             },
-            "distributions": {
-                "research_efficiency": "Approximately normal",
-                "prediction_accuracy": "Slightly left-skewed",
-                "time_to_insight": "Right-skewed",
+            "time_reduction": {
+                "estimate": round(h3b["observed"], 4),
+                "ci": [round(v, 4) for v in h3b["ci"]],
+                "unit": "%",
+                "level": level,
+                "method": method,
             },
         }
-    
-    def _statistical_analysis(self, preprocessed_data: Dict[str, Any]) -> Dict[str, Any]:
-        """통계 분석"""
+        
+        fit = self.engine.regression(scan)
         return {
-            "hypothesis_tests": [
-                {
-                    "hypothesis": "H1: AI-driven vs Traditional efficiency",
-                    "test": "Independent t-test",
-                    "statistic": 4.52,
-                    "p_value": 0.0001,
-                    "significant": True,
-                    "effect_size": "Cohen's d = 0.85 (large)",
-                    "conclusion": "AI-driven methodology shows significantly higher efficiency",
-                },
-                {
-                    "hypothesis": "H2: Multi-modal integration effect",
-                    "test": "ANOVA",
-                    "statistic": 12.34,
-                    "p_value": 0.001,
-                    "significant": True,
-                    "effect_size": "eta-squared = 0.42 (large)",
-                    "conclusion": "Data integration level significantly affects accuracy",
-                },
-                {
-                    "hypothesis": "H3: Automation time reduction",
-                    "test": "Paired t-test",
-                    "statistic": -6.78,
-                    "p_value": 0.00001,
-                    "significant": True,
-                    "effect_size": "Cohen's d = 1.2 (very large)",
-                    "conclusion": "Automation reduces time-to-insight by 42% on average",
-                },
-            ],
-            "confidence_intervals": {
-                "efficiency_difference": "[2.1, 4.3] at 95% CI",
-                "accuracy_improvement": "[8.5%, 15.2%] at 95% CI",
-                "time_reduction": "[35%, 49%] at 95% CI",
-            },
+            "hypothesis_tests": tests,
+            "confidence_intervals": intervals,
             "model_fit": {
-                "r_squared": 0.78,
-                "adjusted_r_squared": 0.76,
-                "rmse": 2.34,
+                "r_squared": fit.get("r_squared"),
+                "adjusted_r_squared": fit.get("adjusted_r_squared"),
+                "rmse": fit.get("rmse"),
+                "model": f"{fit.get('target')} ~ {' + '.join(c for c in fit.get('coefficients', {}) if c != 'intercept')}",
+                "coefficients": fit.get("coefficients", {}),
+                "n": fit.get("n"),
             },
         }
     
+    def _load_columns(self) -> Dict[str, Any]:
+        """재표본/그림용 실험 데이터 컬럼 (max_rows 이하 균등 표본, 결과는 캐시)"""
+        if not self.columns:
+            ds = next(d for d in self.datasets if d["name"] == "Research Performance Dataset")
+            self.columns = load_columns(
+                ds.get("processed_path", ds["path"]),
+                ["methodology_type", "research_efficiency", "data_integration", "prediction_accuracy",
+                 "time_to_insight_baseline", "time_to_insight"],
+                max_rows=self.resampler.options["max_rows"], seed=self.engine.seed,
+                chunk_rows=self.engine.chunk_rows
+            )
+        return self.columns
+    
+    def _resample(self) -> Dict[str, Dict[str, Any]]:
+        """H1-H3 부트스트랩 신뢰구간과 순열검정 p-value (전처리 결과를 메모리로 읽어 병렬 재표본)"""
+        data = self._load_columns()
+        methodology, integration = data["methodology_type"], data["data_integration"]
+        levels = sorted({str(v) for v in integration if v is not None})
+        return {
+            "H1": self.resampler.two_sample(data["research_efficiency"][methodology == "ai_driven"],
+                                            data["research_efficiency"][methodology == "traditional"], key="H1"),
+            "H2": self.resampler.k_sample([data["prediction_accuracy"][integration == level] for level in levels],
+                                          levels, key="H2"),
+            "H3": self.resampler.paired(data["time_to_insight_baseline"], data["time_to_insight"], key="H3"),
+        }
+    
+    @staticmethod
+    def _format_test(hypothesis: str, result: Dict[str, Any], conclusion: str,
+                     resampled: Dict[str, Any] = None) -> Dict[str, Any]:
+        """검정 결과를 보고서 형식으로 정리 (resampled: 순열검정 결과)"""
+        formatted = {
+            "hypothesis": hypothesis,
+            "test": result["test"],
+            "statistic": round(float(result["statistic"]), 4),
+            "p_value": float(f"{result['p_value']:.4g}"),
+            "significant": bool(result["significant"]),
+            "effect_size": f"{result.get('effect_measure', 'effect')} = {result['effect_size']:.2f} "
+                           f"({result.get('effect_label', 'n/a')})",
+            "conclusion": conclusion,
+            "n": result["n"],
+        }
+        if "df" in result:
+            df = result["df"]
+            formatted["df"] = [round(float(d), 2) for d in df] if isinstance(df, tuple) else round(float(df), 2)
+        means = result.get("means") or result.get("group_means")
+        if means:
+            formatted["group_means"] = {str(k): round(float(v), 4) for k, v in means.items()}
+        if "ci" in result:
+            formatted["confidence_interval"] = [round(float(v), 4) for v in result["ci"]]
+        if resampled and resampled.get("n_resamples"):
+            formatted["permutation_p_value"] = float(f"{resampled['p_value']:.4g}")
+        if not result["sufficient_sample"]:
+            formatted["warning"] = f"sample size {result['n']} < {DATA_CONFIG['min_sample_size']}"
+        return formatted
+    
     def _create_visualizations(self, data: Dict[str, Any], stats: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """시각화 생성"""
-        return [
-            {
-                "name": "efficiency_comparison",
-                "type": "box_plot",
-                "description": "Comparison of research efficiency between AI-driven and traditional approaches",
-                "file": "outputs/analysis_results/efficiency_comparison.png",
-            },
-            {
-                "name": "accuracy_by_integration",
-                "type": "bar_chart",
-                "description": "Prediction accuracy across different data integration levels",
-                "file": "outputs/analysis_results/accuracy_by_integration.png",
-            },
-            {
-                "name": "time_reduction",
-                "type": "histogram",
-                "description": "Distribution of time-to-insight reduction",
-                "file": "outputs/analysis_results/time_reduction.png",
-            },
-            {
-                "name": "correlation_heatmap",
-                "type": "heatmap",
-                "description": "Correlation matrix of key variables",
-                "file": "outputs/analysis_results/correlation_heatmap.png",
-            },
+        """시각화 생성 (입력 요약값이 바뀐 그림만 다시 렌더링)"""
+        columns = self._load_columns()
+        scan = self._scan()["Research Performance Dataset"]
+        
+        methodology = columns["methodology_type"]
+        efficiency = columns["research_efficiency"]
+        
+        integration = scan.groups[("data_integration", "prediction_accuracy")].groups
+        levels = [level for level in ("low", "medium", "high") if level in integration]
+        z = sp_stats.norm.ppf(0.5 + DATA_CONFIG["confidence_level"] / 2)
+        
+        baseline = columns["time_to_insight_baseline"]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            reduction = 100.0 * (baseline - columns["time_to_insight"]) / baseline
+        reduction = reduction[np.isfinite(reduction)]
+        counts, edges = np.histogram(reduction, bins=40)
+        
+        matrix = self.engine.correlations(scan)
+        
+        specs = [
+            FigureSpec(
+                "efficiency_comparison", "box_plot",
+                "Research efficiency by methodology",
+                {"groups": {label: box_stats(efficiency[methodology == label])
+                            for label in ("ai_driven", "traditional")}},
+                "Comparison of research efficiency between AI-driven and traditional approaches",
+                {"ylabel": "Research efficiency (tasks/hour)"},
+            ),
+            FigureSpec(
+                "accuracy_by_integration", "bar_chart",
+                "Prediction accuracy by data integration level",
+                {"labels": levels,
+                 "means": [integration[level].mean for level in levels],
+                 "errors": [z * integration[level].std / np.sqrt(integration[level].n) for level in levels]},
+                "Prediction accuracy across different data integration levels",
+                {"xlabel": "Data integration level", "ylabel": "Prediction accuracy (%)"},
+            ),
+            FigureSpec(
+                "time_reduction", "histogram",
+                "Time-to-insight reduction",
+                {"counts": counts, "edges": edges, "mean": float(reduction.mean()) if len(reduction) else 0.0},
+                "Distribution of time-to-insight reduction",
+                {"xlabel": "Reduction (%)", "ylabel": "Records"},
+            ),
+            FigureSpec(
+                "correlation_heatmap", "heatmap",
+                "Correlation matrix",
+                {"labels": list(matrix), "matrix": [[matrix[a][b] for b in matrix] for a in matrix]},
+                "Correlation matrix of key variables",
+            ),
         ]
+        return self.renderer.render(specs)
     
     def _save_results(self):
         """결과 저장"""
@@ -323,6 +511,7 @@ class DataAnalysisAgent:
 - **Test**: {test['test']}
 - **Statistic**: {test['statistic']}
 - **p-value**: {test['p_value']}
+- **Permutation p-value**: {test.get('permutation_p_value', 'N/A')}
 - **Significant**: {test['significant']}
 - **Effect Size**: {test['effect_size']}
 - **Conclusion**: {test['conclusion']}
@@ -334,7 +523,8 @@ class DataAnalysisAgent:
 ### Confidence Intervals
 """
         for metric, ci in self.results['statistical_analysis']['confidence_intervals'].items():
-            content += f"- {metric}: {ci}\n"
+            content += (f"- {metric}: {ci['estimate']:.2f} {ci['unit']}, "
+                        f"{ci['level']:.0%} CI [{ci['ci'][0]:.2f}, {ci['ci'][1]:.2f}] ({ci['method']})\n")
         
         content += f"""
 ### Model Fit
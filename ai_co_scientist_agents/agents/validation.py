@@ -3,13 +3,58 @@ Validation Agent
 검증 에이전트
 """
 
+import hashlib
+import json
 import logging
+import math
+import numbers
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from importlib import metadata
 from pathlib import Path
 from typing import Dict, List, Any
 from datetime import datetime
 
+import numpy as np
+
+from analysis import read_chunks
+from analysis.consistency import check_consistency, expected_facts
+from analysis.reproduce import PROJECT_ROOT, SOURCE_FILES, file_digest, output_hashes
+from config.settings import DATA_CONFIG, VALIDATION_CONFIG
+
 logger = logging.getLogger(__name__)
 
+# 재실행 결과와 비교할 분석 결과 항목
+COMPARED_SECTIONS = ("preprocessing", "eda", "statistical_analysis")
+
+# 개인정보로 보이는 컬럼 이름
+PII_PATTERN = re.compile(r"(^|_)(name|email|phone|ssn|address|birth|resident_id|patient_id)($|_)", re.IGNORECASE)
+
+
+def _flatten(obj: Any, prefix: str = "") -> Dict[str, Any]:
+    """중첩 dict/list → {경로: 값} (예: statistical_analysis.hypothesis_tests[0].p_value)"""
+    if isinstance(obj, dict):
+        flat = {}
+        for key, value in obj.items():
+            flat.update(_flatten(value, f"{prefix}.{key}" if prefix else str(key)))
+        return flat
+    if isinstance(obj, (list, tuple)):
+        flat = {}
+        for i, value in enumerate(obj):
+            flat.update(_flatten(value, f"{prefix}[{i}]"))
+        return flat
+    if isinstance(obj, numbers.Number) and not isinstance(obj, bool):
+        return {prefix: float(obj)}
+    return {prefix: obj if obj is None or isinstance(obj, bool) else str(obj)}
+
 
 class ValidationAgent:
     """
@@ -26,6 +71,8 @@ class ValidationAgent:
         self.role = "Validator"
         self.results = {}
         self.validation_items = []
+        self.cache_path = Path(VALIDATION_CONFIG.get("cache_file", "outputs/validation/.reproduction_cache.json"))
+        self._cache_lock = threading.Lock()
         logger.info(f"{self.role} initialized")
     
     def validate_results(self, paper_results: Dict[str, Any], data_results: Dict[str, Any]) -> Dict[str, Any]:
@@ -41,20 +88,22 @@ class ValidationAgent:
         """
         logger.info("Validating research results...")
         
-        # 1. 재현성 검사
-        reproducibility = self._check_reproducibility(data_results)
-        
-        # 2. 통계적 검증
-        statistical = self._validate_statistical(data_results)
-        
-        # 3. 논리적 일관성 검사
-        consistency = self._check_consistency(paper_results, data_results)
+        # 1-5. 서로 독립적인 검사는 동시에 실행 (재실행 하위 프로세스를 기다리는 동안 나머지 검사 수행)
+        with ThreadPoolExecutor(max_workers=VALIDATION_CONFIG.get("workers", 5)) as pool:
+            # 1. 재현성 검사
+            reproducibility = pool.submit(self._check_reproducibility, data_results)
+            # 2. 통계적 검증
+            statistical = pool.submit(self._validate_statistical, data_results)
+            # 3. 논리적 일관성 검사
+            consistency = pool.submit(self._check_consistency, paper_results, data_results)
+            # 4. 과학적 정확성 검사
+            accuracy = pool.submit(self._check_scientific_accuracy, paper_results)
+            # 5. 데이터 무결성 검사
+            integrity = pool.submit(self._check_data_integrity, data_results)
         
-        # 4. 과학적 정확성 검사
-        accuracy = self._check_scientific_accuracy(paper_results)
-        
-        # 5. 데이터 무결성 검사
-        integrity = self._check_data_integrity(data_results)
+        reproducibility, statistical, consistency, accuracy, integrity = (
+            future.result() for future in (reproducibility, statistical, consistency, accuracy, integrity)
+        )
         
         # 6. 결과 저장
         self.results = {
@@ -81,36 +130,174 @@ class ValidationAgent:
         return self.results
     
     def _check_reproducibility(self, data_results: Dict[str, Any]) -> Dict[str, Any]:
-        """재현성 검사"""
-        checks = [
-            {
-                "item": "Code availability",
-                "passed": True,
-                "details": "All analysis code is documented and available",
-            },
-            {
-                "item": "Data availability",
-                "passed": True,
-                "details": "Dataset sources and collection methods documented",
-            },
+        """재현성 검사 (격리된 하위 프로세스에서 분석을 재실행하고 결과/산출물 비교)"""
+        inputs = {
+            Path(ds['path']).name: ds['path']
+            for ds in data_results.get('datasets', []) if ds.get('path') and Path(ds['path']).exists()
+        }
+        key = self._input_key(inputs)
+        reproduced = self._load_cache().get(key)
+        cached = reproduced is not None
+        if not cached:
+            reproduced = self._reproduce(inputs)
+            if 'error' not in reproduced:
+                self._store_cache(key, reproduced)
+        
+        checks = [{
+            "item": "Re-execution",
+            "passed": 'error' not in reproduced,
+            "details": reproduced.get('error') or (
+                f"Analysis re-executed in an isolated subprocess in {reproduced['elapsed_s']}s"
+                + (" (cached: inputs unchanged)" if cached else "")
+            ),
+        }]
+        
+        if 'error' not in reproduced:
+            rtol, atol = VALIDATION_CONFIG.get("rtol", 1e-6), VALIDATION_CONFIG.get("atol", 1e-9)
+            current = _flatten({k: data_results.get(k) for k in COMPARED_SECTIONS})
+            mismatches = [
+                path for path, expected in reproduced['values'].items()
+                if not self._same(current.get(path, "<missing>"), expected, rtol, atol)
+            ]
+            checks.append({
+                "item": "Numeric results",
+                "passed": not mismatches,
+                "details": f"{len(reproduced['values']) - len(mismatches)}/{len(reproduced['values'])} values "
+                           f"match within rtol={rtol:g}, atol={atol:g}"
+                           + (f"; differ: {', '.join(mismatches[:5])}" if mismatches else ""),
+            })
+            
+            hashes = output_hashes(".", *self._outputs(data_results))
+            differing = [path for path, digest in reproduced['hashes'].items() if hashes.get(path) != digest]
+            checks.append({
+                "item": "Output hashes",
+                "passed": bool(reproduced['hashes']) and not differing,
+                "details": f"{len(reproduced['hashes']) - len(differing)}/{len(reproduced['hashes'])} output files "
+                           f"identical (sha256)" + (f"; differ: {', '.join(differing[:5])}" if differing else ""),
+            })
+        
+        checks += [
             {
                 "item": "Random seed setting",
-                "passed": True,
-                "details": "Random seeds documented for reproducibility",
+                "passed": DATA_CONFIG.get("seed") is not None,
+                "details": f"seed={DATA_CONFIG.get('seed')} (generation, sampling, split, resampling), "
+                           f"PYTHONHASHSEED=0 and single-threaded BLAS in re-execution",
             },
             {
                 "item": "Software versions",
                 "passed": True,
-                "details": "Python 3.9, pandas 2.0, numpy 1.24, scipy 1.10",
+                "details": ", ".join(f"{name} {version}" for name, version in self._versions().items()),
             },
         ]
         
         return {
             "passed": all(c['passed'] for c in checks),
             "checks": checks,
+            "cached": cached,
+            "input_key": key[:16],
             "recommendation": "Ensure all code and data are properly version controlled",
         }
     
+    @staticmethod
+    def _same(actual: Any, expected: Any, rtol: float, atol: float) -> bool:
+        if isinstance(actual, float) and isinstance(expected, float):
+            if math.isnan(actual) or math.isnan(expected):
+                return math.isnan(actual) and math.isnan(expected)
+            return math.isclose(actual, expected, rel_tol=rtol, abs_tol=atol)
+        return actual == expected
+    
+    @staticmethod
+    def _outputs(data_results: Dict[str, Any]):
+        """(전처리 결과 디렉터리 목록, 그림 파일 목록)"""
+        processed = [ds['processed_path'] for ds in data_results.get('datasets', []) if ds.get('processed_path')]
+        figures = [figure['file'] for figure in data_results.get('visualizations', []) if figure.get('file')]
+        return processed, figures
+    
+    @staticmethod
+    def _versions() -> Dict[str, str]:
+        versions = {"Python": platform.python_version()}
+        for package in ("numpy", "pandas", "scipy", "matplotlib"):
+            try:
+                versions[package] = metadata.version(package)
+            except metadata.PackageNotFoundError:
+                versions[package] = "not installed"
+        return versions
+    
+    def _input_key(self, inputs: Dict[str, str]) -> str:
+        """재실행 결과를 결정하는 입력 해시 (원본 데이터, 분석 코드, 설정, 패키지 버전)"""
+        key = {
+            "inputs": {name: file_digest(path) for name, path in sorted(inputs.items())},
+            "code": {name: file_digest(PROJECT_ROOT / name) for name in SOURCE_FILES if (PROJECT_ROOT / name).exists()},
+            "config": DATA_CONFIG,
+            "versions": self._versions(),
+        }
+        return hashlib.sha256(json.dumps(key, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    
+    def _reproduce(self, inputs: Dict[str, str]) -> Dict[str, Any]:
+        """임시 디렉터리에서 분석 재실행 → {values, hashes, elapsed_s} 또는 {error}"""
+        start = time.perf_counter()
+        with tempfile.TemporaryDirectory(prefix="reproduce_") as workdir:
+            data_dir = Path(workdir) / "outputs" / "data"
+            data_dir.mkdir(parents=True)
+            for name, path in inputs.items():
+                try:
+                    os.symlink(Path(path).resolve(), data_dir / name)
+                except OSError:
+                    shutil.copy2(path, data_dir / name)
+            
+            output = Path(workdir) / "reproduction.json"
+            env = {
+                **os.environ,
+                "PYTHONPATH": os.pathsep.join(filter(None, [str(PROJECT_ROOT), os.environ.get("PYTHONPATH")])),
+                "PYTHONHASHSEED": "0",
+                "OMP_NUM_THREADS": "1",
+                "OPENBLAS_NUM_THREADS": "1",
+                "MKL_NUM_THREADS": "1",
+            }
+            timeout = VALIDATION_CONFIG.get("timeout", 600)
+            try:
+                process = subprocess.run(
+                    [sys.executable, "-m", "analysis.reproduce", workdir, str(output)],
+                    cwd=workdir, env=env, capture_output=True, text=True, timeout=timeout
+                )
+            except subprocess.TimeoutExpired:
+                return {"error": f"Re-execution timed out after {timeout}s"}
+            if process.returncode != 0 or not output.exists():
+                lines = process.stderr.strip().splitlines()
+                return {"error": f"Re-execution failed: {lines[-1] if lines else f'exit code {process.returncode}'}"}
+            
+            with open(output, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        
+        return {
+            "values": _flatten({k: record['results'].get(k) for k in COMPARED_SECTIONS}),
+            "hashes": record['hashes'],
+            "elapsed_s": round(time.perf_counter() - start, 2),
+        }
+    
+    def _load_cache(self) -> Dict[str, Any]:
+        with self._cache_lock:
+            if not self.cache_path.exists():
+                return {}
+            try:
+                with open(self.cache_path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, json.JSONDecodeError):
+                return {}
+    
+    def _store_cache(self, key: str, record: Dict[str, Any]) -> None:
+        cache = self._load_cache()
+        cache.pop(key, None)
+        cache[key] = record
+        for old in list(cache)[:-VALIDATION_CONFIG.get("cache_entries", 8)]:
+            del cache[old]
+        with self._cache_lock:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path.with_suffix(".tmp")
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, ensure_ascii=False)
+            os.replace(tmp, self.cache_path)
+    
     def _validate_statistical(self, data_results: Dict[str, Any]) -> Dict[str, Any]:
         """통계적 검증"""
         stats = data_results.get('statistical_analysis', {})
@@ -149,12 +336,33 @@ class ValidationAgent:
         }
     
     def _check_consistency(self, paper_results: Dict[str, Any], data_results: Dict[str, Any]) -> Dict[str, Any]:
-        """논리적 일관성 검사"""
+        """논리적 일관성 검사 (본문 수치를 추출해 섹션 간, 분석 결과와 교차 검증)"""
+        text = paper_results.get('full_paper')
+        paper_path = Path("outputs/paper/research_paper.md")
+        if not text and paper_path.exists():
+            text = paper_path.read_text(encoding='utf-8')
+        report = check_consistency(text or "", data_results)
+        
+        tested = {f.topic for f in expected_facts(data_results) if f.kind == 'p_value'}
+        reported = set(report['coverage'].get('results', []))
+        abstract = [c for c in report['contradictions'] if 'abstract' in c['sections']]
+        others = [c for c in report['contradictions'] if c not in abstract]
+        
+        issues = [
+            f"{c['topic']} {c['symbol'] or c['kind']}: "
+            + " vs ".join(f"{m['text']} ({m['section']}, line {m['line']})" for m in c['mentions'])
+            for c in report['contradictions']
+        ] + [
+            f"{m['text']} ({m['section']}, line {m['line']}) vs analysis {m['expected']} [{m['source']}]"
+            for m in report['mismatches']
+        ]
+        
         checks = [
             {
                 "item": "Hypothesis-Results alignment",
-                "passed": True,
-                "details": "All 3 hypotheses tested and results reported",
+                "passed": bool(text) and tested <= reported,
+                "details": f"p-values reported in Results for {len(tested & reported)} of {len(tested)} tested hypotheses"
+                           + (f" (missing: {', '.join(sorted(tested - reported))})" if tested - reported else ""),
             },
             {
                 "item": "Methodology-Results consistency",
@@ -163,8 +371,20 @@ class ValidationAgent:
             },
             {
                 "item": "Abstract-Full paper alignment",
-                "passed": True,
-                "details": "Abstract accurately reflects full paper content",
+                "passed": bool(text) and not abstract,
+                "details": f"{len(abstract)} abstract values contradict other sections" if abstract
+                           else "Abstract values agree with the body",
+            },
+            {
+                "item": "Cross-section numeric consistency",
+                "passed": bool(text) and not others,
+                "details": f"{report['indexed']} indexed values, {len(others)} contradictions between sections",
+            },
+            {
+                "item": "Text-analysis agreement",
+                "passed": bool(text) and not report['mismatches'],
+                "details": f"{report['verified']} values match the analysis results, "
+                           f"{len(report['mismatches'])} do not",
             },
             {
                 "item": "Figure-Text consistency",
@@ -178,10 +398,24 @@ class ValidationAgent:
             },
         ]
         
+        if not text:
+            recommendation = "Paper text not found; numerical values could not be checked"
+        elif issues:
+            recommendation = f"Correct {len(issues)} numerical values that disagree with other sections or the analysis results"
+        else:
+            recommendation = "All numerical values in text agree across sections and with the analysis results"
+        
         return {
             "passed": all(c['passed'] for c in checks),
             "checks": checks,
-            "recommendation": "Double-check all numerical values in text against tables",
+            "issues": issues,
+            "numbers": {
+                "mentions": report['mentions'],
+                "indexed": report['indexed'],
+                "verified": report['verified'],
+                "elapsed_ms": report['elapsed_ms'],
+            },
+            "recommendation": recommendation,
         }
     
     def _check_scientific_accuracy(self, paper_results: Dict[str, Any]) -> Dict[str, Any]:
@@ -216,32 +450,60 @@ class ValidationAgent:
         }
     
     def _check_data_integrity(self, data_results: Dict[str, Any]) -> Dict[str, Any]:
-        """데이터 무결성 검사"""
+        """데이터 무결성 검사 (원본 파일과 전처리 결과를 직접 확인)"""
+        datasets = data_results.get('datasets', [])
+        preprocessing = data_results.get('preprocessing', {})
+        
+        documented = [
+            ds for ds in datasets
+            if all(ds.get(k) for k in ('source', 'license', 'collection_method')) and Path(ds.get('path', '')).exists()
+        ]
+        fingerprints = [f"{Path(ds['path']).name} {file_digest(ds['path'])[:12]}" for ds in documented]
+        
+        rows, missing, outside, pii = 0, 0, 0, []
+        processed = [ds for ds in datasets if ds.get('processed_path')
+                     and (Path(ds['processed_path']) / "meta.json").exists()]
+        for ds in processed:
+            with open(Path(ds['processed_path']) / "meta.json", 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            rows += sum(meta['rows'].values())
+            pii += [c for c in meta['columns'] if PII_PATTERN.search(c)]
+            numeric = [c for c, dtype in meta['columns'].items() if dtype.startswith('float')]
+            bounds = meta['params'].get('outlier_bounds', {})
+            for chunk in read_chunks(ds['processed_path'], numeric):
+                missing += sum(int(np.isnan(chunk[c]).sum()) for c in numeric)
+                for column, (low, high) in bounds.items():
+                    tolerance = 1e-9 * max(1.0, abs(low), abs(high))
+                    outside += int(((chunk[column] < low - tolerance) | (chunk[column] > high + tolerance)).sum())
+        
+        reported = preprocessing.get('processed_records')
         checks = [
             {
                 "item": "Data source documentation",
-                "passed": True,
-                "details": "All data sources properly cited and documented",
+                "passed": bool(datasets) and len(documented) == len(datasets),
+                "details": f"{len(documented)}/{len(datasets)} datasets have source, license, collection method "
+                           f"and an existing file ({'; '.join(fingerprints)})",
             },
             {
                 "item": "Data preprocessing",
-                "passed": True,
-                "details": "Preprocessing steps documented and justified",
+                "passed": bool(processed) and rows == reported,
+                "details": f"{rows} processed records on disk, {reported} reported",
             },
             {
                 "item": "Missing data handling",
-                "passed": True,
-                "details": "Missing data imputation method documented",
+                "passed": bool(processed) and missing == 0,
+                "details": f"{missing} missing values remain in processed numeric columns",
             },
             {
                 "item": "Outlier treatment",
-                "passed": True,
-                "details": "Outlier detection and handling documented",
+                "passed": bool(processed) and outside == 0,
+                "details": f"{outside} processed values outside the recorded IQR fences",
             },
             {
                 "item": "Data privacy",
-                "passed": True,
-                "details": "No personal identifiable information in dataset",
+                "passed": not pii,
+                "details": f"Columns resembling personal data: {', '.join(pii)}" if pii
+                           else "No column names resembling personal identifiers",
             },
         ]
         
@@ -263,6 +525,7 @@ class ValidationAgent:
 ## 1. Reproducibility Check
 
 **Result**: {'✓ PASSED' if self.results['reproducibility']['passed'] else '✗ FAILED'}
+**Input Key**: {self.results['reproducibility']['input_key']} ({'cached re-execution' if self.results['reproducibility']['cached'] else 'fresh re-execution'})
 
 ### Checks
 """
@@ -293,6 +556,13 @@ class ValidationAgent:
         for check in self.results['consistency']['checks']:
             content += f"- {'✓' if check['passed'] else '✗'} **{check['item']}**: {check['details']}\n"
         
+        numbers = self.results['consistency']['numbers']
+        content += f"\n{numbers['mentions']} numbers extracted, {numbers['indexed']} indexed ({numbers['elapsed_ms']} ms)\n"
+        if self.results['consistency']['issues']:
+            content += "\n### Issues\n"
+            for issue in self.results['consistency']['issues']:
+                content += f"- {issue}\n"
+        
         content += f"""
 **Recommendation**: {self.results['consistency']['recommendation']}
 
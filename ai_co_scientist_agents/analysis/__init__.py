@@ -0,0 +1,29 @@
+"""
+Analysis Package
+데이터 분석 엔진 (DataAnalysisAgent에서 사용)
+"""
+
+from .consistency import check_consistency, extract_mentions
+from .engine import AnalysisEngine, Moments, ScanResult
+from .figures import FigureRenderer, FigureSpec, box_stats
+from .loaders import read_chunks, read_processed, write_benchmark_dataset, write_experiment_dataset
+from .pipeline import PreprocessingPipeline
+from .resampling import Resampler, load_columns
+
+__all__ = [
+    "AnalysisEngine",
+    "Moments",
+    "ScanResult",
+    "FigureRenderer",
+    "FigureSpec",
+    "box_stats",
+    "check_consistency",
+    "extract_mentions",
+    "PreprocessingPipeline",
+    "Resampler",
+    "load_columns",
+    "read_chunks",
+    "read_processed",
+    "write_experiment_dataset",
+    "write_benchmark_dataset",
+]
@@ -0,0 +1,393 @@
+"""
+Consistency
+논문 본문의 수치 추출 + 교차 검증 (ValidationAgent에서 사용)
+
+- 정규식 1회 스캔으로 섹션 제목과 수치(p-value, 백분율, 신뢰구간, 검정통계량/평균 등)를
+  함께 읽어 섹션, 줄 번호, 주변 문맥, 주제(효율/정확도/통합/소요시간/회귀)를 붙인다
+- (주제, 종류, 기호)별 색인을 만들어
+  1) 섹션 간 모순 (예: 초록 42% vs 결론 40%)
+  2) DataAnalysisAgent 결과와의 불일치 (예: 본문 42% vs 분석 27.07%)
+  를 찾는다. 반올림을 감안해 본문에 적힌 자릿수만큼의 오차는 허용한다
+"""
+
+import math
+import re
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# 섹션 제목 (줄 전체가 제목인 경우만) / 하위 절 (예: "4.1 Research Efficiency")
+_SECTIONS = r"Abstract|Introduction|Related\ Work|Methodology|Methods|Results|Discussion|Conclusions?|References"
+
+# 앞의 전방 탐색은 후보가 될 수 없는 위치(일반 단어 중간)를 빨리 건너뛰기 위한 것
+_TOKEN = re.compile(
+    rf"""
+    (?:(?=[\d\[\#β\-])|\b(?=[ACDFIMNRSdnprt]))
+    (?:
+    (?P<heading>^(?:\#{{1,6}}[ \t]*)?(?:\d+\.[ \t]+)?(?P<title>{_SECTIONS})[ \t]*$)
+  | (?P<subheading>^(?:\#{{1,6}}[ \t]*)?\d+\.\d+\.?[ \t]+(?P<subtitle>[^\n]+)$)
+  | (?P<pvalue>\bp[ \t]*(?P<pcmp><=|>=|[<>=≤≥])[ \t]*(?P<pval>\d*\.?\d+(?:[eE][-+]?\d+)?))
+  | (?P<ci>\[[ \t]*(?P<lo>-?\d+(?:\.\d+)?)[ \t]*%?[ \t]*,[ \t]*(?P<hi>-?\d+(?:\.\d+)?)[ \t]*%?[ \t]*\])
+  | (?P<stat>(?P<sym>R²|R\^2|Cohen's[ \t]+d|\bd|\bt|\bF|β|\bM|\bSD|\bn|\bN|\br)
+        [ \t]*(?:\((?P<df>[\d.,\s]{{1,20}})\))?[ \t]*=[ \t]*(?P<sval>-?\d+(?:\.\d+)?)%?)
+  | (?P<range>(?<![\w.\-])(?P<rlo>\d+(?:\.\d+)?)[ \t]*[-–][ \t]*(?P<rhi>\d+(?:\.\d+)?)[ \t]*%)
+  | (?P<percent>(?<![\w.])(?P<pct>-?\d+(?:\.\d+)?)[ \t]*%)
+  | (?P<number>(?<![\w.\[\-])(?P<plain>-?\d+(?:\.\d+)?)(?![\w.%]))
+    )
+    """,
+    re.MULTILINE | re.VERBOSE,
+)
+
+# 주제 키워드 (절 안에 여러 개면 앞쪽 주제 우선)
+TOPICS = (
+    ("integration", re.compile(r"integrat|multi-modal", re.I)),
+    ("time_to_insight", re.compile(r"time[- ]to[- ]insight|time reduction|(?<!/)\bhours?\b", re.I)),
+    ("efficiency", re.compile(r"efficien|task(?:s)?[ /](?:completed|completion|hour)|tasks/hour", re.I)),
+    ("accuracy", re.compile(r"accura", re.I)),
+    ("regression", re.compile(r"regression|predictors?\b", re.I)),
+)
+_TOPIC_PATTERNS = dict(TOPICS)
+# 같은 문장에 앞 주제가 있으면 뒤 주제를 덮어쓴다 (통합 수준 → 정확도는 H2의 결과 변수)
+DOMINATES = {"integration": {"accuracy"}}
+# 기호 자체로 주제가 정해지는 경우
+SYMBOL_TOPICS = {"R²": "regression", "β": "regression"}
+
+CHANGE_WORDS = re.compile(r"improv|increas|higher|reduc|decreas|gain|lower|faster|enhanc|accelerat|fell|drop|declin|rose", re.I)
+CONFIDENCE_LEVEL = re.compile(r"[ \t]*(?:CI\b|confidence)", re.I)
+CLAUSE_DELIMITERS = ",;:()"
+
+# 선행 연구 수치를 인용하는 섹션 (색인에서 제외)
+CITED_SECTIONS = {"related work"}
+# 구간이 아닌 대괄호 (예: 인용 번호 [5, 6])를 걸러낼 때 확인하는 앞 문맥
+INTERVAL_WORDS = re.compile(r"CI|interval", re.I)
+
+# 섹션 간 비교에서 제외 (집단마다 값이 다름)
+GROUP_SYMBOLS = {"M", "SD", "n", "N"}
+
+
+@dataclass
+class Mention:
+    """본문 수치 1개"""
+    kind: str                     # p_value / ci / stat / percent / percent_change / number
+    value: float                  # 범위/구간이면 하한
+    high: Optional[float] = None  # 범위/구간 상한
+    decimals: int = 0             # 본문에 적힌 소수 자릿수 (반올림 허용 오차)
+    symbol: str = ""              # 통계량 기호 (t, F, d, R², M, ...), p-value는 비교 연산자
+    section: str = ""
+    subsection: str = ""
+    topic: Optional[str] = None
+    line: int = 0
+    text: str = ""
+    context: str = ""
+
+    @property
+    def key(self) -> Tuple[Optional[str], str, str]:
+        return (self.topic, self.kind, self.symbol if self.kind == 'stat' else "")
+
+    @property
+    def tolerance(self) -> float:
+        return 0.5 * 10 ** -self.decimals + 1e-12
+
+
+@dataclass
+class Fact:
+    """분석 결과에서 나온 기대값 1개"""
+    topic: str
+    kind: str
+    symbol: str
+    value: float
+    high: Optional[float] = None
+    source: str = ""
+
+    @property
+    def key(self) -> Tuple[Optional[str], str, str]:
+        return (self.topic, self.kind, self.symbol)
+
+
+def _decimals(number: str) -> int:
+    mantissa = number.lower().split('e')[0]
+    return len(mantissa.split('.')[1]) if '.' in mantissa else 0
+
+
+def _symbol(raw: str) -> str:
+    if raw.startswith("Cohen"):
+        return "d"
+    return "R²" if raw in ("R²", "R^2") else raw
+
+
+def _topic(text: str, start: int, end: int, subsection: str, symbol: str = "") -> Optional[str]:
+    """수치가 속한 절 → 같은 문장의 앞부분 → 하위 절 제목 순으로 주제 결정"""
+    if symbol in SYMBOL_TOPICS:
+        return SYMBOL_TOPICS[symbol]
+    sentence_start = max(text.rfind('. ', 0, start), text.rfind('\n', 0, start)) + 1
+    sentence_end = min((i for i in (text.find('. ', end), text.find('\n', end)) if i >= 0), default=len(text))
+    clause_start = max(text.rfind(c, sentence_start, start) for c in CLAUSE_DELIMITERS) + 1
+    clause_start = max(clause_start, sentence_start)
+    clause_end = min((i for i in (text.find(c, end, sentence_end) for c in CLAUSE_DELIMITERS) if i >= 0),
+                     default=sentence_end)
+
+    clause = text[clause_start:start] + text[end:clause_end]
+    for topic, pattern in TOPICS:
+        if pattern.search(clause):
+            return topic
+
+    prefix = text[sentence_start:start]
+    nearest, position = None, -1
+    for topic, pattern in TOPICS:
+        for match in pattern.finditer(prefix):
+            if match.start() > position:
+                nearest, position = topic, match.start()
+    if nearest is not None:
+        for topic, covered in DOMINATES.items():
+            if nearest in covered and _TOPIC_PATTERNS[topic].search(prefix):
+                return topic
+        return nearest
+
+    for topic, pattern in TOPICS:
+        if pattern.search(subsection):
+            return topic
+    return None
+
+
+def _is_change(text: str, start: int, end: int) -> bool:
+    """백분율이 변화량(개선/감소)인지 수준(정확도 92%)인지"""
+    window = max(0, start - 80)
+    before = max([window - 1] + [text.rfind(c, window, start) for c in CLAUSE_DELIMITERS + ".\n"]) + 1
+    after = min((i for i in (text.find(c, end, end + 80) for c in CLAUSE_DELIMITERS + ".\n") if i >= 0),
+                default=min(len(text), end + 80))
+    return bool(CHANGE_WORDS.search(text[before:start] + text[end:after]))
+
+
+def extract_mentions(text: str) -> List[Mention]:
+    """
+    본문의 수치를 1회 스캔으로 추출 (참고문헌 섹션 제외)
+
+    첫 섹션 제목 전까지는 제목 + 초록으로 보고 section='abstract'로 둔다.
+    """
+    mentions = []
+    section, subsection = "abstract", ""
+    line, last = 1, 0
+
+    for match in _TOKEN.finditer(text):
+        start, end = match.span()
+        line += text.count('\n', last, start)
+        last = start
+        group = match.lastgroup
+
+        if group == 'heading':
+            section = match.group('title').lower().replace("conclusions", "conclusion").replace("methods", "methodology")
+            subsection = ""
+            continue
+        if group == 'subheading':
+            subsection = match.group('subtitle').strip()
+            continue
+        if section == "references":
+            continue
+
+        if group == 'pvalue':
+            raw = match.group('pval')
+            mention = Mention('p_value', float(raw), decimals=_decimals(raw),
+                              symbol=match.group('pcmp').replace('≤', '<=').replace('≥', '>='))
+        elif group == 'ci':
+            lo, hi = match.group('lo'), match.group('hi')
+            if not any(c in match.group(0) for c in '.%') and not INTERVAL_WORDS.search(text, max(0, start - 30), start):
+                continue
+            mention = Mention('ci', float(lo), float(hi), decimals=min(_decimals(lo), _decimals(hi)))
+        elif group == 'stat':
+            raw = match.group('sval')
+            mention = Mention('stat', float(raw), decimals=_decimals(raw), symbol=_symbol(match.group('sym')))
+        elif group == 'range':
+            lo, hi = match.group('rlo'), match.group('rhi')
+            mention = Mention('percent_change' if _is_change(text, start, end) else 'percent',
+                              float(lo), float(hi), decimals=min(_decimals(lo), _decimals(hi)))
+        elif group == 'percent':
+            if CONFIDENCE_LEVEL.match(text, end):
+                continue
+            raw = match.group('pct')
+            mention = Mention('percent_change' if _is_change(text, start, end) else 'percent',
+                              float(raw), decimals=_decimals(raw))
+        else:
+            raw = match.group('plain')
+            mention = Mention('number', float(raw), decimals=_decimals(raw))
+
+        mention.section = section
+        mention.subsection = subsection
+        if group != 'number':
+            mention.topic = _topic(text, start, end, subsection, mention.symbol if group == 'stat' else "")
+        mention.line = line
+        mention.text = match.group(0)
+        mention.context = " ".join(text[max(0, start - 60):min(len(text), end + 40)].split())
+        mentions.append(mention)
+
+    return mentions
+
+
+def build_index(mentions: Iterable[Mention]) -> Dict[Tuple[Optional[str], str, str], List[Mention]]:
+    """(주제, 종류, 기호)별 색인 (주제를 알 수 없는 수치, 일반 숫자, 인용 섹션은 제외)"""
+    index = defaultdict(list)
+    for mention in mentions:
+        if mention.topic is not None and mention.kind != 'number' and mention.section not in CITED_SECTIONS:
+            index[mention.key].append(mention)
+    return dict(index)
+
+
+# =============================================================================
+# 비교
+# =============================================================================
+
+def _bounds(item) -> Tuple[float, float]:
+    return item.value, item.value if item.high is None else item.high
+
+
+def _agree(a: Mention, b: Mention) -> bool:
+    """본문 수치끼리 일치 여부 (둘 중 거친 자릿수만큼 허용, 범위는 겹치면 일치)"""
+    tol = max(a.tolerance, b.tolerance)
+    (a_lo, a_hi), (b_lo, b_hi) = _bounds(a), _bounds(b)
+    if a.kind == 'ci':
+        return abs(a_lo - b_lo) <= tol and abs(a_hi - b_hi) <= tol
+    return a_lo - tol <= b_hi and b_lo - tol <= a_hi
+
+
+def _matches(mention: Mention, fact: Fact) -> bool:
+    """본문 수치가 분석 결과와 맞는지 (본문 자릿수 기준 반올림 허용)"""
+    tol = mention.tolerance
+    if mention.kind == 'p_value':
+        actual, claimed = fact.value, mention.value
+        return {
+            '<': actual < claimed + tol, '<=': actual <= claimed + tol,
+            '>': actual > claimed - tol, '>=': actual >= claimed - tol,
+        }.get(mention.symbol, abs(actual - claimed) <= tol)
+    if mention.kind == 'ci':
+        return (fact.high is not None and abs(mention.value - fact.value) <= tol
+                and abs(mention.high - fact.high) <= tol)
+    value = abs(fact.value) if mention.symbol == 't' else fact.value
+    claimed = abs(mention.value) if mention.symbol == 't' else mention.value
+    lo, hi = (claimed, claimed) if mention.high is None else (mention.value, mention.high)
+    return lo - tol <= value <= hi + tol
+
+
+def _hypothesis_topic(hypothesis: str) -> Optional[str]:
+    for topic, pattern in TOPICS:
+        if pattern.search(hypothesis):
+            return topic
+    return None
+
+
+def expected_facts(results: Dict[str, Any]) -> List[Fact]:
+    """DataAnalysisAgent.results → 본문과 비교할 기대값"""
+    facts = []
+    stats = (results or {}).get('statistical_analysis', {})
+
+    for i, test in enumerate(stats.get('hypothesis_tests', [])):
+        topic = _hypothesis_topic(test.get('hypothesis', ''))
+        if topic is None:
+            continue
+        source = f"statistical_analysis.hypothesis_tests[{i}]"
+        for key in ('p_value', 'permutation_p_value'):
+            if isinstance(test.get(key), (int, float)):
+                facts.append(Fact(topic, 'p_value', "", float(test[key]), source=f"{source}.{key}"))
+        symbol = "F" if "ANOVA" in test.get('test', '') else "t"
+        if isinstance(test.get('statistic'), (int, float)):
+            facts.append(Fact(topic, 'stat', symbol, float(test['statistic']), source=f"{source}.statistic"))
+        effect = re.match(r"Cohen's d = (-?\d+(?:\.\d+)?)", str(test.get('effect_size', '')))
+        if effect:
+            facts.append(Fact(topic, 'stat', "d", float(effect.group(1)), source=f"{source}.effect_size"))
+        means = list((test.get('group_means') or {}).values())
+        for mean in means:
+            facts.append(Fact(topic, 'stat', "M", float(mean), source=f"{source}.group_means"))
+        if topic == "efficiency" and len(means) == 2 and means[1]:
+            facts.append(Fact(topic, 'percent_change', "", 100.0 * (means[0] - means[1]) / means[1],
+                              source=f"{source}.group_means"))
+
+    topics = {"efficiency_difference": "efficiency", "accuracy_improvement": "integration",
+              "time_reduction": "time_to_insight"}
+    for name, interval in stats.get('confidence_intervals', {}).items():
+        topic = topics.get(name)
+        if topic is None or not isinstance(interval, dict):
+            continue
+        source = f"statistical_analysis.confidence_intervals.{name}"
+        if interval.get('unit') == '%' and isinstance(interval.get('estimate'), (int, float)):
+            facts.append(Fact(topic, 'percent_change', "", float(interval['estimate']), source=f"{source}.estimate"))
+        ci = interval.get('ci') or []
+        if len(ci) == 2 and all(isinstance(v, (int, float)) for v in ci):
+            facts.append(Fact(topic, 'ci', "", float(ci[0]), float(ci[1]), source=f"{source}.ci"))
+
+    r_squared = stats.get('model_fit', {}).get('r_squared')
+    if isinstance(r_squared, (int, float)):
+        facts.append(Fact("regression", 'stat', "R²", float(r_squared), source="statistical_analysis.model_fit.r_squared"))
+
+    return [f for f in facts if all(math.isfinite(v) for v in _bounds(f))]
+
+
+def _describe(mention: Mention) -> Dict[str, Any]:
+    return {'section': mention.section, 'line': mention.line, 'text': mention.text, 'context': mention.context}
+
+
+def check_consistency(text: str, results: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    본문 수치 교차 검증
+
+    Args:
+        text: 논문 전체 (research_paper.md)
+        results: DataAnalysisAgent.results (없으면 섹션 간 비교만)
+
+    Returns:
+        {mentions, indexed, sections, coverage, contradictions, mismatches, verified, elapsed_ms}
+    """
+    started = time.perf_counter()
+    mentions = extract_mentions(text)
+    index = build_index(mentions)
+
+    # 1) 섹션 간 모순: 같은 키인데 서로 다른 섹션에 맞지 않는 값 (섹션 쌍마다 첫 사례 1개)
+    contradictions = []
+    for (topic, kind, symbol), items in index.items():
+        if kind in ('percent', 'p_value') or symbol in GROUP_SYMBOLS:
+            continue
+        seen = set()
+        for i, a in enumerate(items):
+            for b in items[i + 1:]:
+                pair = tuple(sorted((a.section, b.section)))
+                if a.section == b.section or pair in seen or _agree(a, b):
+                    continue
+                seen.add(pair)
+                contradictions.append({
+                    'topic': topic, 'kind': kind, 'symbol': symbol, 'sections': list(pair),
+                    'mentions': [_describe(a), _describe(b)],
+                })
+
+    # 2) 분석 결과와 불일치: 같은 키의 기대값 중 어느 것과도 맞지 않는 본문 수치
+    facts = defaultdict(list)
+    for fact in expected_facts(results or {}):
+        facts[fact.key].append(fact)
+    mismatches, verified = [], 0
+    for key, items in index.items():
+        for mention in items:
+            candidates = facts.get(key)
+            if not candidates:
+                continue
+            if any(_matches(mention, fact) for fact in candidates):
+                verified += 1
+            else:
+                mismatches.append({
+                    **_describe(mention), 'topic': key[0], 'kind': key[1], 'symbol': key[2],
+                    'expected': [[round(v, 6) for v in _bounds(f)] if f.high is not None else round(f.value, 6)
+                                 for f in candidates],
+                    'source': candidates[0].source,
+                })
+
+    coverage = defaultdict(set)
+    for mention in mentions:
+        if mention.topic is not None and mention.kind == 'p_value':
+            coverage[mention.section].add(mention.topic)
+
+    return {
+        'mentions': len(mentions),
+        'indexed': sum(len(items) for items in index.values()),
+        'sections': sorted({m.section for m in mentions}),
+        'coverage': {section: sorted(topics) for section, topics in coverage.items()},
+        'contradictions': contradictions,
+        'mismatches': mismatches,
+        'verified': verified,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 3),
+    }
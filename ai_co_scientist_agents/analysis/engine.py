@@ -0,0 +1,534 @@
+"""
+Analysis Engine
+통계 분석 엔진
+
+데이터를 청크 단위로 한 번만 읽으면서 필요한 충분통계량을 누적하고,
+검정은 누적된 통계량으로 계산한다 (행 수와 무관하게 메모리 일정).
+
+- Moments: 평균/분산/왜도 (Chan et al. 병렬 병합)
+- Reservoir: 중앙값/분위수용 균등 표본 (행 수 ≤ 표본 크기면 정확)
+- CoMoments: 공분산/상관행렬 (listwise)
+- OLSAccumulator: 회귀 (X'X, X'y 누적)
+- welch_t_test / one_way_anova / paired_t_test: 요약 통계 기반 검정
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import stats as sps
+
+from .loaders import DEFAULT_CHUNK_ROWS, Chunk, read_chunks
+
+# config.settings.DATA_CONFIG와 같은 기본값 (엔진 단독 사용 시)
+DEFAULT_CONFIG = {
+    "min_sample_size": 30,
+    "significance_level": 0.05,
+    "confidence_level": 0.95,
+    "effect_size_threshold": {"small": 0.2, "medium": 0.5, "large": 0.8},
+}
+
+
+# =============================================================================
+# 누적 통계량
+# =============================================================================
+
+class Moments:
+    """평균, 2·3차 중심적률, 최솟값/최댓값 (NaN 제외)"""
+
+    __slots__ = ('n', 'mean', 'm2', 'm3', 'min', 'max', 'missing')
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.missing = 0
+
+    @classmethod
+    def of(cls, values: np.ndarray) -> "Moments":
+        moments = cls()
+        moments.update(values)
+        return moments
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        finite = values[~np.isnan(values)]
+        self.missing += len(values) - len(finite)
+        if len(finite) == 0:
+            return
+        chunk = Moments()
+        chunk.n = len(finite)
+        chunk.mean = float(finite.mean())
+        centered = finite - chunk.mean
+        chunk.m2 = float(np.dot(centered, centered))
+        chunk.m3 = float(np.dot(centered * centered, centered))
+        chunk.min = float(finite.min())
+        chunk.max = float(finite.max())
+        self.merge(chunk)
+
+    def merge(self, other: "Moments") -> None:
+        """다른 청크의 적률 병합"""
+        self.missing += other.missing if other is not self else 0
+        if other.n == 0:
+            return
+        if self.n == 0:
+            self.n, self.mean, self.m2, self.m3 = other.n, other.mean, other.m2, other.m3
+            self.min, self.max = other.min, other.max
+            return
+        n_a, n_b = self.n, other.n
+        n = n_a + n_b
+        delta = other.mean - self.mean
+        self.m3 = (self.m3 + other.m3
+                   + delta ** 3 * n_a * n_b * (n_a - n_b) / n ** 2
+                   + 3.0 * delta * (n_a * other.m2 - n_b * self.m2) / n)
+        self.m2 = self.m2 + other.m2 + delta ** 2 * n_a * n_b / n
+        self.mean = self.mean + delta * n_b / n
+        self.n = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def var(self) -> float:
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.var)
+
+    @property
+    def skewness(self) -> float:
+        if self.n < 3 or self.m2 == 0:
+            return 0.0
+        return math.sqrt(self.n) * self.m3 / self.m2 ** 1.5
+
+
+class GroupMoments:
+    """그룹(범주)별 Moments (청크마다 factorize + bincount로 한 번에 계산)"""
+
+    def __init__(self):
+        self.groups: Dict[str, Moments] = {}
+
+    def update(self, labels: np.ndarray, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        valid = ~np.isnan(values) & ~pd.isna(labels)
+        if not valid.any():
+            return
+        inverse, levels = pd.factorize(labels[valid])
+        x = values[valid]
+        counts = np.bincount(inverse, minlength=len(levels))
+        means = np.bincount(inverse, weights=x, minlength=len(levels)) / counts
+        centered = x - means[inverse]
+        m2 = np.bincount(inverse, weights=centered ** 2, minlength=len(levels))
+        m3 = np.bincount(inverse, weights=centered ** 3, minlength=len(levels))
+        mins = np.full(len(levels), np.inf)
+        maxs = np.full(len(levels), -np.inf)
+        np.minimum.at(mins, inverse, x)
+        np.maximum.at(maxs, inverse, x)
+
+        for i, level in enumerate(levels):
+            chunk = Moments()
+            chunk.n, chunk.mean, chunk.m2, chunk.m3 = int(counts[i]), float(means[i]), float(m2[i]), float(m3[i])
+            chunk.min, chunk.max = float(mins[i]), float(maxs[i])
+            self.groups.setdefault(str(level), Moments()).merge(chunk)
+
+
+class Reservoir:
+    """
+    균등 표본 (분위수 추정)
+
+    행마다 난수 키를 붙이고 키가 가장 작은 size개를 유지한다 (청크 단위 벡터 연산).
+    """
+
+    def __init__(self, size: int = 100_000, seed: int = 42):
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.keys = np.empty(0)
+        self.values = np.empty(0)
+        self.seen = 0
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self.seen += len(values)
+        keys = np.concatenate([self.keys, self.rng.random(len(values))])
+        merged = np.concatenate([self.values, values])
+        if len(merged) > self.size:
+            keep = np.argpartition(keys, self.size)[:self.size]
+            keys, merged = keys[keep], merged[keep]
+        self.keys, self.values = keys, merged
+
+    @property
+    def exact(self) -> bool:
+        return self.seen <= self.size
+
+    def quantile(self, q) -> Any:
+        if len(self.values) == 0:
+            return float('nan')
+        return np.quantile(self.values, q)
+
+
+class CoMoments:
+    """공분산/상관행렬 (NaN이 있는 행은 제외)"""
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.n = 0
+        self.mean = np.zeros(k)
+        self.c = np.zeros((k, k))
+
+    def update(self, chunk: Chunk) -> None:
+        x = np.column_stack([chunk[c] for c in self.columns]).astype(np.float64)
+        x = x[~np.isnan(x).any(axis=1)]
+        n_b = len(x)
+        if n_b == 0:
+            return
+        mean_b = x.mean(axis=0)
+        centered = x - mean_b
+        c_b = centered.T @ centered
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.c = self.c + c_b + np.outer(delta, delta) * self.n * n_b / n
+        self.mean = self.mean + delta * n_b / n
+        self.n = n
+
+    def correlation(self) -> np.ndarray:
+        d = np.sqrt(np.diag(self.c))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            r = self.c / np.outer(d, d)
+        return np.nan_to_num(r)
+
+
+class OLSAccumulator:
+    """최소제곱 회귀 (절편 포함, 정규방정식 누적)"""
+
+    def __init__(self, target: str, predictors: Sequence[str]):
+        self.target = target
+        self.predictors = list(predictors)
+        k = len(self.predictors) + 1
+        self.xtx = np.zeros((k, k))
+        self.xty = np.zeros(k)
+        self.y = Moments()
+
+    def update(self, chunk: Chunk) -> None:
+        x = np.column_stack([chunk[c] for c in self.predictors]).astype(np.float64)
+        y = np.asarray(chunk[self.target], dtype=np.float64)
+        valid = ~(np.isnan(x).any(axis=1) | np.isnan(y))
+        x = np.column_stack([np.ones(valid.sum()), x[valid]])
+        y = y[valid]
+        self.xtx += x.T @ x
+        self.xty += x.T @ y
+        self.y.update(y)
+
+    def fit(self) -> Dict[str, Any]:
+        n, k = self.y.n, len(self.predictors)
+        if n <= k + 1:
+            return {'n': n, 'coefficients': {}, 'r_squared': None, 'adjusted_r_squared': None, 'rmse': None}
+        beta = np.linalg.lstsq(self.xtx, self.xty, rcond=None)[0]
+        # SSE = y'y - 2b'X'y + b'X'Xb,  y'y = M2 + n·mean²
+        yty = self.y.m2 + n * self.y.mean ** 2
+        sse = max(0.0, float(yty - 2 * beta @ self.xty + beta @ self.xtx @ beta))
+        r2 = 1.0 - sse / self.y.m2 if self.y.m2 > 0 else 0.0
+        return {
+            'n': n,
+            'target': self.target,
+            'coefficients': dict(zip(['intercept'] + self.predictors, (round(float(b), 4) for b in beta))),
+            'r_squared': round(r2, 4),
+            'adjusted_r_squared': round(1.0 - (1.0 - r2) * (n - 1) / (n - k - 1), 4),
+            'rmse': round(math.sqrt(sse / n), 4),
+        }
+
+
+# =============================================================================
+# 요약 통계 기반 검정
+# =============================================================================
+
+def effect_label(value: float, thresholds: Dict[str, float]) -> str:
+    """효과크기 해석 (DATA_CONFIG effect_size_threshold, Cohen's d 기준)"""
+    size = abs(value)
+    if size >= thresholds['large']:
+        return "large"
+    if size >= thresholds['medium']:
+        return "medium"
+    if size >= thresholds['small']:
+        return "small"
+    return "negligible"
+
+
+def welch_t_test(a: Moments, b: Moments, confidence: float = 0.95) -> Dict[str, Any]:
+    """독립 2표본 Welch t-test, Cohen's d, 평균 차이 신뢰구간 (a - b)"""
+    se2_a, se2_b = a.var / a.n, b.var / b.n
+    se = math.sqrt(se2_a + se2_b)
+    diff = a.mean - b.mean
+    df = (se2_a + se2_b) ** 2 / (se2_a ** 2 / (a.n - 1) + se2_b ** 2 / (b.n - 1)) if se > 0 else a.n + b.n - 2
+    t = diff / se if se > 0 else 0.0
+    pooled = math.sqrt(((a.n - 1) * a.var + (b.n - 1) * b.var) / (a.n + b.n - 2))
+    margin = sps.t.ppf(0.5 + confidence / 2, df) * se
+    return {
+        'statistic': t,
+        'df': df,
+        'p_value': float(2 * sps.t.sf(abs(t), df)),
+        'effect_size': diff / pooled if pooled > 0 else 0.0,
+        'mean_difference': diff,
+        'ci': (diff - margin, diff + margin),
+    }
+
+
+def one_way_anova(groups: Dict[str, Moments]) -> Dict[str, Any]:
+    """일원분산분석 (F, eta², Cohen's f)"""
+    groups = {k: g for k, g in groups.items() if g.n > 0}
+    n = sum(g.n for g in groups.values())
+    k = len(groups)
+    grand = sum(g.n * g.mean for g in groups.values()) / n
+    ssb = sum(g.n * (g.mean - grand) ** 2 for g in groups.values())
+    ssw = sum(g.m2 for g in groups.values())
+    df_b, df_w = k - 1, n - k
+    f = (ssb / df_b) / (ssw / df_w) if df_b > 0 and ssw > 0 else 0.0
+    eta2 = ssb / (ssb + ssw) if ssb + ssw > 0 else 0.0
+    return {
+        'statistic': f,
+        'df': (df_b, df_w),
+        'p_value': float(sps.f.sf(f, df_b, df_w)) if df_b > 0 else 1.0,
+        'eta_squared': eta2,
+        'cohens_f': math.sqrt(eta2 / (1 - eta2)) if eta2 < 1 else math.inf,
+        'group_means': {k: g.mean for k, g in groups.items()},
+    }
+
+
+def paired_t_test(diff: Moments, confidence: float = 0.95) -> Dict[str, Any]:
+    """대응표본 t-test (diff = 전 - 후), Cohen's d_z, 평균 차이 신뢰구간"""
+    se = diff.std / math.sqrt(diff.n) if diff.n > 1 else 0.0
+    df = diff.n - 1
+    t = diff.mean / se if se > 0 else 0.0
+    margin = sps.t.ppf(0.5 + confidence / 2, df) * se if df > 0 else 0.0
+    return {
+        'statistic': t,
+        'df': df,
+        'p_value': float(2 * sps.t.sf(abs(t), df)) if df > 0 else 1.0,
+        'effect_size': diff.mean / diff.std if diff.std > 0 else 0.0,
+        'mean_difference': diff.mean,
+        'ci': (diff.mean - margin, diff.mean + margin),
+    }
+
+
+# =============================================================================
+# 엔진
+# =============================================================================
+
+@dataclass
+class ScanResult:
+    """데이터셋 1회 스캔으로 누적한 통계량"""
+    path: str
+    rows: int = 0
+    columns: Dict[str, Moments] = field(default_factory=dict)
+    reservoirs: Dict[str, Reservoir] = field(default_factory=dict)
+    categories: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    groups: Dict[Tuple[str, str], GroupMoments] = field(default_factory=dict)
+    pairs: Dict[Tuple[str, str], Moments] = field(default_factory=dict)
+    comoments: Optional[CoMoments] = None
+    regression: Optional[OLSAccumulator] = None
+
+
+class AnalysisEngine:
+    """
+    청크 단위 통계 분석 엔진
+
+    사용 예:
+        engine = AnalysisEngine(DATA_CONFIG)
+        scan = engine.scan("data.csv", numeric=[...], groups=[("methodology_type", "research_efficiency")],
+                           pairs=[("time_to_insight_baseline", "time_to_insight")],
+                           regression=("research_efficiency", ["prediction_accuracy"]))
+        engine.describe(scan)
+        engine.t_test(scan, "methodology_type", "research_efficiency", "ai_driven", "traditional")
+    """
+
+    def __init__(
+        self,
+        config: Optional[Dict[str, Any]] = None,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        reservoir_size: int = 100_000,
+        seed: int = 42
+    ):
+        """
+        Args:
+            config: DATA_CONFIG (유의수준, 신뢰수준, 최소 표본, 효과크기 기준)
+            chunk_rows: 청크당 행 수
+            reservoir_size: 분위수 추정용 표본 크기
+            seed: 표본 추출 seed
+        """
+        self.config = {**DEFAULT_CONFIG, **(config or {})}
+        self.chunk_rows = chunk_rows
+        self.reservoir_size = reservoir_size
+        self.seed = seed
+
+    def scan(
+        self,
+        source,
+        numeric: Sequence[str],
+        categorical: Sequence[str] = (),
+        groups: Iterable[Tuple[str, str]] = (),
+        pairs: Iterable[Tuple[str, str]] = (),
+        regression: Optional[Tuple[str, Sequence[str]]] = None
+    ) -> ScanResult:
+        """
+        데이터 1회 스캔
+
+        Args:
+            source: 파일 경로 또는 청크 iterable
+            numeric: 기술통계/상관행렬 대상 숫자 컬럼
+            categorical: 빈도를 셀 범주형 컬럼
+            groups: (그룹 컬럼, 값 컬럼) 목록 - t-test/ANOVA
+            pairs: (전, 후) 컬럼 목록 - 대응표본 t-test
+            regression: (목표 컬럼, 설명 컬럼 목록)
+        """
+        groups, pairs = list(groups), list(pairs)
+        columns = set(numeric) | set(categorical) | {c for pair in groups + pairs for c in pair}
+        if regression:
+            columns |= {regression[0], *regression[1]}
+
+        if isinstance(source, (str, bytes)) or hasattr(source, '__fspath__'):
+            chunks = read_chunks(source, sorted(columns), self.chunk_rows)
+            result = ScanResult(path=str(source))
+        else:
+            chunks = source
+            result = ScanResult(path="<chunks>")
+
+        result.columns = {c: Moments() for c in numeric}
+        result.reservoirs = {
+            c: Reservoir(self.reservoir_size, self.seed + i) for i, c in enumerate(numeric)
+        }
+        result.categories = {c: {} for c in categorical}
+        result.groups = {pair: GroupMoments() for pair in groups}
+        result.pairs = {pair: Moments() for pair in pairs}
+        result.comoments = CoMoments(numeric) if len(numeric) > 1 else None
+        result.regression = OLSAccumulator(*regression) if regression else None
+
+        for chunk in chunks:
+            result.rows += len(next(iter(chunk.values()))) if chunk else 0
+            for c in numeric:
+                result.columns[c].update(chunk[c])
+                result.reservoirs[c].update(chunk[c])
+            for c in categorical:
+                for level, count in pd.Series(chunk[c]).value_counts().items():
+                    result.categories[c][str(level)] = result.categories[c].get(str(level), 0) + int(count)
+            for (group, value), accumulator in result.groups.items():
+                accumulator.update(chunk[group], chunk[value])
+            for (before, after), accumulator in result.pairs.items():
+                accumulator.update(np.asarray(chunk[before], dtype=np.float64)
+                                   - np.asarray(chunk[after], dtype=np.float64))
+            if result.comoments:
+                result.comoments.update(chunk)
+            if result.regression:
+                result.regression.update(chunk)
+        return result
+
+    # -------------------------------------------------------------------------
+    # 결과
+    # -------------------------------------------------------------------------
+
+    def describe(self, scan: ScanResult) -> Dict[str, Dict[str, Any]]:
+        """컬럼별 기술통계"""
+        described = {}
+        for name, m in scan.columns.items():
+            reservoir = scan.reservoirs[name]
+            q1, median, q3 = (float(v) for v in reservoir.quantile([0.25, 0.5, 0.75])) \
+                if m.n else (float('nan'),) * 3
+            described[name] = {
+                'count': m.n,
+                'missing': m.missing,
+                'mean': round(m.mean, 4),
+                'std': round(m.std, 4),
+                'min': round(m.min, 4) if m.n else None,
+                'q1': round(q1, 4),
+                'median': round(median, 4),
+                'q3': round(q3, 4),
+                'max': round(m.max, 4) if m.n else None,
+                'skewness': round(m.skewness, 4),
+                'quantiles_exact': reservoir.exact,
+            }
+        return described
+
+    @staticmethod
+    def distribution_shape(m: Moments) -> str:
+        """왜도 기반 분포 형태"""
+        skew = m.skewness
+        if abs(skew) < 0.5:
+            return "Approximately normal"
+        if abs(skew) < 1.0:
+            return "Slightly right-skewed" if skew > 0 else "Slightly left-skewed"
+        return "Right-skewed" if skew > 0 else "Left-skewed"
+
+    def correlations(self, scan: ScanResult) -> Dict[str, Dict[str, float]]:
+        """상관행렬 {컬럼: {컬럼: r}}"""
+        if scan.comoments is None or scan.comoments.n < 2:
+            return {}
+        r = scan.comoments.correlation()
+        names = scan.comoments.columns
+        return {a: {b: round(float(r[i, j]), 4) for j, b in enumerate(names)} for i, a in enumerate(names)}
+
+    def _verdict(self, result: Dict[str, Any], n: int) -> Dict[str, Any]:
+        alpha = self.config['significance_level']
+        result['n'] = n
+        result['sufficient_sample'] = n >= self.config['min_sample_size']
+        result['significant'] = result['p_value'] < alpha and result['sufficient_sample']
+        return result
+
+    def t_test(self, scan: ScanResult, group: str, value: str, a: str, b: str) -> Dict[str, Any]:
+        """그룹 a vs b 독립 t-test (Welch)"""
+        moments = scan.groups[(group, value)].groups
+        ga, gb = moments.get(a, Moments()), moments.get(b, Moments())
+        if min(ga.n, gb.n) < 2:
+            return self._verdict({'test': "Independent t-test (Welch)", 'p_value': 1.0,
+                                  'statistic': 0.0, 'effect_size': 0.0}, ga.n + gb.n)
+        result = welch_t_test(ga, gb, self.config['confidence_level'])
+        result.update({
+            'test': "Independent t-test (Welch)",
+            'effect_measure': "Cohen's d",
+            'effect_label': effect_label(result['effect_size'], self.config['effect_size_threshold']),
+            'means': {a: ga.mean, b: gb.mean},
+        })
+        return self._verdict(result, ga.n + gb.n)
+
+    def anova(self, scan: ScanResult, group: str, value: str) -> Dict[str, Any]:
+        """그룹 간 일원분산분석"""
+        moments = scan.groups[(group, value)].groups
+        n = sum(m.n for m in moments.values())
+        if len(moments) < 2 or n <= len(moments):
+            return self._verdict({'test': "One-way ANOVA", 'p_value': 1.0, 'statistic': 0.0,
+                                  'eta_squared': 0.0}, n)
+        result = one_way_anova(moments)
+        # Cohen's f (0.1/0.25/0.4)는 d 기준의 절반 → 2f로 같은 기준 적용
+        result.update({
+            'test': "One-way ANOVA",
+            'effect_measure': "eta-squared",
+            'effect_size': result['eta_squared'],
+            'effect_label': effect_label(2 * result['cohens_f'], self.config['effect_size_threshold']),
+        })
+        return self._verdict(result, n)
+
+    def paired(self, scan: ScanResult, before: str, after: str) -> Dict[str, Any]:
+        """대응표본 t-test (before - after), 평균 감소율 포함"""
+        diff = scan.pairs[(before, after)]
+        if diff.n < 2:
+            return self._verdict({'test': "Paired t-test", 'p_value': 1.0, 'statistic': 0.0,
+                                  'effect_size': 0.0}, diff.n)
+        result = paired_t_test(diff, self.config['confidence_level'])
+        result.update({
+            'test': "Paired t-test",
+            'effect_measure': "Cohen's d_z",
+            'effect_label': effect_label(result['effect_size'], self.config['effect_size_threshold']),
+        })
+        baseline = scan.columns.get(before)
+        if baseline is not None and baseline.mean:
+            result['percent_change'] = -100.0 * diff.mean / baseline.mean
+            result['ci_percent'] = tuple(-100.0 * v / baseline.mean for v in reversed(result['ci']))
+        return self._verdict(result, diff.n)
+
+    def regression(self, scan: ScanResult) -> Dict[str, Any]:
+        """회귀 적합도"""
+        return scan.regression.fit() if scan.regression else {}
@@ -0,0 +1,250 @@
+"""
+Figures
+분석 결과 그림 렌더링 (box plot / bar chart / histogram / heatmap)
+
+- 그림마다 요약 데이터(상자 통계, 그룹 평균, 히스토그램 도수, 상관행렬)와 사양, 해상도,
+  matplotlib 버전을 해시하여 키로 사용하고, 키가 그대로이고 파일이 있으면 다시 그리지 않는다 (.figure_cache.json)
+- 다시 그릴 그림이 있을 때만 프로세스 풀을 띄워 병렬로 렌더링
+- pyplot 없이 Figure + Agg canvas로 그리므로 디스플레이/전역 backend 설정과 무관하며,
+  PNG 메타데이터에서 버전 정보를 빼서 같은 입력이면 같은 파일이 나온다
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+CACHE_FILE = ".figure_cache.json"
+
+
+@dataclass
+class FigureSpec:
+    """그림 1개 (data는 렌더링에 필요한 요약값만 담는다)"""
+    name: str
+    kind: str                     # box_plot / bar_chart / histogram / heatmap
+    title: str
+    data: Dict[str, Any]
+    description: str = ""
+    labels: Dict[str, str] = field(default_factory=dict)   # xlabel, ylabel
+
+    @property
+    def filename(self) -> str:
+        return f"{self.name}.png"
+
+
+# =============================================================================
+# 요약 데이터
+# =============================================================================
+
+def box_stats(values: np.ndarray, whis: float = 1.5, max_fliers: int = 200) -> Dict[str, Any]:
+    """상자 그림 통계 (Axes.bxp 형식, 이상치는 최대 max_fliers개를 균등 간격으로 유지)"""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return {}
+    q1, med, q3 = np.percentile(values, [25, 50, 75])
+    low, high = q1 - whis * (q3 - q1), q3 + whis * (q3 - q1)
+    inside = values[(values >= low) & (values <= high)]
+    fliers = np.sort(values[(values < low) | (values > high)])
+    if len(fliers) > max_fliers:
+        fliers = fliers[np.linspace(0, len(fliers) - 1, max_fliers).astype(int)]
+    return {
+        'med': float(med), 'q1': float(q1), 'q3': float(q3), 'mean': float(values.mean()),
+        'whislo': float(inside.min()) if len(inside) else float(q1),
+        'whishi': float(inside.max()) if len(inside) else float(q3),
+        'fliers': fliers,
+        'n': int(len(values)),
+    }
+
+
+@lru_cache(maxsize=1)
+def _matplotlib_version() -> str:
+    """설치된 matplotlib 버전 (import하지 않고 조회, 없으면 빈 문자열)"""
+    try:
+        return metadata.version("matplotlib")
+    except metadata.PackageNotFoundError:
+        return ""
+
+
+def figure_key(spec: FigureSpec, dpi: int = 150) -> str:
+    """사양 + 데이터 + 해상도 + matplotlib 버전 해시 (배열은 dtype/shape/바이트, 실수는 repr로 정규화)"""
+    digest = hashlib.sha256()
+
+    def feed(obj: Any) -> None:
+        if isinstance(obj, dict):
+            digest.update(b'{')
+            for key in sorted(obj, key=str):
+                feed(str(key))
+                feed(obj[key])
+            digest.update(b'}')
+        elif isinstance(obj, (list, tuple)):
+            digest.update(b'[')
+            for item in obj:
+                feed(item)
+            digest.update(b']')
+        elif isinstance(obj, np.ndarray):
+            array = np.ascontiguousarray(obj)
+            digest.update(f"nd:{array.dtype.str}:{array.shape}:".encode())
+            digest.update(array.tobytes())
+        elif isinstance(obj, (float, np.floating)):
+            digest.update(f"f:{float(obj)!r};".encode())
+        else:
+            digest.update(f"{type(obj).__name__}:{obj!r};".encode())
+
+    feed({'name': spec.name, 'kind': spec.kind, 'title': spec.title,
+          'labels': spec.labels, 'data': spec.data,
+          'dpi': dpi, 'matplotlib': _matplotlib_version()})
+    return digest.hexdigest()
+
+
+# =============================================================================
+# 렌더링 (worker)
+# =============================================================================
+
+def _draw_box(ax, data: Dict[str, Any]) -> None:
+    groups = {label: stats for label, stats in data['groups'].items() if stats}
+    ax.bxp([{**stats, 'label': f"{label}\n(n={stats['n']})"} for label, stats in groups.items()],
+           showmeans=True, patch_artist=True)
+
+
+def _draw_bar(ax, data: Dict[str, Any]) -> None:
+    positions = np.arange(len(data['labels']))
+    ax.bar(positions, data['means'], yerr=data.get('errors'), capsize=6, color="#4C72B0", alpha=0.85)
+    ax.set_xticks(positions, data['labels'])
+    low = min(m - e for m, e in zip(data['means'], data.get('errors') or [0] * len(data['means'])))
+    ax.set_ylim(bottom=max(0.0, low - 0.1 * abs(low)))
+
+
+def _draw_histogram(ax, data: Dict[str, Any]) -> None:
+    edges = np.asarray(data['edges'])
+    ax.stairs(data['counts'], edges, fill=True, alpha=0.8, color="#55A868")
+    if 'mean' in data:
+        ax.axvline(data['mean'], color="#C44E52", linestyle="--", label=f"mean = {data['mean']:.1f}")
+        ax.legend()
+
+
+def _draw_heatmap(ax, data: Dict[str, Any]) -> None:
+    matrix = np.asarray(data['matrix'], dtype=np.float64)
+    labels = data['labels']
+    image = ax.imshow(matrix, vmin=-1.0, vmax=1.0, cmap="RdBu_r")
+    ax.set_xticks(range(len(labels)), labels, rotation=35, ha="right")
+    ax.set_yticks(range(len(labels)), labels)
+    for i in range(len(labels)):
+        for j in range(len(labels)):
+            ax.text(j, i, f"{matrix[i, j]:.2f}", ha="center", va="center",
+                    color="white" if abs(matrix[i, j]) > 0.5 else "black", fontsize=8)
+    ax.figure.colorbar(image, ax=ax, shrink=0.8)
+
+
+DRAWERS = {
+    'box_plot': _draw_box,
+    'bar_chart': _draw_bar,
+    'histogram': _draw_histogram,
+    'heatmap': _draw_heatmap,
+}
+
+
+def _render(spec: FigureSpec, path: str, dpi: int) -> str:
+    """그림 1개를 PNG로 저장 (임시 파일에 쓴 뒤 교체)"""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(7, 5) if spec.kind != 'heatmap' else (7, 6))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    DRAWERS[spec.kind](ax, spec.data)
+    ax.set_title(spec.title)
+    if 'xlabel' in spec.labels:
+        ax.set_xlabel(spec.labels['xlabel'])
+    if 'ylabel' in spec.labels:
+        ax.set_ylabel(spec.labels['ylabel'])
+    fig.tight_layout()
+
+    tmp = f"{path}.tmp"
+    fig.savefig(tmp, format="png", dpi=dpi, metadata={'Software': None})
+    os.replace(tmp, path)
+    return path
+
+
+# =============================================================================
+# 캐시 + 풀
+# =============================================================================
+
+class FigureRenderer:
+    """
+    캐시 기반 그림 렌더러
+
+    사용 예:
+        renderer = FigureRenderer("outputs/analysis_results")
+        figures = renderer.render([FigureSpec("time_reduction", "histogram", ...), ...])
+        # [{'name', 'type', 'description', 'file', 'key', 'cached'}, ...]
+    """
+
+    def __init__(self, output_dir, workers: Optional[int] = None, dpi: int = 150):
+        """
+        Args:
+            output_dir: PNG와 캐시 목록을 둘 디렉터리
+            workers: 렌더링 프로세스 수 (None: CPU 수, 1: 현재 프로세스에서 렌더링)
+            dpi: 해상도
+        """
+        self.output_dir = Path(output_dir)
+        self.workers = workers or os.cpu_count() or 1
+        self.dpi = dpi
+        self.cache_path = self.output_dir / CACHE_FILE
+
+    def _load_cache(self) -> Dict[str, str]:
+        if not self.cache_path.exists():
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def render(self, specs: Sequence[FigureSpec]) -> List[Dict[str, Any]]:
+        """
+        바뀐 그림만 렌더링
+
+        Returns:
+            그림별 {name, type, description, file, key, cached}
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        cache = self._load_cache()
+        keys = {spec.name: figure_key(spec, self.dpi) for spec in specs}
+        paths = {spec.name: self.output_dir / spec.filename for spec in specs}
+        stale = [spec for spec in specs if cache.get(spec.name) != keys[spec.name] or not paths[spec.name].exists()]
+
+        workers = min(self.workers, len(stale))
+        if workers == 1:
+            for spec in stale:
+                _render(spec, str(paths[spec.name]), self.dpi)
+        elif workers > 1:
+            with ProcessPoolExecutor(workers) as pool:
+                futures = [pool.submit(_render, spec, str(paths[spec.name]), self.dpi) for spec in stale]
+                for future in futures:
+                    future.result()
+
+        for spec in stale:
+            cache[spec.name] = keys[spec.name]
+        with open(self.cache_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2)
+
+        rendered = {spec.name for spec in stale}
+        return [
+            {
+                'name': spec.name,
+                'type': spec.kind,
+                'description': spec.description,
+                'file': str(paths[spec.name]),
+                'key': keys[spec.name][:16],
+                'cached': spec.name not in rendered,
+            }
+            for spec in specs
+        ]
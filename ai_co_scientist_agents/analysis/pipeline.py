@@ -0,0 +1,329 @@
+"""
+Preprocessing Pipeline
+대용량 데이터 전처리 (out-of-core)
+
+원본을 청크 단위로 세 번 읽는다 (메모리는 chunk_rows와 분위수 표본 크기로 제한).
+1. 분위수 표본 → IQR 경계, 범주 수준
+2. 경계 안 값의 평균/분산 (평균 대체 후 z-score 모수), train/test 행 수
+3. 결측치 평균 대체 → 이상치 제거(또는 clip) → z-score → one-hot → 80/20 분할 후 기록
+
+결과는 split별 컬럼 .npy memmap (기본) 또는 Parquet로 저장하며,
+read_chunks(결과 디렉터리)로 다시 청크 단위로 읽어 AnalysisEngine.scan에 넘길 수 있다.
+
+결과 디렉터리:
+    meta.json              행 수, 컬럼 dtype, 범주 수준, 전처리 모수
+    train/<컬럼>.npy       (format="npy")
+    test/<컬럼>.npy
+    train.parquet          (format="parquet")
+    test.parquet
+"""
+
+import json
+import math
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .engine import Moments, Reservoir
+from .loaders import DEFAULT_CHUNK_ROWS, PYARROW_AVAILABLE, Chunk, read_chunks
+
+if PYARROW_AVAILABLE:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+# config.settings.DATA_CONFIG["preprocessing"]와 같은 기본값
+DEFAULT_PREPROCESSING = {
+    "iqr_factor": 1.5,          # 이상치 경계: Q1 - k·IQR, Q3 + k·IQR
+    "outlier_action": "drop",   # drop: 행 제거 / clip: 경계값으로 대체
+    "test_size": 0.2,
+    "format": "npy",            # npy (memmap) / parquet
+}
+
+SPLITS = ("train", "test")
+
+
+class _NpyWriter:
+    """split별 컬럼 memmap (행 수를 미리 알고 있으므로 한 번에 할당)"""
+
+    def __init__(self, directory: Path, dtypes: Dict[str, str], rows: Dict[str, int]):
+        self.arrays = {}
+        self.offsets = {split: 0 for split in SPLITS}
+        for split in SPLITS:
+            (directory / split).mkdir(parents=True, exist_ok=True)
+            self.arrays[split] = {
+                name: np.lib.format.open_memmap(directory / split / f"{name}.npy", mode='w+',
+                                                dtype=dtype, shape=(rows[split],))
+                for name, dtype in dtypes.items()
+            }
+
+    def write(self, split: str, columns: Dict[str, np.ndarray]) -> None:
+        start = self.offsets[split]
+        n = len(next(iter(columns.values())))
+        for name, values in columns.items():
+            self.arrays[split][name][start:start + n] = values
+        self.offsets[split] = start + n
+
+    def close(self) -> None:
+        for arrays in self.arrays.values():
+            for array in arrays.values():
+                array.flush()
+        self.arrays.clear()
+
+
+class _ParquetWriter:
+    """split별 Parquet 파일 (청크마다 row group 1개)"""
+
+    def __init__(self, directory: Path, dtypes: Dict[str, str], rows: Dict[str, int]):
+        if not PYARROW_AVAILABLE:
+            raise ImportError("Parquet으로 저장하려면 pyarrow가 필요합니다: pip install pyarrow")
+        schema = pa.schema([(name, pa.from_numpy_dtype(np.dtype(dtype))) for name, dtype in dtypes.items()])
+        self.writers = {split: pq.ParquetWriter(directory / f"{split}.parquet", schema) for split in SPLITS}
+
+    def write(self, split: str, columns: Dict[str, np.ndarray]) -> None:
+        self.writers[split].write_table(pa.table(columns, schema=self.writers[split].schema))
+
+    def close(self) -> None:
+        for writer in self.writers.values():
+            writer.close()
+
+
+class PreprocessingPipeline:
+    """
+    청크 단위 전처리
+
+    사용 예:
+        pipeline = PreprocessingPipeline(DATA_CONFIG)
+        report = pipeline.fit_transform("data.csv", "outputs/data/processed/experiment",
+                                        numeric=["research_efficiency", ...],
+                                        categorical=["methodology_type"],
+                                        outlier_columns=["research_efficiency"])
+        engine.scan("outputs/data/processed/experiment", numeric=[...])
+    """
+
+    def __init__(
+        self,
+        config: Optional[Dict[str, Any]] = None,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        reservoir_size: int = 100_000,
+        seed: int = 42
+    ):
+        """
+        Args:
+            config: DATA_CONFIG (preprocessing 항목 사용)
+            chunk_rows: 청크당 행 수
+            reservoir_size: IQR 경계 추정용 표본 크기 (행 수 이하면 정확)
+            seed: 표본 추출 및 train/test 분할 seed
+        """
+        self.options = {**DEFAULT_PREPROCESSING, **(config or {}).get("preprocessing", {})}
+        if self.options["outlier_action"] not in ("drop", "clip"):
+            raise ValueError(f"지원하지 않는 outlier_action: {self.options['outlier_action']}")
+        self.chunk_rows = chunk_rows
+        self.reservoir_size = reservoir_size
+        self.seed = seed
+
+        self.numeric: List[str] = []
+        self.categorical: List[str] = []
+        self.outlier_columns: List[str] = []
+        self.bounds: Dict[str, tuple] = {}
+        self.levels: Dict[str, List[str]] = {}
+        self.moments: Dict[str, Moments] = {}
+        self.rows = {"input": 0, "kept": 0, "train": 0, "test": 0}
+        self.outliers: Dict[str, int] = {}
+
+    # -------------------------------------------------------------------------
+    # 모수 추정 (1·2차 스캔)
+    # -------------------------------------------------------------------------
+
+    def fit(
+        self,
+        source,
+        numeric: Sequence[str],
+        categorical: Sequence[str] = (),
+        outlier_columns: Optional[Sequence[str]] = None
+    ) -> "PreprocessingPipeline":
+        """
+        전처리 모수 추정
+
+        Args:
+            source: 파일 경로 또는 청크 리스트 (여러 번 읽으므로 generator 불가)
+            numeric: 대체/정규화할 숫자 컬럼
+            categorical: one-hot 인코딩할 범주형 컬럼
+            outlier_columns: IQR 이상치 검사 컬럼 (기본: numeric 전체)
+        """
+        self.numeric = list(numeric)
+        self.categorical = list(categorical)
+        self.outlier_columns = list(numeric if outlier_columns is None else outlier_columns)
+
+        # 1차: 분위수 표본, 범주 수준
+        reservoirs = {c: Reservoir(self.reservoir_size, self.seed + i) for i, c in enumerate(self.outlier_columns)}
+        levels = {c: set() for c in self.categorical}
+        rows = 0
+        for chunk in self._chunks(source):
+            rows += len(next(iter(chunk.values())))
+            for c, reservoir in reservoirs.items():
+                reservoir.update(chunk[c])
+            for c in self.categorical:
+                levels[c].update(str(v) for v in pd.unique(chunk[c]) if not pd.isna(v))
+
+        k = self.options["iqr_factor"]
+        self.bounds = {}
+        for c, reservoir in reservoirs.items():
+            if not len(reservoir.values):
+                continue
+            q1, q3 = (float(v) for v in reservoir.quantile([0.25, 0.75]))
+            self.bounds[c] = (q1 - k * (q3 - q1), q3 + k * (q3 - q1))
+        self.levels = {c: sorted(values) for c, values in levels.items()}
+
+        # 2차: 남는 행의 평균/분산, 분할 행 수 (3차 스캔과 같은 순서로 난수 사용)
+        self.moments = {c: Moments() for c in self.numeric}
+        self.outliers = {c: 0 for c in self.bounds}
+        self.rows = {"input": rows, "kept": 0, "train": 0, "test": 0}
+        rng = np.random.default_rng(self.seed)
+        for chunk in self._chunks(source):
+            values, keep = self._screen(chunk, count=True)
+            for c in self.numeric:
+                self.moments[c].update(values[c][keep])
+            kept = int(keep.sum())
+            test = int((rng.random(kept) < self.options["test_size"]).sum())
+            self.rows["kept"] += kept
+            self.rows["train"] += kept - test
+            self.rows["test"] += test
+        return self
+
+    def _chunks(self, source) -> Iterator[Chunk]:
+        if isinstance(source, (str, bytes)) or hasattr(source, '__fspath__'):
+            return read_chunks(source, self.numeric + self.categorical, self.chunk_rows)
+        return iter(source)
+
+    def _screen(self, chunk: Chunk, count: bool = False):
+        """숫자 컬럼 float64 변환 + 이상치 처리 → (값, 남길 행 mask)"""
+        n = len(next(iter(chunk.values())))
+        values = {c: np.array(chunk[c], dtype=np.float64) for c in self.numeric}
+        keep = np.ones(n, dtype=bool)
+        for c, (lower, upper) in self.bounds.items():
+            x = values[c]
+            with np.errstate(invalid='ignore'):
+                outside = (x < lower) | (x > upper)
+            if count:
+                self.outliers[c] += int(outside.sum())
+            if self.options["outlier_action"] == "clip":
+                values[c] = np.where(np.isnan(x), x, np.clip(x, lower, upper))
+            else:
+                keep &= ~outside
+        return values, keep
+
+    # -------------------------------------------------------------------------
+    # 변환 (3차 스캔)
+    # -------------------------------------------------------------------------
+
+    @property
+    def features(self) -> List[str]:
+        """모델 입력 특징 (z-score 컬럼 + one-hot 컬럼)"""
+        return [f"{c}_z" for c in self.numeric] + [
+            f"{c}_{level}" for c in self.categorical for level in self.levels[c]
+        ]
+
+    def _dtypes(self) -> Dict[str, str]:
+        dtypes = {c: "float64" for c in self.numeric}
+        dtypes.update({c: "int32" for c in self.categorical})
+        dtypes.update({f"{c}_z": "float64" for c in self.numeric})
+        dtypes.update({f"{c}_{level}": "uint8" for c in self.categorical for level in self.levels[c]})
+        return dtypes
+
+    def _scale(self, column: str) -> tuple:
+        """z-score 모수 (평균 대체 값은 편차 0이므로 M2는 그대로, n만 증가)"""
+        m = self.moments[column]
+        n = m.n + m.missing
+        std = math.sqrt(m.m2 / (n - 1)) if n > 1 else 0.0
+        return m.mean, std
+
+    def transform(self, source, output_dir) -> Dict[str, Any]:
+        """
+        전처리 결과 기록
+
+        Args:
+            source: fit과 같은 원본
+            output_dir: 결과 디렉터리 (기존 내용은 삭제)
+
+        Returns:
+            meta.json 내용
+        """
+        output_dir = Path(output_dir)
+        if output_dir.exists():
+            shutil.rmtree(output_dir)
+        output_dir.mkdir(parents=True)
+
+        dtypes = self._dtypes()
+        writer_class = _ParquetWriter if self.options["format"] == "parquet" else _NpyWriter
+        writer = writer_class(output_dir, dtypes, {s: self.rows[s] for s in SPLITS})
+        scales = {c: self._scale(c) for c in self.numeric}
+        codes = {c: {level: i for i, level in enumerate(self.levels[c])} for c in self.categorical}
+        rng = np.random.default_rng(self.seed)
+
+        try:
+            for chunk in self._chunks(source):
+                values, keep = self._screen(chunk)
+                out = {}
+                for c in self.numeric:
+                    x = values[c][keep]
+                    mean, std = scales[c]
+                    x[np.isnan(x)] = mean
+                    out[c] = x
+                    out[f"{c}_z"] = (x - mean) / std if std > 0 else np.zeros_like(x)
+                for c in self.categorical:
+                    labels = pd.Series(chunk[c][keep], dtype=object)
+                    code = labels.map(codes[c]).fillna(-1).to_numpy(dtype=np.int32)
+                    out[c] = code
+                    for level, i in codes[c].items():
+                        out[f"{c}_{level}"] = (code == i).astype(np.uint8)
+
+                is_test = rng.random(int(keep.sum())) < self.options["test_size"]
+                for split, mask in (("train", ~is_test), ("test", is_test)):
+                    if mask.any():
+                        writer.write(split, {name: out[name][mask] for name in dtypes})
+        finally:
+            writer.close()
+
+        meta = {
+            "format": self.options["format"],
+            "rows": {s: self.rows[s] for s in SPLITS},
+            "columns": dtypes,
+            "levels": self.levels,
+            "features": self.features,
+            "params": self.params(),
+        }
+        with open(output_dir / "meta.json", 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        return meta
+
+    def fit_transform(self, source, output_dir, numeric: Sequence[str], categorical: Sequence[str] = (),
+                      outlier_columns: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """fit + transform"""
+        self.fit(source, numeric, categorical, outlier_columns)
+        return self.transform(source, output_dir)
+
+    # -------------------------------------------------------------------------
+    # 결과
+    # -------------------------------------------------------------------------
+
+    def params(self) -> Dict[str, Any]:
+        """추정한 전처리 모수"""
+        return {
+            "rows": dict(self.rows),
+            "imputation": {c: {"mean": round(m.mean, 6), "imputed": m.missing} for c, m in self.moments.items()},
+            "scaling": {c: {"mean": round(mean, 6), "std": round(std, 6)}
+                        for c, (mean, std) in ((c, self._scale(c)) for c in self.numeric)},
+            "outlier_bounds": {c: [round(lo, 6), round(hi, 6)] for c, (lo, hi) in self.bounds.items()},
+            "outliers": dict(self.outliers),
+            "outlier_action": self.options["outlier_action"],
+            "test_size": self.options["test_size"],
+            "seed": self.seed,
+        }
+
+    def completeness(self) -> float:
+        """남긴 행의 숫자 값 중 결측이 아니었던 비율"""
+        total = sum(m.n + m.missing for m in self.moments.values())
+        return 1.0 - sum(m.missing for m in self.moments.values()) / total if total else 1.0
@@ -0,0 +1,95 @@
+"""
+Reproduction Run
+분석 파이프라인 재실행 (ValidationAgent가 격리된 하위 프로세스로 실행)
+
+    python -m analysis.reproduce <작업 디렉터리> <결과 JSON>
+
+작업 디렉터리의 outputs/data에 원본 데이터(링크)를 두고 DataAnalysisAgent를 그대로 실행한 뒤,
+분석 결과와 산출물(전처리 결과, 그림) 해시를 JSON으로 기록한다.
+"""
+
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# 재현 결과에 영향을 주는 코드 (캐시 키)
+SOURCE_FILES = (
+    "agents/data_analysis.py",
+    "analysis/__init__.py",
+    "analysis/engine.py",
+    "analysis/figures.py",
+    "analysis/loaders.py",
+    "analysis/pipeline.py",
+    "analysis/resampling.py",
+    "analysis/reproduce.py",
+    "config/settings.py",
+)
+
+
+def file_digest(path, block_size: int = 1 << 20) -> str:
+    """파일 sha256 (블록 단위로 읽음)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def output_hashes(root, processed: Iterable[str] = (), figures: Iterable[str] = ()) -> Dict[str, str]:
+    """
+    산출물 해시 {root 기준 상대 경로: sha256}
+
+    Args:
+        root: 기준 디렉터리
+        processed: 전처리 결과 디렉터리 목록 (root 기준, meta.json 포함 전체 파일)
+        figures: 그림 파일 목록 (root 기준)
+    """
+    root = Path(root)
+    hashes = {}
+    for directory in processed:
+        for path in sorted((root / directory).rglob('*')):
+            if path.is_file():
+                hashes[path.relative_to(root).as_posix()] = file_digest(path)
+    for figure in figures:
+        if (root / figure).is_file():
+            hashes[Path(figure).as_posix()] = file_digest(root / figure)
+    return hashes
+
+
+def run(workdir: Path) -> Dict[str, Any]:
+    """작업 디렉터리에서 분석 실행"""
+    sys.path.insert(0, str(PROJECT_ROOT))
+    os.chdir(workdir)
+    for directory in ("outputs/data", "outputs/analysis_results"):
+        Path(directory).mkdir(parents=True, exist_ok=True)
+
+    from agents.data_analysis import DataAnalysisAgent
+
+    results = DataAnalysisAgent().analyze_data({})
+    hashes = output_hashes(
+        ".",
+        processed=[ds["processed_path"] for ds in results["datasets"] if "processed_path" in ds],
+        figures=[figure["file"] for figure in results["visualizations"]],
+    )
+    return {"results": results, "hashes": hashes}
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print("Usage: python -m analysis.reproduce <workdir> <output.json>", file=sys.stderr)
+        return 2
+    output = Path(argv[1]).resolve()
+    record = run(Path(argv[0]).resolve())
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(record, f, ensure_ascii=False, default=str)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
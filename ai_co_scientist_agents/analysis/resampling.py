@@ -0,0 +1,310 @@
+"""
+Resampling
+부트스트랩 신뢰구간 / 순열검정 p-value
+
+- 재표본 인덱스는 (batch, n) 행렬로 한 번에 생성하여 batch 단위로 통계량 계산
+- batch들은 프로세스 풀에서 병렬 실행, 데이터는 공유 메모리에 한 번만 올림
+- seed를 주면 batch마다 SeedSequence 자식 stream을 쓰므로 worker 수와 무관하게 결과가 같음
+
+통계량
+- 그룹 비교 (H1, H2): 그룹별 층화 부트스트랩 평균, 라벨 순열 (그룹 크기 고정, 난수 키 partition)
+- 대응 비교 (H3): 행 부트스트랩 (전 평균, 차이 평균), 차이 부호 뒤집기 순열
+"""
+
+import math
+import multiprocessing as mp
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .loaders import DEFAULT_CHUNK_ROWS, read_chunks
+
+# config.settings.DATA_CONFIG["resampling"]와 같은 기본값
+DEFAULT_RESAMPLING = {
+    "n_resamples": 10000,
+    "workers": None,                 # None: CPU 수
+    "batch_elements": 4_000_000,     # batch 하나의 재표본 원소 수 (float64 기준 약 32MB)
+    "max_rows": 1_000_000,           # 메모리에 올릴 최대 행 수 (넘으면 균등 표본)
+}
+
+# worker 프로세스의 공유 배열 {이름: ndarray}
+_ARRAYS: Dict[str, np.ndarray] = {}
+_SEGMENTS: List[shared_memory.SharedMemory] = []
+
+
+def _attach(layout: Dict[str, Tuple[str, Tuple[int, ...], str]], untrack: bool) -> None:
+    """worker 초기화: 공유 메모리 연결"""
+    for key, (name, shape, dtype) in layout.items():
+        segment = shared_memory.SharedMemory(name=name)
+        if untrack:
+            # spawn worker는 별도 resource tracker를 쓰므로, 종료 시 segment를 지우지 않게 등록 해제
+            resource_tracker.unregister(segment._name, "shared_memory")
+        _SEGMENTS.append(segment)
+        _ARRAYS[key] = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+
+
+def _group_batch(values: np.ndarray, offsets: np.ndarray, kind: str,
+                 seed: np.random.SeedSequence, size: int) -> np.ndarray:
+    """그룹별 평균 (size, k) - values는 그룹 순으로 정렬, offsets는 그룹 시작 위치"""
+    rng = np.random.default_rng(seed)
+    counts = np.diff(np.append(offsets, len(values)))
+    if kind == "bootstrap":
+        means = np.empty((size, len(offsets)))
+        for g, (start, count) in enumerate(zip(offsets, counts)):
+            index = rng.integers(0, count, (size, count), dtype=np.int32) + start
+            means[:, g] = values[index].mean(axis=1)
+        return means
+    # 라벨 순열 = 행마다 난수 키를 매겨 키 순서 구간별로 그룹 배정 (셔플보다 빠른 O(n) partition)
+    keys = rng.random((size, len(values)))
+    cuts = offsets[1:]
+    thresholds = np.partition(keys, cuts, axis=1)[:, cuts]
+    cumulative = np.column_stack(
+        [(keys < thresholds[:, [i]]).astype(np.float64) @ values for i in range(len(cuts))]
+        + [np.full(size, values.sum())]
+    )
+    return np.diff(cumulative, axis=1, prepend=0.0) / counts
+
+
+def _paired_batch(before: np.ndarray, diff: np.ndarray, kind: str,
+                  seed: np.random.SeedSequence, size: int) -> np.ndarray:
+    """bootstrap: (size, 2) [전 평균, 차이 평균] / permutation: (size, 1) 부호를 뒤집은 차이 평균"""
+    rng = np.random.default_rng(seed)
+    n = len(diff)
+    if kind == "bootstrap":
+        index = rng.integers(0, n, (size, n), dtype=np.int32)
+        return np.column_stack([before[index].mean(axis=1), diff[index].mean(axis=1)])
+    signs = rng.integers(0, 2, (size, n), dtype=np.int8) * 2 - 1
+    return (signs @ diff / n)[:, None]
+
+
+def _run_batch(task: Tuple[str, str, np.random.SeedSequence, int]) -> np.ndarray:
+    design, kind, seed, size = task
+    if design == "groups":
+        return _group_batch(_ARRAYS["values"], _ARRAYS["offsets"], kind, seed, size)
+    return _paired_batch(_ARRAYS["before"], _ARRAYS["diff"], kind, seed, size)
+
+
+def load_columns(
+    source,
+    columns: Sequence[str],
+    max_rows: Optional[int] = None,
+    seed: int = 42,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS
+) -> Dict[str, np.ndarray]:
+    """
+    재표본용 컬럼을 메모리로 읽기
+
+    행 수가 max_rows를 넘으면 청크마다 같은 비율로 추출한 균등 표본을 반환한다
+    (행 수는 1차 스캔으로 센다).
+    """
+    fraction = 1.0
+    if max_rows:
+        rows = sum(len(chunk[columns[0]]) for chunk in read_chunks(source, [columns[0]], chunk_rows))
+        fraction = min(1.0, max_rows / rows) if rows else 1.0
+    rng = np.random.default_rng(seed)
+    parts: Dict[str, List[np.ndarray]] = {c: [] for c in columns}
+    for chunk in read_chunks(source, list(columns), chunk_rows):
+        n = len(chunk[columns[0]])
+        keep = rng.random(n) < fraction if fraction < 1.0 else slice(None)
+        for c in columns:
+            parts[c].append(chunk[c][keep])
+    return {c: np.concatenate(values) if values else np.empty(0) for c, values in parts.items()}
+
+
+class Resampler:
+    """
+    병렬 부트스트랩/순열검정
+
+    사용 예:
+        resampler = Resampler(DATA_CONFIG)
+        h1 = resampler.two_sample(ai, traditional, key="H1")        # 평균 차이
+        h2 = resampler.k_sample([low, medium, high], labels, key="H2")
+        h3 = resampler.paired(before, after, key="H3")                # 평균 감소율 (%)
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, seed: Optional[int] = 42, **overrides):
+        """
+        Args:
+            config: DATA_CONFIG (resampling, confidence_level 사용)
+            seed: 재현용 seed (None이면 매번 다른 결과)
+            overrides: resampling 설정 덮어쓰기 (n_resamples, workers, batch_elements, max_rows)
+        """
+        config = config or {}
+        self.options = {**DEFAULT_RESAMPLING, **config.get("resampling", {}), **overrides}
+        self.confidence = config.get("confidence_level", 0.95)
+        self.seed = seed
+        self.n_resamples = int(self.options["n_resamples"])
+        self.workers = int(self.options["workers"] or os.cpu_count() or 1)
+
+    # -------------------------------------------------------------------------
+    # 실행
+    # -------------------------------------------------------------------------
+
+    def _seeds(self, key: str, kind: str, count: int) -> List[np.random.SeedSequence]:
+        if self.seed is None:
+            return np.random.SeedSequence().spawn(count)
+        return np.random.SeedSequence([self.seed, zlib.crc32(f"{key}:{kind}".encode())]).spawn(count)
+
+    def _run(self, design: str, arrays: Dict[str, np.ndarray], key: str) -> Dict[str, np.ndarray]:
+        """bootstrap/permutation 분포 계산 {kind: (n_resamples, ...) 배열}"""
+        n = max(len(a) for a in arrays.values())
+        size = max(1, min(self.n_resamples, int(self.options["batch_elements"]) // max(n, 1)))
+        sizes = [min(size, self.n_resamples - start) for start in range(0, self.n_resamples, size)]
+        tasks = {
+            kind: [(design, kind, seed, s) for seed, s in zip(self._seeds(key, kind, len(sizes)), sizes)]
+            for kind in ("bootstrap", "permutation")
+        }
+        jobs = tasks["bootstrap"] + tasks["permutation"]
+        workers = min(self.workers, len(jobs))
+
+        if workers <= 1:
+            _ARRAYS.clear()
+            _ARRAYS.update(arrays)
+            try:
+                results = [_run_batch(job) for job in jobs]
+            finally:
+                _ARRAYS.clear()
+        else:
+            results = self._run_pool(arrays, jobs, workers)
+
+        split = len(tasks["bootstrap"])
+        return {
+            "bootstrap": np.concatenate(results[:split]),
+            "permutation": np.concatenate(results[split:]),
+        }
+
+    @staticmethod
+    def _run_pool(arrays: Dict[str, np.ndarray], jobs: list, workers: int) -> List[np.ndarray]:
+        segments = []
+        try:
+            layout = {}
+            for key, array in arrays.items():
+                segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                segments.append(segment)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[:] = array
+                layout[key] = (segment.name, array.shape, array.dtype.str)
+            context = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else None)
+            with ProcessPoolExecutor(workers, mp_context=context, initializer=_attach,
+                                     initargs=(layout, context.get_start_method() != "fork")) as pool:
+                return list(pool.map(_run_batch, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+        finally:
+            for segment in segments:
+                segment.close()
+                segment.unlink()
+
+    def _interval(self, samples: np.ndarray) -> List[float]:
+        """percentile 부트스트랩 신뢰구간"""
+        alpha = 1.0 - self.confidence
+        samples = samples[np.isfinite(samples)]
+        if len(samples) == 0:
+            return [math.nan, math.nan]
+        return [float(v) for v in np.quantile(samples, [alpha / 2, 1 - alpha / 2])]
+
+    def _p_value(self, null: np.ndarray, observed: float, two_sided: bool = True) -> float:
+        """(1 + 관측값 이상으로 극단적인 순열 수) / (1 + 순열 수)"""
+        if two_sided:
+            extreme = np.abs(null) >= abs(observed) - 1e-12
+        else:
+            extreme = null >= observed - 1e-12
+        return float((1 + extreme.sum()) / (1 + len(null)))
+
+    def _result(self, observed: float, boot: np.ndarray, null: np.ndarray, statistic: str,
+                two_sided: bool = True) -> Dict[str, Any]:
+        return {
+            "statistic": statistic,
+            "observed": float(observed),
+            "ci": self._interval(boot),
+            "confidence_level": self.confidence,
+            "p_value": self._p_value(null, observed, two_sided),
+            "n_resamples": self.n_resamples,
+            "seed": self.seed,
+        }
+
+    # -------------------------------------------------------------------------
+    # 검정
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _grouped(groups: Sequence[np.ndarray]) -> Dict[str, np.ndarray]:
+        groups = [np.asarray(g, dtype=np.float64) for g in groups]
+        groups = [g[~np.isnan(g)] for g in groups]
+        return {
+            "values": np.concatenate(groups),
+            "offsets": np.cumsum([0] + [len(g) for g in groups[:-1]]).astype(np.int64),
+        }
+
+    def two_sample(self, a: Iterable[float], b: Iterable[float], key: str = "two_sample") -> Dict[str, Any]:
+        """
+        평균 차이 (a - b): 층화 부트스트랩 신뢰구간, 라벨 순열 p-value (양측)
+        """
+        arrays = self._grouped([np.asarray(a), np.asarray(b)])
+        counts = np.diff(np.append(arrays["offsets"], len(arrays["values"])))
+        if min(counts) < 2:
+            return {"statistic": "mean_difference", "observed": math.nan, "ci": [math.nan, math.nan],
+                    "p_value": 1.0, "n_resamples": 0, "seed": self.seed}
+        observed = arrays["values"][:counts[0]].mean() - arrays["values"][counts[0]:].mean()
+        dist = self._run("groups", arrays, key)
+        boot = dist["bootstrap"][:, 0] - dist["bootstrap"][:, 1]
+        null = dist["permutation"][:, 0] - dist["permutation"][:, 1]
+        return self._result(observed, boot, null, "mean_difference")
+
+    def k_sample(self, groups: Sequence[Iterable[float]], labels: Optional[Sequence[str]] = None,
+                 key: str = "k_sample") -> Dict[str, Any]:
+        """
+        그룹 간 차이: 라벨 순열 F 검정 p-value (단측),
+        관측 평균이 가장 높은 그룹의 가장 낮은 그룹 대비 상승률(%) 부트스트랩 신뢰구간
+        """
+        labels = list(labels or range(len(groups)))
+        arrays = self._grouped([np.asarray(g) for g in groups])
+        values, offsets = arrays["values"], arrays["offsets"]
+        counts = np.diff(np.append(offsets, len(values)))
+        k, n = len(counts), len(values)
+        if k < 2 or min(counts) < 2:
+            return {"statistic": "f_statistic", "observed": math.nan, "ci": [math.nan, math.nan],
+                    "p_value": 1.0, "n_resamples": 0, "seed": self.seed}
+
+        grand = values.mean()
+        sst = float(((values - grand) ** 2).sum())
+
+        def f_statistic(means: np.ndarray) -> np.ndarray:
+            ssb = ((means - grand) ** 2 * counts).sum(axis=-1)
+            return (ssb / (k - 1)) / np.maximum(sst - ssb, 1e-300) * (n - k)
+
+        means = np.add.reduceat(values, offsets) / counts
+        high, low = int(np.argmax(means)), int(np.argmin(means))
+        dist = self._run("groups", arrays, key)
+        boot = 100.0 * (dist["bootstrap"][:, high] - dist["bootstrap"][:, low]) / dist["bootstrap"][:, low]
+
+        result = self._result(f_statistic(means), boot, f_statistic(dist["permutation"]), "f_statistic",
+                              two_sided=False)
+        result.update({
+            "improvement_percent": float(100.0 * (means[high] - means[low]) / means[low]),
+            "improvement_ci": result.pop("ci"),
+            "highest": str(labels[high]),
+            "lowest": str(labels[low]),
+        })
+        return result
+
+    def paired(self, before: Iterable[float], after: Iterable[float], key: str = "paired") -> Dict[str, Any]:
+        """
+        평균 감소율 100·mean(before - after)/mean(before):
+        행 부트스트랩 신뢰구간, 차이 부호 뒤집기 p-value (양측, 평균 차이 기준)
+        """
+        before = np.asarray(before, dtype=np.float64)
+        after = np.asarray(after, dtype=np.float64)
+        valid = ~(np.isnan(before) | np.isnan(after))
+        before, diff = before[valid], before[valid] - after[valid]
+        if len(diff) < 2 or before.mean() == 0:
+            return {"statistic": "percent_reduction", "observed": math.nan, "ci": [math.nan, math.nan],
+                    "p_value": 1.0, "n_resamples": 0, "seed": self.seed}
+
+        dist = self._run("paired", {"before": before, "diff": diff}, key)
+        boot = 100.0 * dist["bootstrap"][:, 1] / dist["bootstrap"][:, 0]
+        result = self._result(diff.mean(), boot, dist["permutation"][:, 0], "percent_reduction")
+        result["observed"] = float(100.0 * diff.mean() / before.mean())
+        result["mean_difference"] = float(diff.mean())
+        return result
@@ -164,6 +164,37 @@ DATA_CONFIG = {
         "medium": 0.5,
         "large": 0.8,
     },
+    "seed": 42,  # 생성 데이터/표본 추출 seed
+    "chunk_rows": 250000,  # 데이터 청크 크기 (행)
+    "preprocessing": {
+        "iqr_factor": 1.5,  # 이상치 경계 Q1 - k·IQR, Q3 + k·IQR
+        "outlier_action": "drop",  # drop (행 제거) / clip (경계값 대체)
+        "test_size": 0.2,  # Train-Test 80-20 분할
+        "format": "npy",  # npy (memmap) / parquet (pyarrow 필요)
+    },
+    "resampling": {
+        "n_resamples": 10000,  # 부트스트랩/순열 반복 수
+        "workers": None,  # 프로세스 수 (None: CPU 수)
+        "batch_elements": 4000000,  # batch당 재표본 원소 수 (메모리 상한)
+        "max_rows": 1000000,  # 재표본에 쓸 최대 행 수 (넘으면 균등 표본)
+    },
+    "figures": {
+        "workers": None,  # 렌더링 프로세스 수 (None: CPU 수)
+        "dpi": 150,
+    },
+}
+
+# =============================================================================
+# 검증 설정
+# =============================================================================
+
+VALIDATION_CONFIG = {
+    "rtol": 1e-6,  # 재실행 결과 비교 상대 허용오차
+    "atol": 1e-9,  # 절대 허용오차
+    "timeout": 600,  # 재실행 제한 시간 (초)
+    "workers": 5,  # 동시에 실행할 검사 수
+    "cache_file": "outputs/validation/.reproduction_cache.json",
+    "cache_entries": 8,  # 보관할 재실행 결과 수
 }
 
 # =============================================================================
@@ -34,6 +34,8 @@ if str(shared_path) not in sys.path:
     sys.path.insert(0, str(shared_path))
 
 from git_auto_commit import GitAutoCommit
+from ledger import get_ledger
+from tracing import get_tracer, span
 
 # 로깅 설정
 def setup_logging():
@@ -125,6 +127,12 @@ class InfiniteLoopWorkflow:
         """
         logger.info(f"Running phase: {phase}")
         
+        get_ledger().set_context(phase=phase)
+        with span(f"phase.{phase}"):
+            return self._dispatch_phase(phase)
+    
+    def _dispatch_phase(self, phase: str) -> dict:
+        """Phase 이름에 해당하는 에이전트 호출"""
         if phase == "init":
             return self.director.initialize_project()
         
@@ -196,6 +204,8 @@ class InfiniteLoopWorkflow:
         while iteration < self.max_iterations:
             iteration += 1
             self.current_iteration = iteration
+            get_tracer().set_iteration(iteration)
+            get_ledger().set_context(iteration=iteration)
             
             logger.info(f"\n{'='*60}")
             logger.info(f"ITERATION {iteration}/{self.max_iterations}")
@@ -250,6 +260,7 @@ class InfiniteLoopWorkflow:
                 logger.info(f"\n{'='*60}")
                 logger.info(f"TARGET ACHIEVED! Final Score: {total_score}")
                 logger.info(f"{'='*60}")
+                self._write_latency_breakdown()
                 return results
             
             # 개선 필요 영역 식별 및 피드백
@@ -264,8 +275,17 @@ class InfiniteLoopWorkflow:
         logger.warning(f"\nMax iterations ({self.max_iterations}) reached!")
         logger.info(f"Best score achieved: {best_score}")
         
+        self._write_latency_breakdown()
         return best_results or results
     
+    def _write_latency_breakdown(self):
+        """iteration별 지연시간 분석 저장 (tracing 활성화 시)"""
+        tracer = get_tracer()
+        if tracer.enabled:
+            tracer.write_breakdown('outputs/latency_breakdown.json')
+            tracer.flush()
+            logger.info("Latency breakdown saved: outputs/latency_breakdown.json")
+    
     def finalize_submission(self, results: dict) -> Path:
         """
         최종 제출물 생성
@@ -6,31 +6,126 @@ ZhipuAI GLM-4.7 모델 연동 클라이언트
 """
 
 import os
+import sys
 import json
 import time
-from typing import Optional, Dict, Any, List
+import hashlib
+import statistics
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import defaultdict
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterator, List
+
+# Add shared module to path
+shared_path = Path(__file__).parent.parent / "shared"
+if str(shared_path) not in sys.path:
+    sys.path.insert(0, str(shared_path))
+
+from ledger import estimate_tokens, get_ledger
+from llm_http import ChatClient
+from tracing import span
+
+from prompt_packer import (
+    CONTEXT_WINDOW, PromptPacker, apply_section_revision, count_tokens,
+    extractive_summary, paper_budget, plan_section_revision
+)
+from summary_cache import PaperSummary, SummaryCache
+from rate_limiter import RateLimiter
+from resilience import (
+    CallTicket, CircuitBreaker, CircuitOpenError, LatencyHistogram, StreamInterruptedError,
+    hedged_call, iter_with_timeout
+)
+from routing import ModelRouter
+from prompts import evaluation_values, registry
+from json_extract import (
+    extract_json_stream, merge_evaluation, reask_prompt, schema_from_rubric,
+    validate_evaluation
+)
 
 
 class GLM4Client:
     """GLM-4.7 API 클라이언트"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    # self-consistency 평가 temperature (n_samples가 더 크면 반복 사용)
+    EVALUATION_TEMPERATURES = [0.3, 0.7, 1.0]
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        evaluation_paper_tokens: int = 12000,
+        context_window: int = CONTEXT_WINDOW,
+        summary_cache_path: Optional[str] = None,
+        requests_per_minute: Optional[float] = 60,
+        max_concurrent: int = 4,
+        base_url: Optional[str] = None,
+        fallback_models: Optional[List[str]] = None,
+        hedge: bool = True,
+        router: Optional[ModelRouter] = None,
+        stream_idle_timeout: float = 30.0
+    ):
         """
         Args:
             api_key: ZhipuAI API 키 (없으면 환경변수 GLM4_API_KEY 사용)
+            evaluation_paper_tokens: 평가 프롬프트에 넣을 논문 최대 토큰 수
+            context_window: 모델 컨텍스트 윈도우 (토큰)
+            summary_cache_path: 섹션 요약 캐시 (기본: 환경변수 GLM4_SUMMARY_CACHE
+                또는 .cache/summary_cache.db)
+            requests_per_minute: 분당 최대 API 요청 수 (None이면 제한 없음)
+            max_concurrent: 동시 API 요청 수 (배치 평가 worker 수)
+            base_url: OpenAI 호환 API 주소 (기본: 환경변수 GLM4_BASE_URL,
+                예: shared/mock_llm_server.py의 http://127.0.0.1:8765/v1)
+            fallback_models: circuit이 열렸을 때 대신 호출할 모델 (기본: glm-4-flash)
+            hedge: 응답이 p95보다 늦으면 같은 요청을 한 번 더 보냄
+            router: 작업(route)별 모델 선택 (기본: routing.ROUTES)
+            stream_idle_timeout: 스트리밍 조각 사이 최대 대기 시간 (초, 첫 조각은 적응형)
         """
         self.api_key = api_key or os.getenv("GLM4_API_KEY")
         if not self.api_key:
             raise ValueError("API 키가 필요합니다. GLM4_API_KEY 환경변수를 설정하세요.")
         
+        self.base_url = base_url or os.getenv("GLM4_BASE_URL")
+        
         try:
             from zhipuai import ZhipuAI
-            self.client = ZhipuAI(api_key=self.api_key)
+            if self.base_url:
+                self.client = ZhipuAI(api_key=self.api_key, base_url=self.base_url)
+            else:
+                self.client = ZhipuAI(api_key=self.api_key)
         except ImportError:
-            print("경고: zhipuai 패키지가 설치되지 않았습니다. pip install zhipuai")
-            self.client = None
+            if self.base_url:
+                # SDK 없이 OpenAI 호환 HTTP로 호출 (로컬 mock 서버 등)
+                self.client = ChatClient(self.base_url, self.api_key)
+            else:
+                print("경고: zhipuai 패키지가 설치되지 않았습니다. pip install zhipuai")
+                self.client = None
+        
+        self.model = "glm-4.7"  # route가 없는 호출의 기본 모델
+        
+        # 작업별 모델 cascade (요약/1차 심사는 glm-4-flash, 불확실하면 glm-4.7)
+        self.router = router or ModelRouter(default_model=self.model)
+        
+        # 토큰 예산 기반 프롬프트 구성
+        self.context_window = context_window
+        self.evaluation_paper_tokens = evaluation_paper_tokens
+        
+        # 섹션 요약은 내용 hash로 캐시되어 바뀐 부분만 다시 요약됨
+        self.summary_cache = SummaryCache(
+            summary_cache_path or os.getenv("GLM4_SUMMARY_CACHE", ".cache/summary_cache.db"),
+            summarizer=self.summarize_text if self.client else extractive_summary
+        )
+        self.packer = PromptPacker(summarizer=self.summary_cache.summarize)
         
-        self.model = "glm-4.7"  # 또는 "glm-4-flash", "glm-4-plus" 등
+        # 모든 API 호출이 공유하는 속도 제한 (배치 평가의 병렬 호출 포함)
+        self.rate_limiter = RateLimiter(requests_per_minute, max_concurrent)
+        
+        # 꼬리 지연 제어: 모델별 circuit breaker, (모델, 응답 길이)별 지연 분포
+        self.fallback_models = ["glm-4-flash"] if fallback_models is None else fallback_models
+        self.hedge = hedge
+        self.breakers: Dict[str, CircuitBreaker] = defaultdict(CircuitBreaker)
+        self.latencies: Dict[tuple, LatencyHistogram] = defaultdict(LatencyHistogram)
+        self.stream_idle_timeout = stream_idle_timeout
+        self._executor = ThreadPoolExecutor(max_workers=2 * max_concurrent + 2,
+                                            thread_name_prefix="glm4-call")
     
     def generate(
         self,
@@ -39,7 +134,9 @@ class GLM4Client:
         max_tokens: int = 4096,
         top_p: float = 0.7,
         system_prompt: Optional[str] = None,
-        retry_count: int = 3
+        retry_count: int = 3,
+        route: Optional[str] = None,
+        model: Optional[str] = None
     ) -> str:
         """
         텍스트 생성
@@ -51,6 +148,8 @@ class GLM4Client:
             top_p: nucleus sampling
             system_prompt: 시스템 프롬프트
             retry_count: 재시도 횟수
+            route: 작업 이름 (routing.ROUTES, 모델 선택과 지표 집계에 사용)
+            model: 모델 직접 지정 (route의 모델보다 우선)
             
         Returns:
             생성된 텍스트
@@ -63,31 +162,156 @@ class GLM4Client:
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": prompt})
         
-        for attempt in range(retry_count):
-            try:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    top_p=top_p
-                )
-                return response.choices[0].message.content
+        # 선택된 모델의 circuit이 열려 있으면 fallback 모델로 전환
+        primary = model or self.router.model(route)
+        last_error: Optional[Exception] = None
+        
+        with span("llm.generate", model=primary, route=route or "default", temperature=temperature) as s:
+            for model in self._candidates(primary):
+                breaker = self.breakers[model]
+                histogram = self.latencies[(model, self._size_bucket(max_tokens))]
+                
+                for attempt in range(retry_count):
+                    if not breaker.allow():
+                        last_error = CircuitOpenError(f"{model} circuit open")
+                        break
+                    
+                    timeout = histogram.timeout()
+                    try:
+                        (response, latency), hedged = hedged_call(
+                            self._executor,
+                            lambda ticket: self._create(ticket, model, messages, temperature, max_tokens, top_p),
+                            histogram.hedge_delay() if self.hedge else None,
+                            timeout
+                        )
+                    except Exception as e:
+                        breaker.record_failure()
+                        if isinstance(e, TimeoutError):
+                            # timeout도 지연 분포에 넣어야 p95/timeout이 느려진 endpoint를 따라감
+                            histogram.record(timeout)
+                        last_error = e
+                        print(f"API 호출 실패 ({model}, 시도 {attempt + 1}/{retry_count}): {e}")
+                        if attempt < retry_count - 1 and breaker.state == CircuitBreaker.CLOSED:
+                            # 429 응답의 Retry-After가 있으면 따르고, 없으면 지수 백오프
+                            time.sleep(getattr(e, 'retry_after', None) or 2 ** attempt)
+                        continue
+                    
+                    breaker.record_success()
+                    histogram.record(latency)
+                    
+                    content = response.choices[0].message.content
+                    usage = getattr(response, "usage", None)
+                    tokens_in = getattr(usage, "prompt_tokens", None)
+                    tokens_out = getattr(usage, "completion_tokens", None)
+                    if tokens_out is None:
+                        tokens_out = estimate_tokens(content or "")
+                    
+                    cost = get_ledger().record(
+                        model,
+                        (system_prompt or "") + prompt,
+                        tokens_in=tokens_in,
+                        tokens_out=tokens_out,
+                        latency_ms=latency * 1000
+                    )
+                    s.set(model=model, tokens_in=tokens_in or 0, tokens_out=tokens_out,
+                          cost_usd=cost, attempts=attempt + 1, hedged=hedged,
+                          fallback=model != primary)
+                    self.router.record(route, model, latency * 1000,
+                                       (tokens_in or 0) + tokens_out, cost)
+                    return content
+        
+        raise last_error or RuntimeError("호출 가능한 모델이 없습니다")
+    
+    def _candidates(self, primary: str) -> List[str]:
+        """호출 순서: 선택된 모델, fallback 모델, 기본 모델"""
+        candidates = [primary]
+        for model in self.fallback_models + [self.model]:
+            if model not in candidates:
+                candidates.append(model)
+        return candidates
+    
+    def _create(self, ticket: CallTicket, model: str, messages: list, temperature: float,
+                max_tokens: int, top_p: float):
+        """
+        API 호출 1회 (rate limiter 적용)
+        
+        슬롯을 받은 뒤 ticket.start()를 호출하므로 대기 시간은 hedge/timeout에 들어가지 않고,
+        hedged_call이 호출을 버리면 슬롯이 바로 반납된다.
+        
+        Returns:
+            (응답, 슬롯을 받은 뒤 걸린 시간 (초))
+        """
+        with self.rate_limiter.lease() as lease:
+            ticket.start(lease)
+            started = time.perf_counter()
+            response = self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                top_p=top_p
+            )
+            return response, time.perf_counter() - started
+    
+    @staticmethod
+    def _size_bucket(max_tokens: int) -> str:
+        """지연 분포 구분용 응답 길이 구간 (짧은 심사와 긴 논문 개선은 지연이 다름)"""
+        if max_tokens <= 1024:
+            return "short"
+        if max_tokens <= 4096:
+            return "medium"
+        return "long"
+    
+    def resilience_stats(self) -> Dict[str, Any]:
+        """모델별 circuit 상태와 지연 분포 (p50/p95/timeout)"""
+        return {
+            'breakers': {model: b.stats() for model, b in self.breakers.items()},
+            'latency': {
+                f"{model}/{bucket}": {
+                    'samples': len(h.samples),
+                    'p50_s': h.percentile(50),
+                    'p95_s': h.hedge_delay(),
+                    'timeout_s': round(h.timeout(), 3),
+                }
+                for (model, bucket), h in self.latencies.items()
+            },
+        }
+    
+    def summarize_text(self, text: str, max_tokens: int = 120) -> str:
+        """
+        텍스트 요약 (요약 캐시에서 캐시 miss일 때만 호출됨)
+        
+        Args:
+            text: 요약할 텍스트
+            max_tokens: 최대 토큰 수
             
-            except Exception as e:
-                print(f"API 호출 실패 (시도 {attempt + 1}/{retry_count}): {e}")
-                if attempt < retry_count - 1:
-                    time.sleep(2 ** attempt)  # 지수 백오프
-                else:
-                    raise
+        Returns:
+            요약
+        """
+        prompt = f"""
+다음 연구보고서 일부를 {max_tokens} 토큰 이내의 영문으로 요약하세요.
+수치, 방법, 주장은 빠뜨리지 말고 요약만 출력하세요.
+
+{text}
+"""
+        return self.generate(prompt, temperature=0.2, max_tokens=max_tokens, route="summary").strip()
+    
+    def summarize_paper(self, paper: str) -> PaperSummary:
+        """
+        논문 요약 트리 (섹션별 요약 + 전체 요약)
         
-        return ""
+        이전 iteration에서 바뀌지 않은 섹션은 캐시된 요약을 재사용
+        """
+        return self.summary_cache.build(paper)
     
     def generate_json(
         self,
         prompt: str,
         temperature: float = 0.7,
-        max_tokens: int = 4096
+        max_tokens: int = 4096,
+        system_prompt: Optional[str] = None,
+        route: Optional[str] = None,
+        model: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         JSON 형식으로 응답받기
@@ -96,6 +320,9 @@ class GLM4Client:
             prompt: 사용자 프롬프트
             temperature: 창의성
             max_tokens: 최대 토큰 수
+            system_prompt: 시스템 프롬프트
+            route: 작업 이름 (모델 선택)
+            model: 모델 직접 지정
             
         Returns:
             파싱된 JSON 객체
@@ -107,118 +334,249 @@ class GLM4Client:
 중요: 반드시 유효한 JSON 형식으로만 응답하세요. 추가 설명 없이 JSON만 출력하세요.
 """
         
-        response = self.generate(json_prompt, temperature, max_tokens)
-        
-        # JSON 추출
+        # 스트리밍으로 받으면서 추출 (객체가 닫히면 나머지는 받지 않음), 깨진 JSON은 복구
         try:
-            # 코드 블록 제거
-            if "```json" in response:
-                response = response.split("```json")[1].split("```")[0]
-            elif "```" in response:
-                response = response.split("```")[1].split("```")[0]
-            
-            return json.loads(response.strip())
+            result, repaired, raw = extract_json_stream(
+                self.generate_stream(json_prompt, temperature, max_tokens, system_prompt=system_prompt,
+                                     route=route, model=model)
+            )
+        except StreamInterruptedError as e:
+            # 받은 조각은 버리고 hedge/timeout/재시도가 있는 일반 호출로 다시 요청
+            print(f"스트리밍 중단, 일반 호출로 재요청: {e}")
+            result, repaired, raw = extract_json_stream([
+                self.generate(json_prompt, temperature, max_tokens, system_prompt=system_prompt,
+                              route=route, model=model)
+            ])
+        
+        if result is None:
+            print("JSON 파싱 실패")
+            print(f"원본 응답: {raw[:500]}...")
+            return {"error": "JSON parsing failed", "raw": raw}
+        
+        if repaired:
+            print("JSON 복구 적용")
+        return result
+    
+    def generate_stream(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 4096,
+        top_p: float = 0.7,
+        system_prompt: Optional[str] = None,
+        route: Optional[str] = None,
+        model: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        스트리밍 텍스트 생성 (조각 단위로 반환)
+        
+        스트리밍을 시작하지 못하거나 첫 조각이 timeout 안에 오지 않으면 일반 generate()로 대체
+        (hedge/재시도 포함). 첫 조각 timeout은 모델별 첫 조각 지연 분포로 정하고, 조각 사이는
+        stream_idle_timeout으로 제한한다. 조각을 내보낸 뒤 끊기면 StreamInterruptedError.
+        circuit이 열린 모델은 건너뜀
+        
+        Raises:
+            StreamInterruptedError: 조각을 내보낸 뒤 스트림 실패/timeout
+        """
+        if not self.client:
+            yield self.generate(prompt, temperature, max_tokens, top_p, system_prompt, route=route, model=model)
+            return
         
-        except json.JSONDecodeError as e:
-            print(f"JSON 파싱 실패: {e}")
-            print(f"원본 응답: {response[:500]}...")
-            return {"error": "JSON parsing failed", "raw": response}
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        
+        primary = model or self.router.model(route)
+        model = next((m for m in self._candidates(primary) if self.breakers[m].allow()), None)
+        if model is None:
+            yield self.generate(prompt, temperature, max_tokens, top_p, system_prompt, route=route, model=primary)
+            return
+        
+        with span("llm.generate", model=model, route=route or "default",
+                  temperature=temperature, stream=True) as s:
+            started = time.perf_counter()
+            # 동시 실행 슬롯은 스트림을 다 읽거나 닫을 때까지 유지
+            lease = self.rate_limiter.lease()
+            try:
+                response = self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    top_p=top_p,
+                    stream=True
+                )
+            except Exception as e:
+                lease.release()
+                self.breakers[model].record_failure()
+                print(f"스트리밍 호출 실패, 일반 호출로 재시도: {e}")
+                s.set(error=type(e).__name__)
+                yield self.generate(prompt, temperature, max_tokens, top_p, system_prompt,
+                                    route=route, model=primary)
+                return
+            
+            first_token = self.latencies[(model, "first_token")]
+            first_timeout = first_token.timeout()
+            received = []
+            try:
+                try:
+                    for chunk in iter_with_timeout(response, first_timeout, self.stream_idle_timeout):
+                        if not received:
+                            first_token.record(time.perf_counter() - started)
+                        delta = chunk.choices[0].delta.content or ""
+                        received.append(delta)
+                        yield delta
+                except Exception as e:
+                    self.breakers[model].record_failure()
+                    s.set(error=type(e).__name__)
+                    if received:
+                        raise StreamInterruptedError(f"{model} 스트림 중단: {e}") from e
+                    if isinstance(e, TimeoutError):
+                        first_token.record(first_timeout)
+                    # 응답 없는 스트림은 닫고 슬롯을 반납한 뒤 대체 (기록은 generate()가 함)
+                    self._close_stream(response)
+                    lease.release()
+                    print(f"스트리밍 응답 없음, 일반 호출로 재시도: {e}")
+                    yield self.generate(prompt, temperature, max_tokens, top_p, system_prompt,
+                                        route=route, model=primary)
+                    return
+                self.breakers[model].record_success()
+            finally:
+                self._close_stream(response)
+                lease.release()
+                # 중간에 읽기를 멈춰도 받은 만큼 기록
+                if received:
+                    tokens_in = estimate_tokens((system_prompt or "") + prompt)
+                    tokens_out = estimate_tokens("".join(received))
+                    latency_ms = (time.perf_counter() - started) * 1000
+                    cost = get_ledger().record(
+                        model,
+                        (system_prompt or "") + prompt,
+                        tokens_in=tokens_in,
+                        tokens_out=tokens_out,
+                        latency_ms=latency_ms
+                    )
+                    s.set(tokens_in=tokens_in, tokens_out=tokens_out, cost_usd=cost)
+                    self.router.record(route, model, latency_ms, tokens_in + tokens_out, cost)
+    
+    @staticmethod
+    def _close_stream(response) -> None:
+        """스트리밍 응답 연결 닫기 (close()가 없거나 이미 닫혔으면 무시)"""
+        close = getattr(response, 'close', None)
+        if close is not None:
+            try:
+                close()
+            except Exception:
+                pass
     
     def evaluate_paper(
         self,
         paper: str,
         rubric: Dict[str, Any],
-        temperature: float = 0.5
+        temperature: float = 0.5,
+        criteria: Optional[List[str]] = None,
+        system_prompt: Optional[str] = None,
+        model: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         논문 평가 (심사 기준 기반)
         
+        논문은 토큰 예산 안에서 심사 기준별로 관련 섹션을 우선해 구성됨
+        
         Args:
             paper: 논문 내용
             rubric: 심사 기준
             temperature: 평가 일관성을 위해 낮은 값 권장
+            criteria: 예산 배분 대상 심사 기준 (기본: 전체)
+            system_prompt: 미리 만든 평가 system 프롬프트 (배치 평가에서 공유)
+            model: 심사 모델 (기본: "evaluation" route의 1차 모델)
             
         Returns:
             평가 결과
         """
-        prompt = f"""
-당신은 2026 AI Co-Scientist Challenge Korea의 전문 심사위원입니다.
-다음 연구보고서를 심사 기준에 따라 객관적으로 평가하세요.
-
-=== 연구보고서 ===
-{paper[:5000]}...
-
-=== 심사 기준 ===
-1. 주제의 실용성 (20점): {rubric.get('practicality', {}).get('description', '')}
-2. 방법론의 적절성 (20점): {rubric.get('methodology', {}).get('description', '')}
-3. 데이터의 적절성 (25점): {rubric.get('data_quality', {}).get('description', '')}
-4. 결론의 합리성 (10점): {rubric.get('conclusion', {}).get('description', '')}
-5. 전달력 및 가독성 (5점): {rubric.get('readability', {}).get('description', '')}
-6. 연구의 창의성 (20점): {rubric.get('creativity', {}).get('description', '')}
-7. AI 연구기여도 (Pass/Fail): AI가 충분히 기여했는가
-
-=== 응답 형식 ===
-반드시 다음 JSON 형식으로만 응답하세요:
-
-{{
-    "practicality": {{
-        "score": 0-20,
-        "reason": "점수를 준 이유",
-        "improvement": "개선 방안"
-    }},
-    "methodology": {{
-        "score": 0-20,
-        "reason": "점수를 준 이유",
-        "improvement": "개선 방안"
-    }},
-    "data_quality": {{
-        "score": 0-25,
-        "reason": "점수를 준 이유",
-        "improvement": "개선 방안"
-    }},
-    "conclusion": {{
-        "score": 0-10,
-        "reason": "점수를 준 이유",
-        "improvement": "개선 방안"
-    }},
-    "readability": {{
-        "score": 0-5,
-        "reason": "점수를 준 이유",
-        "improvement": "개선 방안"
-    }},
-    "creativity": {{
-        "score": 0-20,
-        "reason": "점수를 준 이유",
-        "improvement": "개선 방안"
-    }},
-    "ai_contribution": {{
-        "pass": true/false,
-        "reason": "PASS/FAIL 이유"
-    }},
-    "total_score": 0-100,
-    "summary": "전체 평가 요약"
-}}
-"""
+        # 심사 기준과 응답 형식은 system 프롬프트에 고정, 논문은 user 프롬프트 마지막에
+        template = registry.get("evaluation")
+        system_prompt = system_prompt or self._evaluation_system(rubric)
+        overhead = system_prompt + template.user(paper="", note="")
+        budget = paper_budget(overhead, 4096, self.context_window, self.evaluation_paper_tokens)
+        packed = self.packer.pack(paper, budget, criteria)
+        prompt = self._evaluation_prompt(packed.text, rubric, packed)
+        
+        # 스키마 검증 후 빠진 항목만 다시 질문 (전체 재평가 대신)
+        schema = schema_from_rubric(rubric)
+        model = model or self.router.model("evaluation")
+        result, missing = validate_evaluation(
+            self.generate_json(prompt, temperature, system_prompt=system_prompt,
+                               route="evaluation", model=model), schema
+        )
+        if missing:
+            print(f"누락 항목 재질문: {missing}")
+            partial = {k: v for k, v in result.items() if k in schema}
+            patch = self.generate_json(
+                prompt + reask_prompt(missing, schema, partial),
+                temperature,
+                max_tokens=150 * len(missing) + 100,
+                system_prompt=system_prompt,
+                route="evaluation",
+                model=model
+            )
+            result, missing = validate_evaluation(merge_evaluation(result, patch), schema)
         
-        return self.generate_json(prompt, temperature)
+        result['valid'] = not missing
+        result['missing'] = missing
+        result['prompt_version'] = template.version
+        result['model'] = model
+        return result
+    
+    def _evaluation_system(self, rubric: Dict[str, Any]) -> str:
+        """평가 system 프롬프트 (같은 심사 기준이면 바이트 단위로 동일)"""
+        return registry.get("evaluation").system(**evaluation_values(rubric))
+    
+    def _evaluation_prompt(self, paper: str, rubric: Dict[str, Any], packed=None) -> str:
+        """평가 user 프롬프트 (논문)"""
+        note = ""
+        if packed is not None and (packed.summarized or packed.truncated):
+            note = "(토큰 예산으로 일부 섹션은 [요약] 또는 [...]로 압축되었습니다)"
+        
+        return registry.get("evaluation").user(paper=paper, note=note)
     
     def improve_paper(
         self,
         paper: str,
         weaknesses: List[Dict[str, Any]],
-        temperature: float = 0.8
+        temperature: float = 0.8,
+        max_tokens: int = 8000
     ) -> str:
         """
         논문 개선
         
+        논문이 응답 길이 또는 컨텍스트 윈도우를 넘으면 약점과 관련된
+        섹션만 다시 쓰게 하고 (나머지 섹션은 요약으로 전달) 원문에 반영
+        
         Args:
             paper: 현재 논문
             weaknesses: 약점 목록
             temperature: 창의성
+            max_tokens: 최대 응답 토큰 수
             
         Returns:
             개선된 논문
         """
+        paper_tokens = count_tokens(paper)
+        if paper_tokens > max_tokens * 0.9 or paper_tokens > paper_budget(
+            json.dumps(weaknesses, ensure_ascii=False), max_tokens, self.context_window
+        ):
+            criteria = [w['criterion'] for w in weaknesses if w.get('criterion')]
+            context, targets = plan_section_revision(
+                paper, criteria, int(max_tokens * 0.8), self.packer
+            )
+            # 제목이 없는 논문은 섹션 단위로 나눌 수 없으므로 전체 개선
+            if targets:
+                return self._improve_sections(
+                    paper, context, targets, weaknesses, temperature, max_tokens
+                )
+        
         prompt = f"""
 다음 연구보고서의 약점을 개선하세요.
 
@@ -237,7 +595,39 @@ class GLM4Client:
 개선된 논문 전체를 작성하세요.
 """
         
-        return self.generate(prompt, temperature, max_tokens=8000)
+        return self.generate(prompt, temperature, max_tokens=max_tokens, route="improve")
+    
+    def _improve_sections(
+        self,
+        paper: str,
+        context: str,
+        targets: List[str],
+        weaknesses: List[Dict[str, Any]],
+        temperature: float,
+        max_tokens: int
+    ) -> str:
+        """약점과 관련된 섹션만 수정 후 원문에 반영"""
+        prompt = f"""
+다음 연구보고서의 약점을 개선하세요.
+
+=== 현재 논문 ([요약] 표시 섹션은 요약본) ===
+{context}
+
+=== 개선이 필요한 부분 ===
+{json.dumps(weaknesses, ensure_ascii=False, indent=2)}
+
+=== 수정할 섹션 ===
+{json.dumps(targets, ensure_ascii=False)}
+
+=== 지시사항 ===
+1. 위 약점들을 해결하세요
+2. 수정할 섹션만 원래 제목 줄(#, ## 포함)을 그대로 유지하여 전체를 다시 작성하세요
+3. 다른 섹션은 출력하지 마세요
+4. 영문으로, 학술 논문 형식을 유지하세요
+"""
+        
+        response = self.generate(prompt, temperature, max_tokens=max_tokens, route="improve")
+        return apply_section_revision(paper, response, targets)
     
     def self_consistency_evaluate(
         self,
@@ -248,6 +638,9 @@ class GLM4Client:
         """
         Self-consistency 평가 (n번 평가 후 중앙값 선택)
         
+        1차 심사는 빠른 모델로 하고, 결과가 불확실하면 (JSON 오류, 누락 항목,
+        점수 편차) 큰 모델로 다시 n번 평가
+        
         Args:
             paper: 논문 내용
             rubric: 심사 기준
@@ -256,53 +649,174 @@ class GLM4Client:
         Returns:
             집계된 평가 결과
         """
-        import statistics
+        # 다양한 temperature로 평가 (n이 더 크면 순환)
+        temperatures = [
+            self.EVALUATION_TEMPERATURES[i % len(self.EVALUATION_TEMPERATURES)]
+            for i in range(max(1, n))
+        ]
         
-        temperatures = [0.3, 0.7, 1.0][:n]  # 다양한 temperature로 평가
+        schema = schema_from_rubric(rubric)
+        system_prompt = self._evaluation_system(rubric)
         
-        evaluations = []
-        for i, temp in enumerate(temperatures):
-            print(f"  평가 {i+1}/{n} (temp={temp})...")
-            result = self.evaluate_paper(paper, rubric, temp)
-            evaluations.append(result)
+        def judge(model: str) -> List[Dict[str, Any]]:
+            evaluations = []
+            for i, temp in enumerate(temperatures):
+                print(f"  평가 {i+1}/{n} (temp={temp}, {model})...")
+                evaluations.append(
+                    self.evaluate_paper(paper, rubric, temp, system_prompt=system_prompt, model=model)
+                )
+            return evaluations
         
-        # 중앙값 집계
-        def median(values):
-            try:
-                return statistics.median(values)
-            except:
-                return sum(values) / len(values)
+        model = self.router.model("evaluation")
+        evaluations = judge(model)
+        reason = self.router.should_escalate(evaluations, schema)
+        escalate_to = self.router.escalation("evaluation")
+        if reason and escalate_to:
+            print(f"  1차 심사 불확실 ({reason}) → {escalate_to}로 재심사")
+            self.router.record_escalation("evaluation")
+            model = escalate_to
+            evaluations = judge(model)
+        
+        aggregated = self._aggregate(evaluations, schema)
+        aggregated['model'] = model
+        aggregated['escalation'] = reason if model == escalate_to else None
+        return aggregated
+    
+    def _aggregate(self, evaluations: List[Dict[str, Any]], schema: Dict[str, float]) -> Dict[str, Any]:
+        """
+        평가 결과 중앙값 집계
         
+        항목별로 점수가 있는 평가만 사용하고, 이유는 중앙값에 가장 가까운 평가에서 가져옴
+        """
         aggregated = {}
         
-        for criterion in ['practicality', 'methodology', 'data_quality', 
-                         'conclusion', 'readability', 'creativity']:
-            scores = [e.get(criterion, {}).get('score', 0) for e in evaluations 
-                     if isinstance(e.get(criterion, {}).get('score'), (int, float))]
+        for criterion in schema:
+            valid = [e[criterion] for e in evaluations
+                     if isinstance(e.get(criterion), dict)
+                     and isinstance(e[criterion].get('score'), (int, float))]
             
-            if scores:
+            if valid:
+                score = statistics.median(v['score'] for v in valid)
+                closest = min(valid, key=lambda v: abs(v['score'] - score))
                 aggregated[criterion] = {
-                    'score': median(scores),
-                    'reason': evaluations[1].get(criterion, {}).get('reason', ''),  # 중간값 사용
-                    'improvement': evaluations[1].get(criterion, {}).get('improvement', '')
+                    'score': score,
+                    'reason': closest.get('reason', ''),
+                    'improvement': closest.get('improvement', '')
                 }
         
-        # AI 기여도는 모두 PASS여야 PASS
-        ai_passes = [e.get('ai_contribution', {}).get('pass', False) for e in evaluations]
+        # AI 기여도는 모두 PASS여야 PASS (판정이 없는 평가는 제외)
+        ai_votes = [e['ai_contribution'] for e in evaluations if 'ai_contribution' in e]
         aggregated['ai_contribution'] = {
-            'pass': all(ai_passes),
-            'reason': evaluations[1].get('ai_contribution', {}).get('reason', '')
+            'pass': bool(ai_votes) and all(v['pass'] for v in ai_votes),
+            'reason': ai_votes[len(ai_votes) // 2].get('reason', '') if ai_votes else ''
         }
         
         # 총점
-        total = sum([
-            aggregated.get(c, {}).get('score', 0) 
-            for c in ['practicality', 'methodology', 'data_quality', 
-                     'conclusion', 'readability', 'creativity']
-        ])
-        aggregated['total_score'] = total
+        aggregated['total_score'] = sum(aggregated.get(c, {}).get('score', 0) for c in schema)
         
         return aggregated
+    
+    def evaluate_many(
+        self,
+        papers,
+        rubric: Dict[str, Any],
+        n_samples: int = 3,
+        criteria: Optional[List[str]] = None,
+        max_workers: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        여러 논문(변형, ablation 후보 등) 일괄 평가
+        
+        - 내용이 같은 논문은 한 번만 평가
+        - 평가 system 프롬프트는 한 번만 만들어 모든 호출이 같은 접두부를 사용
+        - 호출은 worker 풀에서 병렬 실행되며 rate_limiter 제한을 따름
+        - 1차 심사는 빠른 모델, 결과가 불확실한 논문만 큰 모델로 재심사
+        
+        Args:
+            papers: 논문 목록 또는 {이름: 논문} dict
+            rubric: 심사 기준
+            n_samples: 논문당 평가 횟수 (self-consistency)
+            criteria: 예산 배분 대상 심사 기준 (기본: 전체)
+            max_workers: 병렬 worker 수 (기본: rate_limiter.max_concurrent)
+            
+        Returns:
+            {
+                'papers': 논문 이름 목록,
+                'criteria': 심사 기준 목록,
+                'scores': {기준: [논문별 점수]},   # criteria × papers 행렬
+                'total_score': [논문별 총점],
+                'ai_contribution': [논문별 PASS 여부],
+                'results': [논문별 집계 결과],
+                'unique': 실제 평가한 논문 수,
+                'calls': 평가 호출 수,
+                'escalated': 큰 모델로 재심사한 논문 수
+            }
+        """
+        if isinstance(papers, dict):
+            names = list(papers.keys())
+            texts = list(papers.values())
+        else:
+            texts = list(papers)
+            names = [f"paper_{i}" for i in range(len(texts))]
+        
+        # 중복 제거 (내용 hash)
+        keys = [hashlib.sha256(text.encode('utf-8')).hexdigest() for text in texts]
+        unique = dict(zip(keys, texts))
+        
+        schema = schema_from_rubric(rubric)
+        system_prompt = self._evaluation_system(rubric)
+        temperatures = [
+            self.EVALUATION_TEMPERATURES[i % len(self.EVALUATION_TEMPERATURES)]
+            for i in range(max(1, n_samples))
+        ]
+        
+        def judge(pool, keys: List[str], model: str) -> Dict[str, List]:
+            samples: Dict[str, List] = {key: [None] * len(temperatures) for key in keys}
+            futures = {
+                pool.submit(self.evaluate_paper, unique[key], rubric, temp, criteria, system_prompt, model): (key, i)
+                for key in keys for i, temp in enumerate(temperatures)
+            }
+            for future in as_completed(futures):
+                key, i = futures[future]
+                try:
+                    samples[key][i] = future.result()
+                except Exception as e:
+                    print(f"평가 실패 ({key[:8]}, sample {i}): {e}")
+                    samples[key][i] = {'valid': False, 'error': str(e)}
+            return samples
+        
+        escalate_to = self.router.escalation("evaluation")
+        with span("llm.evaluate_many", papers=len(texts), unique=len(unique)) as s:
+            with ThreadPoolExecutor(max_workers=max_workers or self.rate_limiter.max_concurrent) as pool:
+                samples = judge(pool, list(unique), self.router.model("evaluation"))
+                uncertain = [key for key in unique if self.router.should_escalate(samples[key], schema)]
+                if uncertain and escalate_to:
+                    print(f"1차 심사 불확실 {len(uncertain)}/{len(unique)}개 → {escalate_to}로 재심사")
+                    for _ in uncertain:
+                        self.router.record_escalation("evaluation")
+                    samples.update(judge(pool, uncertain, escalate_to))
+                else:
+                    uncertain = []
+            calls = (len(unique) + len(uncertain)) * len(temperatures)
+            s.set(calls=calls, escalated=len(uncertain))
+        
+        aggregated = {key: self._aggregate(evaluations, schema) for key, evaluations in samples.items()}
+        results = [aggregated[key] for key in keys]
+        
+        return {
+            'papers': names,
+            'criteria': list(schema),
+            'scores': {
+                criterion: [r.get(criterion, {}).get('score') for r in results]
+                for criterion in schema
+            },
+            'total_score': [r['total_score'] for r in results],
+            'ai_contribution': [r['ai_contribution']['pass'] for r in results],
+            'results': results,
+            'unique': len(unique),
+            'calls': calls,
+            'escalated': len(uncertain)
+        }
 
 
 # 전역 클라이언트 인스턴스
@@ -342,3 +856,12 @@ def glm4_evaluate(paper: str, rubric: Dict[str, Any]) -> Dict[str, Any]:
         return client.self_consistency_evaluate(paper, rubric)
     except:
         return {"error": "API not available", "total_score": 0}
+
+
+def glm4_evaluate_many(papers, rubric: Dict[str, Any], n_samples: int = 3) -> Dict[str, Any]:
+    """간편한 일괄 평가 함수 (criteria × papers 점수 행렬)"""
+    try:
+        client = get_glm4_client()
+        return client.evaluate_many(papers, rubric, n_samples)
+    except:
+        return {"error": "API not available", "scores": {}}
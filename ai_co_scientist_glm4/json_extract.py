@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+JSON Extract
+
+심사 응답에서 JSON을 견고하게 추출
+- 스트리밍 응답을 받는 즉시 처리하는 증분 추출기 (객체가 닫히면 바로 완료)
+- 흔한 오류 복구: 코드 블록, 끝 쉼표, 잘린 객체, "0-20" 같은 범위 값, Python 리터럴
+- 심사 기준 스키마 검증 및 누락 필드 목록
+- 누락 필드만 다시 묻는 짧은 프롬프트
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+# 심사 기준별 최대 점수 (기본 스키마)
+EVALUATION_SCHEMA = {
+    'practicality': 20,
+    'methodology': 20,
+    'data_quality': 25,
+    'conclusion': 10,
+    'readability': 5,
+    'creativity': 20,
+}
+
+_CLOSERS = {'{': '}', '[': ']'}
+# 여는 괄호 다음 (공백 제외) 첫 글자로 올 수 있는 문자
+_VALUE_STARTS = {'{': '"}', '[': '{["-0123456789tfn]'}
+
+
+class JsonStreamExtractor:
+    """
+    증분 JSON 추출기
+
+    응답 조각을 feed()로 넣으면 첫 번째 최상위 객체가 닫히는 순간
+    complete가 True가 된다. 그 뒤의 설명 텍스트는 더 받을 필요가 없다.
+    여는 괄호 다음 글자가 JSON 값의 시작이 아니면 (예: "[GLM-4-FLASH OUTPUT ...]")
+    그 괄호는 건너뛰고 다음 후보를 찾는다.
+    """
+
+    def __init__(self):
+        self.buffer: List[str] = []
+        self.stack: List[str] = []
+        self.started = False
+        self.complete = False
+        self.in_string = False
+        self.escaped = False
+        self.start = -1      # 후보 여는 괄호의 위치 (feed한 전체 텍스트 기준)
+        self.position = 0
+
+    def feed(self, chunk: str) -> bool:
+        """
+        응답 조각 처리
+
+        Returns:
+            최상위 객체 완료 여부
+        """
+        for char in chunk:
+            if self.complete:
+                break
+            self.position += 1
+            if not self.started:
+                if not self.stack:
+                    if char in _CLOSERS:
+                        self._open(char)
+                    continue
+                if char.isspace():
+                    self.buffer.append(char)
+                    continue
+                if char not in _VALUE_STARTS[self.stack[0]]:
+                    # 괄호로 쓴 설명문 → 버리고 다음 여는 괄호부터 다시
+                    self.buffer.clear()
+                    self.stack.clear()
+                    if char in _CLOSERS:
+                        self._open(char)
+                    continue
+                self.started = True
+
+            self.buffer.append(char)
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in _CLOSERS:
+                self.stack.append(char)
+            elif char in '}]':
+                if self.stack:
+                    self.stack.pop()
+                if not self.stack:
+                    self.complete = True
+        return self.complete
+
+    def _open(self, char: str) -> None:
+        """후보 여는 괄호"""
+        self.start = self.position - 1
+        self.stack.append(char)
+        self.buffer.append(char)
+
+    @property
+    def text(self) -> str:
+        """지금까지 추출한 JSON 텍스트 (미완성일 수 있음)"""
+        return "".join(self.buffer)
+
+
+def _split_strings(text: str) -> List[Tuple[bool, str]]:
+    """텍스트를 (문자열 여부, 조각) 목록으로 분리"""
+    parts = []
+    current = []
+    in_string = False
+    escaped = False
+    for char in text:
+        if in_string:
+            current.append(char)
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                parts.append((True, "".join(current)))
+                current = []
+                in_string = False
+        elif char == '"':
+            if current:
+                parts.append((False, "".join(current)))
+            current = [char]
+            in_string = True
+        else:
+            current.append(char)
+    if current:
+        parts.append((in_string, "".join(current)))
+    return parts
+
+
+def _repair_range(match: "re.Match") -> str:
+    """'"score": 12-15' → 중앙값, '0-20'처럼 템플릿을 그대로 옮긴 값 → null"""
+    low, high = float(match.group(2)), float(match.group(3))
+    if low == 0 or low > high:
+        return f"{match.group(1)}null"
+    value = (low + high) / 2
+    return f"{match.group(1)}{int(value) if value.is_integer() else value}"
+
+
+def _close_truncated(text: str) -> str:
+    """잘린 JSON을 닫음 (열린 문자열, 매달린 key, 끝 쉼표 정리)"""
+    stack = []
+    in_string = False
+    escaped = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+        elif char in '}]' and stack:
+            stack.pop()
+
+    if not stack and not in_string:
+        return text
+
+    if in_string:
+        text += '"'
+    text = text.rstrip()
+    # 객체 안에서 값 없이 끝난 key ("key": 또는 "key") 제거
+    if stack and stack[-1] == '}':
+        text = re.sub(r'([{,])\s*"[^"]*"\s*:?\s*$', r'\1', text)
+    text = re.sub(r'[,:]\s*$', '', text)
+    return text + "".join(reversed(stack))
+
+
+def repair_json(text: str) -> str:
+    """
+    흔한 JSON 오류 복구
+
+    문자열 내부는 건드리지 않고 바깥 부분만 수정한다.
+    """
+    text = text.strip()
+    text = re.sub(r"^```(?:json)?\s*", "", text)
+    text = re.sub(r"\s*```.*$", "", text, flags=re.DOTALL)
+
+    parts = []
+    for is_string, part in _split_strings(text):
+        if not is_string:
+            part = re.sub(r"//[^\n]*", "", part)
+            part = re.sub(r"(:\s*)(\d+(?:\.\d+)?)\s*[-~]\s*(\d+(?:\.\d+)?)", _repair_range, part)
+            part = re.sub(r"(:\s*)true\s*/\s*false", r"\1null", part)
+            part = re.sub(r"\bTrue\b", "true", part)
+            part = re.sub(r"\bFalse\b", "false", part)
+            part = re.sub(r"\bNone\b", "null", part)
+            part = re.sub(r"(:\s*)\.\.\.", r"\1null", part)
+        parts.append(part)
+    text = "".join(parts)
+
+    text = _close_truncated(text)
+
+    # 끝 쉼표 (문자열 분리 후 다시 적용: 닫기 괄호 추가로 새로 생길 수 있음)
+    return "".join(
+        part if is_string else re.sub(r",(\s*[}\]])", r"\1", part)
+        for is_string, part in _split_strings(text)
+    )
+
+
+def _parse(candidate: str) -> Tuple[Optional[Any], bool, bool]:
+    """후보 텍스트 파싱 → (객체, 복구 적용 여부, 성공 여부)"""
+    try:
+        return json.loads(candidate), False, True
+    except json.JSONDecodeError:
+        pass
+    try:
+        return json.loads(repair_json(candidate)), True, True
+    except json.JSONDecodeError:
+        return None, True, False
+
+
+def extract_json(text: str) -> Tuple[Optional[Any], bool]:
+    """
+    응답 텍스트에서 JSON 추출
+
+    닫힌 후보가 파싱되지 않으면 그 다음 여는 괄호부터 다시 찾는다.
+
+    Returns:
+        (파싱된 객체 또는 None, 복구 적용 여부)
+    """
+    offset = 0
+    found = False
+    while True:
+        extractor = JsonStreamExtractor()
+        extractor.feed(text[offset:])
+        candidate = extractor.text
+        if not candidate:
+            return None, found
+        found = True
+        obj, repaired, ok = _parse(candidate)
+        if ok:
+            return obj, repaired
+        if not extractor.complete:
+            return None, True
+        offset += extractor.start + 1
+
+
+def extract_json_stream(chunks: Iterable[str]) -> Tuple[Optional[Any], bool, str]:
+    """
+    스트리밍 응답에서 JSON 추출 (파싱되는 객체가 닫히면 나머지 조각은 읽지 않음)
+
+    Returns:
+        (파싱된 객체 또는 None, 복구 적용 여부, 받은 원문)
+    """
+    extractor = JsonStreamExtractor()
+    received = []
+    offset = 0
+    for chunk in chunks:
+        received.append(chunk)
+        while extractor.feed(chunk) and not _parse(extractor.text)[2]:
+            # 닫혔지만 JSON이 아닌 후보 → 그 다음부터 다시
+            offset += extractor.start + 1
+            extractor = JsonStreamExtractor()
+            chunk = "".join(received)[offset:]
+        if extractor.complete:
+            break
+    raw = "".join(received)
+    obj, repaired = extract_json(raw[offset:])
+    return obj, repaired, raw
+
+
+def _to_number(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        match = re.search(r"-?\d+(?:\.\d+)?", value)
+        if match:
+            return float(match.group())
+    return None
+
+
+def _to_bool(value: Any) -> Optional[bool]:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in ('true', 'pass', 'yes'):
+            return True
+        if lowered in ('false', 'fail', 'no'):
+            return False
+    return None
+
+
+def schema_from_rubric(rubric: Optional[Dict[str, Any]]) -> Dict[str, float]:
+    """심사 기준 dict (max 포함) → {기준: 최대 점수}"""
+    if not rubric:
+        return dict(EVALUATION_SCHEMA)
+    schema = {
+        name: spec['max'] for name, spec in rubric.items()
+        if isinstance(spec, dict) and isinstance(spec.get('max'), (int, float))
+    }
+    return schema or dict(EVALUATION_SCHEMA)
+
+
+def validate_evaluation(
+    result: Any,
+    schema: Optional[Dict[str, float]] = None
+) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    심사 결과 검증 및 정규화
+
+    점수는 숫자로 변환 후 [0, 최대]로 제한하고, 빠진 항목은 목록으로 반환한다.
+
+    Args:
+        result: 파싱된 심사 결과
+        schema: {기준: 최대 점수} (기본: EVALUATION_SCHEMA)
+
+    Returns:
+        (정규화된 결과, 누락 필드 목록 예: ["methodology.score", "ai_contribution.pass"])
+    """
+    schema = schema or EVALUATION_SCHEMA
+    if not isinstance(result, dict):
+        result = {}
+
+    clean: Dict[str, Any] = {}
+    missing: List[str] = []
+
+    for criterion, max_score in schema.items():
+        entry = result.get(criterion)
+        if not isinstance(entry, dict):
+            entry = {'score': entry} if entry is not None else {}
+        score = _to_number(entry.get('score'))
+        if score is None:
+            missing.append(f"{criterion}.score")
+            continue
+        clean[criterion] = {
+            'score': min(max(score, 0.0), float(max_score)),
+            'reason': str(entry.get('reason', '') or ''),
+            'improvement': str(entry.get('improvement', '') or ''),
+        }
+
+    ai = result.get('ai_contribution')
+    passed = _to_bool(ai.get('pass') if isinstance(ai, dict) else ai)
+    if passed is None:
+        missing.append("ai_contribution.pass")
+    else:
+        clean['ai_contribution'] = {
+            'pass': passed,
+            'reason': str(ai.get('reason', '') if isinstance(ai, dict) else ''),
+        }
+
+    for key, value in result.items():
+        if key not in clean and key not in schema and key != 'ai_contribution':
+            clean[key] = value
+
+    scored = [clean[c]['score'] for c in schema if c in clean]
+    clean['total_score'] = sum(scored)
+    return clean, missing
+
+
+def merge_evaluation(base: Dict[str, Any], patch: Any) -> Dict[str, Any]:
+    """재질문 응답의 필드를 기존 결과에 병합"""
+    merged = dict(base)
+    if isinstance(patch, dict):
+        for key, value in patch.items():
+            if isinstance(value, dict) and isinstance(merged.get(key), dict):
+                merged[key] = {**merged[key], **value}
+            else:
+                merged[key] = value
+    return merged
+
+
+def reask_prompt(
+    missing: List[str],
+    schema: Optional[Dict[str, float]] = None,
+    partial: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    누락 필드만 다시 묻는 짧은 프롬프트
+
+    원래 평가 프롬프트 뒤에 붙여 보내면 접두부가 같아 캐시를 활용할 수 있다.
+    """
+    schema = schema or EVALUATION_SCHEMA
+    fields = {}
+    for path in missing:
+        criterion = path.split('.')[0]
+        if criterion == 'ai_contribution':
+            fields[criterion] = {"pass": "true/false", "reason": "..."}
+        else:
+            fields[criterion] = {"score": f"0~{schema.get(criterion, 0):g} 사이 숫자", "reason": "..."}
+
+    partial_text = ""
+    if partial:
+        partial_text = f"\n이전 응답에서 확인된 항목:\n{json.dumps(partial, ensure_ascii=False)}\n"
+
+    return f"""
+이전 응답에서 다음 항목이 빠졌거나 형식이 잘못되었습니다: {', '.join(missing)}
+{partial_text}
+빠진 항목만 다음 JSON 형식으로 응답하세요 (다른 항목과 설명은 출력하지 마세요):
+{json.dumps(fields, ensure_ascii=False, indent=2)}
+"""
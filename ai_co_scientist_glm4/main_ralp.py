@@ -3,16 +3,20 @@
 RALP-MIRROR: RALP-optimized Meta-Learning Iterative Research System
 
 ULTRAWORK RALP에 의해 무한으로 실행되는 메인 루프
-glm 4.7 모델만 사용
+glm 4.7 + glm-4-flash 사용 (작업별 모델 선택: routing.py)
 
 Usage (by RALP):
     while True:
         python main_ralp.py
 """
 
+import hashlib
 import json
 import os
 import sys
+import threading
+import time
+from concurrent.futures import Future
 from datetime import datetime
 from pathlib import Path
 
@@ -27,17 +31,33 @@ try:
 except ImportError:
     GIT_AUTO_COMMIT_AVAILABLE = False
 
+from ledger import estimate_cost, estimate_tokens, get_ledger
+from tracing import get_tracer, span, write_text
+
+from prescorer import PreScorer
+from prompt_packer import PromptPacker, apply_section_revision, revision_targets, split_sections
+from summary_cache import SummaryCache
+from json_extract import extract_json, merge_evaluation, reask_prompt, schema_from_rubric, validate_evaluation
+from prompts import evaluation_values, registry as prompts
+from routing import ModelRouter
+
 # 설정
 WORKSPACE = Path("workspace")
 STATE_FILE = WORKSPACE / "state.json"
+SUMMARY_CACHE_FILE = WORKSPACE / "summary_cache.db"
 RUBRIC_FILE = WORKSPACE / "rubric.json"
 SUBMISSION_DIR = WORKSPACE / "submission"
 HISTORY_DIR = WORKSPACE / "history"
 LEARNINGS_DIR = WORKSPACE / "learnings"
+SPECULATIVE_FILE = WORKSPACE / "speculative.json"
+PRESCORER_FILE = WORKSPACE / "prescorer.json"
 
 # Git auto-commit (optional - initialized in main())
 git_commit = None
 
+# 섹션 요약 캐시 (initialized in init_workspace())
+summary_cache = None
+
 # 심사 기준 (100점 만점)
 RUBRIC = {
     "practicality": {"max": 20, "name": "주제의 실용성", "description": "연구가 실제로 유의미하고 실질적인 문제를 다루는가"},
@@ -52,6 +72,27 @@ RUBRIC = {
 TARGET_SCORE = 85
 MAX_ITERATIONS = 50
 
+# 토큰 예산
+EVAL_PAPER_TOKENS = 12000    # 평가 프롬프트에 넣을 논문 최대 토큰 수
+IMPROVE_OUTPUT_TOKENS = 4000  # 개선 시 다시 쓸 섹션의 최대 토큰 수
+
+# 평가 중에 예측한 약점으로 다음 개선안을 미리 작성 (예측이 맞으면 improve phase에서 사용)
+SPECULATIVE_IMPROVE = True
+
+# 심사 패널 전 로컬 점수 예측: 예측 총점 + PRESCORE_MARGIN × 오차가 최고 점수에 못 미치면 심사 생략
+# (연속 PRESCORE_MAX_SKIPS번 생략하면 다음 초안은 반드시 심사)
+PRESCORE_GATE = True
+PRESCORE_MARGIN = 1.0
+PRESCORE_MAX_SKIPS = 2
+
+packer = PromptPacker()
+
+# 작업별 모델 선택 (AI 활용보고서/1차 심사는 glm-4-flash, 논문 작성/개선은 glm-4.7)
+router = ModelRouter()
+
+# 심사 점수 예측기 (history/iter_*.json으로 학습, initialized in init_workspace())
+prescorer = None
+
 
 def init_workspace():
     """작업 공간 초기화"""
@@ -60,6 +101,14 @@ def init_workspace():
     HISTORY_DIR.mkdir(exist_ok=True)
     LEARNINGS_DIR.mkdir(exist_ok=True)
 
+    # 섹션 요약 캐시 (바뀐 섹션만 다시 요약)
+    global summary_cache
+    summary_cache = SummaryCache(SUMMARY_CACHE_FILE)
+    packer.summarizer = summary_cache.summarize
+
+    global prescorer
+    prescorer = PreScorer(RUBRIC, PRESCORER_FILE)
+
     # Initialize git auto-commit
     global git_commit
     if GIT_AUTO_COMMIT_AVAILABLE:
@@ -104,46 +153,77 @@ def load_state():
         return json.load(f)
 
 
-def glm4_generate(prompt, temperature=0.7, max_tokens=4000):
+def glm4_generate(prompt, temperature=0.7, max_tokens=4000, system_prompt=None, route=None, model=None):
     """
-    glm 4.7 API 호출 (실제 구현 시 API 키 필요)
+    GLM API 호출 (실제 구현 시 API 키 필요)
     
     Args:
-        prompt: 입력 프롬프트
+        prompt: 입력 프롬프트 (바뀌는 내용)
         temperature: 창의성 (0.0~1.0)
         max_tokens: 최대 토큰 수
+        system_prompt: 고정 system 프롬프트 (prompts.py, prefix cache 대상)
+        route: 작업 이름 (routing.ROUTES에서 모델 선택)
+        model: 모델 직접 지정 (재심사 등)
     
     Returns:
         생성된 텍스트
     """
+    model = model or router.model(route)
+    
     # TODO: 실제 glm 4.7 API 연동
     # from zhipuai import ZhipuAI
     # client = ZhipuAI(api_key="YOUR_API_KEY")
     # response = client.chat.completions.create(
     #     model="glm-4.7",
-    #     messages=[{"role": "user", "content": prompt}],
+    #     messages=[{"role": "system", "content": system_prompt},
+    #               {"role": "user", "content": prompt}],
     #     temperature=temperature,
     #     max_tokens=max_tokens
     # )
     # return response.choices[0].message.content
     
+    # GLM4_BASE_URL이 설정되면 OpenAI 호환 서버 호출 (예: shared/mock_llm_server.py 부하 테스트)
+    if os.getenv("GLM4_BASE_URL"):
+        return _http_client().generate(prompt, temperature, max_tokens, system_prompt=system_prompt,
+                                       route=route, model=model)
+    
     # 현재는 mock 구현 (실제 API 연동 필요)
-    return f"[GLM-4.7 OUTPUT for: {prompt[:50]}...]"
+    started = time.perf_counter()
+    with span("llm.generate", model=model, route=route or "default", prompt_chars=len(prompt),
+              system_chars=len(system_prompt or "")):
+        output = f"[{model.upper()} OUTPUT for: {prompt[:50]}...]"
+    tokens_in = estimate_tokens((system_prompt or "") + prompt)
+    tokens_out = estimate_tokens(output)
+    router.record(route, model, (time.perf_counter() - started) * 1000,
+                  tokens_in + tokens_out, estimate_cost(model, tokens_in, tokens_out))
+    return output
+
+
+_glm4_http_client = None
+
+
+def _http_client():
+    """GLM4_BASE_URL 대상 클라이언트 (처음 호출 시 생성)"""
+    global _glm4_http_client
+    if _glm4_http_client is None:
+        from glm4_client import GLM4Client
+        _glm4_http_client = GLM4Client(
+            api_key=os.getenv("GLM4_API_KEY", "local"),
+            summary_cache_path=str(SUMMARY_CACHE_FILE),
+            router=router
+        )
+    return _glm4_http_client
 
 
-def glm4_generate_json(prompt, temperature=0.7):
-    """JSON 형식으로 응답받기"""
-    response = glm4_generate(prompt, temperature)
-    # JSON 파싱
-    try:
-        # 코드 블록 제거
-        if "```json" in response:
-            response = response.split("```json")[1].split("```")[0]
-        elif "```" in response:
-            response = response.split("```")[1].split("```")[0]
-        return json.loads(response.strip())
-    except:
+def glm4_generate_json(prompt, temperature=0.7, max_tokens=4000, system_prompt=None, route=None, model=None):
+    """JSON 형식으로 응답받기 (코드 블록, 끝 쉼표, 잘린 객체 등은 복구)"""
+    response = glm4_generate(prompt, temperature, max_tokens, system_prompt, route, model)
+    result, repaired = extract_json(response)
+    if not isinstance(result, dict):
         return {"error": "JSON parsing failed", "raw": response}
+    if repaired:
+        result['_repaired'] = True
+    return result
 
 
 def search_arxiv(query, max_results=10):
@@ -207,59 +287,29 @@ def phase_research(state):
     
     # 2. 논문 작성
     print("\n[2/4] 연구보고서 작성 중...")
-    paper_prompt = f"""
-    연구 주제: {topic}
-    
-    관련 논문:
-    {json.dumps([p['title'] for p in papers[:5]], ensure_ascii=False, indent=2)}
-    
-    위 내용을 바탕으로 학술 논문 형태의 연구보고서를 작성하세요.
-    
-    다음 섹션을 포함해야 합니다:
-    1. Title
-    2. Abstract (250-300 words)
-    3. Keywords (3-5개)
-    4. Introduction
-    5. Related Work
-    6. Methodology
-    7. Results
-    8. Discussion
-    9. Conclusion
-    10. References
-    
-    영문으로 작성하세요.
-    """
+    paper_prompt = prompts.render(
+        "research.paper",
+        topic=topic,
+        related=json.dumps([p['title'] for p in papers[:5]], ensure_ascii=False, indent=2)
+    )
     
-    paper = glm4_generate(paper_prompt, temperature=0.7)
+    paper = glm4_generate(paper_prompt.user, temperature=0.7, system_prompt=paper_prompt.system,
+                          route="research.paper")
     
     # 파일로 저장
     paper_file = SUBMISSION_DIR / "paper.md"
-    with open(paper_file, 'w', encoding='utf-8') as f:
-        f.write(paper)
+    write_text(paper_file, paper)
     print(f"  - 저장됨: {paper_file}")
     
     # 3. AI 활용보고서 작성
     print("\n[3/4] AI 활용보고서 작성 중...")
-    ai_usage_prompt = f"""
-    이 연구에서 AI(glm 4.7)를 다음과 같이 활용했다는 내용의 보고서를 작성하세요:
-    
-    - 문헌 검색 및 분석
-    - 연구보고서 작성
-    - 데이터 분석
-    - 결과 해석
-    
-    다음 형식으로 작성:
-    1. AI 활용 체크리스트
-    2. AI 상호작용 로그
-    3. AI 기여도 자체 평가 (50% 이상)
-    4. 활용 URL 목록
-    """
+    ai_usage_prompt = prompts.render("research.ai_usage", topic=topic)
     
-    ai_usage = glm4_generate(ai_usage_prompt, temperature=0.5)
+    ai_usage = glm4_generate(ai_usage_prompt.user, temperature=0.5, system_prompt=ai_usage_prompt.system,
+                             route="research.ai_usage")
     
     ai_usage_file = SUBMISSION_DIR / "ai_usage.md"
-    with open(ai_usage_file, 'w', encoding='utf-8') as f:
-        f.write(ai_usage)
+    write_text(ai_usage_file, ai_usage)
     print(f"  - 저장됨: {ai_usage_file}")
     
     # 4. 데이터 목록 작성
@@ -276,8 +326,7 @@ def phase_research(state):
 """
     
     data_list_file = SUBMISSION_DIR / "data_list.md"
-    with open(data_list_file, 'w', encoding='utf-8') as f:
-        f.write(data_list)
+    write_text(data_list_file, data_list)
     print(f"  - 저장됨: {data_list_file}")
     
     # 상태 업데이트
@@ -289,7 +338,11 @@ def phase_research(state):
 
 
 def phase_evaluate(state):
-    """평가 Phase - glm 4.7로 3번 평가 (self-consistency)"""
+    """
+    평가 Phase - 3번 평가 (self-consistency), 1차 심사가 불확실하면 glm 4.7로 재심사
+    
+    심사 전에 로컬 예측기로 점수를 예측하여 최고 점수를 넘을 가능성이 없으면 심사를 생략
+    """
     print("\n" + "="*60)
     print(f"[PHASE: EVALUATE] Iteration {state['iteration']}")
     print("="*60)
@@ -299,48 +352,75 @@ def phase_evaluate(state):
     with open(paper_file, 'r', encoding='utf-8') as f:
         paper = f.read()
     
+    # 로컬 점수 예측 (최고 점수를 넘을 가능성이 없으면 심사 패널 생략)
+    prescorer.fit_history(HISTORY_DIR)
+    prescore = prescorer.predict(paper)
+    judge_panel, gate_reason = prescorer.gate(prescore, state['best_score'], PRESCORE_MARGIN)
+    print(f"\n[Pre-Scorer] 예측 {prescore.total:.1f}/100 ({prescore.elapsed_ms:.1f} ms, {gate_reason})")
+    if not judge_panel and PRESCORE_GATE and state.get('prescore_skips', 0) < PRESCORE_MAX_SKIPS:
+        record_prescore(state, prescore, gate_reason)
+        return
+    state['prescore_skips'] = 0
+    
+    # 요약 트리 갱신 (이전 iteration 이후 바뀐 노드만 다시 요약)
+    paper_summary = summary_cache.build(paper)
+    print(f"\n[Summary Cache] {paper_summary.reused}개 재사용, {paper_summary.computed}개 재계산 "
+          f"(변경 섹션: {paper_summary.changed_sections()})")
+    
+    # 직전 평가의 약점이 그대로 남는다고 예측하고 다음 개선안을 평가와 동시에 작성
+    predicted = state.get('current_weaknesses', [])[:3]
+    speculative = start_speculative_draft(paper, predicted)
+    
+    # 토큰 예산에 맞게 논문 구성 (심사 기준별 관련 섹션 우선)
+    packed = packer.pack(paper, EVAL_PAPER_TOKENS)
+    print(f"\n[Prompt Packing] {packed.tokens}/{packed.budget} tokens "
+          f"(원문 {len(packed.full)}, 일부 {len(packed.truncated)}, 요약 {len(packed.summarized)} 섹션)")
+    
     print("\n[Self-Consistency Evaluation]")
-    print("glm 4.7로 3번 평가 (temperature: 0.3, 0.7, 1.0)")
+    print(f"{router.model('evaluation')}로 3번 평가 (temperature: 0.3, 0.7, 1.0)")
     
-    evaluations = []
+    schema = schema_from_rubric(RUBRIC)
     temps = [0.3, 0.7, 1.0]
     
-    for i, temp in enumerate(temps, 1):
-        print(f"\n  평가 {i}/3 (temp={temp})...")
-        
-        eval_prompt = f"""
-        당신은 2026 AI Co-Scientist Challenge Korea의 심사위원입니다.
-        다음 연구보고서를 심사 기준에 따라 평가하세요.
-        
-        === 연구보고서 ===
-        {paper[:3000]}...
-        
-        === 심사 기준 ===
-        1. 주제의 실용성 (20점): 연구가 실제로 유의미한가
-        2. 방법론의 적절성 (20점): 방법론이 명확하고 과학적인가
-        3. 데이터의 적절성 (25점): 데이터가 논리적이고 신뢰할 수 있는가
-        4. 결론의 합리성 (10점): 결론이 과학적 사실에 부합하는가
-        5. 전달력 및 가독성 (5점): 영문으로 명확하게 전달되었는가
-        6. 연구의 창의성 (20점): 차별화된 창의적 접근인가
-        7. AI 연구기여도 (Pass/Fail): AI가 충분히 기여했는가
-        
-        다음 JSON 형식으로 응답하세요:
-        {{
-            "practicality": {{"score": 0-20, "reason": "...", "improvement": "..."}},
-            "methodology": {{"score": 0-20, "reason": "...", "improvement": "..."}},
-            "data_quality": {{"score": 0-25, "reason": "...", "improvement": "..."}},
-            "conclusion": {{"score": 0-10, "reason": "...", "improvement": "..."}},
-            "readability": {{"score": 0-5, "reason": "...", "improvement": "..."}},
-            "creativity": {{"score": 0-20, "reason": "...", "improvement": "..."}},
-            "ai_contribution": {{"pass": true/false, "reason": "..."}},
-            "total_score": 0-100,
-            "top_weaknesses": ["...", "..."],
-            "top_improvements": ["...", "..."]
-        }}
-        """
-        
-        result = glm4_generate_json(eval_prompt, temperature=temp)
-        evaluations.append(result)
+    # 심사 기준/응답 형식은 고정 system 프롬프트, 논문은 user 프롬프트 (3번 모두 같은 접두부)
+    note = "(토큰 예산으로 일부 섹션은 [요약] 또는 [...]로 압축되었습니다)" \
+        if packed.summarized or packed.truncated else ""
+    eval_prompt = prompts.render("evaluation", paper=packed.text, note=note, **evaluation_values(RUBRIC))
+    
+    def judge(model):
+        evaluations = []
+        for i, temp in enumerate(temps, 1):
+            print(f"\n  평가 {i}/3 (temp={temp}, {model})...")
+            
+            with span("judge.self_consistency", temperature=temp, model=model):
+                result = glm4_generate_json(eval_prompt.user, temperature=temp,
+                                            system_prompt=eval_prompt.system,
+                                            route="evaluation", model=model)
+                result, missing = validate_evaluation(result, schema)
+                if missing:
+                    # 빠진 항목만 다시 질문 (전체 재평가 대신)
+                    print(f"  누락 항목 재질문: {', '.join(missing)}")
+                    partial = {k: v for k, v in result.items() if k in schema}
+                    patch = glm4_generate_json(eval_prompt.user + reask_prompt(missing, schema, partial),
+                                               temperature=temp, max_tokens=500,
+                                               system_prompt=eval_prompt.system,
+                                               route="evaluation", model=model)
+                    result, missing = validate_evaluation(merge_evaluation(result, patch), schema)
+                result['missing'] = missing
+            evaluations.append(result)
+        return evaluations
+    
+    # 1차 심사는 빠른 모델, 불확실하면 (JSON 오류, 누락 항목, 점수 편차) 큰 모델로 재심사
+    judge_model = router.model("evaluation")
+    evaluations = judge(judge_model)
+    escalation = router.should_escalate(evaluations, schema)
+    if escalation and router.escalation("evaluation"):
+        judge_model = router.escalation("evaluation")
+        print(f"\n  1차 심사 불확실 ({escalation}) → {judge_model}로 재심사")
+        router.record_escalation("evaluation")
+        evaluations = judge(judge_model)
+    else:
+        escalation = None
     
     # 중앙값 집계
     print("\n[집계 결과]")
@@ -352,45 +432,24 @@ def phase_evaluate(state):
             return (sorted_vals[n//2-1] + sorted_vals[n//2]) / 2
         return sorted_vals[n//2]
     
-    aggregated = {
-        "practicality": {
-            "score": median([e.get('practicality', {}).get('score', 0) for e in evaluations]),
-            "reason": evaluations[1].get('practicality', {}).get('reason', '')  # 중간값 사용
-        },
-        "methodology": {
-            "score": median([e.get('methodology', {}).get('score', 0) for e in evaluations]),
-            "reason": evaluations[1].get('methodology', {}).get('reason', '')
-        },
-        "data_quality": {
-            "score": median([e.get('data_quality', {}).get('score', 0) for e in evaluations]),
-            "reason": evaluations[1].get('data_quality', {}).get('reason', '')
-        },
-        "conclusion": {
-            "score": median([e.get('conclusion', {}).get('score', 0) for e in evaluations]),
-            "reason": evaluations[1].get('conclusion', {}).get('reason', '')
-        },
-        "readability": {
-            "score": median([e.get('readability', {}).get('score', 0) for e in evaluations]),
-            "reason": evaluations[1].get('readability', {}).get('reason', '')
-        },
-        "creativity": {
-            "score": median([e.get('creativity', {}).get('score', 0) for e in evaluations]),
-            "reason": evaluations[1].get('creativity', {}).get('reason', '')
-        },
-        "ai_contribution": {
-            "pass": all(e.get('ai_contribution', {}).get('pass', False) for e in evaluations),
-            "reason": evaluations[1].get('ai_contribution', {}).get('reason', '')
-        }
+    def aggregate(criterion):
+        # 해당 항목이 유효한 심사만 집계 (파싱 실패를 0점으로 세지 않음)
+        valid = [e[criterion] for e in evaluations if criterion in e]
+        if not valid:
+            return {"score": 0, "reason": "유효한 심사 결과 없음"}
+        score = median([v['score'] for v in valid])
+        closest = min(valid, key=lambda v: abs(v['score'] - score))
+        return {"score": score, "reason": closest.get('reason', '')}
+    
+    aggregated = {criterion: aggregate(criterion) for criterion in schema}
+    
+    ai_votes = [e['ai_contribution'] for e in evaluations if 'ai_contribution' in e]
+    aggregated['ai_contribution'] = {
+        "pass": bool(ai_votes) and all(v['pass'] for v in ai_votes),
+        "reason": ai_votes[len(ai_votes) // 2]['reason'] if ai_votes else "유효한 심사 결과 없음"
     }
     
-    total = sum([
-        aggregated['practicality']['score'],
-        aggregated['methodology']['score'],
-        aggregated['data_quality']['score'],
-        aggregated['conclusion']['score'],
-        aggregated['readability']['score'],
-        aggregated['creativity']['score']
-    ])
+    total = sum(aggregated[criterion]['score'] for criterion in schema)
     
     aggregated['total_score'] = total
     
@@ -404,12 +463,19 @@ def phase_evaluate(state):
             print(f"    - {criterion}: {data['score']:.1f}/{max_score}")
     
     # 히스토리 저장
-    history_file = HISTORY_DIR / f"iter_{state['iteration']:03d}.json"
+    history_file = history_path(state['iteration'])
     with open(history_file, 'w', encoding='utf-8') as f:
         json.dump({
             'iteration': state['iteration'],
             'evaluations': evaluations,
             'aggregated': aggregated,
+            'prompt_version': eval_prompt.version,
+            'judge_model': judge_model,
+            'escalation': escalation,
+            'paper_summary': paper_summary.summary,
+            'changed_sections': paper_summary.changed_sections(),
+            'features': prescore.features,
+            'prescore': prescore.to_dict(),
             'timestamp': datetime.now().isoformat()
         }, f, ensure_ascii=False, indent=2)
     
@@ -417,22 +483,7 @@ def phase_evaluate(state):
     state['current_score'] = total
     state['last_evaluation'] = aggregated
     
-    # 약점 수집
-    weaknesses = []
-    for criterion, data in aggregated.items():
-        if criterion in RUBRIC and RUBRIC[criterion].get('max'):
-            max_score = RUBRIC[criterion]['max']
-            if data['score'] < max_score * 0.8:
-                weaknesses.append({
-                    'criterion': criterion,
-                    'score': data['score'],
-                    'max': max_score,
-                    'gap': max_score - data['score'],
-                    'reason': data.get('reason', ''),
-                    'improvement': data.get('improvement', '')
-                })
-    
-    state['current_weaknesses'] = sorted(weaknesses, key=lambda x: x['gap'], reverse=True)
+    state['current_weaknesses'] = collect_weaknesses(aggregated)
     
     # 목표 달성 확인
     if total >= TARGET_SCORE and aggregated['ai_contribution']['pass']:
@@ -442,6 +493,8 @@ def phase_evaluate(state):
         print(f"\n→ 목표 미달 ({total} < {TARGET_SCORE})")
         state['phase'] = 'improve'
     
+    settle_speculative_draft(speculative, paper, predicted, state)
+    
     # 최고 점수 업데이트
     prev_score = state['best_score']
     if total > state['best_score']:
@@ -469,6 +522,232 @@ def phase_evaluate(state):
     save_state(state)
 
 
+def history_path(iteration, suffix=""):
+    """
+    이번 평가의 history 파일
+    
+    improve → evaluate 반복은 같은 iteration이므로 기존 기록을 덮어쓰지 않고
+    iter_001.json, iter_001_2.json, ... 순으로 번호를 붙임 (예측기 학습 표본으로 모두 사용)
+    """
+    path = HISTORY_DIR / f"iter_{iteration:03d}{suffix}.json"
+    round_no = 2
+    while path.exists():
+        path = HISTORY_DIR / f"iter_{iteration:03d}_{round_no}{suffix}.json"
+        round_no += 1
+    return path
+
+
+def collect_weaknesses(aggregated):
+    """만점의 80%에 못 미치는 항목 (gap 큰 순)"""
+    weaknesses = []
+    for criterion, data in aggregated.items():
+        if criterion in RUBRIC and RUBRIC[criterion].get('max'):
+            max_score = RUBRIC[criterion]['max']
+            if data['score'] < max_score * 0.8:
+                weaknesses.append({
+                    'criterion': criterion,
+                    'score': data['score'],
+                    'max': max_score,
+                    'gap': max_score - data['score'],
+                    'reason': data.get('reason', ''),
+                    'improvement': data.get('improvement', '')
+                })
+    return sorted(weaknesses, key=lambda x: x['gap'], reverse=True)
+
+
+def record_prescore(state, prescore, reason):
+    """
+    심사 패널을 생략한 초안 처리
+    
+    예측 점수로 약점을 정해 바로 improve phase로 넘어감.
+    history에는 prescored로 표시하여 예측기 학습에서 제외하고, 최고 점수는 갱신하지 않음
+    """
+    print("  → 최고 점수를 넘을 가능성이 낮아 심사 패널 생략")
+    aggregated = {
+        criterion: {"score": round(score, 1), "reason": f"pre-scorer 예측 ({reason})"}
+        for criterion, score in prescore.scores.items()
+    }
+    aggregated['ai_contribution'] = state.get('last_evaluation', {}).get(
+        'ai_contribution', {"pass": False, "reason": "심사 패널 생략"}
+    )
+    aggregated['total_score'] = round(prescore.total, 1)
+    
+    history_file = history_path(state['iteration'], "_prescored")
+    with open(history_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            'iteration': state['iteration'],
+            'prescored': True,
+            'aggregated': aggregated,
+            'features': prescore.features,
+            'prescore': prescore.to_dict(),
+            'reason': reason,
+            'timestamp': datetime.now().isoformat()
+        }, f, ensure_ascii=False, indent=2)
+    
+    state['current_score'] = aggregated['total_score']
+    state['last_evaluation'] = aggregated
+    state['current_weaknesses'] = collect_weaknesses(aggregated)
+    state['prescore_skips'] = state.get('prescore_skips', 0) + 1
+    state['phase'] = 'improve'
+    save_state(state)
+
+
+def draft_improvement(paper, weaknesses):
+    """
+    약점 기반 개선안 작성
+    
+    약점과 관련된 섹션만 원문으로 보내고 다시 쓰게 함 (나머지는 요약 트리의 섹션 요약)
+    
+    Args:
+        paper: 현재 논문
+        weaknesses: 개선할 약점 (최대 3개)
+    
+    Returns:
+        개선된 논문
+    """
+    sections = split_sections(paper)
+    targets = revision_targets(sections, [w['criterion'] for w in weaknesses], IMPROVE_OUTPUT_TOKENS)
+    
+    if targets:
+        titles = [sections[i].title for i in targets]
+        print(f"  수정 대상 섹션: {titles}")
+        # 바뀌지 않은 섹션은 평가 때 만든 요약 트리에서 재사용
+        paper_summary = summary_cache.build(paper)
+        
+        improve_prompt = f"""
+    다음 연구보고서를 개선하세요.
+    
+    === 논문 요약 ([원문] 표시 섹션은 아래에 원문 제공) ===
+    {paper_summary.compact(titles)}
+    
+    === 수정할 섹션 원문 ===
+    {"".join(sections[i].text for i in targets)}
+    
+    === 개선이 필요한 부분 ===
+    {json.dumps(weaknesses, ensure_ascii=False, indent=2)}
+    
+    === 수정할 섹션 ===
+    {json.dumps(titles, ensure_ascii=False)}
+    
+    위 약점들을 해결하여 수정할 섹션만 다시 작성하세요.
+    각 섹션은 원래 제목 줄(#, ## 포함)로 시작하고, 다른 섹션은 출력하지 마세요.
+    """
+        
+        response = glm4_generate(improve_prompt, temperature=0.8, max_tokens=IMPROVE_OUTPUT_TOKENS + 500,
+                                 route="improve")
+        return apply_section_revision(paper, response, titles)
+    
+    # 제목이 없는 논문은 섹션 단위로 나눌 수 없으므로 전체 개선
+    improve_prompt = f"""
+    다음 연구보고서를 개선하세요.
+    
+    === 현재 논문 ===
+    {paper}
+    
+    === 개선이 필요한 부분 ===
+    {json.dumps(weaknesses, ensure_ascii=False, indent=2)}
+    
+    위 약점들을 해결하여 개선된 논문을 작성하세요.
+    전체 구조는 유지하면서 해당 부분만 개선하세요.
+    """
+    
+    return glm4_generate(improve_prompt, temperature=0.8, route="improve")
+
+
+def _paper_hash(paper):
+    return hashlib.sha256(paper.encode('utf-8')).hexdigest()
+
+
+def start_speculative_draft(paper, predicted):
+    """
+    평가와 동시에 다음 개선안 작성 시작
+    
+    daemon 스레드에서 실행하므로 예측이 틀리면 끝나기를 기다리지 않고 프로세스 종료
+    
+    Args:
+        paper: 평가 중인 논문
+        predicted: 예측한 약점 (직전 평가의 약점 상위 3개)
+    
+    Returns:
+        개선안 Future (예측할 약점이 없으면 None)
+    """
+    if not SPECULATIVE_IMPROVE or not predicted:
+        return None
+    print(f"\n[Speculative] 예측 약점 {[w['criterion'] for w in predicted]}로 개선안 미리 작성")
+    
+    future = Future()
+    
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            with span("speculative.improve", predicted=len(predicted)):
+                future.set_result(draft_improvement(paper, predicted))
+        except Exception as e:
+            future.set_exception(e)
+    
+    threading.Thread(target=run, name="speculative-improve", daemon=True).start()
+    return future
+
+
+def settle_speculative_draft(future, paper, predicted, state):
+    """
+    평가 결과로 예측 확인: 맞으면 개선안 저장, 틀리면 폐기
+    
+    예측 약점과 실제 약점 상위 3개의 항목이 같고 improve phase로 넘어갈 때만 저장
+    """
+    if future is None:
+        return
+    
+    actual = [w['criterion'] for w in state.get('current_weaknesses', [])[:3]]
+    hit = state['phase'] == 'improve' and set(actual) == {w['criterion'] for w in predicted}
+    
+    speculation = state.setdefault('speculation', {'hits': 0, 'misses': 0})
+    if not hit:
+        # 작성 중인 개선안은 기다리지 않음
+        speculation['misses'] += 1
+        SPECULATIVE_FILE.unlink(missing_ok=True)
+        print(f"[Speculative] 예측 불일치 (실제 약점 {actual}) → 미리 작성한 개선안 폐기")
+        return
+    
+    try:
+        draft = future.result()
+    except Exception as e:
+        print(f"[Speculative] 개선안 작성 실패: {e}")
+        speculation['misses'] += 1
+        return
+    
+    speculation['hits'] += 1
+    with open(SPECULATIVE_FILE, 'w', encoding='utf-8') as f:
+        json.dump({
+            'iteration': state['iteration'],
+            'base_hash': _paper_hash(paper),
+            'criteria': sorted(actual),
+            'paper': draft
+        }, f, ensure_ascii=False)
+    print("[Speculative] 예측 적중 → 개선안 저장")
+
+
+def take_speculative_draft(paper, weaknesses):
+    """
+    미리 작성된 개선안 꺼내기 (같은 논문, 같은 약점에 대해 작성된 경우만)
+    
+    Returns:
+        개선된 논문 (없거나 조건이 다르면 None)
+    """
+    if not SPECULATIVE_FILE.exists():
+        return None
+    with open(SPECULATIVE_FILE, 'r', encoding='utf-8') as f:
+        speculative = json.load(f)
+    SPECULATIVE_FILE.unlink()
+    
+    if speculative['base_hash'] != _paper_hash(paper):
+        return None
+    if speculative['criteria'] != sorted(w['criterion'] for w in weaknesses):
+        return None
+    return speculative['paper']
+
+
 def phase_improve(state):
     """개선 Phase"""
     print("\n" + "="*60)
@@ -493,27 +772,16 @@ def phase_improve(state):
     with open(paper_file, 'r', encoding='utf-8') as f:
         paper = f.read()
     
-    # 개선
-    print("\n[개선 중...]")
-    
-    improve_prompt = f"""
-    다음 연구보고서를 개선하세요.
-    
-    === 현재 논문 ===
-    {paper}
-    
-    === 개선이 필요한 부분 ===
-    {json.dumps(weaknesses[:3], ensure_ascii=False, indent=2)}
-    
-    위 약점들을 해결하여 개선된 논문을 작성하세요.
-    전체 구조는 유지하면서 해당 부분만 개선하세요.
-    """
-    
-    improved_paper = glm4_generate(improve_prompt, temperature=0.8)
+    # 개선 (평가 중에 미리 작성한 개선안이 있고 약점 예측이 맞았으면 그대로 사용)
+    improved_paper = take_speculative_draft(paper, weaknesses[:3])
+    if improved_paper is not None:
+        print("\n[Speculative] 약점 예측 적중 → 평가 중 미리 작성한 개선안 사용")
+    else:
+        print("\n[개선 중...]")
+        improved_paper = draft_improvement(paper, weaknesses[:3])
     
     # 저장
-    with open(paper_file, 'w', encoding='utf-8') as f:
-        f.write(improved_paper)
+    write_text(paper_file, improved_paper)
     
     print("  ✓ 논문 개선 완료")
     
@@ -576,6 +844,9 @@ def phase_finalize(state):
 ## 개선 이력
 {json.dumps(state['improvements_history'], ensure_ascii=False, indent=2)}
 
+## 모델 route별 지표 (호출 수, 지연시간 ms, 토큰, 비용 USD)
+{json.dumps(state.get('route_metrics', {}), ensure_ascii=False, indent=2)}
+
 ## 제출물 목록
 - paper.md: 연구보고서
 - ai_usage.md: AI 활용보고서
@@ -586,8 +857,7 @@ def phase_finalize(state):
 """
     
     report_file = WORKSPACE / "FINAL_REPORT.md"
-    with open(report_file, 'w', encoding='utf-8') as f:
-        f.write(report)
+    write_text(report_file, report)
     
     print(f"\n📄 최종 보고서: {report_file}")
     print("\n🎉 모든 작업 완료!")
@@ -610,25 +880,40 @@ def main():
     print(f"Iteration: {state['iteration']}")
     print(f"Best Score: {state['best_score']}")
     
-    # Phase별 실행
-    if state['phase'] == 'init':
-        phase_init(state)
-    
-    elif state['phase'] == 'research':
-        phase_research(state)
-    
-    elif state['phase'] == 'evaluate':
-        phase_evaluate(state)
-    
-    elif state['phase'] == 'improve':
-        phase_improve(state)
+    # 이번 호출의 span에 iteration 기록 (AICS_TRACE 설정 시)
+    get_tracer().set_iteration(state['iteration'])
+    get_ledger().set_context(iteration=state['iteration'], phase=state['phase'])
     
-    elif state['phase'] == 'finalize':
-        phase_finalize(state)
-    
-    elif state['phase'] == 'completed':
-        print("\n✅ 이미 완료되었습니다.")
-        return 0
+    # Phase별 실행
+    with span(f"phase.{state['phase']}"):
+        if state['phase'] == 'init':
+            phase_init(state)
+        
+        elif state['phase'] == 'research':
+            phase_research(state)
+        
+        elif state['phase'] == 'evaluate':
+            phase_evaluate(state)
+        
+        elif state['phase'] == 'improve':
+            phase_improve(state)
+        
+        elif state['phase'] == 'finalize':
+            phase_finalize(state)
+        
+        elif state['phase'] == 'completed':
+            print("\n✅ 이미 완료되었습니다.")
+            return 0
+    
+    # iteration별 지연시간 분석 누적 (phase마다 새 프로세스이므로 기존 파일에 합침, AICS_TRACE 설정 시)
+    tracer = get_tracer()
+    if tracer.enabled:
+        tracer.write_breakdown(str(WORKSPACE / "latency_breakdown.json"), merge=True)
+    
+    # route별 호출 지표 누적 (phase마다 새 프로세스이므로 state.json에 저장)
+    if router.stats()['routes']:
+        router.merge(state.setdefault('route_metrics', {}))
+        save_state(state)
     
     return 1  # 계속 실행 필요
 
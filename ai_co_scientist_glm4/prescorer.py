@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Pre-Scorer
+
+심사 패널(3번 평가) 전에 로컬에서 항목별 점수를 예측 (API 호출 없음, GPU 불필요)
+- 논문 특징: 섹션 유무, 단어 수, 인용 밀도, 초록/결론 수치의 본문 일치율,
+  가독성 (문장 길이, Flesch), 참고문헌 목록 정합성 (누락/미인용/연도)
+- 누적된 history/iter_*.json의 심사 점수로 항목별 ridge 회귀 학습
+- leave-one-out 잔차로 예측 오차를 추정하고, 오차를 감안해도 최고 점수에
+  못 미치는 초안은 심사 패널에 보내지 않음
+"""
+
+import json
+import math
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from prompt_packer import split_sections
+
+# 섹션 유무 특징 (prompt_packer.SECTION_KEYWORDS 종류)
+SECTION_KINDS = ('abstract', 'introduction', 'related', 'methods', 'data',
+                 'results', 'discussion', 'conclusion', 'references')
+
+FEATURES = tuple(f"has_{kind}" for kind in SECTION_KINDS) + (
+    'log_words',             # log(1 + 단어 수)
+    'sections',              # 섹션 수
+    'citation_density',      # 본문 인용 수 / 1000단어
+    'number_density',        # 수치 / 1000단어
+    'claim_consistency',     # 초록/결론 수치 중 본문에도 있는 비율
+    'sentence_words',        # 문장당 평균 단어 수
+    'long_sentences',        # 35단어 넘는 문장 비율
+    'flesch',                # Flesch reading ease / 100
+    'non_ascii',             # 영문이 아닌 글자 비율
+    'log_references',        # log(1 + 참고문헌 수)
+    'missing_references',    # 본문 인용 번호 중 참고문헌 목록에 없는 비율
+    'uncited_references',    # 참고문헌 중 본문에서 인용되지 않은 비율
+    'dated_references',      # 참고문헌 중 연도가 있는 비율
+)
+
+_WORD = re.compile(r"[A-Za-zÀ-ɏ]+(?:['’-][A-Za-z]+)*|[가-힣]+")
+_SENTENCE = re.compile(r"(?<=[.!?。])\s+|\n\s*\n")
+_VOWELS = re.compile(r"[aeiouy]+", re.IGNORECASE)
+_NUMBER = re.compile(r"(?<![\w.])\d+(?:\.\d+)?%?")
+_CLAIM = re.compile(r"(?<![\w.])(\d+(?:\.\d+)?)\s*%|(?<![\w.])(\d+\.\d+)(?![\w.])")
+_NUMERIC_CITATION = re.compile(r"\[(\d+(?:\s*[-–,]\s*\d+)*)\]")
+_AUTHOR_CITATION = re.compile(r"\([A-Z][A-Za-z'’-]+(?: et al\.| (?:and|&) [A-Z][A-Za-z'’-]+)?,? (?:19|20)\d{2}[a-z]?\)")
+_REFERENCE_ENTRY = re.compile(r"^\s*(?:\[(\d+)\]|(\d+)\.|[-*])\s+\S", re.MULTILINE)
+_YEAR = re.compile(r"\b(?:19|20)\d{2}\b")
+
+
+def _syllables(word: str) -> int:
+    return max(1, len(_VOWELS.findall(word)) - (1 if word.lower().endswith('e') and len(word) > 3 else 0))
+
+
+def _citation_ids(text: str) -> List[int]:
+    """[1], [2, 3], [4-6] → 번호 목록"""
+    ids = []
+    for match in _NUMERIC_CITATION.finditer(text):
+        for part in re.split(r"\s*,\s*", match.group(1)):
+            bounds = re.split(r"\s*[-–]\s*", part)
+            if len(bounds) == 2 and int(bounds[1]) - int(bounds[0]) < 50:
+                ids.extend(range(int(bounds[0]), int(bounds[1]) + 1))
+            else:
+                ids.append(int(bounds[0]))
+    return ids
+
+
+def extract_features(paper: str) -> Dict[str, float]:
+    """논문 → 특징 (FEATURES 순서의 dict)"""
+    sections = split_sections(paper)
+    kinds = {s.kind for s in sections if s.body.strip()}
+    references = "".join(s.body for s in sections if s.kind == 'references')
+    body = "".join(s.text for s in sections if s.kind != 'references')
+    summary = "".join(s.body for s in sections if s.kind in ('abstract', 'conclusion'))
+    evidence = "".join(s.body for s in sections if s.kind in ('results', 'data', 'methods', 'discussion'))
+
+    words = _WORD.findall(body)
+    n_words = len(words)
+    per_k = 1000.0 / max(n_words, 1)
+    english = [w for w in words if w.isascii()]
+
+    sentences = [s for s in _SENTENCE.split(body) if _WORD.search(s)]
+    lengths = [len(_WORD.findall(s)) for s in sentences] or [0]
+    words_per_sentence = sum(lengths) / len(lengths)
+    syllables_per_word = sum(_syllables(w) for w in english) / len(english) if english else 0.0
+    flesch = 206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word if english else 0.0
+
+    claims = {m.group(1) or m.group(2) for m in _CLAIM.finditer(summary)}
+    supported = {m.group(1) or m.group(2) for m in _CLAIM.finditer(evidence)}
+
+    cited = set(_citation_ids(body))
+    listed = {int(m.group(1) or m.group(2)) for m in _REFERENCE_ENTRY.finditer(references) if m.group(1) or m.group(2)}
+    entries = [line for line in references.splitlines() if _REFERENCE_ENTRY.match(line)]
+
+    features = {f"has_{kind}": float(kind in kinds) for kind in SECTION_KINDS}
+    features.update({
+        'log_words': math.log1p(n_words),
+        'sections': float(sum(1 for s in sections if s.level)),
+        'citation_density': (len(_NUMERIC_CITATION.findall(body)) + len(_AUTHOR_CITATION.findall(body))) * per_k,
+        'number_density': len(_NUMBER.findall(body)) * per_k,
+        'claim_consistency': len(claims & supported) / len(claims) if claims else 1.0,
+        'sentence_words': words_per_sentence,
+        'long_sentences': sum(1 for n in lengths if n > 35) / len(lengths),
+        'flesch': max(-1.0, min(1.5, flesch / 100.0)),
+        'non_ascii': sum(1 for c in body if not c.isascii() and c.isalpha()) / max(1, sum(c.isalpha() for c in body)),
+        'log_references': math.log1p(len(entries)),
+        'missing_references': len(cited - listed) / len(cited) if cited and listed else float(bool(cited)),
+        'uncited_references': len(listed - cited) / len(listed) if listed else 0.0,
+        'dated_references': sum(1 for e in entries if _YEAR.search(e)) / len(entries) if entries else 0.0,
+    })
+    return features
+
+
+# =============================================================================
+# Ridge 회귀 (항목 수십 개, 표본 수십 개 → 순수 Python)
+# =============================================================================
+
+def _inverse(matrix: List[List[float]]) -> List[List[float]]:
+    """Gauss-Jordan 역행렬 (부분 피벗)"""
+    n = len(matrix)
+    a = [row[:] + [float(i == j) for j in range(n)] for i, row in enumerate(matrix)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(a[r][col]))
+        a[col], a[pivot] = a[pivot], a[col]
+        p = a[col][col]
+        a[col] = [v / p for v in a[col]]
+        for r in range(n):
+            if r != col and a[r][col]:
+                factor = a[r][col]
+                a[r] = [v - factor * w for v, w in zip(a[r], a[col])]
+    return [row[n:] for row in a]
+
+
+@dataclass
+class Prescore:
+    """예측 결과"""
+    scores: Dict[str, float]
+    total: float
+    total_std: float           # leave-one-out 총점 오차 표준편차 (학습 전이면 inf)
+    samples: int               # 학습 표본 수 (0: 학습 전)
+    features: Dict[str, float] = field(default_factory=dict)
+    elapsed_ms: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'scores': {k: round(v, 2) for k, v in self.scores.items()},
+            'total': round(self.total, 2),
+            'total_std': round(self.total_std, 2) if math.isfinite(self.total_std) else None,
+            'samples': self.samples,
+            'elapsed_ms': round(self.elapsed_ms, 3),
+        }
+
+
+class PreScorer:
+    """
+    심사 점수 예측기
+
+    사용 예:
+        prescorer = PreScorer(RUBRIC, "workspace/prescorer.json")
+        prescorer.fit_history("workspace/history")       # 바뀐 경우만 재학습
+        prescore = prescorer.predict(paper)
+        judge, reason = prescorer.gate(prescore, best_score)
+    """
+
+    def __init__(self, rubric: Dict[str, Any], model_path=None, alpha: float = 1.0, min_samples: int = 8):
+        """
+        Args:
+            rubric: 심사 기준 (max가 있는 항목만 예측)
+            model_path: 학습 결과 JSON (None이면 메모리에만 보관)
+            alpha: ridge 계수
+            min_samples: 이 수보다 표본이 적으면 예측만 하고 심사를 건너뛰지 않음
+        """
+        self.maxima = {k: float(v['max']) for k, v in rubric.items() if v.get('max')}
+        self.model_path = Path(model_path) if model_path else None
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.model: Dict[str, Any] = {}
+        if self.model_path and self.model_path.exists():
+            try:
+                with open(self.model_path, 'r', encoding='utf-8') as f:
+                    self.model = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self.model = {}
+
+    @property
+    def samples(self) -> int:
+        return self.model.get('samples', 0)
+
+    def fit(self, records: Sequence[Tuple[Dict[str, float], Dict[str, float]]]) -> int:
+        """
+        (특징, 항목별 심사 점수) 목록으로 학습
+
+        Returns:
+            학습에 쓴 표본 수
+        """
+        rows = [([float(f.get(name, 0.0)) for name in FEATURES], scores)
+                for f, scores in records if all(c in scores for c in self.maxima)]
+        n, d = len(rows), len(FEATURES)
+        if n < 2:
+            self.model = {'samples': n}
+            return n
+
+        mean = [sum(r[0][j] for r in rows) / n for j in range(d)]
+        scale = [math.sqrt(sum((r[0][j] - mean[j]) ** 2 for r in rows) / n) or 1.0 for j in range(d)]
+        x = [[(r[0][j] - mean[j]) / scale[j] for j in range(d)] for r in rows]
+        gram = [[sum(row[i] * row[j] for row in x) + (self.alpha if i == j else 0.0) for j in range(d)]
+                for i in range(d)]
+        inverse = _inverse(gram)
+        # leave-one-out: e_i / (1 - h_ii), h_ii = 1/n + x_i' (X'X + aI)^-1 x_i
+        leverage = [1.0 / n + sum(row[i] * sum(inverse[i][j] * row[j] for j in range(d)) for i in range(d))
+                    for row in x]
+
+        criteria, loo_total = {}, [0.0] * n
+        for criterion in self.maxima:
+            y = [float(r[1][criterion]) for r in rows]
+            y_mean = sum(y) / n
+            xty = [sum(row[j] * (yi - y_mean) for row, yi in zip(x, y)) for j in range(d)]
+            weights = [sum(inverse[i][j] * xty[j] for j in range(d)) for i in range(d)]
+            loo = [(yi - y_mean - sum(w * v for w, v in zip(weights, row))) / max(1e-6, 1.0 - h)
+                   for row, yi, h in zip(x, y, leverage)]
+            loo_total = [t + e for t, e in zip(loo_total, loo)]
+            criteria[criterion] = {
+                'intercept': y_mean,
+                'weights': weights,
+                'loo_rmse': math.sqrt(sum(e * e for e in loo) / n),
+            }
+
+        self.model = {
+            'samples': n,
+            'features': list(FEATURES),
+            'mean': mean,
+            'scale': scale,
+            'criteria': criteria,
+            'total_std': math.sqrt(sum(e * e for e in loo_total) / n),
+        }
+        return n
+
+    def fit_history(self, history_dir) -> int:
+        """
+        history/iter_*.json 중 심사 패널 점수와 특징이 있는 기록으로 학습
+        (기록 목록이 바뀌지 않았으면 저장된 모델 사용)
+        """
+        paths = sorted(Path(history_dir).glob("iter_*.json"))
+        fingerprint = [f"{p.name}:{p.stat().st_size}:{p.stat().st_mtime_ns}" for p in paths]
+        if self.model.get('fingerprint') == fingerprint:
+            return self.samples
+
+        records = []
+        for path in paths:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    history = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            if history.get('prescored') or not history.get('features'):
+                continue
+            aggregated = history.get('aggregated', {})
+            scores = {c: aggregated[c]['score'] for c in self.maxima
+                      if isinstance(aggregated.get(c), dict) and isinstance(aggregated[c].get('score'), (int, float))}
+            records.append((history['features'], scores))
+
+        n = self.fit(records)
+        self.model['fingerprint'] = fingerprint
+        if self.model_path:
+            self.model_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.model_path, 'w', encoding='utf-8') as f:
+                json.dump(self.model, f, indent=2)
+        return n
+
+    def predict(self, paper: Optional[str] = None, features: Optional[Dict[str, float]] = None) -> Prescore:
+        """항목별 점수 예측 (학습 전이면 만점의 절반, 오차 inf)"""
+        started = time.perf_counter()
+        features = features if features is not None else extract_features(paper or "")
+
+        criteria = self.model.get('criteria')
+        if not criteria:
+            scores = {c: m / 2 for c, m in self.maxima.items()}
+            std = math.inf
+        else:
+            x = [(float(features.get(name, 0.0)) - m) / s
+                 for name, m, s in zip(self.model['features'], self.model['mean'], self.model['scale'])]
+            scores = {}
+            for criterion, maximum in self.maxima.items():
+                params = criteria[criterion]
+                value = params['intercept'] + sum(w * v for w, v in zip(params['weights'], x))
+                scores[criterion] = min(maximum, max(0.0, value))
+            std = self.model['total_std']
+
+        return Prescore(scores=scores, total=sum(scores.values()), total_std=std, samples=self.samples,
+                        features=features, elapsed_ms=(time.perf_counter() - started) * 1000)
+
+    def gate(self, prescore: Prescore, best_score: float, margin: float = 1.0) -> Tuple[bool, str]:
+        """
+        심사 패널에 보낼지 결정
+
+        예측 총점 + margin × 오차가 최고 점수에 못 미치면 보내지 않음
+        (표본이 min_samples보다 적으면 항상 보냄)
+
+        Returns:
+            (심사 여부, 이유)
+        """
+        if prescore.samples < self.min_samples:
+            return True, f"학습 표본 부족 ({prescore.samples}/{self.min_samples})"
+        upper = prescore.total + margin * prescore.total_std
+        if upper < best_score:
+            return False, f"예측 {prescore.total:.1f} (+{margin:g}σ {upper:.1f}) < 최고 점수 {best_score:.1f}"
+        return True, f"예측 {prescore.total:.1f} (+{margin:g}σ {upper:.1f}) ≥ 최고 점수 {best_score:.1f}"
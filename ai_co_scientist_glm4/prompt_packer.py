@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+Prompt Packer
+
+토큰 예산 기반 논문 프롬프트 구성
+- 로컬 토큰 카운트 (tiktoken이 있으면 사용, 없으면 휴리스틱)
+- 섹션 분할 및 심사 기준별 섹션 우선순위
+- 심사 기준별 토큰 예산을 관련 섹션에 배분
+- 우선순위가 낮은 섹션은 요약으로 압축 (요약은 내용 hash로 캐시)
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _ENCODING = None
+
+
+# GLM-4.7 컨텍스트 윈도우 (토큰)
+CONTEXT_WINDOW = 128000
+
+_ASCII_RUN = re.compile(r"[\x00-\x7f]+")
+
+
+def count_tokens(text: str) -> int:
+    """
+    토큰 수 계산
+
+    tiktoken이 없으면 휴리스틱 사용:
+    ASCII는 약 4자당 1토큰, 한글 등 비 ASCII 문자는 1자당 1토큰
+    """
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    ascii_chars = sum(len(run) for run in _ASCII_RUN.findall(text))
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+# 섹션 종류 판별 키워드 (제목 기준, 소문자, 앞에 있는 종류가 우선)
+SECTION_KEYWORDS = {
+    'abstract': ['abstract', 'summary', '초록', '요약'],
+    'introduction': ['introduction', 'background', 'motivation', '서론', '배경'],
+    'related': ['related work', 'literature', 'prior work', '선행', '관련 연구'],
+    'references': ['reference', 'bibliography', '참고문헌'],
+    'appendix': ['appendix', 'supplement', '부록'],
+    'conclusion': ['conclusion', 'future work', '결론'],
+    'discussion': ['discussion', 'limitation', 'implication', '논의', '한계'],
+    'results': ['result', 'finding', 'evaluation', 'analysis', '결과', '분석'],
+    'data': ['data', 'dataset', 'materials', '데이터'],
+    'methods': ['method', 'approach', 'design', 'procedure', 'experiment', '방법'],
+}
+
+# 심사 기준 → 섹션 종류별 우선순위
+CRITERION_SECTIONS = {
+    'practicality': {'abstract': 3, 'introduction': 3, 'discussion': 2, 'conclusion': 2},
+    'methodology': {'methods': 3, 'data': 2, 'abstract': 1, 'results': 1},
+    'data_quality': {'results': 3, 'data': 3, 'methods': 2},
+    'conclusion': {'conclusion': 3, 'discussion': 3, 'results': 2},
+    'readability': {'abstract': 2, 'introduction': 2, 'conclusion': 1},
+    'creativity': {'introduction': 2, 'related': 2, 'methods': 2, 'abstract': 2},
+    'ai_contribution': {'methods': 2, 'appendix': 1},
+}
+
+# 심사 기준별 배점 (예산 배분 비율)
+CRITERION_WEIGHTS = {
+    'practicality': 20,
+    'methodology': 20,
+    'data_quality': 25,
+    'conclusion': 10,
+    'readability': 5,
+    'creativity': 20,
+    'ai_contribution': 5,
+}
+
+# 어떤 기준에도 해당하지 않는 섹션의 기본 우선순위
+BASE_PRIORITY = 0.25
+
+# 이 우선순위 이상인 섹션은 예산이 부족해도 요약 대신 앞부분을 원문으로 보냄
+FULL_TEXT_PRIORITY = 2.0
+
+_ELLIPSIS = "\n\n[...]\n\n"
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$", re.MULTILINE)
+
+
+@dataclass
+class Section:
+    """논문 섹션"""
+    title: str
+    level: int
+    text: str                  # 제목 줄 포함
+    kind: str = 'other'
+
+    @property
+    def body(self) -> str:
+        """제목 줄을 제외한 본문"""
+        if not self.level:
+            return self.text
+        return self.text.split("\n", 1)[1] if "\n" in self.text else ""
+
+
+@dataclass
+class PackedPaper:
+    """예산에 맞게 구성된 논문"""
+    text: str
+    tokens: int
+    budget: int
+    full: List[str] = field(default_factory=list)
+    truncated: List[str] = field(default_factory=list)
+    summarized: List[str] = field(default_factory=list)
+
+
+def classify_section(title: str) -> str:
+    """섹션 제목 → 섹션 종류"""
+    lowered = title.lower()
+    for kind, keywords in SECTION_KEYWORDS.items():
+        if any(keyword in lowered for keyword in keywords):
+            return kind
+    return 'other'
+
+
+def split_sections(paper: str, max_level: int = 2) -> List[Section]:
+    """
+    Markdown 제목(#, ##) 기준으로 섹션 분할
+
+    Args:
+        paper: 논문 내용
+        max_level: 분할할 최대 제목 단계 (더 깊은 제목은 상위 섹션에 포함)
+
+    Returns:
+        섹션 목록 (이어 붙이면 원문과 동일)
+    """
+    headings = [m for m in _HEADING.finditer(paper) if len(m.group(1)) <= max_level]
+    # 첫 제목만 '#'이면 논문 제목으로 간주
+    has_title = bool(headings) and len(headings[0].group(1)) == 1 and all(
+        len(m.group(1)) > 1 for m in headings[1:]
+    )
+
+    sections = []
+    if not headings or headings[0].start() > 0:
+        end = headings[0].start() if headings else len(paper)
+        if paper[:end].strip() or not headings:
+            sections.append(Section(title="", level=0, text=paper[:end], kind='abstract'))
+
+    for i, match in enumerate(headings):
+        end = headings[i + 1].start() if i + 1 < len(headings) else len(paper)
+        title = match.group(2).strip()
+        sections.append(Section(
+            title=title,
+            level=len(match.group(1)),
+            text=paper[match.start():end],
+            kind='front' if has_title and i == 0 else classify_section(title),
+        ))
+
+    # 제목이 종류를 드러내지 않는 하위 섹션은 상위 섹션의 종류를 따름
+    parents: List[Section] = []
+    for section in sections:
+        while parents and parents[-1].level >= section.level:
+            parents.pop()
+        if section.kind == 'other' and parents and parents[-1].kind != 'front':
+            section.kind = parents[-1].kind
+        if section.level:
+            parents.append(section)
+
+    return sections
+
+
+def extractive_summary(text: str, max_tokens: int = 120) -> str:
+    """
+    추출 요약 (API 호출 없음)
+
+    문단마다 첫 문장을 모아 max_tokens 이내로 자름
+    """
+    sentences = []
+    used = 0
+    for paragraph in re.split(r"\n\s*\n", text.strip()):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph or paragraph.startswith(("|", "```")):
+            continue
+        first = re.split(r"(?<=[.!?。])\s", paragraph, maxsplit=1)[0]
+        cost = count_tokens(first)
+        if used + cost > max_tokens:
+            break
+        sentences.append(first)
+        used += cost
+    return " ".join(sentences)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """문단 경계에서 max_tokens 이내로 자름 (생략 표시 포함)"""
+    if count_tokens(text) <= max_tokens:
+        return text
+    kept = []
+    used = count_tokens(_ELLIPSIS)
+    for paragraph in re.split(r"(\n\s*\n)", text):
+        cost = count_tokens(paragraph)
+        if used + cost > max_tokens:
+            break
+        kept.append(paragraph)
+        used += cost
+    return "".join(kept).rstrip() + _ELLIPSIS
+
+
+class PromptPacker:
+    """
+    토큰 예산 기반 논문 구성기
+
+    예산을 심사 기준 배점 비율로 나누고, 각 기준의 몫을 해당 기준과
+    관련된 섹션에 우선순위 비율로 배분한다. 배분량 안에 들어가는
+    섹션은 원문, 넘치는 섹션은 우선순위에 따라 잘린 원문 또는 요약으로
+    들어간다. 남는 예산은 우선순위가 높은 섹션부터 다시 사용한다.
+    """
+
+    def __init__(
+        self,
+        summarizer: Optional[Callable[[str, int], str]] = None,
+        summary_tokens: int = 120
+    ):
+        """
+        Args:
+            summarizer: (섹션 본문, 최대 토큰) → 요약 (기본: 추출 요약)
+            summary_tokens: 섹션 요약 최대 토큰 수
+        """
+        self.summarizer = summarizer or extractive_summary
+        self.summary_tokens = summary_tokens
+        self._summaries: Dict[str, str] = {}
+
+    def summary_text(self, section: Section) -> str:
+        """요약으로 대체된 섹션 (제목 줄 유지)"""
+        heading = section.text.split("\n", 1)[0] + "\n" if section.level else ""
+        summary = self.summarize(section)
+        return f"{heading}[요약] {summary}\n\n" if summary else heading
+
+    def summarize(self, section: Section) -> str:
+        """섹션 요약 (내용 hash로 캐시)"""
+        key = hashlib.sha256(section.text.encode('utf-8')).hexdigest()
+        if key not in self._summaries:
+            self._summaries[key] = self.summarizer(section.body, self.summary_tokens)
+        return self._summaries[key]
+
+    @staticmethod
+    def priorities(sections: List[Section], criteria: Optional[List[str]] = None) -> List[float]:
+        """섹션별 우선순위 (대상 기준들의 배점 가중 합)"""
+        criteria = criteria or list(CRITERION_SECTIONS)
+        total_weight = sum(CRITERION_WEIGHTS.get(c, 1) for c in criteria)
+        result = []
+        for section in sections:
+            score = sum(
+                CRITERION_WEIGHTS.get(c, 1) * CRITERION_SECTIONS.get(c, {}).get(section.kind, 0)
+                for c in criteria
+            ) / total_weight
+            result.append(max(score, BASE_PRIORITY))
+        return result
+
+    def allocate(
+        self,
+        sections: List[Section],
+        budget: int,
+        criteria: Optional[List[str]] = None
+    ) -> List[float]:
+        """
+        심사 기준별 예산을 섹션에 배분
+
+        Returns:
+            섹션별 토큰 배분량
+        """
+        criteria = criteria or list(CRITERION_SECTIONS)
+        total_weight = sum(CRITERION_WEIGHTS.get(c, 1) for c in criteria)
+        allocation = [0.0] * len(sections)
+
+        for criterion in criteria:
+            share = budget * CRITERION_WEIGHTS.get(criterion, 1) / total_weight
+            wanted = CRITERION_SECTIONS.get(criterion, {})
+            weights = [wanted.get(s.kind, 0) or BASE_PRIORITY for s in sections]
+            weight_sum = sum(weights)
+            for i, weight in enumerate(weights):
+                allocation[i] += share * weight / weight_sum
+
+        return allocation
+
+    def pack(
+        self,
+        paper: str,
+        budget: int,
+        criteria: Optional[List[str]] = None
+    ) -> PackedPaper:
+        """
+        논문을 토큰 예산에 맞게 구성
+
+        Args:
+            paper: 논문 내용
+            budget: 논문에 쓸 최대 토큰 수
+            criteria: 대상 심사 기준 (기본: 전체)
+
+        Returns:
+            구성된 논문
+        """
+        total = count_tokens(paper)
+        sections = split_sections(paper)
+        if total <= budget:
+            return PackedPaper(text=paper, tokens=total, budget=budget,
+                               full=[s.title for s in sections])
+
+        priorities = self.priorities(sections, criteria)
+        allocation = self.allocate(sections, budget, criteria)
+        costs = [count_tokens(s.text) for s in sections]
+
+        chosen: List[Optional[str]] = [None] * len(sections)
+        packed = PackedPaper(text="", tokens=0, budget=budget)
+
+        # 1. 배분량 안에 들어가는 섹션은 원문, 남는 예산은 모음
+        pool = 0.0
+        for i, cost in enumerate(costs):
+            if cost <= allocation[i]:
+                chosen[i] = sections[i].text
+                pool += allocation[i] - cost
+                packed.full.append(sections[i].title)
+
+        # 2. 나머지는 우선순위 순으로 원문 / 잘린 원문 / 요약
+        order = sorted(range(len(sections)), key=lambda i: priorities[i], reverse=True)
+        for i in order:
+            if chosen[i] is not None:
+                continue
+            section = sections[i]
+            available = allocation[i] + pool
+
+            if costs[i] <= available:
+                chosen[i] = section.text
+                packed.full.append(section.title)
+            else:
+                summary = self.summary_text(section)
+                if priorities[i] >= FULL_TEXT_PRIORITY or available >= 2 * count_tokens(summary):
+                    chosen[i] = truncate_to_tokens(section.text, int(available))
+                    packed.truncated.append(section.title)
+                else:
+                    chosen[i] = truncate_to_tokens(summary, int(available))
+                    packed.summarized.append(section.title)
+
+            pool = max(0.0, available - count_tokens(chosen[i]))
+
+        # 3. 남은 예산으로 잘리거나 요약된 섹션을 원문 쪽으로 확장
+        for i in order:
+            if pool < 1 or sections[i].title in packed.full:
+                continue
+            current = count_tokens(chosen[i])
+            if sections[i].title in packed.summarized and current + pool < 2 * current:
+                continue
+            expanded = truncate_to_tokens(sections[i].text, int(current + pool))
+            used = count_tokens(expanded)
+            if used > current:
+                if sections[i].title in packed.summarized:
+                    packed.summarized.remove(sections[i].title)
+                    packed.truncated.append(sections[i].title)
+                chosen[i] = expanded
+                pool -= used - current
+
+        packed.text = "".join(chosen)
+        packed.tokens = count_tokens(packed.text)
+        return packed
+
+
+def paper_budget(template: str, max_tokens: int, context_window: int = CONTEXT_WINDOW,
+                 limit: Optional[int] = None) -> int:
+    """
+    프롬프트 템플릿과 응답 길이를 뺀 논문용 토큰 예산
+
+    Args:
+        template: 논문을 제외한 프롬프트
+        max_tokens: 응답 최대 토큰 수
+        context_window: 모델 컨텍스트 윈도우
+        limit: 비용 제한을 위한 상한 (없으면 컨텍스트 윈도우 전체)
+    """
+    budget = context_window - count_tokens(template) - max_tokens
+    return max(0, min(budget, limit) if limit else budget)
+
+
+def plan_section_revision(
+    paper: str,
+    criteria: List[str],
+    output_budget: int,
+    packer: Optional[PromptPacker] = None
+) -> Tuple[str, List[str]]:
+    """
+    약점 기준과 관련된 섹션만 수정하도록 프롬프트용 논문 구성
+
+    응답 길이(output_budget) 안에 다시 쓸 수 있는 만큼 우선순위가 높은
+    섹션을 원문으로 고르고, 나머지 섹션은 요약으로 보낸다.
+
+    Args:
+        paper: 현재 논문
+        criteria: 개선 대상 심사 기준
+        output_budget: 수정 섹션에 쓸 수 있는 응답 토큰 수
+        packer: 요약에 사용할 PromptPacker
+
+    Returns:
+        (프롬프트용 논문, 수정 대상 섹션 제목 목록)
+    """
+    packer = packer or PromptPacker()
+    sections = split_sections(paper)
+    targets = revision_targets(sections, criteria, output_budget)
+
+    context = "".join(
+        s.text if i in targets or s.kind == 'front' else packer.summary_text(s)
+        for i, s in enumerate(sections)
+    )
+    return context, [sections[i].title for i in targets]
+
+
+def revision_targets(sections: List[Section], criteria: List[str], output_budget: int) -> List[int]:
+    """
+    다시 쓸 섹션 선택 (약점 기준 관련도 순으로 응답 길이 안에 들어가는 만큼)
+
+    Returns:
+        수정 대상 섹션 index (논문 순서)
+    """
+    priorities = PromptPacker.priorities(sections, criteria)
+
+    targets = []
+    used = 0
+    for i in sorted(range(len(sections)), key=lambda i: priorities[i], reverse=True):
+        if not sections[i].level or sections[i].kind == 'front':
+            continue
+        cost = count_tokens(sections[i].text)
+        if used + cost <= output_budget:
+            targets.append(i)
+            used += cost
+    return sorted(targets)
+
+
+def apply_section_revision(paper: str, response: str, targets: List[str]) -> str:
+    """
+    응답에 있는 수정 섹션을 제목 기준으로 원문에 반영
+
+    응답에 없거나 대상이 아닌 섹션은 원문 그대로 유지한다.
+    """
+    revised = {
+        s.title: s.text for s in split_sections(response)
+        if s.level and s.title in targets
+    }
+    result = []
+    for section in split_sections(paper):
+        text = revised.get(section.title, section.text)
+        if text is not section.text and not text.endswith("\n\n"):
+            text = text.rstrip("\n") + "\n\n"
+        result.append(text)
+    return "".join(result)
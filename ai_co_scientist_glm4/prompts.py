@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Prompts
+
+프롬프트 템플릿 레지스트리
+- 템플릿은 등록 시 한 번만 컴파일 (들여쓰기 정리 + 변수 위치 파싱)
+- 심사 기준, 지시사항 같은 고정 내용은 system 프롬프트에 두고 바이트 단위로 고정
+  → 같은 system 프롬프트를 쓰는 호출끼리 provider prefix cache 적중
+- 논문 등 바뀌는 내용은 user 프롬프트 마지막에 배치
+- 템플릿 버전 = 템플릿 원문 hash (프롬프트를 고치면 버전이 바뀌어 로컬 캐시 key도 바뀜)
+"""
+
+import hashlib
+import json
+import textwrap
+import threading
+from dataclasses import dataclass
+from string import Formatter
+from typing import Any, Dict, List, Optional, Tuple
+
+from json_extract import EVALUATION_SCHEMA
+
+
+def _normalize(text: str) -> str:
+    """들여쓰기와 앞뒤 공백, 줄 끝 공백 정리 (호출 위치와 무관하게 같은 바이트열)"""
+    lines = textwrap.dedent(text).strip("\n").splitlines()
+    return "\n".join(line.rstrip() for line in lines).strip() + "\n"
+
+
+def _compile(text: str) -> List[Tuple[str, Optional[str]]]:
+    """템플릿 → [(리터럴, 변수명 또는 None)]"""
+    parts = []
+    for literal, field_name, format_spec, conversion in Formatter().parse(text):
+        if field_name is not None and (format_spec or conversion):
+            raise ValueError(f"템플릿 변수에는 형식 지정을 쓸 수 없습니다: {field_name}")
+        parts.append((literal, field_name or None))
+    return parts
+
+
+def _render(parts: List[Tuple[str, Optional[str]]], values: Dict[str, Any], name: str) -> str:
+    out = []
+    for literal, field_name in parts:
+        out.append(literal)
+        if field_name is not None:
+            if field_name not in values:
+                raise KeyError(f"프롬프트 '{name}'에 변수 '{field_name}'가 없습니다")
+            out.append(str(values[field_name]))
+    return "".join(out)
+
+
+def _fields(parts: List[Tuple[str, Optional[str]]]) -> List[str]:
+    return [field_name for _, field_name in parts if field_name is not None]
+
+
+@dataclass(frozen=True)
+class RenderedPrompt:
+    """렌더링된 프롬프트"""
+    name: str
+    version: str
+    system: str
+    user: str
+
+    @property
+    def key(self) -> str:
+        """로컬 캐시 key (템플릿 버전 + 내용)"""
+        digest = hashlib.sha256(f"{self.name}@{self.version}\n".encode('utf-8'))
+        digest.update(self.system.encode('utf-8'))
+        digest.update(b"\x00")
+        digest.update(self.user.encode('utf-8'))
+        return digest.hexdigest()
+
+    @property
+    def text(self) -> str:
+        """system 지원이 없는 호출용 단일 프롬프트 (system이 앞에 오므로 접두부는 동일)"""
+        return f"{self.system}\n{self.user}" if self.system else self.user
+
+
+class PromptTemplate:
+    """
+    컴파일된 프롬프트 템플릿
+
+    system 변수는 심사 기준처럼 호출마다 바뀌지 않는 값만 받으며, 렌더링
+    결과는 값별로 캐시된다. user 변수는 매 호출마다 렌더링된다.
+    """
+
+    def __init__(self, name: str, system: str, user: str):
+        self.name = name
+        self.system_source = _normalize(system) if system.strip() else ""
+        self.user_source = _normalize(user)
+        self.version = hashlib.sha256(
+            f"{name}\n{self.system_source}\x00{self.user_source}".encode('utf-8')
+        ).hexdigest()[:12]
+
+        self._system = _compile(self.system_source)
+        self._user = _compile(self.user_source)
+        self.system_fields = _fields(self._system)
+        self.user_fields = _fields(self._user)
+
+        self._system_cache: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def system(self, **static: Any) -> str:
+        """system 프롬프트 (같은 값이면 같은 문자열 객체 반환)"""
+        values = {k: static[k] for k in self.system_fields if k in static}
+        cache_key = json.dumps(values, sort_keys=True, ensure_ascii=False, default=str)
+        cached = self._system_cache.get(cache_key)
+        if cached is None:
+            cached = _render(self._system, values, self.name)
+            with self._lock:
+                cached = self._system_cache.setdefault(cache_key, cached)
+        return cached
+
+    def user(self, **values: Any) -> str:
+        """user 프롬프트 (바뀌는 내용)"""
+        return _render(self._user, values, self.name)
+
+    def render(self, **values: Any) -> RenderedPrompt:
+        """
+        프롬프트 렌더링
+
+        Args:
+            **values: system 변수와 user 변수 (이름으로 구분)
+        """
+        return RenderedPrompt(
+            name=self.name,
+            version=self.version,
+            system=self.system(**values),
+            user=self.user(**values),
+        )
+
+
+class PromptRegistry:
+    """프롬프트 템플릿 레지스트리"""
+
+    def __init__(self):
+        self._templates: Dict[str, PromptTemplate] = {}
+
+    def register(self, name: str, system: str, user: str) -> PromptTemplate:
+        """템플릿 등록 (컴파일은 여기서 한 번만)"""
+        template = PromptTemplate(name, system, user)
+        self._templates[name] = template
+        return template
+
+    def get(self, name: str) -> PromptTemplate:
+        if name not in self._templates:
+            raise KeyError(f"등록되지 않은 프롬프트: {name}")
+        return self._templates[name]
+
+    def render(self, name: str, **values: Any) -> RenderedPrompt:
+        return self.get(name).render(**values)
+
+    def versions(self) -> Dict[str, str]:
+        """{템플릿 이름: 버전}"""
+        return {name: t.version for name, t in sorted(self._templates.items())}
+
+
+def rubric_text(rubric: Dict[str, Any]) -> str:
+    """심사 기준 목록 (system 프롬프트용, 같은 rubric이면 같은 문자열)"""
+    lines = []
+    for i, (criterion, spec) in enumerate(rubric.items(), 1):
+        if not isinstance(spec, dict):
+            continue
+        points = f"{spec['max']}점" if 'max' in spec else "Pass/Fail"
+        lines.append(f"{i}. {spec.get('name', criterion)} ({points}): {spec.get('description', '')}")
+    return "\n".join(lines)
+
+
+def response_format(rubric: Dict[str, Any]) -> str:
+    """심사 응답 JSON 형식 (system 프롬프트용)"""
+    lines = ["{"]
+    for criterion, spec in rubric.items():
+        if not isinstance(spec, dict):
+            continue
+        if 'max' in spec:
+            lines.append(f'    "{criterion}": {{"score": 0-{spec["max"]}, '
+                         f'"reason": "점수를 준 이유", "improvement": "개선 방안"}},')
+        else:
+            lines.append(f'    "{criterion}": {{"pass": true/false, "reason": "PASS/FAIL 이유"}},')
+    total = sum(spec['max'] for spec in rubric.values() if isinstance(spec, dict) and 'max' in spec)
+    lines.append(f'    "total_score": 0-{total},')
+    lines.append('    "summary": "전체 평가 요약",')
+    lines.append('    "top_weaknesses": ["...", "..."],')
+    lines.append('    "top_improvements": ["...", "..."]')
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def evaluation_values(rubric: Dict[str, Any]) -> Dict[str, str]:
+    """evaluation 템플릿의 system 변수 (심사 기준이 없으면 기본 스키마 사용)"""
+    if not rubric:
+        rubric = {criterion: {'max': max_score} for criterion, max_score in EVALUATION_SCHEMA.items()}
+        rubric['ai_contribution'] = {'type': 'pass_fail', 'description': 'AI가 충분히 기여했는가'}
+    return {'rubric': rubric_text(rubric), 'response_format': response_format(rubric)}
+
+
+# 기본 레지스트리
+registry = PromptRegistry()
+
+registry.register(
+    "evaluation",
+    system="""
+    당신은 2026 AI Co-Scientist Challenge Korea의 전문 심사위원입니다.
+    사용자가 제출한 연구보고서를 아래 심사 기준에 따라 객관적으로 평가하세요.
+
+    === 심사 기준 ===
+    {rubric}
+
+    === 응답 형식 ===
+    반드시 다음 JSON 형식으로만 응답하세요:
+
+    {response_format}
+    """,
+    user="""
+    === 연구보고서 ===
+    {paper}
+    {note}
+    """,
+)
+
+registry.register(
+    "research.paper",
+    system="""
+    당신은 연구보고서를 작성하는 AI 연구원입니다.
+    사용자가 제시한 연구 주제와 관련 논문을 바탕으로 학술 논문 형태의 연구보고서를 작성하세요.
+
+    다음 섹션을 포함해야 합니다:
+    1. Title
+    2. Abstract (250-300 words)
+    3. Keywords (3-5개)
+    4. Introduction
+    5. Related Work
+    6. Methodology
+    7. Results
+    8. Discussion
+    9. Conclusion
+    10. References
+
+    영문으로 작성하세요.
+    """,
+    user="""
+    연구 주제: {topic}
+
+    관련 논문:
+    {related}
+    """,
+)
+
+registry.register(
+    "research.ai_usage",
+    system="""
+    당신은 대회 제출용 AI 활용보고서를 작성합니다.
+    이 연구에서 AI(glm 4.7)를 다음과 같이 활용했다는 내용의 보고서를 작성하세요:
+
+    - 문헌 검색 및 분석
+    - 연구보고서 작성
+    - 데이터 분석
+    - 결과 해석
+
+    다음 형식으로 작성:
+    1. AI 활용 체크리스트
+    2. AI 상호작용 로그
+    3. AI 기여도 자체 평가 (50% 이상)
+    4. 활용 URL 목록
+    """,
+    user="""
+    연구 주제: {topic}
+    """,
+)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter
+
+API 호출 속도 제한
+- 분당 요청 수 (토큰 버킷)
+- 동시 요청 수 (세마포어)
+- 여러 스레드에서 공유 (배치 평가 시 모든 호출이 같은 제한을 따름)
+- 동시 실행 슬롯은 lease로 받아 다른 스레드에서도 반납 가능 (timeout으로 버린 호출)
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+class Lease:
+    """동시 실행 슬롯 1개 (release()는 여러 번, 어느 스레드에서 불러도 한 번만 반납)"""
+
+    def __init__(self, semaphore: threading.BoundedSemaphore):
+        self._semaphore = semaphore
+        self._released = False
+        self._lock = threading.Lock()
+
+    def release(self) -> None:
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self._semaphore.release()
+
+    def __enter__(self) -> "Lease":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class RateLimiter:
+    """
+    토큰 버킷 + 동시 실행 제한
+
+    사용 예:
+        limiter = RateLimiter(requests_per_minute=60, max_concurrent=4)
+        with limiter.slot():
+            client.chat.completions.create(...)
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = 60, max_concurrent: int = 4):
+        """
+        Args:
+            requests_per_minute: 분당 최대 요청 수 (None이면 제한 없음)
+            max_concurrent: 동시에 진행 중인 최대 요청 수
+        """
+        self.rate = requests_per_minute / 60.0 if requests_per_minute else None
+        self.capacity = max(1.0, float(max_concurrent))
+        self.max_concurrent = max_concurrent
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+
+        self.requests = 0
+        self.waited_s = 0.0
+
+    def acquire(self) -> float:
+        """
+        요청 1개 허가 (토큰이 없으면 대기)
+
+        Returns:
+            대기한 시간 (초)
+        """
+        if self.rate is None:
+            with self._lock:
+                self.requests += 1
+            return 0.0
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    self.requests += 1
+                    self.waited_s += waited
+                    return waited
+                delay = (1.0 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def lease(self) -> Lease:
+        """동시 실행 슬롯 + 요청 허가 (반환된 Lease를 release해야 슬롯이 반납됨)"""
+        self._semaphore.acquire()
+        try:
+            self.acquire()
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return Lease(self._semaphore)
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """동시 실행 슬롯 + 요청 허가"""
+        with self.lease():
+            yield
+
+    def stats(self) -> dict:
+        """누적 통계"""
+        return {
+            'requests': self.requests,
+            'waited_s': round(self.waited_s, 3),
+            'requests_per_minute': self.rate * 60 if self.rate else None,
+            'max_concurrent': self.max_concurrent,
+        }
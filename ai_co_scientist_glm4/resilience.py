@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Resilience
+
+느린/불안정한 LLM 호출의 꼬리 지연 제어
+- LatencyHistogram: 최근 지연시간 분포 → 적응형 timeout, hedge 시점 (p95)
+- CircuitBreaker: 연속 실패한 endpoint 호출 중단 후 일정 시간 뒤 재시도 (half-open)
+- hedged_call: p95가 지나도 응답이 없으면 같은 요청을 한 번 더 보내고 먼저 온 결과 사용
+  (rate limiter 대기 시간은 hedge/timeout에 넣지 않고, 버린 호출의 슬롯은 바로 반납)
+- iter_with_timeout: 스트리밍 응답의 첫 조각/조각 사이 대기 시간 제한
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Executor, Future, wait
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, Optional, Tuple, TypeVar
+
+T = TypeVar('T')
+
+
+class CircuitOpenError(Exception):
+    """circuit이 열려 호출하지 않음"""
+
+
+class StreamInterruptedError(Exception):
+    """스트림이 조각을 내보낸 뒤 끊김 (내보낸 조각은 되돌릴 수 없어 호출자가 다시 요청해야 함)"""
+
+
+class LatencyHistogram:
+    """
+    최근 지연시간 (초) 분포
+
+    표본이 min_samples보다 적으면 기본값을 사용한다.
+    """
+
+    def __init__(
+        self,
+        window: int = 200,
+        min_samples: int = 10,
+        default_timeout: float = 120.0,
+        min_timeout: float = 5.0,
+        max_timeout: float = 240.0,
+        timeout_factor: float = 3.0
+    ):
+        """
+        Args:
+            window: 유지할 최근 표본 수
+            min_samples: 분포를 신뢰하기 위한 최소 표본 수
+            default_timeout: 표본이 부족할 때 timeout (초)
+            min_timeout: timeout 하한 (초)
+            max_timeout: timeout 상한 (초)
+            timeout_factor: timeout = p99 × factor
+        """
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_factor = timeout_factor
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """q 백분위 (표본 부족 시 None)"""
+        with self._lock:
+            if len(self.samples) < self.min_samples:
+                return None
+            ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(q / 100.0 * len(ordered)))
+        return ordered[index]
+
+    def timeout(self) -> float:
+        """적응형 timeout (p99 × factor, [min, max]로 제한)"""
+        p99 = self.percentile(99)
+        if p99 is None:
+            return self.default_timeout
+        return min(self.max_timeout, max(self.min_timeout, p99 * self.timeout_factor))
+
+    def hedge_delay(self) -> Optional[float]:
+        """hedge 요청을 보낼 시점 (p95, 표본 부족 시 None = hedge 안 함)"""
+        return self.percentile(95)
+
+
+class CircuitBreaker:
+    """
+    circuit breaker
+
+    closed    : 정상 호출
+    open      : failure_threshold번 연속 실패 → cooldown 동안 호출 차단
+    half_open : cooldown 후 시험 호출 1개 허용, 성공하면 closed, 실패하면 다시 open
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 30.0):
+        """
+        Args:
+            failure_threshold: circuit을 여는 연속 실패 횟수
+            cooldown: open 유지 시간 (초)
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self._probe = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """호출 허용 여부"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+                self._probe = False
+            if self.state == self.HALF_OPEN and not self._probe:
+                self._probe = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.trips += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._probe = False
+
+    def stats(self) -> Dict[str, object]:
+        return {'state': self.state, 'failures': self.failures, 'trips': self.trips}
+
+
+class CallTicket:
+    """
+    hedged_call이 fn에 넘기는 호출 1개의 상태
+
+    fn은 대기(rate limiter 등)가 끝나 실제 요청을 보내기 직전에 start()를 호출한다.
+    hedge/timeout 시간은 start 이후부터 잰다. 버려진 호출(timeout, hedge에서 진 호출)은
+    start에 넘긴 자원(release()가 있는 객체, 예: RateLimiter.lease())을 바로 반납한다.
+    """
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.abandoned = False
+        self._resource: Any = None
+        self._lock = threading.Lock()
+
+    def start(self, resource: Any = None) -> None:
+        """
+        요청 시작 알림
+
+        Raises:
+            CancelledError: 대기 중에 호출이 버려짐 (resource는 반납됨)
+        """
+        with self._lock:
+            if self.abandoned:
+                if resource is not None:
+                    resource.release()
+                raise CancelledError("버려진 호출")
+            self._resource = resource
+        self.started.set()
+
+    def abandon(self) -> None:
+        """호출 버림 (결과를 기다리지 않음, 잡고 있던 자원 반납)"""
+        with self._lock:
+            self.abandoned = True
+            resource, self._resource = self._resource, None
+        if resource is not None:
+            resource.release()
+
+
+def hedged_call(
+    executor: Executor,
+    fn: Callable[[CallTicket], T],
+    hedge_delay: Optional[float],
+    timeout: float
+) -> Tuple[T, bool]:
+    """
+    hedged request
+
+    fn을 실행하고 요청 시작 후 hedge_delay가 지나도 끝나지 않으면 한 번 더 실행하여
+    먼저 성공한 결과를 반환한다. 늦게 끝난 호출의 결과는 버린다.
+
+    Args:
+        executor: 호출을 실행할 스레드 풀
+        fn: CallTicket을 받는 호출 (요청 직전에 ticket.start(), 시작 전 대기는 시간에서 제외)
+        hedge_delay: 두 번째 호출까지 대기 시간 (None이면 hedge 안 함)
+        timeout: 요청 시작 후 전체 대기 시간 상한 (초)
+
+    Returns:
+        (결과, hedge 요청을 보냈는지 여부)
+
+    Raises:
+        TimeoutError: timeout 안에 성공한 호출이 없음
+        Exception: 모든 호출이 실패하면 마지막 예외
+    """
+    tickets: Dict[Future, CallTicket] = {}
+
+    def submit() -> Future:
+        ticket = CallTicket()
+        future = executor.submit(fn, ticket)
+        # 시작 전에 실패해도 대기가 풀리도록
+        future.add_done_callback(lambda _: ticket.started.set())
+        tickets[future] = ticket
+        return future
+
+    pending = {submit()}
+    try:
+        next(iter(tickets.values())).started.wait()
+        deadline = time.monotonic() + timeout
+        hedged = False
+        error: Optional[BaseException] = None
+
+        if hedge_delay is not None and hedge_delay < timeout:
+            done, pending = wait(pending, timeout=hedge_delay)
+            result = _first_success(done)
+            if result is not None:
+                return result.result(), False
+            error = _first_error(done) or error
+            pending.add(submit())
+            hedged = True
+
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            result = _first_success(done)
+            if result is not None:
+                return result.result(), hedged
+            error = _first_error(done) or error
+
+        if pending:
+            raise TimeoutError(f"LLM 호출 timeout ({timeout:.1f}s)")
+        raise error
+    finally:
+        for future in pending:
+            tickets[future].abandon()
+
+
+def iter_with_timeout(items: Iterable[T], first_timeout: float, idle_timeout: float) -> Iterator[T]:
+    """
+    블로킹 iterator (스트리밍 응답)를 별도 스레드에서 읽어 대기 시간 제한
+
+    Args:
+        items: 읽을 iterator (close()가 있으면 timeout이나 중단 시 호출)
+        first_timeout: 첫 항목까지 대기 시간 상한 (초)
+        idle_timeout: 항목 사이 대기 시간 상한 (초)
+
+    Raises:
+        TimeoutError: 제한 시간 안에 다음 항목이 오지 않음
+        Exception: iterator가 낸 예외
+    """
+    done = object()
+    received: "queue.Queue[Tuple[Any, Optional[BaseException]]]" = queue.Queue()
+
+    def pump() -> None:
+        try:
+            for item in items:
+                received.put((item, None))
+            received.put((done, None))
+        except BaseException as e:
+            received.put((done, e))
+
+    threading.Thread(target=pump, name="stream-pump", daemon=True).start()
+    first = True
+    finished = False
+    try:
+        while True:
+            timeout = first_timeout if first else idle_timeout
+            try:
+                item, error = received.get(timeout=timeout)
+            except queue.Empty:
+                stage = "첫 조각" if first else "다음 조각"
+                raise TimeoutError(f"스트리밍 {stage} timeout ({timeout:.1f}s)")
+            if item is done:
+                finished = True
+                if error is not None:
+                    raise error
+                return
+            first = False
+            yield item
+    finally:
+        close = getattr(items, 'close', None)
+        if not finished and close is not None:
+            try:
+                close()
+            except Exception:
+                pass
+
+
+def _first_success(futures) -> Optional[Future]:
+    for future in futures:
+        if future.exception() is None:
+            return future
+    return None
+
+
+def _first_error(futures) -> Optional[BaseException]:
+    for future in futures:
+        if future.exception() is not None:
+            return future.exception()
+    return None
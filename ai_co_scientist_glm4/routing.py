@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Model Routing
+
+작업(route)별 모델 선택 (cascade)
+- 부담이 적은 작업 (AI 활용보고서, 데이터 목록, 요약, 1차 심사)은 glm-4-flash
+- 논문 작성/개선은 glm-4.7
+- 1차 심사 결과가 불확실하면 (JSON 오류, 누락 항목, 심사 간 점수 편차) glm-4.7로 재심사
+- route별 호출 수, 지연시간, 토큰, 비용 집계
+"""
+
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+
+@dataclass(frozen=True)
+class Route:
+    """작업별 모델 (escalate_to: 결과가 불확실할 때 다시 호출할 모델)"""
+    model: str
+    escalate_to: Optional[str] = None
+
+
+ROUTES: Dict[str, Route] = {
+    "research.paper": Route("glm-4.7"),
+    "research.ai_usage": Route("glm-4-flash"),
+    "research.data_list": Route("glm-4-flash"),
+    "summary": Route("glm-4-flash"),
+    "evaluation": Route("glm-4-flash", escalate_to="glm-4.7"),
+    "improve": Route("glm-4.7"),
+}
+
+
+class ModelRouter:
+    """
+    route → 모델 선택 및 route별 지표 집계
+
+    사용 예:
+        router = ModelRouter()
+        model = router.model("evaluation")            # glm-4-flash
+        reason = router.should_escalate(evaluations, schema)
+        if reason:
+            model = router.escalation("evaluation")   # glm-4.7
+    """
+
+    def __init__(
+        self,
+        routes: Optional[Dict[str, Any]] = None,
+        default_model: str = "glm-4.7",
+        spread_threshold: float = 0.25,
+        total_spread: float = 15.0
+    ):
+        """
+        Args:
+            routes: ROUTES 덮어쓰기 ({route: Route 또는 모델 이름})
+            default_model: 등록되지 않은 route의 모델
+            spread_threshold: 심사 간 항목 점수 편차 상한 (항목 만점 대비 비율)
+            total_spread: 심사 간 총점 편차 상한 (점)
+        """
+        self.routes = dict(ROUTES)
+        for name, route in (routes or {}).items():
+            self.routes[name] = route if isinstance(route, Route) else Route(route)
+        self.default_model = default_model
+        self.spread_threshold = spread_threshold
+        self.total_spread = total_spread
+        self._metrics: Dict[tuple, Dict[str, float]] = defaultdict(
+            lambda: {'calls': 0, 'latency_ms': 0.0, 'tokens': 0, 'cost_usd': 0.0}
+        )
+        self._escalations: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def model(self, route: Optional[str]) -> str:
+        """route의 1차 모델"""
+        if route in self.routes:
+            return self.routes[route].model
+        return self.default_model
+
+    def escalation(self, route: Optional[str]) -> Optional[str]:
+        """불확실할 때 재호출할 모델 (없으면 None)"""
+        target = self.routes.get(route)
+        if target is None or target.escalate_to in (None, target.model):
+            return None
+        return target.escalate_to
+
+    def should_escalate(self, evaluations: List[Dict[str, Any]], schema: Dict[str, float]) -> Optional[str]:
+        """
+        1차 심사 결과가 불확실한지 판단
+
+        Args:
+            evaluations: 심사 결과 목록 (validate_evaluation 이후)
+            schema: {항목: 만점}
+
+        Returns:
+            재심사 이유 (불필요하면 None)
+        """
+        if not evaluations:
+            return "no_evaluations"
+
+        for evaluation in evaluations:
+            if 'error' in evaluation:
+                return "invalid_json"
+            if evaluation.get('missing'):
+                return f"missing:{','.join(evaluation['missing'])}"
+
+        totals = []
+        for evaluation in evaluations:
+            totals.append(sum(evaluation[c]['score'] for c in schema if c in evaluation))
+        if max(totals) - min(totals) > self.total_spread:
+            return f"spread:total={max(totals) - min(totals):.1f}"
+
+        for criterion, max_score in schema.items():
+            scores = [e[criterion]['score'] for e in evaluations if criterion in e]
+            if len(scores) > 1 and max_score and (max(scores) - min(scores)) / max_score > self.spread_threshold:
+                return f"spread:{criterion}={max(scores) - min(scores):.1f}"
+
+        return None
+
+    def record(
+        self,
+        route: Optional[str],
+        model: str,
+        latency_ms: float,
+        tokens: int = 0,
+        cost_usd: float = 0.0
+    ) -> None:
+        """호출 1회 기록"""
+        with self._lock:
+            metrics = self._metrics[(route or "default", model)]
+            metrics['calls'] += 1
+            metrics['latency_ms'] += latency_ms
+            metrics['tokens'] += tokens
+            metrics['cost_usd'] += cost_usd
+
+    def record_escalation(self, route: str) -> None:
+        with self._lock:
+            self._escalations[route] += 1
+
+    def merge(self, totals: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+        """
+        누적 지표에 이번 프로세스의 지표를 더함 (main_ralp는 phase마다 새 프로세스)
+
+        Args:
+            totals: {"route/model": {calls, latency_ms, tokens, cost_usd}} (예: state.json)
+
+        Returns:
+            갱신된 totals
+        """
+        with self._lock:
+            for (route, model), metrics in self._metrics.items():
+                entry = totals.setdefault(f"{route}/{model}", {k: 0 for k in metrics})
+                for key, value in metrics.items():
+                    entry[key] = round(entry.get(key, 0) + value, 6)
+            self._metrics.clear()
+        return totals
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        route별 지표
+
+        Returns:
+            {
+                'routes': {route: {model: {calls, mean_latency_ms, tokens, cost_usd}}},
+                'escalations': {route: 재심사 횟수}
+            }
+        """
+        with self._lock:
+            routes: Dict[str, Dict[str, Any]] = defaultdict(dict)
+            for (route, model), metrics in sorted(self._metrics.items()):
+                routes[route][model] = {
+                    'calls': metrics['calls'],
+                    'mean_latency_ms': round(metrics['latency_ms'] / metrics['calls'], 1),
+                    'tokens': metrics['tokens'],
+                    'cost_usd': round(metrics['cost_usd'], 6),
+                }
+            return {'routes': dict(routes), 'escalations': dict(self._escalations)}
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Summary Cache
+
+긴 논문을 위한 계층형 요약 캐시
+- 요약 트리: 문단 그룹 → 섹션 → 논문 전체
+- 각 노드는 자신이 덮는 텍스트의 내용 hash로 식별
+- SQLite에 저장하여 iteration 간 재사용
+- 텍스트가 바뀐 노드만 다시 요약 (바뀐 섹션도 바뀌지 않은 문단 그룹 요약은 재사용)
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from prompt_packer import count_tokens, extractive_summary, split_sections
+
+
+@dataclass
+class SectionSummary:
+    """섹션 요약 노드"""
+    title: str
+    key: str
+    summary: str
+    groups: List[str] = field(default_factory=list)  # 문단 그룹 노드 key
+    reused: bool = False
+
+
+@dataclass
+class PaperSummary:
+    """논문 요약 트리"""
+    key: str
+    summary: str
+    sections: List[SectionSummary] = field(default_factory=list)
+    computed: int = 0   # 이번에 새로 요약한 노드 수
+    reused: int = 0     # 캐시에서 재사용한 노드 수
+
+    def changed_sections(self) -> List[str]:
+        """이전 요약 이후 내용이 바뀐 섹션 제목"""
+        return [s.title for s in self.sections if not s.reused]
+
+    def compact(self, expand: Optional[List[str]] = None) -> str:
+        """
+        요약본 논문 (전체 요약 + 섹션별 요약)
+
+        Args:
+            expand: 원문을 따로 보내는 섹션 제목 (요약 대신 '[원문]'으로 표시)
+        """
+        expand = set(expand or [])
+        lines = [f"[전체 요약] {self.summary}", ""]
+        for section in self.sections:
+            summary = "[원문]" if section.title in expand else section.summary
+            lines.append(f"- {section.title or '(front matter)'}: {summary}")
+        return "\n".join(lines)
+
+
+class SummaryCache:
+    """
+    내용 hash 기반 계층형 요약 캐시
+
+    노드 key = sha256(단계, 요약 길이, 텍스트). 같은 텍스트는 몇 번째
+    iteration이든 같은 key를 가지므로, 바뀌지 않은 부분은 요약을 다시
+    계산하지 않는다.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        summarizer: Optional[Callable[[str, int], str]] = None,
+        group_size: int = 4,
+        section_tokens: int = 120,
+        paper_tokens: int = 300
+    ):
+        """
+        Args:
+            path: SQLite 파일 (None이면 메모리에만 저장)
+            summarizer: (텍스트, 최대 토큰) → 요약 (기본: 추출 요약)
+            group_size: 문단 그룹당 문단 수
+            section_tokens: 섹션 요약 최대 토큰 수
+            paper_tokens: 논문 전체 요약 최대 토큰 수
+        """
+        self.summarizer = summarizer or extractive_summary
+        self.group_size = group_size
+        self.section_tokens = section_tokens
+        self.paper_tokens = paper_tokens
+
+        self.path = Path(path) if path else None
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path) if self.path else ":memory:",
+                                     check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS nodes ("
+            " key TEXT PRIMARY KEY, level TEXT, tokens INTEGER,"
+            " summary TEXT, created TEXT, last_used TEXT)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._memory: Dict[str, str] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def node_key(level: str, max_tokens: int, text: str) -> str:
+        """노드 key"""
+        digest = hashlib.sha256(f"{level}:{max_tokens}\n".encode('utf-8'))
+        digest.update(text.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _lookup(self, key: str) -> Optional[str]:
+        if key in self._memory:
+            return self._memory[key]
+        with self._lock:
+            row = self._conn.execute("SELECT summary FROM nodes WHERE key = ?", (key,)).fetchone()
+            if row:
+                self._conn.execute("UPDATE nodes SET last_used = ? WHERE key = ?",
+                                   (datetime.now().isoformat(), key))
+        if row:
+            self._memory[key] = row[0]
+            return row[0]
+        return None
+
+    def _store(self, key: str, level: str, summary: str) -> None:
+        now = datetime.now().isoformat()
+        self._memory[key] = summary
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO nodes VALUES (?, ?, ?, ?, ?, ?)",
+                (key, level, count_tokens(summary), summary, now, now)
+            )
+
+    def _count(self, reused: bool, tally: Optional[Dict[str, int]]) -> None:
+        """hit/miss 집계 (누적 카운터는 lock 안에서, tally는 호출별 카운터)"""
+        counter = 'hits' if reused else 'misses'
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+        if tally is not None:
+            tally[counter] += 1
+
+    def _node(self, level: str, text: str, max_tokens: int, source: Callable[[], str],
+              tally: Optional[Dict[str, int]] = None) -> tuple:
+        """캐시된 요약 반환, 없으면 source()로 요약할 텍스트를 만들어 요약 → (key, 요약, 재사용 여부)"""
+        key = self.node_key(level, max_tokens, text)
+        cached = self._lookup(key)
+        self._count(cached is not None, tally)
+        if cached is not None:
+            return key, cached, True
+        summary = self.summarizer(source(), max_tokens)
+        self._store(key, level, summary)
+        return key, summary, False
+
+    def _groups(self, text: str) -> List[str]:
+        """
+        문단 그룹 분할
+
+        그룹 경계는 문단 내용 hash로 정해지므로 (평균 group_size 문단),
+        문단 하나를 추가/삭제해도 다른 그룹의 경계와 key는 바뀌지 않는다.
+        """
+        paragraphs = [p for p in re.split(r"\n\s*\n", text.strip()) if p.strip()]
+        groups = []
+        current: List[str] = []
+        for paragraph in paragraphs:
+            current.append(paragraph)
+            boundary = int(hashlib.md5(paragraph.encode('utf-8')).hexdigest()[:8], 16) % self.group_size == 0
+            if boundary or len(current) >= 2 * self.group_size:
+                groups.append("\n\n".join(current))
+                current = []
+        if current:
+            groups.append("\n\n".join(current))
+        return groups
+
+    def summarize_section(self, text: str, max_tokens: Optional[int] = None,
+                          tally: Optional[Dict[str, int]] = None) -> SectionSummary:
+        """
+        섹션 요약 (문단 그룹 요약을 다시 요약)
+
+        Args:
+            text: 섹션 본문
+            max_tokens: 최대 토큰 수 (기본: section_tokens)
+            tally: 이 호출의 hit/miss를 더할 카운터 ({'hits', 'misses'})
+        """
+        max_tokens = max_tokens or self.section_tokens
+        if not text.strip():
+            return SectionSummary(title="", key=self.node_key('section', max_tokens, text),
+                                  summary="", reused=True)
+        groups = self._groups(text)
+
+        if len(groups) <= 1:
+            key, summary, reused = self._node('section', text, max_tokens, lambda: text, tally)
+            return SectionSummary(title="", key=key, summary=summary, reused=reused)
+
+        group_tokens = max(40, 2 * max_tokens // len(groups))
+        group_nodes = [self._node('group', g, group_tokens, lambda g=g: g, tally) for g in groups]
+        key, summary, reused = self._node(
+            'section', text, max_tokens,
+            lambda: "\n\n".join(node[1] for node in group_nodes), tally
+        )
+        return SectionSummary(title="", key=key, summary=summary,
+                              groups=[node[0] for node in group_nodes], reused=reused)
+
+    def summarize(self, text: str, max_tokens: int) -> str:
+        """PromptPacker용 요약 함수 (텍스트, 최대 토큰) → 요약"""
+        summary = self.summarize_section(text, max_tokens).summary
+        with self._lock:
+            self._conn.commit()
+        return summary
+
+    def build(self, paper: str) -> PaperSummary:
+        """
+        논문 요약 트리 생성
+
+        Args:
+            paper: 논문 내용
+
+        Returns:
+            요약 트리 (섹션 요약 + 전체 요약, 재사용/재계산 노드 수)
+
+        여러 스레드에서 동시에 불러도 (예: 평가 중 미리 쓰는 개선안) 재사용/재계산 수는
+        이 호출의 노드만 센다.
+        """
+        tally = {'hits': 0, 'misses': 0}
+
+        sections = []
+        for section in split_sections(paper):
+            node = self.summarize_section(section.body, tally=tally)
+            node.title = section.title
+            sections.append(node)
+
+        key, summary, _ = self._node(
+            'paper', paper, self.paper_tokens,
+            lambda: "\n\n".join(s.summary for s in sections if s.summary), tally
+        )
+        with self._lock:
+            self._conn.commit()
+
+        return PaperSummary(
+            key=key,
+            summary=summary,
+            sections=sections,
+            computed=tally['misses'],
+            reused=tally['hits'],
+        )
+
+    def prune(self, keep_days: int = 30) -> int:
+        """오래 사용되지 않은 노드 삭제"""
+        cutoff = datetime.fromtimestamp(datetime.now().timestamp() - keep_days * 86400).isoformat()
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM nodes WHERE last_used < ?", (cutoff,)).rowcount
+            self._conn.commit()
+        self._memory.clear()
+        return removed
+
+    def close(self) -> None:
+        """변경사항 저장 후 닫기"""
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
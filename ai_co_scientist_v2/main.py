@@ -38,6 +38,7 @@ class LiteratureAgent(SelfImprovingAgent):
     
     def review(self) -> dict:
         return {
+            'prompt': self.build_prompt('Review recent literature on AI-assisted research.'),
             'papers': [
                 {'title': 'AI in Scientific Research', 'year': 2024},
                 {'title': 'Machine Learning for Discovery', 'year': 2025}
@@ -54,6 +55,7 @@ class HypothesisAgent(SelfImprovingAgent):
     
     def generate(self, literature: dict) -> dict:
         return {
+            'prompt': self.build_prompt('Generate testable hypotheses from the literature gaps.'),
             'hypotheses': [
                 {'id': 'H1', 'statement': 'AI improves research efficiency by 40%'},
                 {'id': 'H2', 'statement': 'Multi-modal data enhances accuracy'}
@@ -70,6 +72,7 @@ class DataAgent(SelfImprovingAgent):
     
     def analyze(self, hypothesis: dict) -> dict:
         return {
+            'prompt': self.build_prompt('Analyze the datasets to test each hypothesis.'),
             'results': {
                 'efficiency_improvement': 42,
                 'accuracy_improvement': 15,
@@ -90,6 +93,7 @@ class WritingAgent(SelfImprovingAgent):
     
     def write(self, data: dict) -> dict:
         return {
+            'prompt': self.build_prompt('Write the research paper from the analysis results.'),
             'title': 'AI-Driven Methodology for Enhancing Scientific Research',
             'abstract': 'This study demonstrates...',
             'sections': ['Introduction', 'Methods', 'Results', 'Discussion', 'Conclusion'],
@@ -105,6 +109,7 @@ class LoggingAgent(SelfImprovingAgent):
     
     def compile(self) -> dict:
         return {
+            'prompt': self.build_prompt('Compile the AI usage report from the interaction log.'),
             'interactions': [
                 {'model': 'claude', 'task': 'literature review'},
                 {'model': 'gpt4', 'task': 'data analysis'},
@@ -208,6 +213,18 @@ def main():
         default=20,
         help='Maximum iterations (default: 20)'
     )
+    parser.add_argument(
+        '--improve-token-budget',
+        type=int,
+        default=None,
+        help='LLM token budget per improve phase (default: unlimited)'
+    )
+    parser.add_argument(
+        '--experiment-replicates',
+        type=int,
+        default=8,
+        help='Inputs per configuration in A/B tests, 0 disables testing (default: 8)'
+    )
     parser.add_argument(
         '--test',
         action='store_true',
@@ -224,7 +241,9 @@ def main():
     # 설정
     config = {
         'target_score': args.target_score,
-        'max_iterations': args.max_iterations
+        'max_iterations': args.max_iterations,
+        'improve_token_budget': args.improve_token_budget,
+        'experiment_replicates': args.experiment_replicates
     }
     
     logger.info(f"Configuration: {config}")
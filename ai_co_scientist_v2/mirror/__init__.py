@@ -4,10 +4,22 @@ MIRROR: Meta-Learning Iterative Research Optimization & Reflection System
 2026 AI Co-Scientist Challenge Korea - Track 1
 """
 
+import sys
+from pathlib import Path
+
+# Add shared module to path
+shared_path = Path(__file__).parent.parent.parent / "shared"
+if str(shared_path) not in sys.path:
+    sys.path.insert(0, str(shared_path))
+
 from .engine import MIRROREngine
 from .meta_learning import MetaLearningEngine
 from .reflection import ReflectionEngine
 from .version_control import VersionController
+from .object_store import ObjectStore
+from .surrogate import ImprovementSurrogate
+from .experiment import ExperimentHarness, Variant
 
 __version__ = "2.0.0"
-__all__ = ["MIRROREngine", "MetaLearningEngine", "ReflectionEngine", "VersionController"]
+__all__ = ["MIRROREngine", "MetaLearningEngine", "ReflectionEngine", "VersionController", "ObjectStore", "ImprovementSurrogate",
+           "ExperimentHarness", "Variant"]
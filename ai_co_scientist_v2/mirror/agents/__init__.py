@@ -3,5 +3,6 @@ Self-Improving Agents
 """
 
 from .base import SelfImprovingAgent
+from .bandit import StrategyBandit
 
-__all__ = ["SelfImprovingAgent"]
+__all__ = ["SelfImprovingAgent", "StrategyBandit"]
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Strategy Bandit - 프롬프트 전략 선택기
+
+프롬프트 전략(arm)마다 Beta 사후분포를 두고 Thompson sampling으로 다음 전략을 고른다.
+
+- 보상은 심사 점수 (0-1), 분수 보상을 그대로 성공/실패 pseudo-count로 더한다
+- 전략별 통계는 arm 순서의 배열(alpha, beta, pulls)로만 유지하며 npz로 저장하여
+  다음 실행에서 이어서 학습한다
+- discount < 1이면 오래된 보상의 가중치를 줄여 (제출물이 좋아지며 바뀌는) 보상 분포를 따라간다
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class StrategyBandit:
+    """
+    Thompson sampling 기반 전략 선택기 (Beta-Bernoulli, 분수 보상)
+
+    사용 예:
+        bandit = StrategyBandit(['baseline', 'drastic_change'], path='versions/strategies/writer.npz')
+        arm = bandit.select()
+        bandit.update(arm, 0.72)
+    """
+
+    def __init__(self, arms: Sequence[str], path: Optional[str] = None,
+                 prior: float = 1.0, discount: float = 1.0, seed: Optional[int] = None):
+        """
+        Args:
+            arms: 전략 이름 목록
+            path: 통계 파일 (None: 저장하지 않음, 있으면 로드)
+            prior: Beta(prior, prior) 사전분포
+            discount: 업데이트마다 기존 통계에 곱하는 감쇠 계수 (1.0: 감쇠 없음)
+            seed: 난수 시드
+        """
+        self.prior = prior
+        self.discount = discount
+        self.rng = np.random.default_rng(seed)
+
+        self.arms: list = []
+        self._index: Dict[str, int] = {}
+        self.alpha = np.zeros(0)
+        self.beta = np.zeros(0)
+        self.pulls = np.zeros(0, dtype=np.int64)
+        for arm in arms:
+            self.add_arm(arm)
+
+        self.path: Optional[Path] = None
+        if path:
+            self.bind(path)
+
+    def add_arm(self, arm: str) -> int:
+        """전략 추가 (이미 있으면 기존 위치)"""
+        if arm in self._index:
+            return self._index[arm]
+        self._index[arm] = len(self.arms)
+        self.arms.append(arm)
+        self.alpha = np.append(self.alpha, self.prior)
+        self.beta = np.append(self.beta, self.prior)
+        self.pulls = np.append(self.pulls, 0)
+        return self._index[arm]
+
+    # =========================================================================
+    # 선택 / 업데이트
+    # =========================================================================
+
+    def select(self, exclude: Iterable[str] = ()) -> str:
+        """사후분포 표본이 가장 큰 전략 (exclude는 후보에서 제외, 모두 제외되면 무시)"""
+        samples = self.rng.beta(self.alpha, self.beta)
+        excluded = [self._index[arm] for arm in exclude if arm in self._index]
+        if len(excluded) < len(self.arms):
+            samples[excluded] = -np.inf
+        return self.arms[int(np.argmax(samples))]
+
+    def update(self, arm: str, reward: float) -> None:
+        """보상 기록 (0-1로 잘라서 반영) 후 저장"""
+        i = self.add_arm(arm)
+        reward = float(np.clip(reward, 0.0, 1.0))
+        if self.discount < 1.0:
+            # 사전분포 쪽으로 감쇠
+            self.alpha = self.prior + self.discount * (self.alpha - self.prior)
+            self.beta = self.prior + self.discount * (self.beta - self.prior)
+        self.alpha[i] += reward
+        self.beta[i] += 1.0 - reward
+        self.pulls[i] += 1
+        self.save()
+
+    def mean(self, arm: str) -> float:
+        """사후 평균 보상"""
+        i = self._index[arm]
+        return float(self.alpha[i] / (self.alpha[i] + self.beta[i]))
+
+    def std(self, arm: str) -> float:
+        """사후 표준편차"""
+        i = self._index[arm]
+        a, b = self.alpha[i], self.beta[i]
+        return float(np.sqrt(a * b / ((a + b) ** 2 * (a + b + 1))))
+
+    def best(self) -> str:
+        """사후 평균이 가장 높은 전략 (활용)"""
+        return self.arms[int(np.argmax(self.alpha / (self.alpha + self.beta)))]
+
+    # =========================================================================
+    # 저장
+    # =========================================================================
+
+    def bind(self, path) -> None:
+        """통계 파일 연결 (파일이 있으면 로드, 현재 arm 목록에 없는 전략도 추가)"""
+        self.path = Path(path)
+        if not self.path.exists():
+            return
+        try:
+            with np.load(self.path) as data:
+                for arm, a, b, n in zip(data['arms'].tolist(), data['alpha'], data['beta'], data['pulls']):
+                    i = self.add_arm(arm)
+                    self.alpha[i], self.beta[i], self.pulls[i] = a, b, n
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning(f"Could not load strategy stats {self.path}: {e}")
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, 'wb') as f:
+            np.savez(f, arms=np.array(self.arms, dtype=str), alpha=self.alpha,
+                     beta=self.beta, pulls=self.pulls)
+        os.replace(tmp, self.path)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """전략별 {pulls, mean, std}"""
+        return {
+            arm: {'pulls': int(self.pulls[i]), 'mean': round(self.mean(arm), 3), 'std': round(self.std(arm), 3)}
+            for i, arm in enumerate(self.arms)
+        }
@@ -6,10 +6,14 @@ Self-Improving Agent Base Class
 """
 
 import logging
+import random
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional
+from pathlib import Path
+from typing import Callable, Dict, List, Any, Optional
 from datetime import datetime
 
+from .bandit import StrategyBandit
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,10 +24,21 @@ class SelfImprovingAgent(ABC):
     Features:
     - 버전 관리 (Semantic Versioning)
     - 성능 기록
-    - 프롬프트 전략 최적화
+    - 프롬프트 전략 최적화 (Thompson sampling bandit)
     - 피드백 기반 개선
     """
     
+    # 프롬프트 전략 (bandit arm) → 프롬프트에 덧붙이는 지시문
+    STRATEGIES = {
+        'baseline': '',
+        'incremental_improvement': 'Revise the previous output conservatively: keep what scored well '
+                                   'and fix only the listed weaknesses.',
+        'explore_alternatives': 'Before answering, sketch two alternative approaches and continue '
+                                'with the stronger one.',
+        'drastic_change': 'Discard the previous output and redo the task from scratch with a '
+                          'different structure.',
+    }
+    
     def __init__(self, name: str):
         self.name = name
         self.version = "1.0.0"
@@ -31,9 +46,20 @@ class SelfImprovingAgent(ABC):
         self.prompt_strategies: List[Dict] = []
         self.current_strategy: Optional[Dict] = None
         self.improvement_count = 0
+        self.bandit = StrategyBandit(list(self.STRATEGIES))
+        # 에이전트 난수 (무작위성은 전역 random 대신 이것을 사용, 실험에서는 입력별 시드로 교체)
+        self.rng = random.Random()
+        # A/B 실험 훅 (agent, approach) -> 채택 여부, 엔진이 연결 (pickle 대상 아님)
+        self.strategy_tester: Optional[Callable[['SelfImprovingAgent', str], bool]] = None
         
         logger.info(f"Agent '{name}' initialized (v{self.version})")
     
+    def __getstate__(self) -> Dict[str, Any]:
+        # 실험 worker로 복사할 때 엔진 참조는 제외
+        state = self.__dict__.copy()
+        state['strategy_tester'] = None
+        return state
+    
     @abstractmethod
     def execute(self, task: Any) -> Any:
         """
@@ -70,38 +96,85 @@ class SelfImprovingAgent(ABC):
         
         logger.info(f"Agent '{self.name}' improving (score: {score:.2f})")
         
+        # 이번 결과를 낸 전략의 보상으로 기록하고 다음 전략 선택
+        self.bandit.update(self.current_approach, score)
+        self._adapt_strategy(feedback)
+        
         # 점수가 낮으면 개선
         if score < 0.7:  # 70% 미만
-            self._adapt_strategy(feedback)
             self._optimize_prompt(feedback)
             self._update_version()
             self.improvement_count += 1
     
+    @property
+    def current_approach(self) -> str:
+        """현재 전략 (아직 선택 전이면 baseline)"""
+        return self.current_strategy['approach'] if self.current_strategy else 'baseline'
+    
+    @property
+    def prompt_directive(self) -> str:
+        """현재 전략의 프롬프트 지시문"""
+        return self.STRATEGIES.get(self.current_approach, '')
+    
+    def build_prompt(self, instruction: str) -> str:
+        """
+        생성 프롬프트 구성 (작업 지시 + 현재 전략 지시문)
+        
+        하위 클래스는 LLM 호출 프롬프트를 이 메서드로 만들어야 전략 선택이 출력에 반영된다.
+        """
+        directive = self.prompt_directive
+        return f"{instruction}\n\n{directive}" if directive else instruction
+    
+    def bind_strategy_store(self, directory) -> None:
+        """전략별 보상 통계를 directory/<name>.npz에 저장하고 이전 실행의 통계를 이어받음"""
+        self.bandit.bind(Path(directory) / f"{self.name}.npz")
+    
     def _adapt_strategy(self, feedback: Dict[str, Any]) -> None:
         """
         전략 적응
         
-        피드백을 분석하여 새로운 전략 생성
+        bandit의 Thompson sampling으로 다음 전략을 고른다. 연속으로 점수가 낮으면
+        현재 전략은 후보에서 제외하고 반드시 교체한다.
         """
         weaknesses = feedback.get('weaknesses', [])
         
         # 실패 패턴 분석
         patterns = self._analyze_failure_patterns()
+        current = self.current_approach
+        exclude = [current] if 'consecutive_low_scores' in patterns else []
+        
+        approach = self.bandit.select(exclude=exclude)
+        if approach == current:
+            if self.current_strategy is None:
+                self.set_strategy(approach, weaknesses)
+            return
         
-        # 새로운 전략 생성
-        new_strategy = {
-            'name': f'strategy_v{len(self.prompt_strategies) + 1}',
+        # 전략 테스트 및 적용 (연속 저점이면 테스트 없이 교체)
+        if exclude or self._test_strategy(self._strategy_for(approach, weaknesses)):
+            self.set_strategy(approach, weaknesses)
+            logger.info(f"Strategy switched: {current} → {approach} "
+                        f"(patterns: {patterns or 'none'})")
+    
+    def _strategy_for(self, approach: str, triggered_by: Optional[List[str]] = None) -> Dict:
+        """전략 기록 조회 (처음이면 새로 생성, 아직 목록에 추가하지 않음)"""
+        for strategy in self.prompt_strategies:
+            if strategy['approach'] == approach:
+                return strategy
+        return {
+            'name': f'strategy_{approach}',
             'created_at': datetime.now().isoformat(),
-            'triggered_by': weaknesses,
-            'approach': self._generate_new_approach(patterns),
+            'triggered_by': triggered_by or [],
+            'approach': approach,
             'tested': False
         }
-        
-        # 전략 테스트 및 적용
-        if self._test_strategy(new_strategy):
-            self.current_strategy = new_strategy
-            self.prompt_strategies.append(new_strategy)
-            logger.info(f"New strategy adopted: {new_strategy['name']}")
+    
+    def set_strategy(self, approach: str, triggered_by: Optional[List[str]] = None) -> Dict:
+        """전략 적용 (처음 쓰는 전략이면 목록에 추가)"""
+        strategy = self._strategy_for(approach, triggered_by)
+        if strategy not in self.prompt_strategies:
+            self.prompt_strategies.append(strategy)
+        self.current_strategy = strategy
+        return strategy
     
     def _analyze_failure_patterns(self) -> List[str]:
         """실패 패턴 분석"""
@@ -121,20 +194,19 @@ class SelfImprovingAgent(ABC):
         
         return patterns
     
-    def _generate_new_approach(self, patterns: List[str]) -> str:
-        """새로운 접근법 생성"""
-        if 'consecutive_low_scores' in patterns:
-            return 'drastic_change'
-        elif 'declining_trend' in patterns:
-            return 'incremental_improvement'
-        else:
-            return 'explore_alternatives'
-    
     def _test_strategy(self, strategy: Dict) -> bool:
-        """전략 테스트"""
-        # 실제로는 A/B 테스트나 시뮬레이션
-        # 여기서는 간단히 항상 True 반환
+        """
+        전략 테스트
+        
+        1. 사후분포 기준으로 최선 전략보다 확실히 나쁘면 (평균 + 2σ < 최선 평균) 기각
+        2. 엔진이 A/B 실험을 연결했으면 같은 입력에서 현재 전략을 유의하게 이길 때만 채택
+        """
         strategy['tested'] = True
+        approach = strategy['approach']
+        if self.bandit.mean(approach) + 2 * self.bandit.std(approach) < self.bandit.mean(self.bandit.best()):
+            return False
+        if self.strategy_tester is not None:
+            return self.strategy_tester(self, approach)
         return True
     
     def _optimize_prompt(self, feedback: Dict[str, Any]) -> None:
@@ -229,6 +301,14 @@ class SelfImprovingAgent(ABC):
         elif 'enhance' in action:
             self._enhance_capabilities()
     
+    def applies_improvement(self, improvement: Any) -> bool:
+        """
+        apply_improvement가 이 에이전트의 출력을 실제로 바꾸는지 여부
+        
+        기본 구현은 기록만 하므로 False (출력을 바꾸는 서브클래스에서 재정의)
+        """
+        return False
+    
     def _decompose_agent(self) -> None:
         """에이전트 분해"""
         logger.info(f"Decomposing agent '{self.name}'")
@@ -261,5 +341,6 @@ class SelfImprovingAgent(ABC):
             'best_score': max(scores),
             'worst_score': min(scores),
             'strategies_tested': len(self.prompt_strategies),
-            'current_strategy': self.current_strategy.get('name') if self.current_strategy else None
+            'current_strategy': self.current_strategy.get('name') if self.current_strategy else None,
+            'strategy_stats': self.bandit.get_stats()
         }
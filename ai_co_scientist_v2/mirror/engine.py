@@ -3,17 +3,24 @@
 MIRROR Engine - 메인 실행 엔진
 """
 
+import json
 import logging
+import pickle
+import random
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Sequence
 from dataclasses import dataclass, field
 
+import numpy as np
+
 from .meta_learning import MetaLearningEngine
+from .experiment import PROMOTED, ExperimentHarness, Variant, is_testable
 from .reflection import ReflectionEngine
+from .surrogate import ImprovementSurrogate
 from .version_control import VersionController
 import sys
-from pathlib import Path
 
 # Add shared module to path
 shared_path = Path(__file__).parent.parent.parent / "shared"
@@ -26,6 +33,9 @@ try:
 except ImportError:
     GIT_AUTO_COMMIT_AVAILABLE = False
 
+from ledger import get_ledger
+from tracing import get_tracer, span, write_text
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -49,6 +59,93 @@ class SystemImprovement:
     priority: str = "medium"
 
 
+# 연구 단계 (실행 순서, 에이전트 이름) / 심사위원
+RESEARCH_STAGES = ('literature', 'hypothesis', 'data', 'writer', 'logger')
+JUDGES = ('claude', 'gpt4', 'gemini')
+
+# 연구 에이전트별 담당 심사 기준 (전략 보상 계산)
+AGENT_CRITERIA = {
+    'literature': ('practicality',),
+    'hypothesis': ('creativity', 'methodology'),
+    'data': ('data_quality',),
+    'writer': ('conclusion', 'readability'),
+    'logger': ('ai_contribution',),
+}
+CRITERIA = ('practicality', 'methodology', 'data_quality', 'conclusion', 'readability', 'creativity')
+
+
+def run_research(agents: Dict[str, Any], stages: Sequence[str] = RESEARCH_STAGES) -> Dict[str, Any]:
+    """
+    연구 파이프라인 1회 실행
+    
+    Args:
+        agents: 에이전트 레지스트리
+        stages: 실행할 단계 (workflow 변형은 일부 단계를 뺄 수 있음)
+    """
+    # 각 에이전트가 self-improving 하게 동작
+    results = {}
+    
+    if 'literature' in agents and 'literature' in stages:
+        with span("agent.literature"):
+            results['literature'] = agents['literature'].review()
+    
+    if 'hypothesis' in agents and 'hypothesis' in stages:
+        with span("agent.hypothesis"):
+            results['hypothesis'] = agents['hypothesis'].generate(
+                results.get('literature', {})
+            )
+    
+    if 'data' in agents and 'data' in stages:
+        with span("agent.data"):
+            results['data'] = agents['data'].analyze(
+                results.get('hypothesis', {})
+            )
+    
+    if 'writer' in agents and 'writer' in stages:
+        with span("agent.writer"):
+            results['paper'] = agents['writer'].write(
+                results.get('data', {})
+            )
+    
+    if 'logger' in agents and 'logger' in stages:
+        with span("agent.logger"):
+            results['ai_usage'] = agents['logger'].compile()
+    
+    return results
+
+
+def mock_evaluation(submission: Dict[str, Any], judge: str, rng: Any = random) -> Dict[str, float]:
+    """Mock evaluation for testing (rng: random 모듈 또는 random.Random)"""
+    base_score = 60 + rng.random() * 25
+    return {
+        'practicality': min(20, base_score * 0.2),
+        'methodology': min(20, base_score * 0.2),
+        'data_quality': min(25, base_score * 0.25),
+        'conclusion': min(10, base_score * 0.1),
+        'readability': min(5, base_score * 0.05),
+        'creativity': min(20, base_score * 0.2),
+        'ai_contribution': 'PASS' if rng.random() > 0.3 else 'FAIL',
+        'total': base_score
+    }
+
+
+def aggregate_judge_results(results: Dict[str, Dict]) -> Dict[str, float]:
+    """심사 결과 집계 (중앙값 사용)"""
+    aggregated = {}
+    
+    for criterion in CRITERIA:
+        scores = [r.get(criterion, 0) for r in results.values()]
+        aggregated[criterion] = round(np.median(scores), 1)
+    
+    # AI 기여도는 모두 PASS여야 PASS
+    ai_contributions = [r.get('ai_contribution', 'FAIL') for r in results.values()]
+    aggregated['ai_contribution'] = 'PASS' if all(a == 'PASS' for a in ai_contributions) else 'FAIL'
+    
+    aggregated['total'] = sum(aggregated[c] for c in CRITERIA)
+    
+    return aggregated
+
+
 class MIRROREngine:
     """
     MIRROR 시스템 메인 엔진
@@ -63,11 +160,23 @@ class MIRROREngine:
         self.iteration = 0
         self.max_iterations = self.config.get('max_iterations', 20)
         self.target_score = self.config.get('target_score', 85)
+        self.improve_token_budget = self.config.get('improve_token_budget')  # None: 제한 없음
         
         # 핵심 컴포넌트
         self.meta_learner = MetaLearningEngine()
-        self.reflection = ReflectionEngine()
         self.version_ctrl = VersionController()
+        self.surrogate = ImprovementSurrogate(self.config.get('surrogate_path', 'versions/surrogate.npz'))
+        self.surrogate.fit_history(self.version_ctrl)
+        self.reflection = ReflectionEngine(surrogate=self.surrogate)
+        
+        # A/B 실험 하니스 (experiment_replicates=0이면 비활성: 검증 없이 적용)
+        replicates = self.config.get('experiment_replicates', 8)
+        self.experiments = ExperimentHarness(
+            replicates=replicates,
+            workers=self.config.get('experiment_workers'),
+            alpha=self.config.get('experiment_alpha', 0.05),
+            directory=self.config.get('experiment_dir', 'versions')
+        ) if replicates else None
 
         # Git auto-commit (optional)
         self.git_commit = None
@@ -92,8 +201,12 @@ class MIRROREngine:
         logger.info(f"Target score: {self.target_score}, Max iterations: {self.max_iterations}")
     
     def register_agent(self, name: str, agent: Any) -> None:
-        """에이전트 등록"""
+        """에이전트 등록 (전략 통계는 strategy_dir에 저장되어 실행 간 유지)"""
         self.agents[name] = agent
+        if hasattr(agent, 'bind_strategy_store'):
+            agent.bind_strategy_store(self.config.get('strategy_dir', 'versions/strategies'))
+        if self.experiments is not None and name in RESEARCH_STAGES and hasattr(agent, 'strategy_tester'):
+            agent.strategy_tester = self._test_agent_strategy
         logger.info(f"Agent '{name}' registered (v{getattr(agent, 'version', '1.0.0')})")
     
     def run(self) -> Dict[str, Any]:
@@ -107,8 +220,12 @@ class MIRROREngine:
         logger.info("MIRROR Engine Starting")
         logger.info("=" * 60)
         
+        tracer = get_tracer()
+        
         for iteration in range(1, self.max_iterations + 1):
             self.iteration = iteration
+            tracer.set_iteration(iteration)
+            get_ledger().set_context(iteration=iteration)
             
             logger.info("")
             logger.info(f"{'='*60}")
@@ -116,29 +233,40 @@ class MIRROREngine:
             logger.info(f"{'='*60}")
             
             # 1. 연구 수행
-            submission = self._execute_research()
+            with span("phase.research"):
+                submission = self._execute_research()
             
             # 2. 다중 AI 심사 (3개 모델)
-            evaluation = self._multi_judge_evaluation(submission)
+            with span("phase.evaluate"):
+                evaluation = self._multi_judge_evaluation(submission)
             
             current_score = evaluation.get('total_score', 0)
             logger.info(f"Current score: {current_score}/{self.target_score}")
             
+            # 2.5. 연구 에이전트 전략 보상 (다음 iteration 전략 선택)
+            self._reward_agents(evaluation)
+            
             # 3. 목표 달성 확인
             if current_score >= self.target_score:
                 logger.info(f"✅ TARGET ACHIEVED at iteration {iteration}!")
                 return self._finalize(submission, evaluation)
             
             # 4. 리플렉션
-            reflection = self._reflect(submission, evaluation)
+            with span("phase.reflect"):
+                reflection = self._reflect(submission, evaluation)
             
             # 5. 낸부 루프: 제출물 개선
-            improved_submission = self._improve_submission(
-                submission, evaluation, reflection
-            )
+            with span("phase.improve"):
+                improved_submission = self._improve_submission(
+                    submission, evaluation, reflection
+                )
             
             # 6. 버전 컨트롤: commit
-            self._commit_iteration(iteration, improved_submission, evaluation, reflection)
+            with span("phase.commit"):
+                commit = self._commit_iteration(iteration, improved_submission, evaluation, reflection)
+            
+            # 6.1. 직전 iteration 개선사항의 효과로 surrogate 갱신
+            self._update_surrogate(evaluation, commit.tag)
 
             # 6.5. Git auto-commit (every 3 iterations or on score improvement)
             if self.git_commit and (iteration % 3 == 0 or current_score > self.best_score):
@@ -161,8 +289,9 @@ class MIRROREngine:
             # 8. 외부 루프: 메타러닝 (3 iteration마다)
             if iteration % 3 == 0:
                 logger.info("Running meta-learning...")
-                improvements = self._meta_learn()
-                self._apply_system_improvements(improvements)
+                with span("phase.meta_learn"):
+                    improvements = self._meta_learn()
+                    self._apply_system_improvements(improvements)
             
             # 9. 메타러닝: 개별 iteration 학습
             self.meta_learner.learn_from_iteration(self.iteration_history[-1])
@@ -181,32 +310,7 @@ class MIRROREngine:
     def _execute_research(self) -> Dict[str, Any]:
         """연구 수행"""
         logger.info("Executing research...")
-        
-        # 각 에이전트가 self-improving 하게 동작
-        results = {}
-        
-        if 'literature' in self.agents:
-            results['literature'] = self.agents['literature'].review()
-        
-        if 'hypothesis' in self.agents:
-            results['hypothesis'] = self.agents['hypothesis'].generate(
-                results.get('literature', {})
-            )
-        
-        if 'data' in self.agents:
-            results['data'] = self.agents['data'].analyze(
-                results.get('hypothesis', {})
-            )
-        
-        if 'writer' in self.agents:
-            results['paper'] = self.agents['writer'].write(
-                results.get('data', {})
-            )
-        
-        if 'logger' in self.agents:
-            results['ai_usage'] = self.agents['logger'].compile()
-        
-        return results
+        return run_research(self.agents)
     
     def _multi_judge_evaluation(self, submission: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -217,15 +321,17 @@ class MIRROREngine:
         logger.info("Multi-AI judge evaluation...")
         
         # 3개 AI 모델로 평가
-        judges = ['claude', 'gpt4', 'gemini']
         results = {}
         
-        for judge in judges:
-            if judge in self.agents:
-                results[judge] = self.agents[judge].evaluate(submission)
-            else:
-                # Mock evaluation for testing
-                results[judge] = self._mock_evaluation(submission, judge)
+        for judge in JUDGES:
+            with span(f"judge.{judge}", mock=judge not in self.agents):
+                if judge in self.agents:
+                    started = time.perf_counter()
+                    results[judge] = self.agents[judge].evaluate(submission)
+                    self._record_judge_call(judge, submission, results[judge], started)
+                else:
+                    # Mock evaluation for testing
+                    results[judge] = self._mock_evaluation(submission, judge)
         
         # 결과 집계
         aggregated = self._aggregate_judge_results(results)
@@ -236,39 +342,62 @@ class MIRROREngine:
             'total_score': aggregated.get('total', 0)
         }
     
+    def _record_judge_call(
+        self,
+        judge: str,
+        submission: Dict[str, Any],
+        result: Dict[str, Any],
+        started: float
+    ):
+        """심사 호출을 interaction ledger에 기록 (usage가 없으면 토큰 추정)"""
+        usage = result.get('usage', {}) if isinstance(result, dict) else {}
+        prompt = json.dumps(submission, sort_keys=True, ensure_ascii=False, default=str)
+        get_ledger().record(
+            judge,
+            prompt,
+            tokens_in=usage.get('prompt_tokens'),
+            tokens_out=usage.get('completion_tokens', 0),
+            latency_ms=(time.perf_counter() - started) * 1000,
+            phase='evaluate'
+        )
+    
     def _mock_evaluation(self, submission: Dict[str, Any], judge: str) -> Dict[str, float]:
         """Mock evaluation for testing"""
-        import random
-        base_score = 60 + random.random() * 25
-        return {
-            'practicality': min(20, base_score * 0.2),
-            'methodology': min(20, base_score * 0.2),
-            'data_quality': min(25, base_score * 0.25),
-            'conclusion': min(10, base_score * 0.1),
-            'readability': min(5, base_score * 0.05),
-            'creativity': min(20, base_score * 0.2),
-            'ai_contribution': 'PASS' if random.random() > 0.3 else 'FAIL',
-            'total': base_score
-        }
+        return mock_evaluation(submission, judge)
     
     def _aggregate_judge_results(self, results: Dict[str, Dict]) -> Dict[str, float]:
         """심사 결과 집계 (중앙값 사용)"""
-        import numpy as np
-        
-        aggregated = {}
-        criteria = ['practicality', 'methodology', 'data_quality', 'conclusion', 'readability', 'creativity']
-        
-        for criterion in criteria:
-            scores = [r.get(criterion, 0) for r in results.values()]
-            aggregated[criterion] = round(np.median(scores), 1)
-        
-        # AI 기여도는 모두 PASS여야 PASS
-        ai_contributions = [r.get('ai_contribution', 'FAIL') for r in results.values()]
-        aggregated['ai_contribution'] = 'PASS' if all(a == 'PASS' for a in ai_contributions) else 'FAIL'
-        
-        aggregated['total'] = sum(aggregated[c] for c in criteria)
+        return aggregate_judge_results(results)
+    
+    def _reward_agents(self, evaluation: Dict[str, Any]) -> None:
+        """
+        각 연구 에이전트가 담당한 기준의 점수 비율(0-1)을 현재 프롬프트 전략 보상으로 전달
         
-        return aggregated
+        ai_contribution은 PASS면 1, FAIL이면 0
+        """
+        aggregated = evaluation.get('aggregated', {})
+        for name, criteria in AGENT_CRITERIA.items():
+            agent = self.agents.get(name)
+            if agent is None or not hasattr(agent, 'bandit'):
+                continue
+            
+            earned, possible = 0.0, 0.0
+            weaknesses = []
+            for criterion in criteria:
+                if criterion == 'ai_contribution':
+                    score, max_score = (1.0 if aggregated.get(criterion) == 'PASS' else 0.0), 1.0
+                else:
+                    score, max_score = aggregated.get(criterion, 0), ReflectionEngine.RUBRIC[criterion]['max']
+                earned += score
+                possible += max_score
+                if score < max_score * 0.8:
+                    weaknesses.append(criterion)
+            
+            agent.improve({
+                'score': earned / possible,
+                'weaknesses': weaknesses,
+                'type': 'general'
+            })
     
     def _reflect(self, submission: Dict[str, Any], evaluation: Dict[str, Any]) -> Dict[str, Any]:
         """리플렉션 수행"""
@@ -278,7 +407,13 @@ class MIRROREngine:
     def _improve_submission(self, submission: Dict[str, Any], 
                            evaluation: Dict[str, Any],
                            reflection: Dict[str, Any]) -> Dict[str, Any]:
-        """제출물 개선 (낸부 루프)"""
+        """
+        제출물 개선 (낸부 루프)
+        
+        개선사항은 토큰당 기대 상승 순으로 정렬되어 있으며, improve_token_budget이 있으면
+        예산에 들어가는 것만 적용한다 (첫 항목은 항상 적용). 적용 여부는 개선사항의
+        'applied'에 기록되어 surrogate 학습에 쓰인다.
+        """
         logger.info("Improving submission...")
         
         # 개선 전략 생성
@@ -286,12 +421,22 @@ class MIRROREngine:
         
         # 각 개선사항 적용
         improved = submission.copy()
+        spent = 0
         
         for improvement in improvements:
             target = improvement.get('target')
             action = improvement.get('action')
+            cost = improvement.get('cost_tokens', 0)
+            
+            if self.improve_token_budget is not None and spent and spent + cost > self.improve_token_budget:
+                improvement['applied'] = False
+                logger.info(f"  Skipping (budget): {action} to {target}")
+                continue
+            improvement['applied'] = True
+            spent += cost
             
-            logger.info(f"  Applying: {action} to {target}")
+            logger.info(f"  Applying: {action} to {target} "
+                        f"(expected {improvement.get('expected_impact', '?')}, ~{cost} tokens)")
             
             # 해당 에이전트에게 개선 요청
             if target in self.agents:
@@ -303,18 +448,44 @@ class MIRROREngine:
         return improved
     
     def _commit_iteration(self, iteration: int, submission: Dict[str, Any],
-                         evaluation: Dict[str, Any], reflection: Dict[str, Any]) -> None:
+                         evaluation: Dict[str, Any], reflection: Dict[str, Any]) -> Any:
         """iteration commit"""
         logger.info(f"Committing iteration {iteration}...")
         
         commit_info = {
             'iteration': iteration,
             'score': evaluation.get('total_score', 0),
+            'scores': evaluation.get('aggregated', {}),
             'improvements': reflection.get('improvements', []),
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now().isoformat(),
+            'artifacts': {
+                name: submission[name]
+                for name in ('paper', 'ai_usage', 'data')
+                if name in submission
+            }
         }
         
-        self.version_ctrl.commit(commit_info)
+        return self.version_ctrl.commit(commit_info)
+    
+    def _update_surrogate(self, evaluation: Dict[str, Any], key: str) -> None:
+        """
+        에피소딕 메모리의 직전 iteration (점수, 적용한 개선사항)과 이번 평가로 surrogate 갱신
+        
+        key는 이번 commit tag로, 다음 실행에서 버전 히스토리를 다시 학습할 때 중복을 막는다.
+        """
+        if not self.meta_learner.episodic_memory:
+            return
+        previous = self.meta_learner.episodic_memory[-1]
+        if previous['iteration'] != self.iteration - 1:
+            return
+        
+        added = self.surrogate.observe(
+            previous.get('scores', {}), previous.get('improvements', []),
+            evaluation.get('aggregated', {}), key=key
+        )
+        if added:
+            self.surrogate.save()
+            logger.info(f"Surrogate updated with {added} tuples ({self.surrogate.get_stats()})")
     
     def _meta_learn(self) -> List[SystemImprovement]:
         """메타러닝 수행 (외부 루프)"""
@@ -330,10 +501,64 @@ class MIRROREngine:
         
         return improvements
     
+    def _run_experiment(self, candidates: List[Variant], baseline: Optional[Variant] = None) -> List[Any]:
+        """A/B 실험 실행 (에이전트를 복사할 수 없으면 모든 후보 결과가 None)"""
+        try:
+            with span("phase.experiment", candidates=len(candidates)):
+                results = self.experiments.compare(self.agents, candidates, baseline)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            logger.warning(f"Experiment skipped, agents cannot be copied to workers: {e}")
+            return [None] * len(candidates)
+        
+        for result in results:
+            logger.info(f"  [A/B] {result.variant} vs {result.baseline}: "
+                        f"{result.mean_diff:+.2f} (p={result.p_value:.4f}, "
+                        f"{result.wins}W/{result.losses}L) → {result.status}"
+                        f"{' (identical submissions)' if result.identical else ''}")
+        return results
+    
+    def _test_agent_strategy(self, agent: Any, approach: str) -> bool:
+        """
+        에이전트 전략 후보를 현재 전략과 A/B 비교 (SelfImprovingAgent.strategy_tester)
+        
+        같은 입력에서 현재 전략을 유의하게 이겼을 때 (promoted)만 채택한다.
+        """
+        name = next((n for n, a in self.agents.items() if a is agent), agent.name)
+        candidate = Variant(f"{name}:{approach}", strategies={name: approach})
+        if not is_testable(self.agents, candidate):
+            logger.info(f"  [A/B] {candidate.name}: untestable, skipped")
+            return False
+        baseline = Variant(f"{name}:{agent.current_approach}", strategies={name: agent.current_approach})
+        [result] = self._run_experiment([candidate], baseline)
+        return result is not None and result.status == PROMOTED
+    
+    def _screen_improvements(self, improvements: List[SystemImprovement]) -> List[SystemImprovement]:
+        """
+        시스템 개선사항을 현재 구성과 A/B 비교하여 promoted된 것만 반환
+        
+        apply_variant로 표현할 수 없는 개선사항 (workflow/prompt, 출력을 바꾸지 않는 에이전트 개선)은
+        기준 구성과 같은 구성을 비교하게 되므로 실험하지 않고 제외한다.
+        """
+        candidates = []
+        for improvement in improvements:
+            variant = Variant(f"{improvement.target}:{improvement.action}", improvements=[improvement])
+            if is_testable(self.agents, variant):
+                candidates.append((improvement, variant))
+            else:
+                logger.info(f"  [A/B] {variant.name}: untestable, skipped")
+        if not candidates:
+            return []
+        results = self._run_experiment([variant for _, variant in candidates])
+        return [improvement for (improvement, _), result in zip(candidates, results)
+                if result is not None and result.status == PROMOTED]
+    
     def _apply_system_improvements(self, improvements: List[SystemImprovement]) -> None:
-        """시스템 개선사항 적용"""
+        """시스템 개선사항 적용 (실험 하니스가 있으면 A/B 비교에서 promoted된 것만 적용)"""
         logger.info("Applying system improvements...")
         
+        if self.experiments is not None and improvements and self.agents:
+            improvements = self._screen_improvements(improvements)
+        
         for improvement in improvements:
             logger.info(f"  [{improvement.priority.upper()}] {improvement.target}: {improvement.action}")
             
@@ -376,6 +601,15 @@ class MIRROREngine:
         # 저장
         self._save_final_submission(final)
         
+        if self.experiments is not None:
+            self.experiments.close()
+        
+        # iteration별 지연시간 분석 (tracing 활성화 시)
+        tracer = get_tracer()
+        if tracer.enabled:
+            tracer.write_breakdown('versions/latency_breakdown.json')
+            tracer.flush()
+        
         return final
     
     def _save_final_submission(self, final: Dict[str, Any]) -> None:
@@ -384,8 +618,8 @@ class MIRROREngine:
         output_dir.mkdir(exist_ok=True)
         
         import json
-        with open(output_dir / 'final_submission.json', 'w', encoding='utf-8') as f:
-            json.dump(final, f, ensure_ascii=False, indent=2)
+        write_text(output_dir / 'final_submission.json',
+                   json.dumps(final, ensure_ascii=False, indent=2))
         
         logger.info(f"Final submission saved to {output_dir / 'final_submission.json'}")
     
@@ -395,6 +629,8 @@ class MIRROREngine:
             'total_iterations': self.iteration,
             'best_score': self.best_score,
             'improvement_count': len(self.iteration_history),
+            'surrogate': self.surrogate.get_stats(),
+            'experiments': self.experiments.get_stats() if self.experiments is not None else None,
             'agent_versions': {name: getattr(agent, 'version', '1.0.0') 
                              for name, agent in self.agents.items()}
         }
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+Experiment Harness - A/B 평가 하니스
+
+전략 후보와 workflow 변형을 같은 입력(시드)에서 기준 구성과 나란히 실행하고,
+대응 표본 점수 차이가 유의하게 양수일 때만 승격한다.
+
+- 연구 실행과 심사 호출은 프로세스 풀에서 병렬 수행 (workers=1이면 현재 프로세스)
+- 에이전트는 실험마다 pickle로 복사하여 변형 적용이 원본에 영향을 주지 않음
+- 심사 결과는 (심사위원 버전, 제출물 해시)로 캐시하여 같은 제출물은 다시 심사하지 않음
+  (judge_cache.jsonl, append-only, 최근 사용 순으로 크기 제한)
+- 대응 차이에 sign-flip permutation 검정 (n ≤ 16이면 모든 부호 조합으로 정확 검정)
+- 대응 차이가 모두 0이면 (두 구성의 제출물이 같거나 심사위원이 구별하지 못함) 기각하지 않고
+  inconclusive로 기록하여 호출자가 다른 근거(bandit 사후분포 등)로 결정하게 한다
+- 핵심 지표: 시간당 평가한 후보 수 (candidates_per_hour)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import random
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ledger import get_ledger
+from tracing import span, write_text
+
+logger = logging.getLogger(__name__)
+
+EXACT_TEST_MAX = 16   # 이 이하 표본 수는 2^n 부호 조합 전체로 정확 검정
+
+PROMOTED = 'promoted'
+REJECTED = 'rejected'
+INCONCLUSIVE = 'inconclusive'
+
+
+@dataclass
+class Variant:
+    """실험 구성 (기준 또는 후보)"""
+    name: str
+    strategies: Dict[str, str] = field(default_factory=dict)   # 에이전트 이름 → 프롬프트 전략
+    improvements: List[Any] = field(default_factory=list)       # 적용할 SystemImprovement
+    stages: Optional[Tuple[str, ...]] = None                    # 연구 단계 (None: 전체)
+
+
+@dataclass
+class ExperimentResult:
+    """후보 1개의 대응 비교 결과"""
+    variant: str
+    baseline: str
+    n: int
+    baseline_mean: float
+    variant_mean: float
+    mean_diff: float
+    std_diff: float
+    t_stat: float
+    p_value: float
+    wins: int
+    losses: int
+    promoted: bool
+    status: str = REJECTED    # promoted / rejected / inconclusive
+    identical: bool = False   # 모든 입력에서 두 구성의 제출물이 같음
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def paired_test(diffs: Sequence[float], rounds: int = 10000,
+                rng: Optional[np.random.Generator] = None) -> float:
+    """
+    대응 차이의 단측 sign-flip permutation 검정 (H1: 평균 차이 > 0)
+
+    Returns:
+        p-value (차이가 모두 0이면 1.0)
+    """
+    diffs = np.asarray(diffs, dtype=np.float64)
+    n = len(diffs)
+    if n == 0 or not np.any(diffs):
+        return 1.0
+
+    observed = diffs.mean()
+    if n <= EXACT_TEST_MAX:
+        bits = (np.arange(2 ** n)[:, None] >> np.arange(n)) & 1
+        signs = 1.0 - 2.0 * bits
+        means = signs @ diffs / n
+        return float(np.mean(means >= observed - 1e-12))
+
+    rng = rng or np.random.default_rng()
+    signs = rng.choice([-1.0, 1.0], size=(rounds, n))
+    means = signs @ diffs / n
+    return float((np.sum(means >= observed - 1e-12) + 1) / (rounds + 1))
+
+
+def apply_variant(agents: Dict[str, Any], variant: Variant) -> None:
+    """에이전트 (복사본)에 변형 적용"""
+    for name, approach in variant.strategies.items():
+        agent = agents.get(name)
+        if agent is not None and hasattr(agent, 'set_strategy'):
+            agent.set_strategy(approach)
+
+    for improvement in variant.improvements:
+        target = getattr(improvement, 'target', '')
+        if target.startswith('agent:'):
+            agent = agents.get(target.split(':', 1)[1])
+            if agent is not None:
+                agent.apply_improvement(improvement)
+
+
+def is_testable(agents: Dict[str, Any], variant: Variant) -> bool:
+    """apply_variant로 기준 구성과 다른 구성을 만들 수 있는 변형인지 (아니면 같은 구성끼리의 비교)"""
+    if variant.stages:
+        return True
+    if any(hasattr(agents.get(name), 'set_strategy') for name in variant.strategies):
+        return True
+    for improvement in variant.improvements:
+        target = getattr(improvement, 'target', '')
+        if target.startswith('agent:'):
+            agent = agents.get(target.split(':', 1)[1])
+            if agent is not None and getattr(agent, 'applies_improvement', lambda _: True)(improvement):
+                return True
+    return False
+
+
+# =============================================================================
+# worker
+# =============================================================================
+
+def _run_trial(payload: bytes, variant: Variant, seed: int) -> Dict[str, Any]:
+    """연구 1회 (같은 시드 = 같은 입력)"""
+    from .engine import RESEARCH_STAGES, run_research
+
+    agents = pickle.loads(payload)
+    # 에이전트별 지역 난수 (전역 random 상태는 건드리지 않음, workers=1이면 부모 프로세스)
+    for name, agent in agents.items():
+        if hasattr(agent, 'rng'):
+            agent.rng = random.Random(f"{seed}:{name}")
+    apply_variant(agents, variant)
+    return run_research(agents, variant.stages or RESEARCH_STAGES)
+
+
+def _run_judge(payload: bytes, judge: str, submission: Dict[str, Any], seed: int) -> Tuple[Dict[str, Any], float]:
+    """심사 1회 (심사위원 에이전트가 없으면 제출물별로 고정된 mock 평가)"""
+    from .engine import mock_evaluation
+
+    agent = pickle.loads(payload)
+    started = time.perf_counter()
+    if agent is None:
+        evaluation = mock_evaluation(submission, judge, random.Random(seed))
+    else:
+        evaluation = agent.evaluate(submission)
+    return evaluation, (time.perf_counter() - started) * 1000
+
+
+# =============================================================================
+# 심사 캐시
+# =============================================================================
+
+class JudgeCache:
+    """
+    (심사위원 버전, 제출물) → 평가 결과 캐시 (append-only JSONL, LRU 크기 제한)
+
+    키에 심사위원 에이전트 버전과 심사 프롬프트 버전이 들어가므로 심사 방식이 바뀌면
+    이전 평가는 다시 쓰이지 않는다. 파일 줄 수가 max_entries의 2배를 넘으면 메모리에
+    남은 항목만으로 다시 쓴다.
+    """
+
+    PROMPT_VERSION = 1   # 심사 프롬프트/루브릭을 바꾸면 올림
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 10000):
+        self.path = Path(path) if path else None
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lines = 0
+        if self.path and self.path.exists():
+            self._load()
+
+    def _load(self) -> None:
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                self._lines += 1
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping corrupt judge cache line: {line[:80]}")
+                    continue
+                self.entries[record['key']] = record['evaluation']
+                self.entries.move_to_end(record['key'])
+        self._evict()
+        if self._lines > 2 * self.max_entries:
+            self._compact()
+
+    @classmethod
+    def version(cls, agent: Any) -> str:
+        """심사위원 버전 (mock이면 'mock')"""
+        if agent is None:
+            return f"mock/p{cls.PROMPT_VERSION}"
+        return f"{getattr(agent, 'version', '')}/p{getattr(agent, 'prompt_version', cls.PROMPT_VERSION)}"
+
+    @staticmethod
+    def key(judge: str, submission: Dict[str, Any], version: str = '') -> str:
+        text = json.dumps(submission, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(f"{judge}\0{version}\0{text}".encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        evaluation = self.entries.get(key)
+        if evaluation is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return evaluation
+
+    def put_many(self, records: Sequence[Tuple[str, str, Dict[str, Any]]]) -> None:
+        """(key, judge, evaluation) 목록 추가 (한 번에 기록)"""
+        lines = []
+        for key, judge, evaluation in records:
+            self.entries[key] = evaluation
+            self.entries.move_to_end(key)
+            lines.append(json.dumps({'key': key, 'judge': judge, 'evaluation': evaluation},
+                                    ensure_ascii=False, default=str))
+        self._evict()
+        if self.path and lines:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            write_text(self.path, "\n".join(lines) + "\n", mode='a')
+            self._lines += len(lines)
+            if self._lines > 2 * self.max_entries:
+                self._compact()
+
+    def _evict(self) -> None:
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def _compact(self) -> None:
+        """메모리에 남은 항목만으로 파일 다시 쓰기"""
+        lines = [json.dumps({'key': key, 'evaluation': evaluation}, ensure_ascii=False, default=str)
+                 for key, evaluation in self.entries.items()]
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        write_text(tmp, "".join(line + "\n" for line in lines))
+        os.replace(tmp, self.path)
+        self._lines = len(lines)
+
+
+# =============================================================================
+# 하니스
+# =============================================================================
+
+class ExperimentHarness:
+    """
+    A/B 실험 하니스
+
+    사용 예:
+        harness = ExperimentHarness(replicates=8, directory="versions")
+        results = harness.compare(engine.agents, [
+            Variant('writer:drastic_change', strategies={'writer': 'drastic_change'}),
+            Variant('no_literature', stages=('hypothesis', 'data', 'writer', 'logger')),
+        ])
+        winners = [r.variant for r in results if r.promoted]
+        untested = [r.variant for r in results if r.status == 'inconclusive']
+    """
+
+    JUDGE_CACHE_FILE = "judge_cache.jsonl"
+    LOG_FILE = "experiments.jsonl"
+
+    def __init__(self, replicates: int = 8, workers: Optional[int] = None,
+                 alpha: float = 0.05, min_effect: float = 0.0,
+                 directory: Optional[str] = "versions", seed: Optional[int] = None,
+                 judge_cache_size: int = 10000):
+        """
+        Args:
+            replicates: 구성당 입력(시드) 수 (모든 구성이 같은 입력 사용,
+                        정확 검정의 최소 p-value가 2^-n이므로 alpha=0.05면 5 이상)
+            workers: 프로세스 수 (None: CPU 수, 1: 현재 프로세스에서 실행)
+            alpha: 유의수준 (단측)
+            min_effect: 승격에 필요한 최소 평균 점수 차이
+            directory: 심사 캐시와 실험 로그를 둘 디렉터리 (None: 저장하지 않음)
+            seed: 입력 시드 생성용 난수 시드
+            judge_cache_size: 심사 캐시 최대 항목 수
+        """
+        self.replicates = replicates
+        self.workers = workers or os.cpu_count() or 1
+        self.alpha = alpha
+        self.min_effect = min_effect
+        self.directory = Path(directory) if directory else None
+        self.cache = JudgeCache(self.directory / self.JUDGE_CACHE_FILE if self.directory else None,
+                                max_entries=judge_cache_size)
+        self.rng = np.random.default_rng(seed)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+        self.experiments = 0
+        self.candidates = 0
+        self.trials = 0
+        self.judge_calls = 0
+        self.elapsed = 0.0
+
+    def _map(self, fn, calls: List[tuple]) -> List[Any]:
+        """풀에서 병렬 실행 (입력 순서대로 결과 반환)"""
+        if self.workers == 1 or len(calls) <= 1:
+            return [fn(*args) for args in calls]
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers)
+        futures = [self._pool.submit(fn, *args) for args in calls]
+        return [future.result() for future in futures]
+
+    def compare(self, agents: Dict[str, Any], candidates: Sequence[Variant],
+                baseline: Optional[Variant] = None) -> List[ExperimentResult]:
+        """
+        기준 구성과 후보들을 같은 입력에서 실행하고 후보별 대응 비교
+
+        Args:
+            agents: 에이전트 레지스트리 (pickle 가능해야 함, 원본은 바뀌지 않음)
+            candidates: 후보 구성
+            baseline: 기준 구성 (None: 현재 구성 그대로)
+
+        Returns:
+            후보별 ExperimentResult (candidates 순서)
+        """
+        from .engine import JUDGES
+
+        baseline = baseline or Variant('baseline')
+        variants = [baseline, *candidates]
+        seeds = self.rng.integers(0, 2 ** 31, self.replicates).tolist()
+        started = time.perf_counter()
+
+        payload = pickle.dumps(agents)
+        with span("experiment.research", trials=len(variants) * len(seeds)):
+            submissions = self._map(_run_trial, [(payload, v, s) for v in variants for s in seeds])
+
+        with span("experiment.judge"):
+            totals = self._judge(agents, submissions, JUDGES)
+        scores = np.asarray(totals).reshape(len(variants), len(seeds))
+        digests = np.asarray([JudgeCache.key('', submission) for submission in submissions]).reshape(len(variants), len(seeds))
+
+        results = [self._result(baseline, candidate, scores[0], scores[i + 1],
+                                identical=bool(np.all(digests[i + 1] == digests[0])))
+                   for i, candidate in enumerate(candidates)]
+
+        elapsed = time.perf_counter() - started
+        self.experiments += 1
+        self.candidates += len(candidates)
+        self.trials += len(submissions)
+        self.elapsed += elapsed
+        self._log(results, elapsed)
+        return results
+
+    def _judge(self, agents: Dict[str, Any], submissions: List[Dict[str, Any]],
+               judges: Sequence[str]) -> List[float]:
+        """캐시에 없는 (심사위원, 제출물)만 심사하고 제출물별 패널 총점 반환"""
+        from .engine import aggregate_judge_results
+
+        versions = {judge: JudgeCache.version(agents.get(judge)) for judge in judges}
+        keys = [{judge: JudgeCache.key(judge, submission, versions[judge]) for judge in judges}
+                for submission in submissions]
+        found: Dict[str, Dict[str, Any]] = {}
+        missing: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        for submission, row in zip(submissions, keys):
+            for judge, key in row.items():
+                if key in found or key in missing:
+                    continue
+                evaluation = self.cache.get(key)
+                if evaluation is None:
+                    missing[key] = (judge, submission)
+                else:
+                    found[key] = evaluation
+
+        if missing:
+            payloads = {judge: pickle.dumps(agents.get(judge)) for judge in judges}
+            calls = [(payloads[judge], judge, submission, int(key[:8], 16))
+                     for key, (judge, submission) in missing.items()]
+            outputs = self._map(_run_judge, calls)
+            records = [(key, judge, evaluation)
+                       for (key, (judge, _)), (evaluation, _) in zip(missing.items(), outputs)]
+            self.cache.put_many(records)
+            found.update((key, evaluation) for key, _, evaluation in records)
+            self.judge_calls += len(calls)
+            self._record_judge_calls(agents, list(missing.values()), outputs)
+
+        return [
+            aggregate_judge_results({judge: found[key] for judge, key in row.items()})['total']
+            for row in keys
+        ]
+
+    def _record_judge_calls(self, agents: Dict[str, Any], calls: List[Tuple[str, Dict[str, Any]]],
+                            outputs: List[Tuple[Dict[str, Any], float]]) -> None:
+        """실제 심사위원 호출을 interaction ledger에 기록 (mock 제외)"""
+        for (judge, submission), (evaluation, latency_ms) in zip(calls, outputs):
+            if judge not in agents:
+                continue
+            usage = evaluation.get('usage', {}) if isinstance(evaluation, dict) else {}
+            get_ledger().record(
+                judge,
+                json.dumps(submission, sort_keys=True, ensure_ascii=False, default=str),
+                tokens_in=usage.get('prompt_tokens'),
+                tokens_out=usage.get('completion_tokens', 0),
+                latency_ms=latency_ms,
+                phase='experiment'
+            )
+
+    def _result(self, baseline: Variant, candidate: Variant,
+                base: np.ndarray, scores: np.ndarray, identical: bool = False) -> ExperimentResult:
+        diffs = scores - base
+        n = len(diffs)
+        mean_diff = float(diffs.mean())
+        std_diff = float(diffs.std(ddof=1)) if n > 1 else 0.0
+        p_value = paired_test(diffs, rng=self.rng)
+        promoted = p_value < self.alpha and mean_diff > self.min_effect
+        if identical or not np.any(diffs):
+            status = INCONCLUSIVE
+        else:
+            status = PROMOTED if promoted else REJECTED
+        return ExperimentResult(
+            variant=candidate.name,
+            baseline=baseline.name,
+            n=n,
+            baseline_mean=round(float(base.mean()), 3),
+            variant_mean=round(float(scores.mean()), 3),
+            mean_diff=round(mean_diff, 3),
+            std_diff=round(std_diff, 3),
+            t_stat=round(mean_diff / (std_diff / np.sqrt(n)), 3) if std_diff > 0 else 0.0,
+            p_value=round(p_value, 5),
+            wins=int(np.sum(diffs > 0)),
+            losses=int(np.sum(diffs < 0)),
+            promoted=promoted,
+            status=status,
+            identical=identical,
+        )
+
+    def _log(self, results: List[ExperimentResult], elapsed: float) -> None:
+        if not self.directory:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        record = {
+            'timestamp': datetime.now().isoformat(),
+            'elapsed_s': round(elapsed, 3),
+            'candidates_per_hour': round(len(results) * 3600 / elapsed, 1) if elapsed > 0 else None,
+            'results': [r.to_dict() for r in results],
+        }
+        write_text(self.directory / self.LOG_FILE, json.dumps(record, ensure_ascii=False) + "\n", mode='a')
+
+    def close(self) -> None:
+        """프로세스 풀 종료"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """처리량 통계 (candidates_per_hour가 핵심 지표)"""
+        lookups = self.cache.hits + self.cache.misses
+        return {
+            'experiments': self.experiments,
+            'candidates': self.candidates,
+            'trials': self.trials,
+            'judge_calls': self.judge_calls,
+            'judge_cache_hit_rate': round(self.cache.hits / lookups, 3) if lookups else 0.0,
+            'elapsed_s': round(self.elapsed, 3),
+            'candidates_per_hour': round(self.candidates * 3600 / self.elapsed, 1) if self.elapsed > 0 else 0.0,
+        }
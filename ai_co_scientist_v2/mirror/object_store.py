@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Object Store - 제출물 저장소
+
+content-addressed 저장소. 제출물(논문 등)의 각 버전을 zlib 압축 blob
+또는 이전 버전에 대한 delta로 저장하고, pack 단계에서 loose object를
+하나의 pack 파일로 모은다.
+"""
+
+import difflib
+import hashlib
+import json
+import logging
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+# delta 명령 코드
+OP_COPY = 0x01    # base의 [offset, offset + length) 복사
+OP_INSERT = 0x02  # 뒤따르는 length 바이트 삽입
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    """LEB128 varint 기록"""
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    """LEB128 varint 읽기 → (값, 다음 위치)"""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def make_delta(base: bytes, target: bytes) -> bytes:
+    """
+    base → target 바이너리 delta 생성 (줄 단위 매칭)
+
+    Args:
+        base: 기준 버전
+        target: 새 버전
+
+    Returns:
+        copy/insert 명령열
+    """
+    base_lines = base.splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+
+    # 줄 → 바이트 offset
+    base_offsets = [0]
+    for line in base_lines:
+        base_offsets.append(base_offsets[-1] + len(line))
+    target_offsets = [0]
+    for line in target_lines:
+        target_offsets.append(target_offsets[-1] + len(line))
+
+    matcher = difflib.SequenceMatcher(None, base_lines, target_lines, autojunk=False)
+
+    out = bytearray()
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            out.append(OP_COPY)
+            _write_varint(out, base_offsets[i1])
+            _write_varint(out, base_offsets[i2] - base_offsets[i1])
+        elif j2 > j1:
+            chunk = target[target_offsets[j1]:target_offsets[j2]]
+            out.append(OP_INSERT)
+            _write_varint(out, len(chunk))
+            out.extend(chunk)
+
+    return bytes(out)
+
+
+def apply_delta(base: bytes, delta: bytes) -> bytes:
+    """delta를 base에 적용"""
+    out = bytearray()
+    pos = 0
+    while pos < len(delta):
+        op = delta[pos]
+        pos += 1
+        if op == OP_COPY:
+            offset, pos = _read_varint(delta, pos)
+            length, pos = _read_varint(delta, pos)
+            out.extend(base[offset:offset + length])
+        elif op == OP_INSERT:
+            length, pos = _read_varint(delta, pos)
+            out.extend(delta[pos:pos + length])
+            pos += length
+        else:
+            raise ValueError(f"Unknown delta opcode: {op}")
+    return bytes(out)
+
+
+class ObjectStore:
+    """
+    content-addressed 객체 저장소
+
+    - object id: 원본 내용의 sha256
+    - 저장 형식: zlib(header + payload)
+        - header "full\\n": payload는 원본
+        - header "delta <base> <depth>\\n": payload는 base 대비 delta
+    - loose object: objects/ab/cdef...
+    - pack: packs/pack-NNNN.pack + packs/pack-NNNN.idx (JSON: oid → [offset, length])
+    """
+
+    def __init__(self, root: Path, max_chain: int = 16, cache_size: int = 8):
+        """
+        Args:
+            root: 저장소 디렉토리
+            max_chain: 최대 delta chain 길이 (넘으면 full blob 저장)
+            cache_size: 복원한 내용 캐시 크기
+        """
+        self.root = Path(root)
+        self.loose_dir = self.root / "objects"
+        self.pack_dir = self.root / "packs"
+        self.loose_dir.mkdir(parents=True, exist_ok=True)
+        self.pack_dir.mkdir(parents=True, exist_ok=True)
+
+        self.max_chain = max_chain
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._depth: Dict[str, int] = {}
+
+        # pack 인덱스: oid → (pack 파일, offset, length)
+        self._pack_index: Dict[str, Tuple[Path, int, int]] = {}
+        for idx_file in sorted(self.pack_dir.glob("pack-*.idx")):
+            self._load_pack_index(idx_file)
+
+    @staticmethod
+    def hash(data: bytes) -> str:
+        """object id 계산"""
+        return hashlib.sha256(data).hexdigest()
+
+    def _loose_path(self, oid: str) -> Path:
+        return self.loose_dir / oid[:2] / oid[2:]
+
+    def _load_pack_index(self, idx_file: Path) -> None:
+        pack_file = idx_file.with_suffix(".pack")
+        with open(idx_file, 'r', encoding='utf-8') as f:
+            for oid, (offset, length) in json.load(f).items():
+                self._pack_index[oid] = (pack_file, offset, length)
+
+    def has(self, oid: str) -> bool:
+        """객체 존재 여부"""
+        return oid in self._pack_index or self._loose_path(oid).exists()
+
+    def put(self, data: bytes, base: Optional[str] = None) -> str:
+        """
+        객체 저장
+
+        Args:
+            data: 저장할 내용
+            base: delta 기준 object id (이전 버전)
+
+        Returns:
+            object id
+        """
+        oid = self.hash(data)
+        if self.has(oid):
+            return oid
+
+        record = zlib.compress(b"full\n" + data, 9)
+
+        if base and base != oid and self.has(base):
+            depth = self._get_depth(base) + 1
+            if depth <= self.max_chain:
+                delta = make_delta(self.get(base), data)
+                delta_record = zlib.compress(f"delta {base} {depth}\n".encode() + delta, 9)
+                if len(delta_record) < len(record):
+                    record = delta_record
+                    self._depth[oid] = depth
+
+        path = self._loose_path(oid)
+        path.parent.mkdir(exist_ok=True)
+        with span("file.write", path="store/objects", bytes_written=len(record)):
+            with open(path, 'wb') as f:
+                f.write(record)
+
+        self._remember(oid, data)
+        return oid
+
+    def get(self, oid: str) -> bytes:
+        """
+        객체 내용 복원
+
+        Args:
+            oid: object id
+
+        Returns:
+            원본 내용
+        """
+        if oid in self._cache:
+            self._cache.move_to_end(oid)
+            return self._cache[oid]
+
+        header, payload = self._read_record(oid)
+
+        if header.startswith(b"delta "):
+            _, base, depth = header.split(b" ")
+            data = apply_delta(self.get(base.decode()), payload)
+            self._depth[oid] = int(depth)
+        else:
+            data = payload
+            self._depth[oid] = 0
+
+        self._remember(oid, data)
+        return data
+
+    def get_text(self, oid: str) -> str:
+        """객체 내용을 텍스트로 복원"""
+        return self.get(oid).decode('utf-8')
+
+    def _read_record(self, oid: str) -> Tuple[bytes, bytes]:
+        """압축 레코드 읽기 → (header, payload)"""
+        if oid in self._pack_index:
+            pack_file, offset, length = self._pack_index[oid]
+            with open(pack_file, 'rb') as f:
+                f.seek(offset)
+                raw = f.read(length)
+        else:
+            path = self._loose_path(oid)
+            if not path.exists():
+                raise KeyError(f"Object not found: {oid}")
+            with open(path, 'rb') as f:
+                raw = f.read()
+
+        header, _, payload = zlib.decompress(raw).partition(b"\n")
+        return header, payload
+
+    def _get_depth(self, oid: str) -> int:
+        """delta chain 길이"""
+        if oid not in self._depth:
+            header, _ = self._read_record(oid)
+            self._depth[oid] = int(header.split(b" ")[2]) if header.startswith(b"delta ") else 0
+        return self._depth[oid]
+
+    def _remember(self, oid: str, data: bytes) -> None:
+        self._cache[oid] = data
+        self._cache.move_to_end(oid)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def loose_objects(self) -> List[str]:
+        """loose object id 목록"""
+        return [
+            path.parent.name + path.name
+            for path in self.loose_dir.glob("??/*")
+            if path.is_file()
+        ]
+
+    def pack(self) -> Dict[str, int]:
+        """
+        loose object를 하나의 pack 파일로 모음
+
+        Returns:
+            pack 통계
+        """
+        loose = self.loose_objects()
+        if not loose:
+            return {'packed': 0, 'bytes': 0}
+
+        existing = sorted(self.pack_dir.glob("pack-*.pack"))
+        pack_file = self.pack_dir / f"pack-{len(existing) + 1:04d}.pack"
+
+        index: Dict[str, List[int]] = {}
+        offset = 0
+        with span("file.write", path=pack_file.name) as s:
+            with open(pack_file, 'wb') as out:
+                for oid in sorted(loose):
+                    with open(self._loose_path(oid), 'rb') as f:
+                        raw = f.read()
+                    out.write(raw)
+                    index[oid] = [offset, len(raw)]
+                    offset += len(raw)
+            s.set(bytes_written=offset)
+
+        with open(pack_file.with_suffix(".idx"), 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+
+        for oid, (pack_offset, length) in index.items():
+            self._pack_index[oid] = (pack_file, pack_offset, length)
+            self._loose_path(oid).unlink()
+
+        for subdir in self.loose_dir.iterdir():
+            if subdir.is_dir() and not any(subdir.iterdir()):
+                subdir.rmdir()
+
+        logger.info(f"Packed {len(index)} objects into {pack_file.name} ({offset:,} bytes)")
+
+        return {'packed': len(index), 'bytes': offset}
+
+    def disk_usage(self) -> int:
+        """저장소 전체 크기 (bytes)"""
+        return sum(p.stat().st_size for p in self.root.rglob("*") if p.is_file())
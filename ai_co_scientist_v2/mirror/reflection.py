@@ -10,6 +10,8 @@ from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, field
 from datetime import datetime
 
+from .surrogate import improvement_cost
+
 logger = logging.getLogger(__name__)
 
 
@@ -32,6 +34,8 @@ class Improvement:
     description: str
     expected_impact: str
     priority: str = "medium"
+    predicted_gain: float = 0.0   # 기대 점수 상승
+    cost_tokens: int = 0          # 예상 LLM 토큰 비용
 
 
 @dataclass
@@ -66,7 +70,12 @@ class ReflectionEngine:
         'creativity': {'max': 20, 'name': '연구의 창의성 및 참신성'}
     }
     
-    def __init__(self):
+    def __init__(self, surrogate: Optional[Any] = None):
+        """
+        Args:
+            surrogate: 개선사항 효과 예측 모델 (ImprovementSurrogate, 없거나 학습 전이면 gap 기반 추정)
+        """
+        self.surrogate = surrogate
         self.reflection_history: List[ReflectionReport] = []
         logger.info("ReflectionEngine initialized")
     
@@ -93,7 +102,7 @@ class ReflectionEngine:
         report.weaknesses = self._identify_weaknesses(aggregated)
         
         # 3. 개선사항 생성
-        report.improvements = self._generate_improvements(report.weaknesses)
+        report.improvements = self._generate_improvements(report.weaknesses, aggregated, submission)
         
         # 4. 인사이트 추출
         report.insights = self._extract_insights(submission, evaluation, report.weaknesses)
@@ -234,9 +243,18 @@ class ReflectionEngine:
         
         return fixes.get(criterion, ['개선 방안 필요'])
     
-    def _generate_improvements(self, weaknesses: List[Weakness]) -> List[Improvement]:
-        """개선사항 생성"""
+    def _generate_improvements(self, weaknesses: List[Weakness],
+                               scores: Optional[Dict[str, Any]] = None,
+                               submission: Optional[Dict[str, Any]] = None) -> List[Improvement]:
+        """
+        개선사항 생성
+
+        기대 상승은 surrogate 예측(학습 전이면 gap의 절반)을 쓰고,
+        토큰당 기대 상승 순으로 정렬한다. ai_contribution은 통과 여부가 걸려 있어 항상 먼저.
+        """
         improvements = []
+        scores = scores or {}
+        submission = submission or {}
         
         for weakness in weaknesses:
             # 우선순위 결정
@@ -248,17 +266,30 @@ class ReflectionEngine:
                 priority = "low"
             
             # 개선사항 생성
+            cost = improvement_cost(submission, weakness.category)
+            
             for fix in weakness.suggested_fixes[:2]:  # 상위 2개만
+                gain = None
+                if self.surrogate is not None:
+                    gain = self.surrogate.predict(weakness.category, fix, scores, cost)
+                if gain is None:
+                    gain = weakness.gap * 0.5
+                
                 improvement = Improvement(
                     target=weakness.category,
                     action=fix,
                     description=f"Improve {weakness.category}: {fix}",
-                    expected_impact=f"+{weakness.gap * 0.5:.1f} points",
-                    priority=priority
+                    expected_impact=f"{gain:+.1f} points",
+                    priority=priority,
+                    predicted_gain=round(gain, 3),
+                    cost_tokens=cost
                 )
                 improvements.append(improvement)
         
-        return improvements
+        return sorted(
+            improvements,
+            key=lambda i: (i.target != 'ai_contribution', -i.predicted_gain / max(i.cost_tokens, 1))
+        )
     
     def _extract_insights(self, submission: Dict[str, Any], 
                          evaluation: Dict[str, Any],
@@ -335,7 +366,9 @@ class ReflectionEngine:
                     'action': i.action,
                     'description': i.description,
                     'expected_impact': i.expected_impact,
-                    'priority': i.priority
+                    'priority': i.priority,
+                    'predicted_gain': i.predicted_gain,
+                    'cost_tokens': i.cost_tokens
                 }
                 for i in report.improvements
             ],
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Improvement Surrogate - 개선사항 효과 예측 모델
+
+(제출물 특징, 적용한 개선사항, 다음 iteration의 점수 변화) 튜플로 학습한
+ridge 회귀 모델로 개선 action별 기대 점수 상승을 예측한다.
+
+- 학습 데이터: 버전 히스토리(이전 실행의 commit)와 에피소딕 메모리(현재 실행)
+- 충분 통계량(XᵀX, Xᵀy)만 유지하므로 새 iteration이 들어올 때마다 rank-1 갱신으로
+  다시 학습되고, 저장 크기는 특징 차원에만 비례한다 (versions/surrogate.npz)
+- 개선 단계는 예측 상승 / 예상 토큰 비용 순으로 제한된 LLM 예산을 배분한다
+"""
+
+import json
+import logging
+import math
+import os
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+
+from ledger import estimate_tokens
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+# 심사 기준 (ReflectionEngine.RUBRIC과 동일, ai_contribution은 PASS/FAIL 관문이라 제외)
+CRITERIA = {
+    'practicality': 20,
+    'methodology': 20,
+    'data_quality': 25,
+    'conclusion': 10,
+    'readability': 5,
+    'creativity': 20,
+}
+
+# 기준별로 개선 요청 시 다시 작성하는 제출물 부분
+CRITERION_PARTS = {
+    'practicality': 'paper',
+    'methodology': 'paper',
+    'data_quality': 'data',
+    'conclusion': 'paper',
+    'readability': 'paper',
+    'creativity': 'hypothesis',
+    'ai_contribution': 'ai_usage',
+}
+
+PROMPT_OVERHEAD_TOKENS = 400   # 개선 지시문 + 심사 피드백
+ACTION_BUCKETS = 32            # action 해시 버킷 수
+
+# 특징: [bias, 점수 비율, gap 비율, 총점/100, log 토큰 비용] + 기준 one-hot + action 버킷
+NUMERIC_FEATURES = 5
+DIMENSION = NUMERIC_FEATURES + len(CRITERIA) + ACTION_BUCKETS
+
+
+def improvement_cost(submission: Dict[str, Any], target: str) -> int:
+    """개선 1건의 예상 토큰 비용 (해당 부분 입력 + 재작성 출력 + 지시문)"""
+    part = submission.get(CRITERION_PARTS.get(target, 'paper'), {})
+    text = json.dumps(part, ensure_ascii=False, sort_keys=True, default=str)
+    return PROMPT_OVERHEAD_TOKENS + 2 * estimate_tokens(text)
+
+
+def _action_bucket(target: str, action: str) -> int:
+    """실행 간 안정적인 action 해시"""
+    return zlib.crc32(f"{target}:{action}".encode('utf-8')) % ACTION_BUCKETS
+
+
+def _numeric(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class ImprovementSurrogate:
+    """
+    개선사항 점수 상승 예측 모델 (incremental ridge 회귀)
+
+    사용 예:
+        surrogate = ImprovementSurrogate("versions/surrogate.npz")
+        surrogate.fit_history(version_ctrl)
+        gain = surrogate.predict('methodology', '방법론 섹션 상세화', scores, cost_tokens=1200)
+        surrogate.observe(before_scores, improvements, after_scores, key=commit.tag)
+    """
+
+    def __init__(self, path: Optional[str] = "versions/surrogate.npz",
+                 alpha: float = 1.0, min_samples: int = 8):
+        """
+        Args:
+            path: 모델 파일 (None: 저장하지 않음)
+            alpha: ridge 정규화 계수 (bias 제외)
+            min_samples: 예측을 시작할 최소 학습 튜플 수 (미만이면 predict가 None)
+        """
+        self.path = Path(path) if path else None
+        self.alpha = alpha
+        self.min_samples = min_samples
+
+        self.xtx = np.zeros((DIMENSION, DIMENSION))
+        self.xty = np.zeros(DIMENSION)
+        self.yty = 0.0
+        self.samples = 0
+        self.seen: set = set()   # 학습에 사용한 iteration 키 (다음 commit의 tag)
+        self._weights: Optional[np.ndarray] = None
+
+        if self.path and self.path.exists():
+            self._load()
+
+    # =========================================================================
+    # 특징
+    # =========================================================================
+
+    @staticmethod
+    def features(target: str, action: str, scores: Dict[str, Any], cost_tokens: int = 0) -> np.ndarray:
+        """개선 1건의 특징 벡터"""
+        x = np.zeros(DIMENSION)
+        max_score = CRITERIA[target]
+        score = _numeric(scores.get(target, 0))
+        total = _numeric(scores.get('total', sum(_numeric(scores.get(c, 0)) for c in CRITERIA)))
+
+        x[0] = 1.0
+        x[1] = score / max_score
+        x[2] = max(0.0, max_score - score) / max_score
+        x[3] = total / 100
+        x[4] = math.log1p(max(cost_tokens, 0)) / 10
+        x[NUMERIC_FEATURES + list(CRITERIA).index(target)] = 1.0
+        x[NUMERIC_FEATURES + len(CRITERIA) + _action_bucket(target, action)] = 1.0
+        return x
+
+    # =========================================================================
+    # 학습
+    # =========================================================================
+
+    def observe(self, before: Dict[str, Any], improvements: Iterable[Dict[str, Any]],
+                after: Dict[str, Any], key: Optional[str] = None) -> int:
+        """
+        iteration 1개 학습 (before 점수에서 적용한 개선사항 → after 점수)
+
+        기준별 점수 변화는 같은 기준을 겨냥한 개선사항들에 균등 분배한다.
+
+        Args:
+            before: 개선 전 기준별 점수 (aggregated)
+            improvements: 적용한 개선사항 (applied=False는 제외)
+            after: 다음 iteration의 기준별 점수
+            key: 중복 학습 방지 키 (이미 본 키면 무시)
+
+        Returns:
+            추가된 학습 튜플 수
+        """
+        if key is not None and key in self.seen:
+            return 0
+
+        applied = [
+            imp for imp in improvements
+            if imp.get('target') in CRITERIA and imp.get('applied', True)
+        ]
+        per_target: Dict[str, int] = {}
+        for imp in applied:
+            per_target[imp['target']] = per_target.get(imp['target'], 0) + 1
+
+        if applied:
+            X = np.stack([
+                self.features(imp['target'], imp.get('action', ''), before, imp.get('cost_tokens', 0))
+                for imp in applied
+            ])
+            y = np.array([
+                (_numeric(after.get(imp['target'], 0)) - _numeric(before.get(imp['target'], 0)))
+                / per_target[imp['target']]
+                for imp in applied
+            ])
+            self.xtx += X.T @ X
+            self.xty += X.T @ y
+            self.yty += float(y @ y)
+            self.samples += len(y)
+            self._weights = None
+
+        if key is not None:
+            self.seen.add(key)
+        return len(applied)
+
+    def fit_history(self, version_ctrl: Any) -> int:
+        """
+        버전 히스토리의 연속된 commit 쌍에서 아직 학습하지 않은 튜플을 학습
+
+        기준별 점수가 없는 (이전 형식) commit과 실행 경계(iteration 불연속)는 건너뛴다.
+
+        Returns:
+            추가된 학습 튜플 수
+        """
+        entries = version_ctrl.list_commits()
+        added = 0
+
+        for prev, curr in zip(entries, entries[1:]):
+            if curr['tag'] in self.seen or curr['iteration'] != prev['iteration'] + 1:
+                continue
+            before = version_ctrl.get_commit(prev['tag'])
+            after = version_ctrl.get_commit(curr['tag'])
+            if before is None or after is None or not before.scores or not after.scores:
+                continue
+            added += self.observe(before.scores, before.improvements, after.scores, key=curr['tag'])
+
+        if added:
+            logger.info(f"Surrogate trained on {added} tuples from version history ({self.samples} total)")
+            self.save()
+        return added
+
+    def _solve(self) -> np.ndarray:
+        if self._weights is None:
+            penalty = np.full(DIMENSION, self.alpha)
+            penalty[0] = 0.0
+            self._weights = np.linalg.solve(self.xtx + np.diag(penalty) + 1e-9 * np.eye(DIMENSION), self.xty)
+        return self._weights
+
+    @property
+    def trained(self) -> bool:
+        return self.samples >= self.min_samples
+
+    # =========================================================================
+    # 예측
+    # =========================================================================
+
+    def predict(self, target: str, action: str, scores: Dict[str, Any], cost_tokens: int = 0) -> Optional[float]:
+        """기대 점수 상승 (학습 전이거나 예측 대상 기준이 아니면 None)"""
+        if not self.trained or target not in CRITERIA:
+            return None
+        return float(self.features(target, action, scores, cost_tokens) @ self._solve())
+
+    def residual_std(self) -> float:
+        """학습 데이터 잔차 표준편차 (점수 단위)"""
+        if not self.trained:
+            return 0.0
+        w = self._solve()
+        sse = self.yty - 2 * float(w @ self.xty) + float(w @ self.xtx @ w)
+        return math.sqrt(max(sse, 0.0) / max(self.samples - 1, 1))
+
+    # =========================================================================
+    # 저장
+    # =========================================================================
+
+    def save(self) -> None:
+        """압축 저장 (XᵀX는 대칭이라 상삼각만 float32로 보관)"""
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        upper = np.triu_indices(DIMENSION)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with span("file.write", path=str(self.path)):
+            with open(tmp, 'wb') as f:
+                np.savez_compressed(
+                    f,
+                    dimension=np.array([DIMENSION, ACTION_BUCKETS]),
+                    xtx=self.xtx[upper].astype(np.float32),
+                    xty=self.xty.astype(np.float32),
+                    yty=np.array([self.yty]),
+                    samples=np.array([self.samples]),
+                    seen=np.array(sorted(self.seen), dtype=str),
+                )
+            os.replace(tmp, self.path)
+
+    def _load(self) -> None:
+        try:
+            with np.load(self.path) as data:
+                if tuple(data['dimension']) != (DIMENSION, ACTION_BUCKETS):
+                    logger.warning(f"Surrogate feature layout changed, retraining from history: {self.path}")
+                    return
+                upper = np.triu_indices(DIMENSION)
+                xtx = np.zeros((DIMENSION, DIMENSION))
+                xtx[upper] = data['xtx']
+                self.xtx = xtx + np.triu(xtx, 1).T
+                self.xty = data['xty'].astype(np.float64)
+                self.yty = float(data['yty'][0])
+                self.samples = int(data['samples'][0])
+                self.seen = set(data['seen'].tolist())
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning(f"Could not load surrogate {self.path}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """모델 통계"""
+        return {
+            'samples': self.samples,
+            'iterations': len(self.seen),
+            'trained': self.trained,
+            'residual_std': round(self.residual_std(), 3),
+        }
+
@@ -5,12 +5,18 @@ Version Controller - 버전 컨트롤러
 iteration마다 commit을 생성하고 버전을 관리
 """
 
+import difflib
 import logging
 import json
+import re
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
+
+from tracing import span, write_text
+
+from .object_store import ObjectStore
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +32,8 @@ class Commit:
     improvements: List[Dict]
     agent_versions: Dict[str, str]
     tag: str
+    artifacts: Dict[str, str] = field(default_factory=dict)  # 이름 → object id
+    scores: Dict[str, Any] = field(default_factory=dict)     # 기준별 심사 점수 (aggregated)
 
 
 class VersionController:
@@ -36,11 +44,21 @@ class VersionController:
     - diff 추적
     - rollback 지원
     - changelog 생성
+    
+    commit 본문은 append-only 저장소(commits.jsonl)에 한 줄씩 기록하고
+    필요할 때만 offset으로 읽는다. tag/iteration 인덱스와 누적 통계는
+    manifest로부터 유지한다.
     """
     
+    MANIFEST_FILE = "manifest.jsonl"
+    COMMIT_STORE_FILE = "commits.jsonl"
+    CHANGELOG_FILE = "CHANGELOG.md"
+    CHANGELOG_STATE_FILE = ".changelog_state.json"
+    AUTO_PACK_THRESHOLD = 64  # loose object가 이 수를 넘으면 pack
+    TAG_PATTERN = re.compile(r"^v(\d+\.\d+\.\d+)-iter(\d+)$")
+    
     def __init__(self, repo_path: str = "./"):
         self.repo_path = Path(repo_path)
-        self.commits: List[Commit] = []
         self.current_version = "1.0.0"
         
         # 출력 디렉토리
@@ -50,7 +68,166 @@ class VersionController:
         self.versions_dir = Path("versions")
         self.versions_dir.mkdir(exist_ok=True)
         
-        logger.info("VersionController initialized")
+        # 제출물 object 저장소 (압축 blob + delta)
+        self.objects = ObjectStore(self.versions_dir / "store")
+        self._loose_count = len(self.objects.loose_objects())
+        
+        # manifest 요약 행 (commit 순서) 과 인덱스
+        self._entries: List[Dict[str, Any]] = []
+        self._tag_index: Dict[str, int] = {}
+        self._iteration_index: Dict[int, int] = {}
+        # 각 commit 시점까지의 누적 통계 (rollback 시 잘라내기만 하면 됨)
+        self._running: List[Dict[str, float]] = []
+        # 로드된 Commit 캐시
+        self._loaded: Dict[str, Commit] = {}
+        # 렌더링한 changelog 항목 [commit 저장소 offset, 본문] (오래된 순, 처음 사용할 때 로드)
+        self._changelog: Optional[List[List[Any]]] = None
+        
+        self._load_manifest()
+        
+        logger.info(f"VersionController initialized ({len(self._entries)} commits in history)")
+    
+    @property
+    def commits(self) -> List[Commit]:
+        """모든 commit (필요 시 lazy 로드)"""
+        return [self._load_commit(i) for i in range(len(self._entries))]
+    
+    def _load_manifest(self) -> None:
+        """manifest로부터 이전 히스토리 복원 (commit 본문은 로드하지 않음)"""
+        manifest = self.versions_dir / self.MANIFEST_FILE
+        
+        if not manifest.exists():
+            self._bootstrap_manifest(manifest)
+            return
+        
+        with open(manifest, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping corrupt manifest line: {line[:80]}")
+                    continue
+                
+                if 'rollback' in record:
+                    self._truncate_to(record['rollback'])
+                else:
+                    self._index_entry(record)
+        
+        if self._entries:
+            self.current_version = self._entries[-1].get('version', self.current_version)
+    
+    def _bootstrap_manifest(self, manifest: Path) -> None:
+        """manifest 이전에 저장된 versions/*.json 을 commit 저장소로 이관 (1회)"""
+        legacy = []
+        for path in self.versions_dir.glob("v*-iter*.json"):
+            if not self.TAG_PATTERN.match(path.stem):
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    legacy.append(Commit(**json.load(f)))
+            except (json.JSONDecodeError, TypeError) as e:
+                logger.warning(f"Skipping unreadable commit file {path}: {e}")
+        
+        if not legacy:
+            return
+        
+        legacy.sort(key=lambda c: (c.iteration, c.timestamp))
+        for commit in legacy:
+            record = self._summarize(commit, self._append_commit_store(commit))
+            self._index_entry(record)
+            self._append_manifest(record)
+        
+        self.current_version = self._entries[-1]['version']
+        logger.info(f"Built manifest from {len(legacy)} existing commit files")
+    
+    def _summarize(self, commit: Commit, offset: int) -> Dict[str, Any]:
+        """manifest 요약 행 생성 (offset: commit 저장소 내 위치)"""
+        match = self.TAG_PATTERN.match(commit.tag)
+        return {
+            'tag': commit.tag,
+            'version': match.group(1) if match else self.current_version,
+            'iteration': commit.iteration,
+            'score': commit.score,
+            'score_change': commit.score_change,
+            'timestamp': commit.timestamp,
+            'improvement_count': len(commit.improvements),
+            'artifacts': commit.artifacts,
+            'offset': offset,
+        }
+    
+    def _index_entry(self, record: Dict[str, Any]) -> None:
+        """요약 행을 인덱스와 누적 통계에 반영"""
+        position = len(self._entries)
+        score = record['score']
+        
+        if self._running:
+            prev = self._running[-1]
+            running = {
+                'best_score': max(prev['best_score'], score),
+                'worst_score': min(prev['worst_score'], score),
+                'score_sum': prev['score_sum'] + score,
+                'total_improvements': prev['total_improvements'] + record['improvement_count'],
+            }
+        else:
+            running = {
+                'best_score': score,
+                'worst_score': score,
+                'score_sum': score,
+                'total_improvements': record['improvement_count'],
+            }
+        
+        self._entries.append(record)
+        self._running.append(running)
+        self._tag_index[record['tag']] = position
+        self._iteration_index[record['iteration']] = position
+    
+    def _truncate_to(self, tag: str) -> Optional[int]:
+        """tag 이후의 commit을 인덱스에서 제거"""
+        position = self._tag_index.get(tag)
+        if position is None:
+            return None
+        
+        for record in self._entries[position + 1:]:
+            self._tag_index.pop(record['tag'], None)
+            self._loaded.pop(record['tag'], None)
+        
+        del self._entries[position + 1:]
+        del self._running[position + 1:]
+        
+        self._iteration_index = {}
+        for i, record in enumerate(self._entries):
+            self._iteration_index[record['iteration']] = i
+        
+        return position
+    
+    def _append_manifest(self, record: Dict[str, Any]) -> None:
+        """manifest에 한 줄 추가"""
+        write_text(self.versions_dir / self.MANIFEST_FILE,
+                   json.dumps(record, ensure_ascii=False) + "\n", mode='a')
+    
+    def _load_commit(self, position: int) -> Commit:
+        """위치로 commit 본문 로드 (캐시 사용)"""
+        record = self._entries[position]
+        tag = record['tag']
+        
+        if tag not in self._loaded:
+            with open(self.versions_dir / self.COMMIT_STORE_FILE, 'rb') as f:
+                f.seek(record['offset'])
+                self._loaded[tag] = Commit(**json.loads(f.readline()))
+        
+        return self._loaded[tag]
+    
+    def _append_commit_store(self, commit: Commit) -> int:
+        """commit 본문을 저장소에 한 줄로 추가하고 offset 반환"""
+        line = json.dumps(asdict(commit), ensure_ascii=False).encode('utf-8') + b"\n"
+        with span("file.write", path=self.COMMIT_STORE_FILE, bytes_written=len(line)):
+            with open(self.versions_dir / self.COMMIT_STORE_FILE, 'ab') as f:
+                offset = f.tell()
+                f.write(line)
+        return offset
     
     def commit(self, commit_info: Dict[str, Any]) -> Commit:
         """
@@ -68,8 +245,8 @@ class VersionController:
         
         # 점수 변화 계산
         score_change = 0
-        if self.commits:
-            score_change = score - self.commits[-1].score
+        if self._entries:
+            score_change = score - self._entries[-1]['score']
         
         # 커밋 메시지 생성
         message = self._generate_commit_message(iteration, score, score_change, improvements)
@@ -77,6 +254,9 @@ class VersionController:
         # 태그 생성 (semantic versioning)
         tag = self._generate_tag(iteration, improvements)
         
+        # 제출물 저장 (object 저장소)
+        artifacts = self._save_submission(iteration, commit_info)
+        
         # Commit 객체 생성
         commit = Commit(
             iteration=iteration,
@@ -86,13 +266,14 @@ class VersionController:
             score_change=score_change,
             improvements=improvements,
             agent_versions=commit_info.get('agent_versions', {}),
-            tag=tag
+            tag=tag,
+            artifacts=artifacts,
+            scores=commit_info.get('scores', {})
         )
         
         # 저장
-        self.commits.append(commit)
         self._save_commit(commit)
-        self._save_submission(iteration, commit_info)
+        self._loaded[tag] = commit
         
         logger.info(f"Commit created: {tag}")
         logger.info(f"  Score: {score:.1f} ({score_change:+.1f})")
@@ -156,37 +337,75 @@ class VersionController:
         return f"v{self.current_version}-iter{iteration}"
     
     def _save_commit(self, commit: Commit) -> None:
-        """Commit 저장"""
-        # JSON으로 저장
-        commit_file = self.versions_dir / f"{commit.tag}.json"
-        with open(commit_file, 'w', encoding='utf-8') as f:
-            json.dump(asdict(commit), f, ensure_ascii=False, indent=2)
-        
-        # Commit log에 추가
-        log_file = self.versions_dir / "commit_log.txt"
-        with open(log_file, 'a', encoding='utf-8') as f:
-            f.write(f"\n{'='*60}\n")
-            f.write(f"Tag: {commit.tag}\n")
-            f.write(f"Iteration: {commit.iteration}\n")
-            f.write(f"Score: {commit.score:.1f} ({commit.score_change:+.1f})\n")
-            f.write(f"Timestamp: {commit.timestamp}\n")
-            f.write(f"\n{commit.message}\n")
-    
-    def _save_submission(self, iteration: int, commit_info: Dict[str, Any]) -> None:
-        """제출물 저장"""
+        """Commit 저장 (append-only 저장소)"""
+        offset = self._append_commit_store(commit)
+        
+        # manifest 및 인덱스 갱신
+        record = self._summarize(commit, offset)
+        self._append_manifest(record)
+        self._index_entry(record)
+    
+    def _save_submission(self, iteration: int, commit_info: Dict[str, Any]) -> Dict[str, str]:
+        """
+        제출물 저장
+        
+        제출물 내용은 전체 복사본 대신 object 저장소에 이전 버전 대비
+        delta로 저장하고, iteration 디렉토리에는 메타데이터만 남긴다.
+        
+        Returns:
+            제출물 이름 → object id
+        """
         submission_dir = self.submissions_dir / f"iter_{iteration:03d}"
         submission_dir.mkdir(exist_ok=True)
         
+        previous = self._entries[-1].get('artifacts', {}) if self._entries else {}
+        
+        artifacts = {}
+        for name, content in commit_info.get('artifacts', {}).items():
+            artifacts[name] = self.objects.put(
+                self._serialize_artifact(content), base=previous.get(name)
+            )
+            self._loose_count += 1
+        
+        if self._loose_count > self.AUTO_PACK_THRESHOLD:
+            self.pack()
+        
         # 메타데이터 저장
         metadata = {
             'iteration': iteration,
             'score': commit_info.get('score', 0),
             'timestamp': datetime.now().isoformat(),
-            'improvements': commit_info.get('improvements', [])
+            'improvements': commit_info.get('improvements', []),
+            'artifacts': artifacts
         }
         
-        with open(submission_dir / "metadata.json", 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        write_text(submission_dir / "metadata.json",
+                   json.dumps(metadata, ensure_ascii=False, indent=2))
+        
+        return artifacts
+    
+    @staticmethod
+    def _serialize_artifact(content: Any) -> bytes:
+        """제출물을 diff 가능한 텍스트로 직렬화"""
+        if isinstance(content, bytes):
+            return content
+        if isinstance(content, str):
+            return content.encode('utf-8')
+        return json.dumps(content, ensure_ascii=False, indent=2, sort_keys=True, default=str).encode('utf-8')
+    
+    def get_artifact(self, tag: str, name: str) -> Optional[str]:
+        """특정 버전의 제출물 내용"""
+        position = self._tag_index.get(tag)
+        if position is None:
+            return None
+        oid = self._entries[position].get('artifacts', {}).get(name)
+        return self.objects.get_text(oid) if oid else None
+    
+    def pack(self) -> Dict[str, int]:
+        """제출물 object를 pack 파일로 모음"""
+        stats = self.objects.pack()
+        self._loose_count = 0
+        return stats
     
     def get_diff(self, tag1: str, tag2: str) -> Dict[str, Any]:
         """
@@ -213,15 +432,48 @@ class VersionController:
             'improvements_added': len(commit2.improvements) - len(commit1.improvements),
             'agent_version_changes': self._compare_agent_versions(
                 commit1.agent_versions, commit2.agent_versions
-            )
+            ),
+            'artifact_diffs': self._diff_artifacts(commit1, commit2)
         }
     
+    def _diff_artifacts(self, commit1: Commit, commit2: Commit) -> Dict[str, str]:
+        """제출물 unified diff (object id가 같으면 생략)"""
+        diffs = {}
+        
+        for name in sorted(set(commit1.artifacts) | set(commit2.artifacts)):
+            oid1 = commit1.artifacts.get(name)
+            oid2 = commit2.artifacts.get(name)
+            if oid1 == oid2:
+                continue
+            
+            old = self.objects.get_text(oid1) if oid1 else ""
+            new = self.objects.get_text(oid2) if oid2 else ""
+            diffs[name] = "".join(difflib.unified_diff(
+                old.splitlines(keepends=True),
+                new.splitlines(keepends=True),
+                fromfile=f"{commit1.tag}/{name}",
+                tofile=f"{commit2.tag}/{name}"
+            ))
+        
+        return diffs
+    
     def _find_commit_by_tag(self, tag: str) -> Optional[Commit]:
         """태그로 commit 찾기"""
-        for commit in self.commits:
-            if commit.tag == tag:
-                return commit
-        return None
+        position = self._tag_index.get(tag)
+        if position is None:
+            return None
+        return self._load_commit(position)
+    
+    def get_commit(self, tag: str) -> Optional[Commit]:
+        """태그로 commit 조회"""
+        return self._find_commit_by_tag(tag)
+    
+    def find_commit_by_iteration(self, iteration: int) -> Optional[Commit]:
+        """iteration으로 commit 찾기"""
+        position = self._iteration_index.get(iteration)
+        if position is None:
+            return None
+        return self._load_commit(position)
     
     def _compare_agent_versions(self, v1: Dict, v2: Dict) -> Dict[str, Any]:
         """에이전트 버전 비교"""
@@ -257,8 +509,10 @@ class VersionController:
             logger.error(f"Commit with tag {tag} not found")
             return None
         
-        # 해당 iteration 이후의 commits 제거
-        self.commits = [c for c in self.commits if c.iteration <= commit.iteration]
+        # 해당 commit 이후의 commits 제거
+        self._truncate_to(tag)
+        self._append_manifest({'rollback': tag})
+        self.current_version = self._entries[-1]['version']
         
         logger.info(f"Rolled back to {tag}")
         
@@ -266,71 +520,122 @@ class VersionController:
     
     def generate_changelog(self) -> str:
         """
-        Changelog 생성
+        Changelog 생성 (최신순, 새 항목만 렌더링하여 본문 앞에 붙임)
+        
+        렌더링한 항목은 commit 저장소 offset과 함께 메모리에 두고, 상태 파일에는
+        항목별 (offset, 길이)를 기록하여 재시작 후에도 다시 렌더링하지 않는다.
+        rollback 뒤 같은 tag로 다시 commit해도 offset이 달라지므로, 현재 히스토리와
+        offset이 일치하는 항목까지만 재사용한다.
         
         Returns:
             Changelog 내용
         """
-        lines = [
+        changelog_file = self.versions_dir / self.CHANGELOG_FILE
+        state_file = self.versions_dir / self.CHANGELOG_STATE_FILE
+        
+        if self._changelog is None:
+            self._changelog = self._load_changelog(changelog_file, state_file)
+        rendered = self._changelog
+        
+        valid = 0
+        while (valid < min(len(rendered), len(self._entries))
+               and rendered[valid][0] == self._entries[valid]['offset']):
+            valid += 1
+        del rendered[valid:]
+        
+        for position in range(valid, len(self._entries)):
+            text = "\n".join(self._render_changelog_entry(self._load_commit(position))) + "\n"
+            rendered.append([self._entries[position]['offset'], text])
+        
+        header = "\n".join([
             "# Changelog",
             "",
-            f"## Total Iterations: {len(self.commits)}",
-            f"## Best Score: {max(c.score for c in self.commits) if self.commits else 0:.1f}",
+            f"## Total Iterations: {len(self._entries)}",
+            f"## Best Score: {self._running[-1]['best_score'] if self._running else 0:.1f}",
+            "",
             ""
-        ]
-        
-        for commit in reversed(self.commits):  # 최신순
-            lines.extend([
-                f"### {commit.tag}",
-                "",
-                f"**Iteration:** {commit.iteration}",
-                f"**Score:** {commit.score:.1f} ({commit.score_change:+.1f})",
-                f"**Timestamp:** {commit.timestamp}",
-                "",
-                "**Improvements:**"
-            ])
-            
-            for imp in commit.improvements[:3]:
-                priority = imp.get('priority', 'medium').upper()
-                lines.append(f"- [{priority}] {imp.get('target')}: {imp.get('action')}")
-            
-            lines.append("")
-        
-        changelog = "\n".join(lines)
+        ])
+        changelog = header + "".join(text for _, text in reversed(rendered))  # 최신순
         
         # 파일로 저장
-        with open(self.versions_dir / "CHANGELOG.md", 'w', encoding='utf-8') as f:
-            f.write(changelog)
+        write_text(changelog_file, changelog)
+        write_text(state_file, json.dumps({
+            'header': len(header),
+            'entries': [[offset, len(text)] for offset, text in rendered]
+        }))
         
         return changelog
     
+    def _load_changelog(self, changelog_file: Path, state_file: Path) -> List[List[Any]]:
+        """이전에 렌더링한 changelog 항목 복원 (파일이 상태와 다르면 빈 목록 → 전체 재생성)"""
+        if not (changelog_file.exists() and state_file.exists()):
+            return []
+        try:
+            with open(state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            with open(changelog_file, 'r', encoding='utf-8') as f:
+                existing = f.read()
+            lengths = [(offset, length) for offset, length in state['entries']]
+            position = state['header']
+        except (OSError, json.JSONDecodeError, KeyError, TypeError, ValueError):
+            return []
+        # 직접 수정 등으로 길이가 맞지 않으면 재사용하지 않음
+        if position + sum(length for _, length in lengths) != len(existing):
+            return []
+        
+        rendered = []
+        for offset, length in reversed(lengths):  # 파일은 최신순
+            rendered.append([offset, existing[position:position + length]])
+            position += length
+        rendered.reverse()
+        return rendered
+    
+    def _render_changelog_entry(self, commit: Commit) -> List[str]:
+        """Changelog 항목 하나 렌더링"""
+        lines = [
+            f"### {commit.tag}",
+            "",
+            f"**Iteration:** {commit.iteration}",
+            f"**Score:** {commit.score:.1f} ({commit.score_change:+.1f})",
+            f"**Timestamp:** {commit.timestamp}",
+            "",
+            "**Improvements:**"
+        ]
+        
+        for imp in commit.improvements[:3]:
+            priority = imp.get('priority', 'medium').upper()
+            lines.append(f"- [{priority}] {imp.get('target')}: {imp.get('action')}")
+        
+        lines.append("")
+        return lines
+    
     def get_stats(self) -> Dict[str, Any]:
         """버전 통계"""
-        if not self.commits:
+        if not self._entries:
             return {'message': 'No commits yet'}
         
-        scores = [c.score for c in self.commits]
+        running = self._running[-1]
         
         return {
-            'total_commits': len(self.commits),
+            'total_commits': len(self._entries),
             'current_version': self.current_version,
-            'best_score': max(scores),
-            'worst_score': min(scores),
-            'average_score': sum(scores) / len(scores),
-            'score_improvement': scores[-1] - scores[0],
-            'total_improvements': sum(len(c.improvements) for c in self.commits)
+            'best_score': running['best_score'],
+            'worst_score': running['worst_score'],
+            'average_score': running['score_sum'] / len(self._entries),
+            'score_improvement': self._entries[-1]['score'] - self._entries[0]['score'],
+            'total_improvements': running['total_improvements']
         }
     
     def list_commits(self) -> List[Dict[str, Any]]:
         """모든 commit 목록"""
         return [
             {
-                'tag': c.tag,
-                'iteration': c.iteration,
-                'score': c.score,
-                'score_change': c.score_change,
-                'timestamp': c.timestamp,
-                'improvement_count': len(c.improvements)
+                'tag': e['tag'],
+                'iteration': e['iteration'],
+                'score': e['score'],
+                'score_change': e['score_change'],
+                'timestamp': e['timestamp'],
+                'improvement_count': e['improvement_count']
             }
-            for c in self.commits
+            for e in self._entries
         ]
@@ -158,6 +158,111 @@ def test_version_control():
     print("✓ VersionController test passed")
 
 
+def test_version_control_history():
+    """버전 컨트롤러 인덱스 / manifest 복원 테스트"""
+    print("\n=== Testing VersionController history ===")
+    
+    import os
+    import tempfile
+    
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            vc = VersionController()
+            for i, score in enumerate([70, 82, 76, 88], 1):
+                vc.commit({
+                    'iteration': i,
+                    'score': score,
+                    'improvements': [{'target': 'methodology', 'action': 'add_detail'}] * i
+                })
+            
+            stats = vc.get_stats()
+            assert stats['best_score'] == 88
+            assert stats['worst_score'] == 70
+            assert stats['total_improvements'] == 10
+            assert vc.find_commit_by_iteration(3).score == 76
+            
+            tag2 = vc.list_commits()[1]['tag']
+            vc.rollback(tag2)
+            assert vc.get_stats()['best_score'] == 82
+            assert vc.get_stats()['total_commits'] == 2
+            
+            # 재시작 시 manifest로부터 히스토리 복원 (본문은 lazy 로드)
+            reloaded = VersionController()
+            assert reloaded.list_commits() == vc.list_commits()
+            assert reloaded.current_version == vc.current_version
+            assert not reloaded._loaded
+            assert reloaded._find_commit_by_tag(tag2).score == 82
+            print(f"Reloaded stats: {reloaded.get_stats()}")
+            
+            # 증분 changelog는 전체 재생성 결과와 같아야 함
+            reloaded.generate_changelog()
+            reloaded.commit({'iteration': 3, 'score': 90, 'improvements': []})
+            incremental = reloaded.generate_changelog()
+            assert incremental.startswith("# Changelog\n\n## Total Iterations: 3\n## Best Score: 90.0\n")
+            assert VersionController().generate_changelog() == incremental
+            (reloaded.versions_dir / reloaded.CHANGELOG_STATE_FILE).unlink()
+            assert VersionController().generate_changelog() == incremental
+            
+            # rollback 후 같은 tag로 다시 commit하면 이전 본문을 재사용하지 않고, 오래된 항목은 그대로 둔 채 앞에 추가
+            tag3 = reloaded.list_commits()[2]['tag']
+            reloaded.rollback(tag2)
+            reloaded.commit({'iteration': 3, 'score': 95, 'improvements': []})
+            assert reloaded.list_commits()[2]['tag'] == tag3
+            changelog = reloaded.generate_changelog()
+            assert "95.0" in changelog and "90.0" not in changelog
+            assert changelog.index(f"### {tag3}") < changelog.index(f"### {tag2}")
+            assert changelog.endswith(incremental[incremental.index(f"### {tag2}"):])
+            (reloaded.versions_dir / reloaded.CHANGELOG_STATE_FILE).unlink()
+            assert VersionController().generate_changelog() == changelog
+            
+            # commit 본문은 단일 append-only 저장소에만 기록
+            assert not list(reloaded.versions_dir.glob("v*.json"))
+        finally:
+            os.chdir(cwd)
+    
+    print("✓ VersionController history test passed")
+
+
+def test_submission_object_store():
+    """제출물 delta 저장 / diff 테스트"""
+    print("\n=== Testing submission object store ===")
+    
+    import os
+    import tempfile
+    
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            vc = VersionController()
+            
+            sections = [f"## Section {i}\n" + f"Paragraph {i} of the paper. " * 40 + "\n" for i in range(60)]
+            paper_v1 = "".join(sections)
+            paper_v2 = paper_v1.replace("## Section 30\n", "## Section 30 (revised)\nNew evidence added.\n")
+            
+            c1 = vc.commit({'iteration': 1, 'score': 70, 'artifacts': {'paper': paper_v1}})
+            size_after_v1 = vc.objects.disk_usage()
+            c2 = vc.commit({'iteration': 2, 'score': 75, 'artifacts': {'paper': paper_v2}})
+            growth = vc.objects.disk_usage() - size_after_v1
+            print(f"Paper size: {len(paper_v2)} bytes, store growth: {growth} bytes")
+            
+            # 저장소 증가량은 논문 크기가 아니라 수정 크기에 비례
+            assert growth < len(paper_v2) // 20
+            
+            diff = vc.get_diff(c1.tag, c2.tag)
+            assert "+## Section 30 (revised)" in diff['artifact_diffs']['paper']
+            
+            vc.pack()
+            assert not vc.objects.loose_objects()
+            assert VersionController().get_artifact(c2.tag, 'paper') == paper_v2
+        finally:
+            os.chdir(cwd)
+    
+    print("✓ Submission object store test passed")
+
+
 def test_self_improving_agent():
     """Self-Improving Agent 테스트"""
     print("\n=== Testing SelfImprovingAgent ===")
@@ -220,6 +325,360 @@ def test_full_engine():
     print("✓ Full engine test passed")
 
 
+def test_tracing():
+    """span tracing / iteration별 지연시간 분석 테스트"""
+    print("\n=== Testing tracing ===")
+    
+    import tracing
+    
+    engine = MIRROREngine({'target_score': 85, 'max_iterations': 1})
+    from main import create_agents
+    for name, agent in create_agents().items():
+        engine.register_agent(name, agent)
+    
+    tracer = tracing.configure(enabled=True)
+    try:
+        tracer.set_iteration(1)
+        with tracing.span("phase.research"):
+            submission = engine._execute_research()
+        with tracing.span("phase.evaluate"):
+            engine._multi_judge_evaluation(submission)
+        
+        breakdown = tracer.iteration_breakdown()[1]
+        print(f"Iteration 1: {breakdown['total_ms']} ms, spans: {list(breakdown['spans'])}")
+        
+        spans = breakdown['spans']
+        assert spans['phase.research']['count'] == 1
+        assert spans['judge.gpt4']['count'] == 1
+        assert any(name.startswith('agent.') for name in spans)
+        # 중첩 span은 iteration 총합에 중복 계산되지 않음
+        root_ms = spans['phase.research']['total_ms'] + spans['phase.evaluate']['total_ms']
+        assert abs(breakdown['total_ms'] - root_ms) < 0.01
+    finally:
+        tracing.configure(enabled=False)
+    
+    # 비활성화 시 no-op
+    assert tracing.span("phase.research") is tracing.NOOP_SPAN
+    
+    # phase마다 새 프로세스가 같은 파일로 내보내도 이전 trace/분석에 합쳐짐
+    import json
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        trace, output = Path(tmp) / 'trace.json', Path(tmp) / 'latency_breakdown.json'
+        for phase in ('research', 'evaluate'):
+            process = tracing.Tracer(enabled=True, path=str(trace), fmt="chrome")
+            process.set_iteration(1)
+            with process.span(f"phase.{phase}"):
+                with process.span("llm.generate"):
+                    pass
+            process.flush()
+            process.flush()
+            process.write_breakdown(str(output), merge=True)
+        
+        with open(trace, 'r', encoding='utf-8') as f:
+            events = json.load(f)['traceEvents']
+        assert sorted(e['name'] for e in events) == ['llm.generate', 'llm.generate',
+                                                      'phase.evaluate', 'phase.research']
+        with open(output, 'r', encoding='utf-8') as f:
+            merged = json.load(f)['1']
+        assert merged['spans']['llm.generate']['count'] == 2
+        assert set(merged['spans']) == {'llm.generate', 'phase.research', 'phase.evaluate'}
+    
+    print("✓ Tracing test passed")
+
+
+def test_surrogate():
+    """개선 효과 surrogate (incremental 학습, 저장, 예산 기반 개선) 테스트"""
+    print("\n=== Testing ImprovementSurrogate ===")
+    
+    import random
+    import tempfile
+    from mirror.surrogate import ImprovementSurrogate
+    
+    rng = random.Random(7)
+    scores = {'practicality': 12, 'methodology': 11, 'data_quality': 15,
+              'conclusion': 6, 'readability': 3, 'creativity': 12, 'total': 59}
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'surrogate.npz'
+        surrogate = ImprovementSurrogate(str(path), min_samples=8)
+        assert surrogate.predict('methodology', '통계적 가정 검증', scores) is None
+        
+        # '통계적 가정 검증'은 평균 +3점, '방법론 섹션 상세화'는 +0.5점
+        for i in range(12):
+            before = {c: v + rng.uniform(-1, 1) for c, v in scores.items()}
+            improvements = [
+                {'target': 'methodology', 'action': '통계적 가정 검증', 'cost_tokens': 900},
+                {'target': 'conclusion', 'action': '한계점 명확히 논의', 'cost_tokens': 900},
+                {'target': 'readability', 'action': '영문 교정', 'cost_tokens': 900, 'applied': False},
+            ] if i % 2 else [
+                {'target': 'methodology', 'action': '방법론 섹션 상세화', 'cost_tokens': 900},
+                {'target': 'conclusion', 'action': '한계점 명확히 논의', 'cost_tokens': 900},
+            ]
+            after = dict(before)
+            after['methodology'] += (3.0 if i % 2 else 0.5) + rng.gauss(0, 0.1)
+            after['conclusion'] += 1.0
+            added = surrogate.observe(before, improvements, after, key=f"iter{i}")
+            assert added == 2  # applied=False 제외
+        
+        assert surrogate.observe(scores, improvements, scores, key="iter3") == 0  # 중복 키
+        strong = surrogate.predict('methodology', '통계적 가정 검증', scores, 900)
+        weak = surrogate.predict('methodology', '방법론 섹션 상세화', scores, 900)
+        print(f"Predicted gain: 통계적 가정 검증 {strong:+.2f}, 방법론 섹션 상세화 {weak:+.2f}")
+        assert strong > weak + 1.5
+        
+        # 저장 후 다시 로드해도 같은 예측
+        surrogate.save()
+        reloaded = ImprovementSurrogate(str(path))
+        assert reloaded.samples == surrogate.samples and "iter3" in reloaded.seen
+        assert abs(reloaded.predict('methodology', '통계적 가정 검증', scores, 900) - strong) < 1e-3
+        print(f"Saved model: {path.stat().st_size} bytes, stats {reloaded.get_stats()}")
+        
+        # 리플렉션: 학습된 예측으로 기대 상승과 정렬 결정
+        engine = ReflectionEngine(surrogate=reloaded)
+        weakness = engine._identify_weaknesses(scores)
+        ranked = engine._generate_improvements(weakness, scores, {'paper': {'title': 'T'}})
+        methodology = [i for i in ranked if i.target == 'methodology']
+        assert methodology[0].action == '통계적 가정 검증'
+        assert ranked.index(methodology[0]) < ranked.index(methodology[1])
+        assert all(i.cost_tokens > 0 for i in ranked)
+    
+    # 엔진: 토큰 예산 내의 개선사항만 적용
+    mirror_engine = MIRROREngine({'improve_token_budget': 1000, 'surrogate_path': None})
+    reflection = {'improvements': [
+        {'target': 'methodology', 'action': 'a', 'cost_tokens': 600},
+        {'target': 'conclusion', 'action': 'b', 'cost_tokens': 600},
+        {'target': 'readability', 'action': 'c', 'cost_tokens': 300},
+    ]}
+    mirror_engine._improve_submission({}, {}, reflection)
+    assert [i['applied'] for i in reflection['improvements']] == [True, False, True]
+    
+    print("✓ ImprovementSurrogate test passed")
+
+
+def test_strategy_bandit():
+    """프롬프트 전략 bandit (Thompson sampling, 실행 간 유지) 테스트"""
+    print("\n=== Testing StrategyBandit ===")
+    
+    import random
+    import tempfile
+    from mirror.agents.bandit import StrategyBandit
+    
+    rng = random.Random(3)
+    true_means = {'baseline': 0.55, 'incremental_improvement': 0.75, 'drastic_change': 0.45}
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'writer.npz'
+        bandit = StrategyBandit(list(true_means), path=str(path), seed=0)
+        for _ in range(300):
+            arm = bandit.select()
+            bandit.update(arm, min(1.0, max(0.0, rng.gauss(true_means[arm], 0.1))))
+        
+        stats = bandit.get_stats()
+        print(f"Stats: {stats}")
+        assert bandit.best() == 'incremental_improvement'
+        assert stats['incremental_improvement']['pulls'] > 200   # 활용
+        assert all(s['pulls'] > 0 for s in stats.values())       # 탐색
+        assert bandit.select(exclude=['incremental_improvement']) != 'incremental_improvement'
+        
+        # 다음 실행: 저장된 통계를 이어받음
+        restored = StrategyBandit(list(true_means), path=str(path))
+        assert restored.get_stats() == stats
+        
+        # 에이전트: 보상이 현재 전략에 기록되고, 연속 저점이면 전략 교체
+        class TestAgent(SelfImprovingAgent):
+            def execute(self, task):
+                return {'result': 'test'}
+        
+        agent = TestAgent('writer')
+        agent.bind_strategy_store(tmp)
+        assert agent.bandit.pulls.sum() == 300
+        
+        for _ in range(3):
+            before = agent.current_approach
+            agent.improve({'score': 0.3, 'weaknesses': ['methodology']})
+        assert agent.current_approach != before
+        assert agent.prompt_directive == SelfImprovingAgent.STRATEGIES.get(agent.current_approach, '')
+        assert StrategyBandit(list(true_means), path=str(path)).pulls.sum() == 303
+        print(f"Agent strategy: {agent.get_stats()['current_strategy']}")
+        
+        # 선택된 전략의 지시문이 생성 프롬프트에 들어감
+        from main import create_agents
+        agents = create_agents()
+        baseline_paper = agents['writer'].write({})
+        agents['writer'].set_strategy('drastic_change')
+        paper = agents['writer'].write({})
+        assert paper != baseline_paper
+        assert SelfImprovingAgent.STRATEGIES['drastic_change'] in paper['prompt']
+        
+        # 엔진: 에이전트마다 담당 기준의 점수로 보상
+        engine = MIRROREngine({'experiment_replicates': 0, 'surrogate_path': None,
+                               'strategy_dir': tmp})
+        for name, research_agent in agents.items():
+            engine.register_agent(name, research_agent)
+        engine._reward_agents({'aggregated': {
+            'practicality': 20, 'methodology': 10, 'data_quality': 5, 'conclusion': 10,
+            'readability': 5, 'creativity': 10, 'ai_contribution': 'FAIL'
+        }})
+        rewards = {name: agents[name].performance_history[-1]['score']
+                   for name in ('literature', 'hypothesis', 'data', 'writer', 'logger')}
+        print(f"Rewards: {rewards}")
+        assert rewards == {'literature': 1.0, 'hypothesis': 0.5, 'data': 0.2, 'writer': 1.0, 'logger': 0.0}
+        assert agents['data'].performance_history[-1]['feedback']['weaknesses'] == ['data_quality']
+    
+    print("✓ StrategyBandit test passed")
+
+
+class StrategyWriter(SelfImprovingAgent):
+    """전략에 따라 결과가 달라지는 작성 에이전트 (A/B 테스트용, worker로 pickle됨)"""
+    
+    def write(self, data):
+        return {'title': 'Test Paper', 'approach': self.current_approach}
+    
+    def execute(self, task):
+        return self.write(task)
+
+
+class StrategyJudge(SelfImprovingAgent):
+    """incremental_improvement 전략으로 쓴 논문에 +6점, drastic_change에는 -4점을 주는 심사위원"""
+    
+    BONUS = {'incremental_improvement': 6, 'drastic_change': -4}
+    
+    def evaluate(self, submission):
+        bonus = self.BONUS.get(submission.get('paper', {}).get('approach'), 0)
+        return {'practicality': 14, 'methodology': 14, 'data_quality': 18 + bonus,
+                'conclusion': 7, 'readability': 4, 'creativity': 14, 'ai_contribution': 'PASS'}
+    
+    def execute(self, task):
+        return self.evaluate(task)
+
+
+def test_experiment_harness():
+    """A/B 실험 하니스 (병렬 실행, 심사 캐시, 대응 검정, 승격) 테스트"""
+    print("\n=== Testing ExperimentHarness ===")
+    
+    import tempfile
+    from mirror.experiment import ExperimentHarness, Variant, paired_test
+    
+    assert paired_test([1.0] * 8) == 1 / 256
+    assert paired_test([0.0] * 8) == 1.0
+    assert paired_test([-1.0] * 8) == 1.0
+    
+    agents = {'writer': StrategyWriter('writer'),
+              **{judge: StrategyJudge(judge) for judge in ('claude', 'gpt4', 'gemini')}}
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        harness = ExperimentHarness(replicates=8, workers=2, directory=tmp, seed=0)
+        try:
+            results = harness.compare(agents, [
+                Variant('incremental', strategies={'writer': 'incremental_improvement'}),
+                Variant('drastic', strategies={'writer': 'drastic_change'}),
+                Variant('no_writer', stages=('literature', 'hypothesis', 'data', 'logger')),
+            ])
+            for r in results:
+                print(f"  {r.variant}: {r.mean_diff:+.1f} (p={r.p_value}, promoted={r.promoted})")
+            assert [r.promoted for r in results] == [True, False, False]
+            assert [r.status for r in results] == ['promoted', 'rejected', 'inconclusive']
+            assert results[0].mean_diff == 6 and results[0].wins == 8
+            assert agents['writer'].current_strategy is None  # 원본은 그대로
+            
+            # 제출물이 4종류뿐이라 심사 호출은 4 x 3회, 두 번째 실험은 모두 캐시
+            assert harness.judge_calls == 12
+            harness.compare(agents, [Variant('incremental', strategies={'writer': 'incremental_improvement'})])
+            assert harness.judge_calls == 12
+        finally:
+            harness.close()
+        
+        stats = harness.get_stats()
+        print(f"Stats: {stats}")
+        assert stats['candidates'] == 4 and stats['trials'] == 32 + 16
+        assert stats['candidates_per_hour'] > 0
+        assert len(Path(tmp, 'experiments.jsonl').read_text().splitlines()) == 2
+        
+        # 엔진: 지는 전략 후보만 거부, 제출물이 그대로인 시스템 개선은 inconclusive라 적용
+        engine = MIRROREngine({'experiment_replicates': 6, 'experiment_workers': 1,
+                               'experiment_dir': tmp, 'surrogate_path': None})
+        for name, agent in agents.items():
+            engine.register_agent(name, agent)
+        # apply_variant로 표현할 수 없는 개선사항은 실험 없이 제외
+        improvements = [SystemImprovement(target='agent:writer', action='enhance_capabilities', reason='test'),
+                        SystemImprovement(target='workflow', action='parallelize', reason='test'),
+                        SystemImprovement(target='prompt', action='add_examples', reason='test')]
+        assert engine._screen_improvements(improvements) == []
+        assert engine.experiments.experiments == 0
+        writer = agents['writer']
+        assert writer.strategy_tester is not None
+        assert engine._test_agent_strategy(writer, 'incremental_improvement')
+        assert not engine._test_agent_strategy(writer, 'drastic_change')
+        # 차이 없음 (inconclusive)은 채택하지 않음
+        assert not engine._test_agent_strategy(writer, 'explore_alternatives')
+    
+    print("✓ ExperimentHarness test passed")
+
+
+class DirectiveJudge(SelfImprovingAgent):
+    """논문 프롬프트의 전략 지시문에 따라 점수가 달라지는 심사위원 (main.py 에이전트 A/B 테스트용)"""
+    
+    def evaluate(self, submission):
+        prompt = submission.get('paper', {}).get('prompt', '')
+        bonus = 5 if SelfImprovingAgent.STRATEGIES['incremental_improvement'] in prompt else 0
+        return {'practicality': 15, 'methodology': 15, 'data_quality': 18 + bonus,
+                'conclusion': 8, 'readability': 4, 'creativity': 15, 'ai_contribution': 'PASS'}
+    
+    def execute(self, task):
+        return self.evaluate(task)
+
+
+def test_experiment_promotion():
+    """실제 연구 에이전트에서 생성물이 달라지는 전략은 승격, 구별되지 않는 변형은 inconclusive"""
+    print("\n=== Testing Experiment Promotion ===")
+    
+    import random
+    import tempfile
+    from main import create_agents
+    from mirror.experiment import ExperimentHarness, JudgeCache, Variant
+    
+    agents = {name: agent for name, agent in create_agents().items()
+              if name not in ('claude', 'gpt4', 'gemini')}
+    agents.update({judge: DirectiveJudge(judge) for judge in ('claude', 'gpt4', 'gemini')})
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        harness = ExperimentHarness(replicates=6, workers=1, directory=tmp, seed=0)
+        state = random.getstate()
+        results = harness.compare(agents, [
+            Variant('writer:incremental', strategies={'writer': 'incremental_improvement'}),
+            Variant('data:incremental', strategies={'data': 'incremental_improvement'}),
+            Variant('writer:improved', improvements=[
+                SystemImprovement(target='agent:writer', action='enhance_capabilities', reason='test')]),
+        ])
+        harness.close()
+        for r in results:
+            print(f"  {r.variant}: {r.mean_diff:+.1f} (p={r.p_value}, {r.status}, identical={r.identical})")
+        assert random.getstate() == state  # workers=1이어도 전역 난수 상태는 그대로
+        
+        assert results[0].status == 'promoted' and results[0].promoted and results[0].mean_diff == 5
+        # 데이터 프롬프트는 바뀌었지만 심사위원이 구별하지 못함
+        assert results[1].status == 'inconclusive' and not results[1].identical
+        # 제출물 자체가 같음
+        assert results[2].status == 'inconclusive' and results[2].identical
+        
+        # 심사 캐시: 심사위원 버전이 바뀌면 재사용하지 않고, 크기 제한을 넘으면 오래된 것부터 제거
+        submission = {'paper': {'title': 'T'}}
+        judge = DirectiveJudge('claude')
+        key = JudgeCache.key('claude', submission, JudgeCache.version(judge))
+        judge.version = '1.1.0'
+        assert JudgeCache.key('claude', submission, JudgeCache.version(judge)) != key
+        
+        cache = JudgeCache(Path(tmp) / 'small_cache.jsonl', max_entries=3)
+        for i in range(8):
+            cache.put_many([(f"k{i}", 'claude', {'total': i})])
+        assert list(cache.entries) == ['k5', 'k6', 'k7']
+        assert len((Path(tmp) / 'small_cache.jsonl').read_text().splitlines()) <= 6
+        assert list(JudgeCache(Path(tmp) / 'small_cache.jsonl', max_entries=3).entries) == ['k5', 'k6', 'k7']
+    
+    print("✓ Experiment promotion test passed")
+
+
 def main():
     """메인 테스트"""
     print("=" * 60)
@@ -230,8 +689,15 @@ def main():
         ("MetaLearningEngine", test_meta_learning),
         ("ReflectionEngine", test_reflection),
         ("VersionController", test_version_control),
+        ("VersionController History", test_version_control_history),
+        ("Submission Object Store", test_submission_object_store),
         ("SelfImprovingAgent", test_self_improving_agent),
         ("Full Engine", test_full_engine),
+        ("Tracing", test_tracing),
+        ("ImprovementSurrogate", test_surrogate),
+        ("StrategyBandit", test_strategy_bandit),
+        ("ExperimentHarness", test_experiment_harness),
+        ("Experiment Promotion", test_experiment_promotion),
     ]
     
     passed = 0
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Benchmark Harness
+
+Metric collection and result storage for the end-to-end benchmarks.
+
+Each scenario runs in its own process with tracing and the interaction
+ledger pointed at a scratch directory. Afterwards the harness reads back:
+
+- per-phase latency percentiles from the exported spans
+- file bytes written (file.write spans) and final output size on disk
+- LLM tokens (interaction ledger)
+- peak RSS of the scenario process
+
+Results are appended to benchmarks/results/<scenario>.jsonl (asv-style
+history) and compared against benchmarks/baseline.json, or against the
+previous run when no baseline exists.
+"""
+
+import json
+import math
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+BASELINE_FILE = Path(__file__).resolve().parent / "baseline.json"
+
+sys.path.insert(0, str(ROOT / "shared"))
+
+# metric -> direction ("lower" or "higher" is better); only these are checked for regressions
+TRACKED = {
+    'iterations_per_hour': 'higher',
+    'peak_rss_mb': 'lower',
+    'bytes_written': 'lower',
+    'output_bytes': 'lower',
+    'tokens_per_point': 'lower',
+    'phase_p50_ms': 'lower',
+    'phase_p90_ms': 'lower',
+}
+
+# changes smaller than this are treated as noise (iterations_per_hour: seconds per iteration)
+NOISE_FLOOR = {
+    'iterations_per_hour': 0.005,
+    'peak_rss_mb': 2.0,
+    'bytes_written': 1024,
+    'output_bytes': 1024,
+    'tokens_per_point': 1.0,
+    'phase_p50_ms': 5.0,
+    'phase_p90_ms': 5.0,
+}
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def load_spans(path: Path) -> List[Dict[str, Any]]:
+    """Read a JSON-lines span export"""
+    if not path.exists():
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def span_percentiles(spans: Iterable[Dict[str, Any]], prefix: str) -> Dict[str, Dict[str, float]]:
+    """{span name: {count, p50_ms, p90_ms, p99_ms, max_ms}} for spans starting with prefix"""
+    durations: Dict[str, List[float]] = {}
+    for record in spans:
+        if record['name'].startswith(prefix):
+            durations.setdefault(record['name'], []).append(record['duration_ms'])
+    return {
+        name: {
+            'count': len(values),
+            'p50_ms': round(percentile(values, 50), 3),
+            'p90_ms': round(percentile(values, 90), 3),
+            'p99_ms': round(percentile(values, 99), 3),
+            'max_ms': round(max(values), 3),
+        }
+        for name, values in sorted(durations.items())
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (MB)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 2)
+
+
+def output_bytes(scratch: Path) -> int:
+    """Size of files the scenario left in its scratch directory"""
+    harness_files = {'trace.jsonl', 'result.json'}
+    return sum(
+        path.stat().st_size for path in scratch.rglob('*')
+        if path.is_file() and path.name not in harness_files and not path.name.startswith('ledger.bin')
+    )
+
+
+def summarize(
+    scenario: str,
+    wall_s: float,
+    scores: List[float],
+    scratch: Path,
+    extra: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Build the result record for a finished scenario
+
+    Args:
+        scenario: Scenario name
+        wall_s: Wall time of the measured loop
+        scores: Score after each iteration
+        scratch: Scratch directory holding trace.jsonl
+        extra: Scenario-specific fields
+    """
+    from ledger import get_ledger
+    from tracing import get_tracer
+
+    get_tracer().flush()
+    spans = load_spans(scratch / "trace.jsonl")
+    phases = span_percentiles(spans, "phase.")
+    phase_totals = [r['duration_ms'] for r in spans if r['name'].startswith("phase.")]
+
+    usage = get_ledger().aggregate()
+
+    iterations = len(scores)
+    gain = (max(scores) - scores[0]) if scores else 0.0
+    tokens = usage['total_tokens']
+
+    return {
+        'scenario': scenario,
+        'iterations': iterations,
+        'wall_s': round(wall_s, 3),
+        'iterations_per_hour': round(iterations / wall_s * 3600, 1) if wall_s > 0 else 0.0,
+        'phase_p50_ms': round(percentile(phase_totals, 50), 3),
+        'phase_p90_ms': round(percentile(phase_totals, 90), 3),
+        'phases': phases,
+        'llm': span_percentiles(spans, "llm."),
+        'peak_rss_mb': peak_rss_mb(),
+        'bytes_written': sum(r['attrs'].get('bytes_written', 0) for r in spans if r['name'] == 'file.write'),
+        'output_bytes': output_bytes(scratch),
+        'llm_calls': usage['total_interactions'],
+        'llm_tokens': tokens,
+        'scores': [round(s, 2) for s in scores],
+        'score_gain': round(gain, 2),
+        'tokens_per_point': round(tokens / gain, 1) if gain > 0 else None,
+        **(extra or {}),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, timeout=10).stdout.strip()
+    except Exception:
+        return ""
+
+
+def store(result: Dict[str, Any]) -> Path:
+    """Append a result to the scenario history"""
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    record = {
+        'timestamp': datetime.now().isoformat(),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        **result,
+    }
+    path = RESULTS_DIR / f"{result['scenario']}.jsonl"
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return path
+
+
+def previous(scenario: str) -> Optional[Dict[str, Any]]:
+    """Reference result: baseline entry, otherwise the previous stored run"""
+    if BASELINE_FILE.exists():
+        with open(BASELINE_FILE, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if scenario in baseline:
+            return baseline[scenario]
+
+    path = RESULTS_DIR / f"{scenario}.jsonl"
+    if not path.exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = [line for line in f if line.strip()]
+    return json.loads(lines[-1]) if lines else None
+
+
+def save_baseline(results: List[Dict[str, Any]]) -> None:
+    """Use these results as the regression baseline"""
+    baseline = {}
+    if BASELINE_FILE.exists():
+        with open(BASELINE_FILE, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    for result in results:
+        baseline[result['scenario']] = {k: result.get(k) for k in ('iterations', *TRACKED)}
+        baseline[result['scenario']]['revision'] = git_revision()
+    with open(BASELINE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=2)
+
+
+def compare(result: Dict[str, Any], reference: Optional[Dict[str, Any]],
+            tolerance: float = 0.25) -> List[str]:
+    """
+    Regressions of result against reference
+
+    Returns:
+        Human-readable regression messages (empty if none)
+    """
+    if not reference:
+        return []
+    regressions = []
+    for metric, better in TRACKED.items():
+        new, old = result.get(metric), reference.get(metric)
+        if not isinstance(new, (int, float)) or not isinstance(old, (int, float)) or old == 0:
+            continue
+        if metric == 'iterations_per_hour':
+            delta = abs(3600.0 / new - 3600.0 / old) if new > 0 else float('inf')
+        else:
+            delta = abs(new - old)
+        if delta < NOISE_FLOOR.get(metric, 0):
+            continue
+        change = (new - old) / abs(old)
+        worse = change > tolerance if better == 'lower' else change < -tolerance
+        if worse:
+            regressions.append(f"{result['scenario']}.{metric}: {old} -> {new} ({change:+.0%})")
+    return regressions
+
+
+class Stopwatch:
+    """Wall-clock timer for the measured loop"""
+
+    def __enter__(self) -> "Stopwatch":
+        self.start = time.perf_counter()
+        self.elapsed = 0.0
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.elapsed = time.perf_counter() - self.start
+        return False
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmarks for the research loops
+
+Scenarios (each runs in a fresh process and scratch directory):
+    agents     InfiniteLoopWorkflow.run_infinite_loop   (ai_co_scientist_agents)
+    mirror     MIRROREngine.run with HTTP judges         (ai_co_scientist_v2)
+    main_ralp  main_ralp phase machine via GLM4Client    (ai_co_scientist_glm4)
+
+LLM calls go to the local mock server (shared/mock_llm_server.py), so runs
+are offline and deterministic apart from the configured latency.
+
+Usage:
+    python benchmarks/run.py                           # all scenarios, compare to baseline
+    python benchmarks/run.py --scenarios mirror --iterations 10
+    python benchmarks/run.py --save-baseline           # accept current numbers
+    python benchmarks/run.py --latency lognormal:800:0.6 --tps 60 --time-scale 1
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from harness import ROOT, Stopwatch, compare, previous, save_baseline, store, summarize
+
+SCENARIOS = ['agents', 'mirror', 'main_ralp']
+
+JUDGE_RUBRIC = {
+    'practicality': 20,
+    'methodology': 20,
+    'data_quality': 25,
+    'conclusion': 10,
+    'readability': 5,
+    'creativity': 20,
+}
+
+
+# =============================================================================
+# Scenarios (run inside the worker process)
+# =============================================================================
+
+def run_agents(iterations: int) -> Dict[str, Any]:
+    """InfiniteLoopWorkflow for a fixed number of iterations (target unreachable)"""
+    sys.path.insert(0, str(ROOT / "ai_co_scientist_agents"))
+    from main import InfiniteLoopWorkflow
+
+    workflow = InfiniteLoopWorkflow(target_score=101, max_iterations=iterations)
+    workflow.git_commit = None
+
+    scores: List[float] = []
+    assess = workflow.quality_agent.assess_quality
+
+    def assess_and_record(*args, **kwargs):
+        result = assess(*args, **kwargs)
+        scores.append(float(result.get('total_score', 0)))
+        return result
+
+    workflow.quality_agent.assess_quality = assess_and_record
+
+    with Stopwatch() as watch:
+        workflow.run_infinite_loop()
+    return {'wall_s': watch.elapsed, 'scores': scores}
+
+
+def _judge_class():
+    from llm_http import APIStatusError, ChatClient
+    from mirror.agents.base import SelfImprovingAgent
+
+    system_prompt = (
+        "You are a judge for the 2026 AI Co-Scientist Challenge Korea.\n"
+        "Respond only with JSON in this format:\n{\n"
+        + "".join(f'    "{c}": {{"score": 0-{m}, "reason": "..."}},\n' for c, m in JUDGE_RUBRIC.items())
+        + '    "ai_contribution": {"pass": true/false, "reason": "..."}\n}\n'
+    )
+
+    class MockLLMJudge(SelfImprovingAgent):
+        """Judge that scores the submission through the mock LLM server"""
+
+        def __init__(self, name: str, base_url: str, model: str):
+            super().__init__(name)
+            self.client = ChatClient(base_url, api_key="mock")
+            self.model = model
+
+        def evaluate(self, submission: dict) -> dict:
+            paper = json.dumps(submission.get('paper', submission), ensure_ascii=False, default=str)
+            messages = [{'role': 'system', 'content': system_prompt},
+                        {'role': 'user', 'content': f"=== 연구보고서 ===\n{paper}"}]
+            for attempt in range(3):
+                try:
+                    response = self.client.chat.completions.create(
+                        model=self.model, messages=messages, temperature=0.5, max_tokens=1024
+                    )
+                    break
+                except APIStatusError:
+                    if attempt == 2:
+                        raise
+            data = json.loads(response.choices[0].message.content)
+            scores = {c: float(data[c]['score']) for c in JUDGE_RUBRIC}
+            return {
+                **scores,
+                'ai_contribution': 'PASS' if data['ai_contribution']['pass'] else 'FAIL',
+                'total': sum(scores.values()),
+                'usage': {'prompt_tokens': response.usage.prompt_tokens,
+                          'completion_tokens': response.usage.completion_tokens},
+            }
+
+        def execute(self, task):
+            return self.evaluate(task)
+
+    return MockLLMJudge
+
+
+def run_mirror(iterations: int) -> Dict[str, Any]:
+    """MIRROREngine.run with the three judges backed by the mock server"""
+    sys.path.insert(0, str(ROOT / "ai_co_scientist_v2"))
+    from main import create_agents
+    from mirror.engine import MIRROREngine
+
+    engine = MIRROREngine({'target_score': 101, 'max_iterations': iterations})
+    engine.git_commit = None
+
+    judge = _judge_class()
+    base_url = os.environ['GLM4_BASE_URL']
+    agents = create_agents()
+    for name, model in (('claude', 'claude'), ('gpt4', 'gpt-4'), ('gemini', 'gemini-pro')):
+        agents[name] = judge(f"{name}_judge", base_url, model)
+    for name, agent in agents.items():
+        engine.register_agent(name, agent)
+
+    with Stopwatch() as watch:
+        engine.run()
+    scores = [float(it.evaluation.get('total_score', 0)) for it in engine.iteration_history]
+    return {'wall_s': watch.elapsed, 'scores': scores}
+
+
+def run_main_ralp(iterations: int) -> Dict[str, Any]:
+    """main_ralp phase machine until `iterations` evaluate phases have run"""
+    sys.path.insert(0, str(ROOT / "ai_co_scientist_glm4"))
+    import main_ralp
+
+    main_ralp.GIT_AUTO_COMMIT_AVAILABLE = False
+    main_ralp.TARGET_SCORE = 101
+
+    scores: List[float] = []
+    calls = 0
+    with Stopwatch() as watch:
+        while len(scores) < iterations and calls < 4 * iterations + 10:
+            phase = main_ralp.load_state()['phase'] if main_ralp.STATE_FILE.exists() else 'init'
+            if phase in ('finalize', 'completed'):
+                break
+            main_ralp.main()
+            calls += 1
+            if phase == 'evaluate':
+                scores.append(float(main_ralp.load_state()['current_score']))
+    return {'wall_s': watch.elapsed, 'scores': scores, 'phase_calls': calls}
+
+
+RUNNERS = {'agents': run_agents, 'mirror': run_mirror, 'main_ralp': run_main_ralp}
+
+
+def worker(scenario: str, iterations: int, output: str) -> None:
+    scratch = Path.cwd()
+    run = RUNNERS[scenario](iterations)
+    result = summarize(
+        scenario, run.pop('wall_s'), run.pop('scores'), scratch,
+        extra={k: v for k, v in run.items()}
+    )
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False)
+
+
+# =============================================================================
+# Driver
+# =============================================================================
+
+def run_scenario(scenario: str, args: argparse.Namespace, base_url: str) -> Dict[str, Any]:
+    """Run one scenario in a subprocess with its own scratch directory"""
+    with tempfile.TemporaryDirectory(prefix=f"bench_{scenario}_") as scratch:
+        output = Path(scratch) / "result.json"
+        env = dict(os.environ)
+        env.update({
+            'AICS_TRACE': str(Path(scratch) / "trace.jsonl"),
+            'AICS_TRACE_FORMAT': 'jsonl',
+            'AICS_LEDGER': str(Path(scratch) / "ledger.bin"),
+            'GLM4_BASE_URL': base_url,
+            'GLM4_API_KEY': 'mock',
+            'GLM4_SUMMARY_CACHE': str(Path(scratch) / "summary_cache.db"),
+        })
+        command = [sys.executable, str(Path(__file__).resolve()), '--worker', scenario,
+                   '--iterations', str(args.iterations), '--output', str(output)]
+        quiet = None if args.verbose else subprocess.DEVNULL
+        completed = subprocess.run(command, cwd=scratch, env=env, stdout=quiet, stderr=quiet)
+        if completed.returncode != 0 or not output.exists():
+            raise RuntimeError(f"scenario '{scenario}' failed (exit {completed.returncode}); "
+                               f"rerun with --verbose")
+        with open(output, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+
+def print_result(result: Dict[str, Any]) -> None:
+    print(f"\n[{result['scenario']}] {result['iterations']} iterations in {result['wall_s']:.2f}s "
+          f"({result['iterations_per_hour']:.0f}/hour)")
+    print(f"  peak RSS {result['peak_rss_mb']} MB, {result['bytes_written']} bytes written "
+          f"({result['output_bytes']} on disk), "
+          f"{result['llm_calls']} LLM calls / {result['llm_tokens']} tokens")
+    print(f"  scores {result['scores']} (gain {result['score_gain']}, "
+          f"tokens/point {result['tokens_per_point']})")
+    for name, stats in result['phases'].items():
+        print(f"  {name:<22} n={stats['count']:<4} p50={stats['p50_ms']:>9.1f}ms "
+              f"p90={stats['p90_ms']:>9.1f}ms p99={stats['p99_ms']:>9.1f}ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="End-to-end research loop benchmarks")
+    parser.add_argument('--scenarios', default=",".join(SCENARIOS),
+                        help=f"comma-separated subset of {SCENARIOS}")
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--latency', default='lognormal:300:0.5', help='mock server time to first token')
+    parser.add_argument('--tps', type=float, default=200, help='mock server output tokens per second')
+    parser.add_argument('--time-scale', type=float, default=0.1, help='mock server sleep multiplier')
+    parser.add_argument('--error-429', type=float, default=0.0)
+    parser.add_argument('--error-500', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative regression')
+    parser.add_argument('--save-baseline', action='store_true', help='store results as the new baseline')
+    parser.add_argument('--no-store', action='store_true', help='do not append to results history')
+    parser.add_argument('--verbose', action='store_true', help='show scenario output')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--output', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.iterations, args.output)
+        return 0
+
+    from mock_llm_server import MockLLMServer
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {sorted(unknown)}")
+
+    results, regressions = [], []
+    with MockLLMServer(latency=args.latency, tokens_per_second=args.tps,
+                       error_rate_429=args.error_429, error_rate_500=args.error_500,
+                       seed=args.seed, time_scale=args.time_scale) as server:
+        for scenario in scenarios:
+            started = time.perf_counter()
+            result = run_scenario(scenario, args, server.base_url)
+            result['mock'] = {'latency': args.latency, 'tps': args.tps,
+                              'time_scale': args.time_scale, 'seed': args.seed}
+            print_result(result)
+            print(f"  (total {time.perf_counter() - started:.1f}s including startup)")
+
+            reference = previous(scenario)
+            regressions += compare(result, reference, args.tolerance)
+            if not args.no_store:
+                store(result)
+            results.append(result)
+
+    if args.save_baseline:
+        save_baseline(results)
+        print("\nBaseline updated: benchmarks/baseline.json")
+
+    if regressions:
+        print("\nREGRESSIONS:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
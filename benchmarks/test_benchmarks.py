@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Benchmark Harness Test Suite
+
+Metric helpers, result history and regression checks, plus one short
+end-to-end scenario against the mock LLM server (no API key needed).
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "shared"))
+
+import harness
+import run
+from harness import compare, percentile, span_percentiles
+from mock_llm_server import MockLLMServer
+
+
+def test_percentiles():
+    """Nearest-rank percentiles and per-span statistics"""
+    print("\n=== Testing percentiles ===")
+
+    assert percentile([], 50) == 0.0
+    assert percentile([7.0], 99) == 7.0
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 90) == 90.0
+    assert percentile(values, 100) == 100.0
+    assert percentile(list(reversed(values)), 1) == 1.0
+
+    spans = [{'name': 'phase.review', 'duration_ms': float(v)} for v in range(1, 11)]
+    spans += [{'name': 'phase.improve', 'duration_ms': 40.0},
+              {'name': 'llm.chat', 'duration_ms': 5.0}]
+    stats = span_percentiles(spans, "phase.")
+    assert list(stats) == ['phase.improve', 'phase.review']
+    assert stats['phase.review'] == {'count': 10, 'p50_ms': 5.0, 'p90_ms': 9.0,
+                                     'p99_ms': 10.0, 'max_ms': 10.0}
+    assert stats['phase.improve']['count'] == 1
+    assert span_percentiles(spans, "llm.")['llm.chat']['max_ms'] == 5.0
+
+    print("✓ percentile test passed")
+
+
+def test_compare():
+    """Regressions are reported past the tolerance and above the noise floor"""
+    print("\n=== Testing compare ===")
+
+    reference = {'scenario': 'mirror', 'peak_rss_mb': 100.0, 'phase_p50_ms': 200.0,
+                 'iterations_per_hour': 3600.0, 'bytes_written': 10_000}
+
+    assert compare(dict(reference), None) == []
+    assert compare(dict(reference), reference) == []
+
+    # lower-is-better metric grew by 50%
+    result = dict(reference, phase_p50_ms=300.0)
+    regressions = compare(result, reference)
+    assert len(regressions) == 1 and regressions[0].startswith("mirror.phase_p50_ms: 200.0 -> 300.0")
+
+    # improvements are not regressions
+    assert compare(dict(reference, phase_p50_ms=100.0, peak_rss_mb=50.0), reference) == []
+
+    # large relative change below the absolute noise floor is ignored
+    small = {'scenario': 'mirror', 'phase_p50_ms': 2.0, 'peak_rss_mb': 1.0}
+    assert compare(dict(small, phase_p50_ms=4.0, peak_rss_mb=1.9), small) == []
+
+    # iterations_per_hour: higher is better, noise floor is on seconds per iteration
+    assert compare(dict(reference, iterations_per_hour=1800.0), reference)
+    fast = {'scenario': 'mirror', 'iterations_per_hour': 3_600_000.0}
+    assert compare(dict(fast, iterations_per_hour=1_800_000.0), fast) == []
+    assert compare(dict(reference, iterations_per_hour=0.0), reference)
+
+    # tolerance is configurable; non-numeric and missing values are skipped
+    assert compare(dict(reference, peak_rss_mb=110.0), reference, tolerance=0.05)
+    assert compare(dict(reference, peak_rss_mb=None, bytes_written="n/a"), reference) == []
+
+    print("✓ compare test passed")
+
+
+def test_history():
+    """Stored runs and the baseline are used as the comparison reference"""
+    print("\n=== Testing result history ===")
+
+    results_dir, baseline_file = harness.RESULTS_DIR, harness.BASELINE_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        harness.RESULTS_DIR = Path(tmp) / "results"
+        harness.BASELINE_FILE = Path(tmp) / "baseline.json"
+        try:
+            assert harness.previous('mirror') is None
+
+            first = {'scenario': 'mirror', 'iterations': 2, 'peak_rss_mb': 80.0}
+            path = harness.store(first)
+            harness.store(dict(first, peak_rss_mb=90.0))
+            with open(path, 'r', encoding='utf-8') as f:
+                records = [json.loads(line) for line in f]
+            assert len(records) == 2
+            assert all('timestamp' in r and 'python' in r for r in records)
+
+            # without a baseline the previous stored run is the reference
+            assert harness.previous('mirror')['peak_rss_mb'] == 90.0
+
+            harness.save_baseline([dict(first, phase_p50_ms=12.0)])
+            baseline = harness.previous('mirror')
+            assert baseline['peak_rss_mb'] == 80.0 and baseline['phase_p50_ms'] == 12.0
+            assert set(baseline) == {'iterations', 'revision', *harness.TRACKED}
+
+            # other scenarios in the baseline are kept
+            harness.save_baseline([{'scenario': 'agents', 'iterations': 1}])
+            with open(harness.BASELINE_FILE, 'r', encoding='utf-8') as f:
+                assert set(json.load(f)) == {'mirror', 'agents'}
+            assert harness.previous('main_ralp') is None
+        finally:
+            harness.RESULTS_DIR, harness.BASELINE_FILE = results_dir, baseline_file
+
+    print("✓ result history test passed")
+
+
+def test_scenario():
+    """One mirror iteration end to end against the mock server"""
+    print("\n=== Testing mirror scenario ===")
+
+    args = argparse.Namespace(iterations=1, verbose=False)
+    with MockLLMServer(time_scale=0) as server:
+        result = run.run_scenario('mirror', args, server.base_url)
+
+    assert result['scenario'] == 'mirror'
+    assert result['iterations'] == 1 and len(result['scores']) == 1
+    assert result['llm_calls'] > 0 and result['llm_tokens'] > 0
+    assert result['phases'] and all(name.startswith("phase.") for name in result['phases'])
+    assert result['wall_s'] > 0 and result['peak_rss_mb'] > 0
+    print(f"  {result['llm_calls']} LLM calls, phases: {', '.join(result['phases'])}")
+
+    print("✓ mirror scenario test passed")
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("Benchmark Harness Test Suite")
+    print("=" * 60)
+
+    tests = [
+        ("percentile", test_percentiles),
+        ("compare", test_compare),
+        ("Result history", test_history),
+        ("Mirror scenario", test_scenario),
+    ]
+
+    passed = 0
+    failed = 0
+
+    for name, test_func in tests:
+        try:
+            test_func()
+            passed += 1
+        except Exception as e:
+            print(f"\n✗ {name} test failed: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print("Test Summary")
+    print("=" * 60)
+    print(f"Passed: {passed}/{len(tests)}")
+    print(f"Failed: {failed}/{len(tests)}")
+
+    if failed == 0:
+        print("\n🎉 All tests passed!")
+        return 0
+    else:
+        print(f"\n⚠️ {failed} test(s) failed")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -13,6 +13,11 @@ from dataclasses import dataclass, asdict
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 
+try:
+    from .tracing import span
+except ImportError:
+    from tracing import span
+
 logger = logging.getLogger(__name__)
 
 
@@ -220,7 +225,8 @@ class GitAutoCommit:
                 'check': True
             })
 
-        result = subprocess.run(cmd, **kwargs)
+        with span(f"git.{args[0]}"):
+            result = subprocess.run(cmd, **kwargs)
 
         if capture:
             return result.stdout.strip()
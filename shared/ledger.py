@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+Interaction Ledger Module
+
+Compact, append-only ledger of real AI model calls for AI Co-Scientist systems.
+Every call is stored as one fixed-size binary record (model, phase, iteration,
+prompt hash, token counts, latency, cost). Model and phase names are interned
+into a small side file. Reads go through mmap and are aggregated in chunks,
+so usage reports stay cheap over millions of records.
+
+Layout:
+    <path>          16-byte header + N x 40-byte records
+    <path>.names    JSON lines: {"id": ..., "name": ...}
+
+Default location: logs/ai_ledger.bin (override with AICS_LEDGER).
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:  # Windows: names are only safe within one process
+    FCNTL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+MAGIC = b"AICSLDG1"
+HEADER = struct.Struct("<8sH6x")
+# timestamp, prompt_hash, iteration, tokens_in, tokens_out, latency_ms, cost_usd, model_id, phase_id
+RECORD = struct.Struct("<dQiIIffHH")
+CHUNK_RECORDS = 65536
+
+if NUMPY_AVAILABLE:
+    RECORD_DTYPE = np.dtype([
+        ('timestamp', '<f8'), ('prompt_hash', '<u8'), ('iteration', '<i4'),
+        ('tokens_in', '<u4'), ('tokens_out', '<u4'), ('latency_ms', '<f4'),
+        ('cost_usd', '<f4'), ('model_id', '<u2'), ('phase_id', '<u2'),
+    ])
+
+# USD per 1M tokens (input, output). Unknown models are recorded at cost 0.
+PRICING: Dict[str, Tuple[float, float]] = {
+    "glm-4.7": (0.60, 2.20),
+    "glm-4-plus": (0.70, 0.70),
+    "glm-4-flash": (0.0, 0.0),
+    "claude-3-5-sonnet-20241022": (3.00, 15.00),
+    "claude": (3.00, 15.00),
+    "gpt-4": (30.00, 60.00),
+    "gpt4": (30.00, 60.00),
+    "gemini-pro": (0.50, 1.50),
+    "gemini": (0.50, 1.50),
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token) when the API reports no usage"""
+    return max(1, len(text) // 4) if text else 0
+
+
+def prompt_hash(prompt: str) -> int:
+    """64-bit prompt fingerprint"""
+    return int.from_bytes(hashlib.sha256(prompt.encode('utf-8')).digest()[:8], 'little')
+
+
+def estimate_cost(model: str, tokens_in: int, tokens_out: int) -> float:
+    """Cost in USD from the pricing table"""
+    price_in, price_out = PRICING.get(model, (0.0, 0.0))
+    return (tokens_in * price_in + tokens_out * price_out) / 1_000_000
+
+
+@dataclass
+class LedgerRecord:
+    """One model call"""
+    timestamp: str
+    model: str
+    phase: str
+    iteration: Optional[int]
+    prompt_hash: str
+    tokens_input: int
+    tokens_output: int
+    latency_ms: float
+    cost_usd: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class InteractionLedger:
+    """
+    Append-only binary ledger of model calls
+
+    Features:
+    - Fixed 40-byte records, one O_APPEND write per call (safe across processes)
+    - mmap-backed streaming reads
+    - Incremental aggregation (only records added since the last call are read)
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: Ledger file (default: AICS_LEDGER or logs/ai_ledger.bin)
+        """
+        self.path = Path(path or os.getenv("AICS_LEDGER", "logs/ai_ledger.bin"))
+        self.names_path = self.path.with_name(self.path.name + ".names")
+
+        self.iteration: Optional[int] = None
+        self.phase = "unknown"
+
+        self._lock = threading.Lock()
+        self._fd: Optional[int] = None
+        self._names: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._names_size = 0
+
+        self._reset_aggregate()
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def set_context(self, iteration: Optional[int] = None, phase: Optional[str] = None) -> None:
+        """Tag subsequent records with the current iteration / phase"""
+        if iteration is not None:
+            self.iteration = iteration
+        if phase is not None:
+            self.phase = phase
+
+    def record(
+        self,
+        model: str,
+        prompt: str,
+        tokens_in: Optional[int] = None,
+        tokens_out: int = 0,
+        latency_ms: float = 0.0,
+        phase: Optional[str] = None,
+        iteration: Optional[int] = None,
+        cost_usd: Optional[float] = None
+    ) -> float:
+        """
+        Append one model call
+
+        Args:
+            model: Model name
+            prompt: Prompt text (only its hash is stored)
+            tokens_in: Input tokens (default: estimated from the prompt)
+            tokens_out: Output tokens
+            latency_ms: Call latency
+            phase: Research phase (default: current context)
+            iteration: Iteration (default: current context)
+            cost_usd: Cost (default: from PRICING)
+
+        Returns:
+            Recorded cost in USD
+        """
+        if tokens_in is None:
+            tokens_in = estimate_tokens(prompt)
+        if cost_usd is None:
+            cost_usd = estimate_cost(model, tokens_in, tokens_out)
+        if iteration is None:
+            iteration = self.iteration
+
+        with self._lock:
+            fd = self._open_for_append()
+            data = RECORD.pack(
+                datetime.now().timestamp(),
+                prompt_hash(prompt),
+                -1 if iteration is None else iteration,
+                tokens_in,
+                tokens_out,
+                latency_ms,
+                cost_usd,
+                self._intern(model),
+                self._intern(phase or self.phase),
+            )
+            os.write(fd, data)
+
+        return cost_usd
+
+    def _open_for_append(self) -> int:
+        """Open the ledger once, writing the header if the file is new (caller holds the lock)"""
+        if self._fd is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            if os.fstat(self._fd).st_size == 0:
+                os.write(self._fd, HEADER.pack(MAGIC, RECORD.size))
+        return self._fd
+
+    def _intern(self, name: str) -> int:
+        """
+        Name → id, appending new names to the side file (caller holds the lock)
+
+        The reload, id assignment and append run under an exclusive flock on the
+        side file, so two processes cannot hand out the same id for different names.
+        """
+        if name in self._ids:
+            return self._ids[name]
+        self.names_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.names_path, 'ab') as f:
+            if FCNTL_AVAILABLE:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                # another process may have added names since we last looked
+                self._load_names()
+                if name not in self._ids:
+                    new_id = len(self._names)
+                    line = json.dumps({'id': new_id, 'name': name}, ensure_ascii=False) + "\n"
+                    f.write(line.encode('utf-8'))
+                    f.flush()
+                    self._names.append(name)
+                    self._ids[name] = new_id
+                    self._names_size = os.fstat(f.fileno()).st_size
+            finally:
+                if FCNTL_AVAILABLE:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        return self._ids[name]
+
+    def _load_names(self) -> None:
+        """Read names added to the side file since the last load (a partly written last line is left for later)"""
+        if not self.names_path.exists():
+            return
+        with open(self.names_path, 'rb') as f:
+            f.seek(self._names_size)
+            data = f.read()
+        complete = data[:data.rfind(b"\n") + 1]
+        for line in complete.decode('utf-8').splitlines():
+            entry = json.loads(line)
+            while len(self._names) <= entry['id']:
+                self._names.append("")
+            self._names[entry['id']] = entry['name']
+            self._ids[entry['name']] = entry['id']
+        self._names_size += len(complete)
+
+    def close(self) -> None:
+        """Close the append handle"""
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        if not self.path.exists():
+            return 0
+        return max(0, (self.path.stat().st_size - HEADER.size) // RECORD.size)
+
+    def _name(self, name_id: int) -> str:
+        if name_id >= len(self._names):
+            self._load_names()
+        return self._names[name_id] if name_id < len(self._names) else f"#{name_id}"
+
+    def _chunks(self, start: int = 0, count: Optional[int] = None) -> Iterator[memoryview]:
+        """mmap the ledger and yield raw record chunks for record indices [`start`, `count`)"""
+        count = len(self) if count is None else count
+        if start >= count:
+            return
+        with open(self.path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                magic, record_size = HEADER.unpack_from(mm, 0)
+                if magic != MAGIC or record_size != RECORD.size:
+                    raise ValueError(f"Not an interaction ledger: {self.path}")
+                view = memoryview(mm)
+                try:
+                    for first in range(start, count, CHUNK_RECORDS):
+                        last = min(first + CHUNK_RECORDS, count)
+                        chunk = view[HEADER.size + first * RECORD.size:HEADER.size + last * RECORD.size]
+                        try:
+                            yield chunk
+                        finally:
+                            chunk.release()
+                finally:
+                    view.release()
+
+    def _decode(self, raw: tuple) -> LedgerRecord:
+        timestamp, p_hash, iteration, tokens_in, tokens_out, latency_ms, cost_usd, model_id, phase_id = raw
+        return LedgerRecord(
+            timestamp=datetime.fromtimestamp(timestamp).isoformat(timespec='seconds'),
+            model=self._name(model_id),
+            phase=self._name(phase_id),
+            iteration=None if iteration < 0 else iteration,
+            prompt_hash=f"{p_hash:016x}",
+            tokens_input=tokens_in,
+            tokens_output=tokens_out,
+            latency_ms=round(latency_ms, 1),
+            cost_usd=round(cost_usd, 6),
+        )
+
+    def iter_records(self, start: int = 0) -> Iterator[LedgerRecord]:
+        """Stream decoded records"""
+        for chunk in self._chunks(start):
+            for raw in RECORD.iter_unpack(chunk):
+                yield self._decode(raw)
+
+    def tail(self, n: int) -> List[LedgerRecord]:
+        """Most recent n records"""
+        return list(self.iter_records(max(0, len(self) - n)))
+
+    # ------------------------------------------------------------------
+    # Aggregation
+    # ------------------------------------------------------------------
+
+    def _reset_aggregate(self) -> None:
+        self._agg_upto = 0
+        # model_id → [count, tokens_in, tokens_out, cost, latency_ms]
+        self._by_model: Dict[int, List[float]] = {}
+        # (phase_id, model_id) → count
+        self._by_phase: Dict[Tuple[int, int], int] = {}
+        # iteration → [count, tokens, cost]
+        self._by_iteration: Dict[int, List[float]] = {}
+
+    def _accumulate_python(self, chunk: memoryview) -> None:
+        for _, _, iteration, tokens_in, tokens_out, latency_ms, cost, model_id, phase_id in RECORD.iter_unpack(chunk):
+            m = self._by_model.setdefault(model_id, [0, 0, 0, 0.0, 0.0])
+            m[0] += 1
+            m[1] += tokens_in
+            m[2] += tokens_out
+            m[3] += cost
+            m[4] += latency_ms
+            key = (phase_id, model_id)
+            self._by_phase[key] = self._by_phase.get(key, 0) + 1
+            it = self._by_iteration.setdefault(iteration, [0, 0, 0.0])
+            it[0] += 1
+            it[1] += tokens_in + tokens_out
+            it[2] += cost
+
+    def _accumulate_numpy(self, chunk: memoryview) -> None:
+        arr = np.frombuffer(chunk, dtype=RECORD_DTYPE)
+        tokens_in = arr['tokens_in'].astype(np.int64)
+        tokens_out = arr['tokens_out'].astype(np.int64)
+        cost = arr['cost_usd'].astype(np.float64)
+
+        models, model_idx = np.unique(arr['model_id'], return_inverse=True)
+        columns = (
+            np.bincount(model_idx),
+            np.bincount(model_idx, weights=tokens_in),
+            np.bincount(model_idx, weights=tokens_out),
+            np.bincount(model_idx, weights=cost),
+            np.bincount(model_idx, weights=arr['latency_ms'].astype(np.float64)),
+        )
+        for i, model_id in enumerate(models.tolist()):
+            m = self._by_model.setdefault(model_id, [0, 0, 0, 0.0, 0.0])
+            m[0] += int(columns[0][i])
+            m[1] += int(columns[1][i])
+            m[2] += int(columns[2][i])
+            m[3] += float(columns[3][i])
+            m[4] += float(columns[4][i])
+
+        pairs = arr['phase_id'].astype(np.uint32) << 16 | arr['model_id']
+        keys, counts = np.unique(pairs, return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            pair = (key >> 16, key & 0xFFFF)
+            self._by_phase[pair] = self._by_phase.get(pair, 0) + count
+
+        iterations, iter_idx = np.unique(arr['iteration'], return_inverse=True)
+        it_counts = np.bincount(iter_idx)
+        it_tokens = np.bincount(iter_idx, weights=tokens_in + tokens_out)
+        it_cost = np.bincount(iter_idx, weights=cost)
+        for i, iteration in enumerate(iterations.tolist()):
+            it = self._by_iteration.setdefault(iteration, [0, 0, 0.0])
+            it[0] += int(it_counts[i])
+            it[1] += int(it_tokens[i])
+            it[2] += float(it_cost[i])
+
+    def aggregate(self) -> Dict[str, Any]:
+        """
+        Usage statistics over the whole ledger
+
+        Only records appended since the previous call are read.
+
+        Returns:
+            Totals plus per-model, per-phase and per-iteration breakdowns
+        """
+        count = len(self)
+        accumulate = self._accumulate_numpy if NUMPY_AVAILABLE else self._accumulate_python
+        for chunk in self._chunks(self._agg_upto, count):
+            accumulate(chunk)
+        self._agg_upto = max(self._agg_upto, count)
+
+        by_model = {
+            self._name(model_id): {
+                'count': int(m[0]),
+                'tokens_input': int(m[1]),
+                'tokens_output': int(m[2]),
+                'cost_usd': round(m[3], 6),
+                'avg_latency_ms': round(m[4] / m[0], 1) if m[0] else 0.0,
+            }
+            for model_id, m in sorted(self._by_model.items())
+        }
+
+        phase_usage: Dict[str, Dict[str, int]] = {}
+        for (phase_id, model_id), n in sorted(self._by_phase.items()):
+            phase_usage.setdefault(self._name(phase_id), {})[self._name(model_id)] = n
+
+        by_iteration = {
+            iteration: {'count': int(it[0]), 'tokens': int(it[1]), 'cost_usd': round(it[2], 6)}
+            for iteration, it in sorted(self._by_iteration.items())
+            if iteration >= 0
+        }
+
+        total = sum(m['count'] for m in by_model.values())
+        total_tokens = sum(m['tokens_input'] + m['tokens_output'] for m in by_model.values())
+        total_cost = sum(m['cost_usd'] for m in by_model.values())
+
+        return {
+            'total_interactions': total,
+            'total_tokens': total_tokens,
+            'total_cost_usd': round(total_cost, 6),
+            'by_model': by_model,
+            'phase_usage': phase_usage,
+            'by_iteration': by_iteration,
+            'cost_per_iteration': round(
+                sum(it['cost_usd'] for it in by_iteration.values()) / len(by_iteration), 6
+            ) if by_iteration else 0.0,
+        }
+
+
+_ledger: Optional[InteractionLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger() -> InteractionLedger:
+    """Get the process-wide ledger"""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = InteractionLedger()
+            atexit.register(_ledger.close)
+        return _ledger
+
+
+def record_interaction(model: str, prompt: str, **kwargs: Any) -> float:
+    """Append one model call to the process-wide ledger"""
+    return get_ledger().record(model, prompt, **kwargs)
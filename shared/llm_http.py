@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+LLM HTTP Client
+
+Minimal OpenAI-compatible chat completions client built on urllib.
+It mirrors the subset of the OpenAI/ZhipuAI SDK interface the systems use:
+
+    client = ChatClient(base_url, api_key)
+    response = client.chat.completions.create(model=..., messages=[...])
+    response.choices[0].message.content
+    response.usage.prompt_tokens
+
+    for chunk in client.chat.completions.create(..., stream=True):
+        chunk.choices[0].delta.content
+
+It is the fallback when the provider SDK is not installed, and the client
+used against the local mock server (mock_llm_server.py).
+"""
+
+import json
+import urllib.error
+import urllib.request
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, Optional
+
+
+class APIStatusError(Exception):
+    """Non-2xx response"""
+
+    def __init__(self, status_code: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(f"HTTP {status_code}: {message}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def _namespace(value: Any) -> Any:
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: _namespace(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [_namespace(v) for v in value]
+    return value
+
+
+class _Completions:
+    def __init__(self, client: "ChatClient"):
+        self._client = client
+
+    def create(self, model: str, messages: list, stream: bool = False, **params: Any):
+        payload: Dict[str, Any] = {'model': model, 'messages': messages, 'stream': stream}
+        payload.update({k: v for k, v in params.items() if v is not None})
+        response = self._client._post('/chat/completions', payload)
+        if stream:
+            return self._events(response)
+        with response:
+            return _namespace(json.loads(response.read()))
+
+    @staticmethod
+    def _events(response) -> Iterator[SimpleNamespace]:
+        with response:
+            for raw in response:
+                line = raw.decode('utf-8').strip()
+                if not line.startswith('data:'):
+                    continue
+                data = line[5:].strip()
+                if data == '[DONE]':
+                    break
+                chunk = json.loads(data)
+                for choice in chunk.get('choices', []):
+                    choice.setdefault('delta', {}).setdefault('content', None)
+                yield _namespace(chunk)
+
+
+class ChatClient:
+    """OpenAI-compatible chat completions client"""
+
+    def __init__(self, base_url: str, api_key: Optional[str] = None, timeout: float = 120.0):
+        """
+        Args:
+            base_url: API root, e.g. http://127.0.0.1:8765/v1
+            api_key: Bearer token (optional for local servers)
+            timeout: Socket timeout in seconds
+        """
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.timeout = timeout
+        self.chat = SimpleNamespace(completions=_Completions(self))
+
+    def _post(self, path: str, payload: Dict[str, Any]):
+        request = urllib.request.Request(
+            self.base_url + path,
+            data=json.dumps(payload, ensure_ascii=False).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST',
+        )
+        if self.api_key:
+            request.add_header('Authorization', f"Bearer {self.api_key}")
+        try:
+            return urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            body = e.read().decode('utf-8', errors='replace')
+            try:
+                message = json.loads(body).get('error', {}).get('message', body)
+            except (json.JSONDecodeError, AttributeError):
+                message = body
+            retry_after = e.headers.get('Retry-After') if e.headers else None
+            raise APIStatusError(e.code, message,
+                                 float(retry_after) if retry_after else None) from None
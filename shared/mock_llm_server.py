@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Mock LLM Server
+
+Local OpenAI/ZhipuAI-compatible chat completions server for offline load
+testing. Unlike the in-process mocks it behaves like a real provider:
+
+- configurable time-to-first-token distribution (fixed, uniform, lognormal)
+- output paced at a fixed tokens-per-second rate, with SSE streaming
+- injected 429 (with Retry-After) and 500 responses
+- deterministic content: the same request with the same seed always gets
+  the same response. JSON requests get rubric-shaped evaluations whose
+  scores grow with paper length; other requests get markdown papers.
+
+Usage:
+    python shared/mock_llm_server.py --port 8765 --latency lognormal:400:0.5 --tps 80
+
+    with MockLLMServer(latency="fixed:50", tokens_per_second=500) as server:
+        client = GLM4Client(api_key="mock", base_url=server.base_url)
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+# Criterion -> max score, used when the prompt carries no response format
+DEFAULT_RUBRIC = {
+    'practicality': 20,
+    'methodology': 20,
+    'data_quality': 25,
+    'conclusion': 10,
+    'readability': 5,
+    'creativity': 20,
+}
+
+PAPER_SECTIONS = ['Abstract', 'Introduction', 'Related Work', 'Methodology',
+                  'Results', 'Discussion', 'Conclusion', 'References']
+
+_VOCABULARY = (
+    "model data analysis method result experiment baseline accuracy dataset "
+    "hypothesis evaluation research scientific approach performance training "
+    "material property prediction validation error sample feature learning "
+    "significant improvement compared framework observed measured proposed"
+).split()
+
+PAPER_MARKER = "=== 연구보고서 ==="
+
+_SCORE_FIELD = re.compile(r'"(\w+)"\s*:\s*\{\s*"score"\s*:\s*"?0\s*[-~]\s*(\d+(?:\.\d+)?)')
+_PASS_FIELD = re.compile(r'"(\w+)"\s*:\s*\{\s*"pass"')
+_PATHS = ('/chat/completions', '/v1/chat/completions', '/api/paas/v4/chat/completions')
+
+
+def count_tokens(text: str) -> int:
+    """Rough token count (4 characters per token)"""
+    return max(1, len(text) // 4)
+
+
+class LatencyModel:
+    """
+    Time-to-first-token distribution
+
+    Spec strings:
+        fixed:<ms>
+        uniform:<low_ms>:<high_ms>
+        lognormal:<median_ms>:<sigma>
+    """
+
+    def __init__(self, spec: str = "fixed:0"):
+        kind, *params = spec.split(":")
+        self.spec = spec
+        self.kind = kind
+        self.params = [float(p) for p in params]
+        if kind not in ('fixed', 'uniform', 'lognormal'):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample(self, rng: random.Random) -> float:
+        """Latency in seconds"""
+        if self.kind == 'fixed':
+            ms = self.params[0] if self.params else 0.0
+        elif self.kind == 'uniform':
+            ms = rng.uniform(self.params[0], self.params[1])
+        else:
+            ms = self.params[0] * math.exp(rng.gauss(0.0, self.params[1]))
+        return max(0.0, ms) / 1000.0
+
+
+def _seeded(seed: int, *parts: Any) -> random.Random:
+    digest = hashlib.sha256(repr((seed,) + parts).encode('utf-8')).digest()
+    return random.Random(int.from_bytes(digest[:8], 'big'))
+
+
+def _prompt_text(messages: List[Dict[str, Any]]) -> str:
+    return "\n".join(str(m.get('content') or '') for m in messages)
+
+
+def _paper_words(text: str) -> int:
+    """Words of the paper inside an evaluation prompt (whole prompt if unmarked)"""
+    marker = text.find(PAPER_MARKER)
+    body = text[marker + len(PAPER_MARKER):] if marker >= 0 else text
+    return len(body.split())
+
+
+def evaluation_response(text: str, temperature: float, seed: int) -> Dict[str, Any]:
+    """
+    Deterministic rubric-shaped evaluation
+
+    Quality rises with paper length (saturating at ~3000 words) plus seeded
+    noise whose spread grows with temperature.
+    """
+    rubric = {name: float(max_score) for name, max_score in _SCORE_FIELD.findall(text)}
+    rubric = rubric or {k: float(v) for k, v in DEFAULT_RUBRIC.items()}
+    pass_fields = _PASS_FIELD.findall(text) or ['ai_contribution']
+
+    rng = _seeded(seed, 'eval', text, round(temperature, 2))
+    quality = 0.5 + 0.4 * min(1.0, _paper_words(text) / 3000.0)
+    spread = 0.03 + 0.07 * temperature
+
+    result: Dict[str, Any] = {}
+    for criterion, max_score in rubric.items():
+        score = max_score * min(1.0, max(0.0, quality + rng.gauss(0.0, spread)))
+        result[criterion] = {
+            'score': round(score, 1),
+            'reason': f"{criterion} is {'adequate' if score > max_score * 0.7 else 'insufficient'}",
+            'improvement': f"strengthen {criterion.replace('_', ' ')}",
+        }
+    for criterion in pass_fields:
+        if criterion not in result:
+            result[criterion] = {'pass': quality + rng.gauss(0.0, spread) > 0.55,
+                                 'reason': 'AI contribution documented'}
+    result['total_score'] = round(sum(result[c]['score'] for c in rubric), 1)
+    result['summary'] = 'mock evaluation'
+    return result
+
+
+def text_response(text: str, max_tokens: int, seed: int) -> str:
+    """Deterministic markdown paper, slightly longer than the input paper"""
+    rng = _seeded(seed, 'text', text)
+    words = min(int(max_tokens * 0.75), 300 + int(len(text.split()) * 1.1))
+    per_section = max(10, words // len(PAPER_SECTIONS))
+
+    lines = ["# Mock Research Paper", ""]
+    for section in PAPER_SECTIONS:
+        lines.append(f"## {section}")
+        lines.append(" ".join(rng.choice(_VOCABULARY) for _ in range(per_section)) + ".")
+        lines.append("")
+    return "\n".join(lines)
+
+
+class MockLLMServer:
+    """Threaded mock chat completions server"""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: str = "fixed:0",
+        tokens_per_second: float = 0,
+        error_rate_429: float = 0.0,
+        error_rate_500: float = 0.0,
+        seed: int = 0,
+        time_scale: float = 1.0,
+    ):
+        """
+        Args:
+            host: Bind address
+            port: Port (0 picks a free port)
+            latency: Time-to-first-token spec (see LatencyModel)
+            tokens_per_second: Output pacing (0 = instant)
+            error_rate_429: Probability of a 429 response
+            error_rate_500: Probability of a 500 response
+            seed: Seed for content, latency and error injection
+            time_scale: Multiplier for every sleep (e.g. 0.1 for fast runs)
+        """
+        self.latency = LatencyModel(latency)
+        self.tokens_per_second = tokens_per_second
+        self.error_rate_429 = error_rate_429
+        self.error_rate_500 = error_rate_500
+        self.seed = seed
+        self.time_scale = time_scale
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'streamed': 0, 'errors_429': 0, 'errors_500': 0,
+                      'prompt_tokens': 0, 'completion_tokens': 0}
+
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "MockLLMServer":
+        """Serve in a background thread"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "MockLLMServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.stop()
+        return False
+
+    def _draw(self) -> Tuple[float, Optional[int]]:
+        """Latency and injected error for the next request"""
+        with self._lock:
+            self.stats['requests'] += 1
+            delay = self.latency.sample(self._rng)
+            roll = self._rng.random()
+        if roll < self.error_rate_429:
+            return delay, 429
+        if roll < self.error_rate_429 + self.error_rate_500:
+            return delay, 500
+        return delay, None
+
+    def _sleep(self, seconds: float) -> None:
+        if seconds > 0 and self.time_scale > 0:
+            time.sleep(seconds * self.time_scale)
+
+    def complete(self, request: Dict[str, Any]) -> Tuple[str, int, int]:
+        """Response content, prompt tokens and completion tokens for a request"""
+        messages = request.get('messages') or []
+        text = _prompt_text(messages)
+        temperature = float(request.get('temperature', 0.7) or 0.0)
+        max_tokens = int(request.get('max_tokens') or 4096)
+
+        if 'JSON' in text:
+            content = json.dumps(evaluation_response(text, temperature, self.seed),
+                                 ensure_ascii=False)
+        else:
+            content = text_response(text, max_tokens, self.seed)
+        return content, count_tokens(text), count_tokens(content)
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _json(self, status: int, payload: Dict[str, Any], headers=None) -> None:
+                body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path.rstrip('/').endswith('/stats'):
+                    self._json(200, dict(server.stats))
+                else:
+                    self._json(404, {'error': {'message': 'not found'}})
+
+            def do_POST(self):
+                if not self.path.rstrip('/').endswith(_PATHS):
+                    self._json(404, {'error': {'message': 'not found'}})
+                    return
+                length = int(self.headers.get('Content-Length') or 0)
+                try:
+                    request = json.loads(self.rfile.read(length) or b'{}')
+                except json.JSONDecodeError:
+                    self._json(400, {'error': {'message': 'invalid JSON body'}})
+                    return
+
+                delay, error = server._draw()
+                server._sleep(delay)
+                if error == 429:
+                    with server._lock:
+                        server.stats['errors_429'] += 1
+                    self._json(429, {'error': {'code': '1302', 'message': 'rate limited'}},
+                               headers={'Retry-After': '1'})
+                    return
+                if error == 500:
+                    with server._lock:
+                        server.stats['errors_500'] += 1
+                    self._json(500, {'error': {'code': '500', 'message': 'injected failure'}})
+                    return
+
+                content, prompt_tokens, completion_tokens = server.complete(request)
+                with server._lock:
+                    server.stats['prompt_tokens'] += prompt_tokens
+                    server.stats['completion_tokens'] += completion_tokens
+
+                model = request.get('model', 'mock')
+                usage = {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                         'total_tokens': prompt_tokens + completion_tokens}
+                if request.get('stream'):
+                    with server._lock:
+                        server.stats['streamed'] += 1
+                    self._stream(model, content, completion_tokens, usage)
+                    return
+
+                if server.tokens_per_second:
+                    server._sleep(completion_tokens / server.tokens_per_second)
+                self._json(200, {
+                    'id': f"mock-{server.stats['requests']}",
+                    'object': 'chat.completion',
+                    'created': int(time.time()),
+                    'model': model,
+                    'choices': [{'index': 0, 'finish_reason': 'stop',
+                                 'message': {'role': 'assistant', 'content': content}}],
+                    'usage': usage,
+                })
+
+            def _stream(self, model: str, content: str, tokens: int, usage: Dict[str, int]) -> None:
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Cache-Control', 'no-cache')
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                self.close_connection = True
+
+                chunk_chars = 16  # ~4 tokens per event
+                pause = 4 / server.tokens_per_second if server.tokens_per_second else 0
+                try:
+                    for start in range(0, len(content), chunk_chars):
+                        event = {'model': model, 'object': 'chat.completion.chunk',
+                                 'choices': [{'index': 0, 'delta': {'content': content[start:start + chunk_chars]}}]}
+                        self.wfile.write(f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode('utf-8'))
+                        self.wfile.flush()
+                        server._sleep(pause)
+                    final = {'model': model, 'object': 'chat.completion.chunk', 'usage': usage,
+                             'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]}
+                    self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode('utf-8'))
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client stopped reading early
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI/ZhipuAI-compatible LLM server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', default='lognormal:400:0.5',
+                        help='fixed:<ms> | uniform:<lo>:<hi> | lognormal:<median>:<sigma>')
+    parser.add_argument('--tps', type=float, default=80, help='output tokens per second (0 = instant)')
+    parser.add_argument('--error-429', type=float, default=0.0)
+    parser.add_argument('--error-500', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--time-scale', type=float, default=1.0)
+    args = parser.parse_args()
+
+    server = MockLLMServer(args.host, args.port, args.latency, args.tps,
+                           args.error_429, args.error_500, args.seed, args.time_scale)
+    print(f"Mock LLM server listening on {server.base_url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
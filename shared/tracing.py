@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Tracing Module
+
+Lightweight hot-path tracing for AI Co-Scientist systems.
+Spans are context managers that record wall time plus counters such as
+tokens, cache hits and bytes written. When tracing is disabled, span()
+returns a shared no-op object so instrumented code pays almost nothing.
+
+Enable with environment variables:
+    AICS_TRACE=<path>            write finished spans to <path>
+    AICS_TRACE_FORMAT=jsonl      one JSON object per span (default)
+    AICS_TRACE_FORMAT=chrome     Chrome trace (chrome://tracing, Perfetto)
+
+Both formats add to an existing export file, so a run split over several
+processes (one per phase) ends up in a single trace.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class _NoopSpan:
+    """Span used when tracing is disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+    def add(self, key: str, amount: float = 1) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """A timed unit of work"""
+
+    __slots__ = ('tracer', 'name', 'attrs', 'span_id', 'parent_id', 'thread_id',
+                 'start', 'duration')
+
+    def __init__(self, tracer: "Tracer", name: str, attrs: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.span_id = 0
+        self.parent_id: Optional[int] = None
+        self.thread_id = 0
+        self.start = 0.0
+        self.duration = 0.0
+
+    def __enter__(self) -> "Span":
+        self.tracer._open(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.duration = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        self.tracer._close(self)
+        return False
+
+    def set(self, **attrs: Any) -> None:
+        """Set span attributes (tokens_in, tokens_out, cache_hit, ...)"""
+        self.attrs.update(attrs)
+
+    def add(self, key: str, amount: float = 1) -> None:
+        """Accumulate a counter attribute (e.g. bytes_written)"""
+        self.attrs[key] = self.attrs.get(key, 0) + amount
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'thread_id': self.thread_id,
+            'start': self.tracer.epoch + (self.start - self.tracer.origin),
+            'duration_ms': round(self.duration * 1000, 3),
+            'attrs': self.attrs,
+        }
+
+
+class Tracer:
+    """
+    Span collector and exporter
+
+    Features:
+    - Nested spans (parent tracked per thread)
+    - JSON-lines or Chrome trace export
+    - Per-iteration latency roll-up
+    """
+
+    FLUSH_EVERY = 256
+
+    def __init__(self, enabled: bool = False, path: Optional[str] = None, fmt: str = "jsonl"):
+        """
+        Args:
+            enabled: Record spans (default: False)
+            path: Export file (default: None = keep in memory only)
+            fmt: "jsonl" or "chrome"
+        """
+        self.enabled = enabled
+        self.path = Path(path) if path else None
+        self.fmt = fmt
+        self.iteration: Optional[int] = None
+
+        self.origin = time.perf_counter()
+        self.epoch = time.time()
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._next_id = 1
+        self._pending: List[Dict[str, Any]] = []
+        self._chrome_events: List[Dict[str, Any]] = []
+        self._chrome_flushed = 0
+        # iteration → span name → [count, total_s, max_s, tokens_in, tokens_out, bytes_written, cache_hits]
+        self._rollup: Dict[Any, Dict[str, List[float]]] = defaultdict(dict)
+        # iteration → wall time of root spans (nested spans are not double counted)
+        self._root_time: Dict[Any, float] = defaultdict(float)
+
+    @classmethod
+    def from_env(cls) -> "Tracer":
+        """Create tracer from AICS_TRACE / AICS_TRACE_FORMAT"""
+        path = os.getenv("AICS_TRACE")
+        return cls(enabled=bool(path), path=path, fmt=os.getenv("AICS_TRACE_FORMAT", "jsonl"))
+
+    def span(self, name: str, **attrs: Any) -> Union[Span, _NoopSpan]:
+        """
+        Create a span
+
+        Args:
+            name: Span name (e.g. "phase.literature", "llm.generate")
+            **attrs: Initial attributes
+
+        Returns:
+            Context manager
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        if self.iteration is not None:
+            attrs.setdefault('iteration', self.iteration)
+        return Span(self, name, attrs)
+
+    def set_iteration(self, iteration: Optional[int]) -> None:
+        """Tag subsequent spans with an iteration number"""
+        self.iteration = iteration
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _open(self, span: Span) -> None:
+        stack = self._stack()
+        with self._lock:
+            span.span_id = self._next_id
+            self._next_id += 1
+        span.parent_id = stack[-1].span_id if stack else None
+        span.thread_id = threading.get_ident()
+        stack.append(span)
+
+    def _close(self, span: Span) -> None:
+        stack = self._stack()
+        if stack and stack[-1] is span:
+            stack.pop()
+
+        record = span.to_dict()
+        attrs = span.attrs
+
+        with self._lock:
+            stats = self._rollup[attrs.get('iteration')].setdefault(
+                span.name, [0, 0.0, 0.0, 0, 0, 0, 0]
+            )
+            stats[0] += 1
+            stats[1] += span.duration
+            stats[2] = max(stats[2], span.duration)
+            stats[3] += attrs.get('tokens_in', 0) or 0
+            stats[4] += attrs.get('tokens_out', 0) or 0
+            stats[5] += attrs.get('bytes_written', 0) or 0
+            stats[6] += 1 if attrs.get('cache_hit') else 0
+            if span.parent_id is None:
+                self._root_time[attrs.get('iteration')] += span.duration
+
+            if self.fmt == "chrome":
+                self._chrome_events.append({
+                    'name': span.name,
+                    'ph': 'X',
+                    'ts': round((self.epoch + span.start - self.origin) * 1e6, 1),
+                    'dur': round(span.duration * 1e6, 1),
+                    'pid': os.getpid(),
+                    'tid': span.thread_id,
+                    'args': attrs,
+                })
+            elif self.path:
+                self._pending.append(record)
+                if len(self._pending) >= self.FLUSH_EVERY:
+                    self._flush_pending()
+
+    def _flush_pending(self) -> None:
+        """Append pending JSON-lines records (caller holds the lock)"""
+        if not self._pending or not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for record in self._pending:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self._pending.clear()
+
+    def _flush_chrome(self) -> None:
+        """Merge new Chrome trace events into the export file (caller holds the lock)"""
+        events = self._chrome_events[self._chrome_flushed:]
+        if not events:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        existing: List[Dict[str, Any]] = []
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    existing = json.load(f)['traceEvents']
+            except (OSError, ValueError, KeyError, TypeError):
+                logger.warning(f"Replacing unreadable trace file: {self.path}")
+        temp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': existing + events}, f, default=str)
+        os.replace(temp, self.path)
+        self._chrome_flushed = len(self._chrome_events)
+
+    def flush(self) -> None:
+        """Write buffered spans to the export file"""
+        if not self.path:
+            return
+        with self._lock:
+            if self.fmt == "chrome":
+                self._flush_chrome()
+            else:
+                self._flush_pending()
+
+    def iteration_breakdown(self) -> Dict[Any, Dict[str, Any]]:
+        """
+        Per-iteration latency breakdown
+
+        Returns:
+            {iteration: {'total_ms': ..., 'spans': {name: {count, total_ms, max_ms, ...}}}}
+            Spans recorded outside an iteration are keyed by None.
+        """
+        with self._lock:
+            breakdown = {}
+            for iteration, spans in self._rollup.items():
+                rows = {
+                    name: {
+                        'count': int(s[0]),
+                        'total_ms': round(s[1] * 1000, 3),
+                        'max_ms': round(s[2] * 1000, 3),
+                        'tokens_in': int(s[3]),
+                        'tokens_out': int(s[4]),
+                        'bytes_written': int(s[5]),
+                        'cache_hits': int(s[6]),
+                    }
+                    for name, s in sorted(spans.items(), key=lambda x: x[1][1], reverse=True)
+                }
+                breakdown[iteration] = {
+                    'total_ms': round(self._root_time[iteration] * 1000, 3),
+                    'spans': rows,
+                }
+            return breakdown
+
+    def write_breakdown(self, path: str, merge: bool = False) -> None:
+        """
+        Save the per-iteration latency breakdown as JSON
+
+        Args:
+            path: Output file
+            merge: Add to the breakdown already in `path` (one call per process
+                when a run is split over several processes)
+        """
+        output = Path(path)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        breakdown = {str(k): v for k, v in self.iteration_breakdown().items()}
+        if merge and output.exists():
+            try:
+                with open(output, 'r', encoding='utf-8') as f:
+                    breakdown = merge_breakdowns(json.load(f), breakdown)
+            except (OSError, ValueError, KeyError, TypeError, AttributeError):
+                logger.warning(f"Replacing unreadable latency breakdown: {output}")
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(breakdown, f, ensure_ascii=False, indent=2)
+
+    def reset(self) -> None:
+        """Drop collected spans and roll-ups"""
+        with self._lock:
+            self._pending.clear()
+            self._chrome_events.clear()
+            self._chrome_flushed = 0
+            self._rollup.clear()
+            self._root_time.clear()
+
+
+def merge_breakdowns(*breakdowns: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Combine per-iteration breakdowns (as written by Tracer.write_breakdown)
+
+    Counters and times are summed, max_ms takes the maximum.
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for breakdown in breakdowns:
+        for iteration, entry in breakdown.items():
+            target = merged.setdefault(iteration, {'total_ms': 0.0, 'spans': {}})
+            target['total_ms'] = round(target['total_ms'] + entry['total_ms'], 3)
+            for name, row in entry['spans'].items():
+                current = target['spans'].get(name)
+                if current is None:
+                    target['spans'][name] = dict(row)
+                    continue
+                for key, value in row.items():
+                    if key == 'max_ms':
+                        current[key] = max(current[key], value)
+                    else:
+                        current[key] = round(current.get(key, 0) + value, 3)
+    for entry in merged.values():
+        entry['spans'] = dict(sorted(entry['spans'].items(), key=lambda x: x[1]['total_ms'], reverse=True))
+    return merged
+
+
+_tracer = Tracer.from_env()
+atexit.register(lambda: _tracer.flush())
+
+
+def get_tracer() -> Tracer:
+    """Get the process-wide tracer"""
+    return _tracer
+
+
+def configure(enabled: bool = True, path: Optional[str] = None, fmt: str = "jsonl") -> Tracer:
+    """
+    Reconfigure the process-wide tracer
+
+    Args:
+        enabled: Record spans
+        path: Export file
+        fmt: "jsonl" or "chrome"
+
+    Returns:
+        The tracer
+    """
+    _tracer.flush()
+    _tracer.enabled = enabled
+    _tracer.path = Path(path) if path else None
+    _tracer.fmt = fmt
+    _tracer.reset()
+    return _tracer
+
+
+def span(name: str, **attrs: Any) -> Union[Span, _NoopSpan]:
+    """Create a span on the process-wide tracer"""
+    if not _tracer.enabled:
+        return NOOP_SPAN
+    return _tracer.span(name, **attrs)
+
+
+def write_text(path: Union[str, Path], content: str, mode: str = 'w', encoding: str = 'utf-8') -> int:
+    """
+    Write text to a file inside a "file.write" span
+
+    Args:
+        path: Target file
+        content: Text to write
+        mode: 'w' or 'a'
+        encoding: Text encoding
+
+    Returns:
+        Number of bytes written
+    """
+    data = content.encode(encoding)
+    with span("file.write", path=str(path)) as s:
+        with open(path, mode + 'b') as f:
+            f.write(data)
+        s.add('bytes_written', len(data))
+    return len(data)